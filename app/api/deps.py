@@ -1,9 +1,8 @@
-import asyncio
 import re
 import secrets
 import time
 from dataclasses import dataclass
-from typing import AsyncGenerator, Literal, Optional
+from typing import AsyncGenerator, Literal, Mapping, Optional
 
 from fastapi import Depends, Header, Request
 from app.utils.exceptions import (
@@ -17,10 +16,11 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db.session import get_db_session
+from app.db.session import get_db_session, get_read_sessionmaker
 from app.utils.security import decode_token
 from app.db.models.participant import Participant
 from app.config import canonicalize_http_origin, settings
+from app.utils.rate_limit import SlidingWindowCounter, redis_hit, route_cost
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 optional_oauth2 = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
@@ -33,10 +33,8 @@ def _admin_token_matches(candidate: str) -> bool:
     )
 
 
-_rate_limit_lock = asyncio.Lock()
-_rate_limit_counters: dict[tuple[int, str], int] = {}
+_rate_limit_windows = SlidingWindowCounter()
 _RATE_LIMIT_MAX_ENTRIES = 10_000
-_rate_limit_last_cleanup_bucket: int | None = None
 
 
 # Paths that are explicitly exempt from rate-limiting.
@@ -50,8 +48,6 @@ _RATE_LIMIT_EXEMPT_PATHS: frozenset[str] = frozenset(
 
 
 async def rate_limit(request: Request) -> None:
-    global _rate_limit_last_cleanup_bucket
-
     if not settings.RATE_LIMIT_ENABLED:
         return
 
@@ -60,55 +56,35 @@ async def rate_limit(request: Request) -> None:
     if request_path in _RATE_LIMIT_EXEMPT_PATHS:
         return
 
+    client_host = (request.client.host if request.client else None) or "unknown"
+    window_seconds = max(1, int(settings.RATE_LIMIT_WINDOW_SECONDS))
+    limit = max(1, int(settings.RATE_LIMIT_REQUESTS_PER_WINDOW))
+    # A heavy endpoint may cost more than the whole budget of a tiny test limit; cap it
+    # so the endpoint stays reachable once per window.
+    cost = min(limit, route_cost(request, settings.RATE_LIMIT_ROUTE_COSTS))
+
     redis_client = getattr(getattr(request, "app", None), "state", None)
     redis_client = getattr(redis_client, "redis", None)
     if settings.REDIS_ENABLED and redis_client is not None:
-        client_host = (request.client.host if request.client else None) or "unknown"
-        window_seconds = max(1, int(settings.RATE_LIMIT_WINDOW_SECONDS))
-        limit = max(1, int(settings.RATE_LIMIT_REQUESTS_PER_WINDOW))
-        bucket = int(time.time() // window_seconds)
-        key = f"rl:{client_host}:{bucket}"
-
-        current = await redis_client.incr(key)
-        if current == 1:
-            # Ensure key expires after the window.
-            await redis_client.expire(key, window_seconds + 1)
-
-        if current > limit:
-            raise TooManyRequestsException(
-                details={
-                    "window_seconds": window_seconds,
-                    "limit": limit,
-                }
-            )
-        return
+        allowed = await redis_hit(
+            redis_client,
+            f"rl:{client_host}",
+            now=time.time(),
+            window_seconds=window_seconds,
+            limit=limit,
+            cost=cost,
+        )
+    else:
+        allowed = _rate_limit_windows.hit(
+            client_host,
+            now=time.monotonic(),
+            window_seconds=window_seconds,
+            limit=limit,
+            cost=cost,
+            max_entries=int(_RATE_LIMIT_MAX_ENTRIES),
+        )
 
-    client_host = (request.client.host if request.client else None) or "unknown"
-    window_seconds = max(1, int(settings.RATE_LIMIT_WINDOW_SECONDS))
-    limit = max(1, int(settings.RATE_LIMIT_REQUESTS_PER_WINDOW))
-    bucket = int(time.monotonic() // window_seconds)
-    key = (bucket, client_host)
-
-    async with _rate_limit_lock:
-        if _rate_limit_last_cleanup_bucket != bucket:
-            stale_keys = [
-                stored_key
-                for stored_key in _rate_limit_counters
-                if stored_key[0] < bucket - 1
-            ]
-            for stale_key in stale_keys:
-                _rate_limit_counters.pop(stale_key, None)
-            _rate_limit_last_cleanup_bucket = bucket
-
-        current = _rate_limit_counters.pop(key, 0) + 1
-        _rate_limit_counters[key] = current
-
-        max_entries = max(1, int(_RATE_LIMIT_MAX_ENTRIES))
-        while len(_rate_limit_counters) > max_entries:
-            oldest_key = next(iter(_rate_limit_counters))
-            _rate_limit_counters.pop(oldest_key, None)
-
-    if current > limit:
+    if not allowed:
         raise TooManyRequestsException(
             details={
                 "window_seconds": window_seconds,
@@ -125,6 +101,19 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async for session in get_db_session():
         yield session
 
+async def get_read_db(db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the read replica when configured, else `get_db`.
+
+    The primary session is only checked out if something else in the request uses it.
+    """
+
+    read_sessionmaker = get_read_sessionmaker()
+    if read_sessionmaker is None:
+        yield db
+        return
+    async with read_sessionmaker() as session:
+        yield session
+
 async def get_current_participant(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(reusable_oauth2)
@@ -232,8 +221,15 @@ def _check_csrf_origin(request: Request, actor: "SimulatorActor") -> None:
         return  # CSRF only applies to cookie-auth
     if request.method in ("GET", "HEAD", "OPTIONS"):
         return  # Safe methods are exempt
+    check_simulator_origin(request.headers.get("origin"))
+
 
-    origin = request.headers.get("origin")
+def check_simulator_origin(origin: str | None) -> None:
+    """Origin allowlist check for cookie-auth simulator traffic.
+
+    Applied to state-changing requests (above) and to WebSocket handshakes, which
+    browsers send cross-site with cookies attached.
+    """
     if not origin:
         raise ForbiddenException(
             "Missing Origin header for cookie-auth request",
@@ -253,24 +249,15 @@ def _check_csrf_origin(request: Request, actor: "SimulatorActor") -> None:
         )
 
 
-async def require_simulator_actor(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-    x_admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
-    x_simulator_owner: str | None = Header(default=None, alias="X-Simulator-Owner"),
-    token: str | None = Depends(optional_oauth2),
+async def resolve_simulator_actor(
+    db: AsyncSession,
+    *,
+    x_admin_token: str | None,
+    x_simulator_owner: str | None,
+    token: str | None,
+    cookies: Mapping[str, str],
 ) -> SimulatorActor:
-    """Resolve actor identity for simulator endpoints.
-
-    Priority:
-    1. X-Admin-Token → admin (check X-Simulator-Owner for override)
-    2. Authorization: Bearer JWT → participant
-    3. Cookie geo_sim_sid → anon
-    4. → 401
-
-    After resolving the actor, applies CSRF Origin check for cookie-auth (anon)
-    actors on state-changing (non-safe) requests per spec §11.
-    """
+    """Credential resolution shared by simulator HTTP routes and the run WebSocket."""
     from app.core.simulator.session import COOKIE_NAME, validate_session
 
     _actor: Optional[SimulatorActor] = None
@@ -322,7 +309,7 @@ async def require_simulator_actor(
 
     # 3. Cookie geo_sim_sid → anon
     if _actor is None:
-        cookie_value = request.cookies.get(COOKIE_NAME)
+        cookie_value = cookies.get(COOKIE_NAME)
         if cookie_value:
             session_info = validate_session(
                 cookie_value,
@@ -340,6 +327,34 @@ async def require_simulator_actor(
     # 4. No valid credentials
     if _actor is None:
         raise UnauthorizedException("No valid credentials")
+    return _actor
+
+
+async def require_simulator_actor(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+    x_simulator_owner: str | None = Header(default=None, alias="X-Simulator-Owner"),
+    token: str | None = Depends(optional_oauth2),
+) -> SimulatorActor:
+    """Resolve actor identity for simulator endpoints.
+
+    Priority:
+    1. X-Admin-Token → admin (check X-Simulator-Owner for override)
+    2. Authorization: Bearer JWT → participant
+    3. Cookie geo_sim_sid → anon
+    4. → 401
+
+    After resolving the actor, applies CSRF Origin check for cookie-auth (anon)
+    actors on state-changing (non-safe) requests per spec §11.
+    """
+    _actor = await resolve_simulator_actor(
+        db,
+        x_admin_token=x_admin_token,
+        x_simulator_owner=x_simulator_owner,
+        token=token,
+        cookies=request.cookies,
+    )
 
     # 5. CSRF Origin check for cookie-auth actors on state-changing requests (spec §11).
     _check_csrf_origin(request, _actor)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 
 from app.api import deps
-from app.api.v1 import auth, participants, trustlines, payments, balance, clearing, integrity, equivalents, health, admin, websocket, simulator
+from app.api.v1 import auth, participants, trustlines, payments, balance, clearing, integrity, equivalents, health, admin, websocket, simulator, simulator_ws
 
 api_router = APIRouter()
 
@@ -18,4 +18,5 @@ api_router.include_router(equivalents.router, prefix="/equivalents", tags=["Equi
 api_router.include_router(health.router, tags=["Health"], dependencies=_http_deps)
 api_router.include_router(admin.router, tags=["Admin"], dependencies=_http_deps)
 api_router.include_router(simulator.router, tags=["Simulator"], dependencies=_http_deps)
-api_router.include_router(websocket.router, tags=["WebSocket"])
\ No newline at end of file
+api_router.include_router(websocket.router, tags=["WebSocket"])
+api_router.include_router(simulator_ws.router, tags=["Simulator"])
\ No newline at end of file
@@ -2,17 +2,17 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import Callable
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 from pydantic import TypeAdapter, ValidationError, WithJsonSchema
-from sqlalchemy import case, String, cast, desc, func, select, and_, union_all
+from sqlalchemy import String, cast, desc, func, select, and_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import aliased
 
+import app.db.session as db_session
 from app.api import deps
 from app.config import Settings, settings
 from app.db.models.audit_log import AuditLog
@@ -38,6 +38,7 @@ from app.schemas.admin import (
     AdminFeatureFlags,
     AdminFeatureFlagsPatchRequest,
     AdminMigrationsStatus,
+    AdminSqlDebugResponse,
     AdminParticipantActionRequest,
     AdminParticipantStatusResponse,
     AdminParticipantsListResponse,
@@ -56,15 +57,17 @@ from app.schemas.graph import (
     AdminClearingCycleEdge,
     AdminClearingCyclesForEquivalent,
     AdminClearingCyclesResponse,
-    AdminGraphDebt,
     AdminGraphEgoResponse,
-    AdminGraphParticipant,
     AdminGraphSnapshotResponse,
 )
 from app.schemas.trustline import TrustLine as TrustLineSchema
 from app.core.clearing.service import ClearingService
+from app.core.admin import liquidity_view
+from app.core.admin.graph_snapshot import AdminGraph, load_admin_graph
 from app.core.admin.metrics import compute_participant_metrics, is_ratio_below_threshold
+from app.core.participants.search import search_terms
 from app.core.trustlines.service import TrustLineService
+from app.db import instrumentation as db_instrumentation
 from app.core.payments.engine import PaymentEngine
 from app.utils.exceptions import (
     BadRequestException,
@@ -73,6 +76,7 @@ from app.utils.exceptions import (
     TimeoutException,
 )
 from app.utils.metrics import PAYMENT_EVENTS_TOTAL
+from app.utils import snapshot_cache, snapshot_codec
 from app.utils.request_id import new_request_id, request_id_var, validate_request_id
 from app.utils.validation import validate_equivalent_code, validate_equivalent_precision
 
@@ -80,30 +84,6 @@ from app.schemas.metrics import AdminParticipantMetricsResponse
 
 
 
-# Live rows first, then a stable tie-break.  Used by the admin graph queries: since
-# migration 019 a closed incarnation may share (from, to, equivalent) with the live one, so
-# a query that does not order deterministically returns them in planner order, and a query
-# that does not de-duplicate emits BOTH as graph edges -- attaching the same `Debt` row to
-# each and doubling `used`/`available`.
-_TRUSTLINE_LIVE_FIRST = case((TrustLine.status == "closed", 1), else_=0)
-
-
-def _dedupe_trustline_rows(rows, *, equivalent_index: int, from_index: int, to_index: int):
-    """Keep one row per (equivalent, from, to) -- the live one when it exists.
-
-    Restores the "one edge per triple" shape the graph had while the unique constraint was
-    unconditional, without hiding pairs whose only incarnation is closed.
-    """
-    seen: set[tuple] = set()
-    out = []
-    for row in rows:
-        key = (row[equivalent_index], row[from_index], row[to_index])
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(row)
-    return out
-
 router = APIRouter(prefix="/admin", dependencies=[Depends(deps.require_admin)])
 
 _runtime_config_lock = asyncio.Lock()
@@ -123,6 +103,9 @@ _DecimalThreshold = Annotated[
     Query(ge=0.0, le=1.0),
     WithJsonSchema({"type": "number", "minimum": 0, "maximum": 1}),
 ]
+
+# Relative width of the threshold band that bottleneck queries re-check exactly.
+_THRESHOLD_BAND = Decimal("1e-9")
 _OptionalDecimalThreshold = Annotated[
     Decimal | None,
     Query(ge=0.0, le=1.0),
@@ -510,16 +493,13 @@ async def list_admin_participants(
     type: Literal["person", "business", "hub"] | None = Query(None, description="Participant type"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=200),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminParticipantsListResponse:
     base = select(Participant)
 
-    if q:
-        needle = f"%{q}%"
-        base = base.where(
-            (Participant.pid.ilike(needle))
-            | (Participant.display_name.ilike(needle))
-        )
+    terms = await search_terms(db, q)
+    if terms is not None:
+        base = base.where(terms.match_clause())
     status_db_values = _participant_status_db_values_for_filter(status)
     if status_db_values:
         if len(status_db_values) == 1:
@@ -533,7 +513,10 @@ async def list_admin_participants(
         await db.execute(select(func.count()).select_from(base.subquery()))
     ).scalar_one()
 
-    stmt = base.order_by(Participant.id.asc()).limit(per_page).offset((page - 1) * per_page)
+    order_by = [Participant.id.asc()]
+    if terms is not None:
+        order_by.insert(0, terms.rank_expr().asc())
+    stmt = base.order_by(*order_by).limit(per_page).offset((page - 1) * per_page)
     items = (await db.execute(stmt)).scalars().all()
 
     return AdminParticipantsListResponse(
@@ -556,7 +539,7 @@ async def list_admin_participants(
 
 @router.get("/participants/stats", response_model=AdminParticipantsStatsResponse)
 async def admin_participants_stats(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminParticipantsStatsResponse:
     status_rows = (
         await db.execute(
@@ -596,95 +579,59 @@ async def _load_admin_trustline_bottlenecks(
     equivalent: str | None,
     db: AsyncSession,
 ) -> tuple[int, list[TrustLineSchema]]:
-    p_from = aliased(Participant)
-    p_to = aliased(Participant)
-    used_expr = func.coalesce(Debt.amount, 0)
-    available_expr = TrustLine.limit - used_expr
-
-    stmt = (
-        select(
-            TrustLine.id,
-            TrustLine.limit,
-            TrustLine.status,
-            TrustLine.created_at,
-            TrustLine.updated_at,
-            TrustLine.policy,
-            EquivalentModel.code.label("equivalent"),
-            p_from.pid.label("from_pid"),
-            p_from.display_name.label("from_display_name"),
-            p_to.pid.label("to_pid"),
-            p_to.display_name.label("to_display_name"),
-            used_expr.label("used"),
-            available_expr.label("available"),
-        )
-        .select_from(TrustLine)
-        .join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id)
-        .join(p_from, TrustLine.from_participant_id == p_from.id)
-        .join(p_to, TrustLine.to_participant_id == p_to.id)
-        .outerjoin(
-            Debt,
-            and_(
-                Debt.debtor_id == TrustLine.to_participant_id,
-                Debt.creditor_id == TrustLine.from_participant_id,
-                Debt.equivalent_id == TrustLine.equivalent_id,
-            ),
+    view = await liquidity_view.get_liquidity_view(db, equivalent)
+    if view is not None:
+        return view.bottlenecks(threshold=threshold, limit=limit)
+    if threshold < 0:
+        return 0, []
+
+    available_expr = TrustLine.limit - func.coalesce(Debt.amount, 0)
+    base = liquidity_view.trustline_rows_stmt().where(TrustLine.limit > 0)
+    if equivalent:
+        base = base.where(EquivalentModel.code == equivalent)
+
+    # The database filters in its own arithmetic (binary floats on SQLite), so it only
+    # settles rows clearly below the threshold; the narrow band around it is checked
+    # exactly here, as the ratio must not round across the boundary.
+    lower = threshold * (1 - _THRESHOLD_BAND)
+    upper = threshold * (1 + _THRESHOLD_BAND)
+    certain = (
+        await db.execute(
+            select(func.count()).select_from(
+                base.where(available_expr < TrustLine.limit * lower).subquery()
+            )
         )
-        .where(
-            TrustLine.status == "active",
-            TrustLine.limit > 0,
+    ).scalar_one()
+    band = (
+        await db.execute(
+            base.where(
+                available_expr >= TrustLine.limit * lower,
+                available_expr < TrustLine.limit * upper,
+            )
         )
-        .order_by(available_expr.asc(), TrustLine.created_at.asc())
+    ).all()
+    band_matches = sum(
+        1
+        for row in band
+        if is_ratio_below_threshold(numerator=row.available, denominator=row.limit, threshold=threshold)
     )
+    total = int(certain) + band_matches
 
-    if equivalent:
-        stmt = stmt.where(EquivalentModel.code == equivalent)
-
-    rows = (await db.execute(stmt)).all()
-    total = 0
     items: list[TrustLineSchema] = []
-    for (
-        tl_id,
-        limit_value,
-        status,
-        created_at,
-        updated_at,
-        policy,
-        equivalent_code,
-        from_pid,
-        from_display_name,
-        to_pid,
-        to_display_name,
-        used,
-        available,
-    ) in rows:
-        if not is_ratio_below_threshold(
-            numerator=available,
-            denominator=limit_value,
-            threshold=threshold,
-        ):
-            continue
-        total += 1
-        if len(items) >= limit:
-            continue
-        items.append(
-            TrustLineSchema.model_validate(
-                {
-                    "id": tl_id,
-                    "from_pid": from_pid,
-                    "to_pid": to_pid,
-                    "from_display_name": from_display_name,
-                    "to_display_name": to_display_name,
-                    "equivalent_code": equivalent_code,
-                    "limit": limit_value,
-                    "used": used,
-                    "available": available,
-                    "status": status,
-                    "created_at": created_at,
-                    "updated_at": updated_at,
-                    "policy": policy,
-                }
+    if total:
+        # Rows below `upper` that fail the exact check all sit in the band.
+        rows = (
+            await db.execute(
+                base.where(available_expr < TrustLine.limit * upper)
+                .order_by(available_expr.asc(), TrustLine.created_at.asc())
+                .limit(limit + len(band) - band_matches)
             )
-        )
+        ).all()
+        for row in rows:
+            if is_ratio_below_threshold(numerator=row.available, denominator=row.limit, threshold=threshold):
+                items.append(liquidity_view.trustline_row_schema(row))
+                if len(items) >= limit:
+                    break
 
     return total, items
 
@@ -694,7 +641,7 @@ async def admin_trustlines_bottlenecks(
     threshold: _DecimalThreshold = 0.10,
     limit: int = Query(10, ge=1, le=50),
     equivalent: str | None = Query(None, description="Equivalent code (optional)"),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminTrustLinesBottlenecksResponse:
     eq_code = str(equivalent or "").strip().upper() or None
     threshold_dec = Decimal(str(threshold))
@@ -713,106 +660,106 @@ async def admin_liquidity_summary(
     equivalent: str | None = Query(None, description="Equivalent code (optional; omit for ALL)"),
     threshold: _DecimalThreshold = 0.10,
     limit: int = Query(10, ge=1, le=50, description="Top-N size for ranked lists"),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminLiquiditySummaryResponse:
     eq_code = str(equivalent or "").strip().upper() or None
     threshold_dec = Decimal(str(threshold))
     now = _utc_now()
 
-    used_expr = func.coalesce(Debt.amount, 0)
-    available_expr = TrustLine.limit - used_expr
-
-    totals_stmt = (
-        select(
-            func.count().label("active_trustlines"),
-            func.coalesce(func.sum(TrustLine.limit), 0).label("total_limit"),
-            func.coalesce(func.sum(used_expr), 0).label("total_used"),
-            func.coalesce(func.sum(available_expr), 0).label("total_available"),
-        )
-        .select_from(TrustLine)
-        .join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id)
-        .outerjoin(
-            Debt,
-            and_(
-                Debt.debtor_id == TrustLine.to_participant_id,
-                Debt.creditor_id == TrustLine.from_participant_id,
-                Debt.equivalent_id == TrustLine.equivalent_id,
-            ),
-        )
-        .where(TrustLine.status == "active")
-    )
-    if eq_code:
-        totals_stmt = totals_stmt.where(EquivalentModel.code == eq_code)
-
-    totals = (await db.execute(totals_stmt)).one()
-    active_trustlines = int(totals.active_trustlines or 0)
-    total_limit = totals.total_limit
-    total_used = totals.total_used
-    total_available = totals.total_available
-
-    # Incidents over SLA ("stuck" payments). Filter by equivalent in Python to keep it portable.
+    # Incidents over SLA ("stuck" payments), counted on the denormalised equivalent column.
     sla_seconds = int(getattr(settings, "PAYMENT_TX_STUCK_TIMEOUT_SECONDS", 120) or 120)
     cutoff = now - timedelta(seconds=sla_seconds)
-    inc_payloads = (
-        await db.execute(
-            select(Transaction.payload)
-            .where(
-                Transaction.type == "PAYMENT",
-                Transaction.state.in_(_ACTIVE_PAYMENT_TX_STATES),
-                Transaction.updated_at < cutoff,
+    incidents_stmt = select(func.count()).select_from(Transaction).where(
+        Transaction.type == "PAYMENT",
+        Transaction.state.in_(_ACTIVE_PAYMENT_TX_STATES),
+        Transaction.updated_at < cutoff,
+    )
+    if eq_code:
+        incidents_stmt = incidents_stmt.where(Transaction.equivalent_code == eq_code)
+    incidents_over_sla = (await db.execute(incidents_stmt)).scalar_one()
+
+    view = await liquidity_view.get_liquidity_view(db, eq_code)
+    if view is not None:
+        active_trustlines = view.active_trustlines
+        total_limit = view.total_limit
+        total_used = view.total_used
+        total_available = view.total_available
+        top_creditors = list(view.top_creditors[:limit])
+        top_debtors = list(view.top_debtors[:limit])
+        top_by_abs_net = list(view.top_by_abs_net[:limit])
+    else:
+        used_expr = func.coalesce(Debt.amount, 0)
+        available_expr = TrustLine.limit - used_expr
+
+        totals_stmt = (
+            select(
+                func.count().label("active_trustlines"),
+                func.coalesce(func.sum(TrustLine.limit), 0).label("total_limit"),
+                func.coalesce(func.sum(used_expr), 0).label("total_used"),
+                func.coalesce(func.sum(available_expr), 0).label("total_available"),
+            )
+            .select_from(TrustLine)
+            .join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id)
+            .outerjoin(
+                Debt,
+                and_(
+                    Debt.debtor_id == TrustLine.to_participant_id,
+                    Debt.creditor_id == TrustLine.from_participant_id,
+                    Debt.equivalent_id == TrustLine.equivalent_id,
+                ),
             )
+            .where(TrustLine.status == "active")
         )
-    ).scalars().all()
-    if eq_code:
-        incidents_over_sla = sum(
-            1
-            for p in inc_payloads
-            if str((p or {}).get("equivalent") or "").strip().upper() == eq_code
+        if eq_code:
+            totals_stmt = totals_stmt.where(EquivalentModel.code == eq_code)
+
+        totals = (await db.execute(totals_stmt)).one()
+        active_trustlines = int(totals.active_trustlines or 0)
+        total_limit = totals.total_limit
+        total_used = totals.total_used
+        total_available = totals.total_available
+
+        # Net positions (Debt direction: debtor -> creditor).
+        debt_base = (
+            select(Debt)
+            .join(EquivalentModel, Debt.equivalent_id == EquivalentModel.id)
+            .where(Debt.amount > 0)
         )
-    else:
-        incidents_over_sla = len(inc_payloads)
-
-    # Net positions (Debt direction: debtor -> creditor).
-    debt_base = (
-        select(Debt)
-        .join(EquivalentModel, Debt.equivalent_id == EquivalentModel.id)
-        .where(Debt.amount > 0)
-    )
-    if eq_code:
-        debt_base = debt_base.where(EquivalentModel.code == eq_code)
-    debt_subq = debt_base.subquery()
-
-    pos = select(debt_subq.c.creditor_id.label("participant_id"), debt_subq.c.amount.label("delta"))
-    neg = select(debt_subq.c.debtor_id.label("participant_id"), (-debt_subq.c.amount).label("delta"))
-    delta = union_all(pos, neg).subquery()
-
-    net_stmt = (
-        select(
-            Participant.pid.label("pid"),
-            Participant.display_name.label("display_name"),
-            func.coalesce(func.sum(delta.c.delta), 0).label("net"),
+        if eq_code:
+            debt_base = debt_base.where(EquivalentModel.code == eq_code)
+        debt_subq = debt_base.subquery()
+
+        pos = select(debt_subq.c.creditor_id.label("participant_id"), debt_subq.c.amount.label("delta"))
+        neg = select(debt_subq.c.debtor_id.label("participant_id"), (-debt_subq.c.amount).label("delta"))
+        delta = union_all(pos, neg).subquery()
+
+        net_stmt = (
+            select(
+                Participant.pid.label("pid"),
+                Participant.display_name.label("display_name"),
+                func.coalesce(func.sum(delta.c.delta), 0).label("net"),
+            )
+            .select_from(delta)
+            .join(Participant, Participant.id == delta.c.participant_id)
+            .group_by(Participant.pid, Participant.display_name)
         )
-        .select_from(delta)
-        .join(Participant, Participant.id == delta.c.participant_id)
-        .group_by(Participant.pid, Participant.display_name)
-    )
 
-    net = net_stmt.subquery()
-    net_base = select(net.c.pid, net.c.display_name, net.c.net)
+        net = net_stmt.subquery()
+        net_base = select(net.c.pid, net.c.display_name, net.c.net)
 
-    top_creditors_rows = (
-        await db.execute(net_base.where(net.c.net > 0).order_by(net.c.net.desc()).limit(limit))
-    ).all()
-    top_debtors_rows = (
-        await db.execute(net_base.where(net.c.net < 0).order_by(net.c.net.asc()).limit(limit))
-    ).all()
-    top_abs_rows = (
-        await db.execute(net_base.order_by(func.abs(net.c.net).desc()).limit(limit))
-    ).all()
+        top_creditors_rows = (
+            await db.execute(net_base.where(net.c.net > 0).order_by(net.c.net.desc()).limit(limit))
+        ).all()
+        top_debtors_rows = (
+            await db.execute(net_base.where(net.c.net < 0).order_by(net.c.net.asc()).limit(limit))
+        ).all()
+        top_abs_rows = (
+            await db.execute(net_base.order_by(func.abs(net.c.net).desc()).limit(limit))
+        ).all()
 
-    top_creditors = [AdminLiquidityNetRow(pid=pid, display_name=dn, net=netv) for pid, dn, netv in top_creditors_rows]
-    top_debtors = [AdminLiquidityNetRow(pid=pid, display_name=dn, net=netv) for pid, dn, netv in top_debtors_rows]
-    top_by_abs_net = [AdminLiquidityNetRow(pid=pid, display_name=dn, net=netv) for pid, dn, netv in top_abs_rows]
+        top_creditors = [AdminLiquidityNetRow(pid=pid, display_name=dn, net=netv) for pid, dn, netv in top_creditors_rows]
+        top_debtors = [AdminLiquidityNetRow(pid=pid, display_name=dn, net=netv) for pid, dn, netv in top_debtors_rows]
+        top_by_abs_net = [AdminLiquidityNetRow(pid=pid, display_name=dn, net=netv) for pid, dn, netv in top_abs_rows]
 
     # Top bottleneck edges with computed used/available.
     bottlenecks, bottleneck_items = await _load_admin_trustline_bottlenecks(
@@ -872,6 +819,7 @@ async def _set_participant_status(
     except BaseException:
         await db.rollback()
         raise
+    snapshot_cache.bump_ledger_version()
 
     return result
 
@@ -958,7 +906,7 @@ async def list_audit_log(
     object_id: str | None = None,
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminAuditLogListResponse:
     base = select(AuditLog)
 
@@ -996,7 +944,7 @@ async def list_audit_log(
 async def list_incidents(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=200),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminIncidentsListResponse:
     """List "stuck" payment transactions (over SLA) for operator intervention."""
 
@@ -1169,6 +1117,7 @@ async def admin_create_equivalent(
     except BaseException:
         await db.rollback()
         raise
+    snapshot_cache.bump_ledger_version()
     return result
 
 
@@ -1262,6 +1211,7 @@ async def admin_update_equivalent(
     except BaseException:
         await db.rollback()
         raise
+    snapshot_cache.bump_ledger_version()
 
     return result
 
@@ -1289,7 +1239,7 @@ async def _equivalent_usage_counts(db: AsyncSession, *, equivalent_id) -> dict[s
 @router.get("/equivalents/{code}/usage", response_model=AdminEquivalentUsageResponse)
 async def admin_equivalent_usage(
     code: str,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminEquivalentUsageResponse:
     normalized = str(code or "").strip().upper()
     validate_equivalent_code(normalized)
@@ -1352,6 +1302,7 @@ async def admin_delete_equivalent(
     except BaseException:
         await db.rollback()
         raise
+    snapshot_cache.bump_ledger_version()
 
     return AdminDeleteResponse(deleted=normalized)
 
@@ -1386,6 +1337,17 @@ async def migrations_status() -> AdminMigrationsStatus:
         return AdminMigrationsStatus(current_revision=None, head_revision=None, is_up_to_date=False)
 
 
+@router.get("/debug/sql", response_model=AdminSqlDebugResponse)
+async def sql_debug(
+    limit: int = Query(50, ge=1, le=500),
+    request_id: str | None = Query(None, description="Only requests/slow statements with this X-Request-ID"),
+) -> AdminSqlDebugResponse:
+    """SQL fingerprints by total time, recent slow statements and per-request counts (this process)."""
+    return AdminSqlDebugResponse.model_validate(
+        db_instrumentation.snapshot(limit=limit, request_id=request_id)
+    )
+
+
 @router.get("/trustlines", response_model=AdminTrustLinesListResponse)
 async def admin_list_trustlines(
     equivalent: str | None = None,
@@ -1394,7 +1356,7 @@ async def admin_list_trustlines(
     status: Literal["active", "frozen", "closed"] | None = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=200),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminTrustLinesListResponse:
     service = TrustLineService(db)
     offset = (page - 1) * per_page
@@ -1417,341 +1379,111 @@ async def admin_list_trustlines(
     return AdminTrustLinesListResponse(items=items, page=page, per_page=per_page, total=int(total))
 
 
-@router.get("/graph/snapshot", response_model=AdminGraphSnapshotResponse)
+async def _admin_graph_entry(db: AsyncSession, equivalent: str | None) -> snapshot_cache.CachedSnapshot:
+    """Full graph for `equivalent` (viz basis), from the snapshot cache when still current."""
+
+    key = ("admin_graph", equivalent or "")
+    # Taken before reading: a commit that lands while we build leaves the entry outdated.
+    version = snapshot_cache.ledger_version(None)
+    entry = snapshot_cache.get_snapshot(key, version=version)
+    if entry is not None:
+        return entry
+
+    async with db_session.primary_session_for(db) as source:
+        graph = await load_admin_graph(source, equivalent=equivalent)
+    body = AdminGraphSnapshotResponse(
+        participants=graph.participants,
+        trustlines=graph.trustlines,
+        incidents=[],
+        equivalents=graph.equivalents,
+        debts=graph.debts,
+        audit_log=[],
+        transactions=[],
+    ).model_dump_json(by_alias=True)
+    return snapshot_cache.store_snapshot(
+        key, snapshot_cache.make_snapshot(graph, body.encode("utf-8"), version=version)
+    )
+
+
+async def _graph_fetch_extras(db: AsyncSession, include: str | None) -> dict[str, list[Any]]:
+    include_set = _parse_include_csv(include)
+    extras: dict[str, list[Any]] = {"incidents": [], "audit_log": [], "transactions": []}
+    if "incidents" in include_set:
+        extras["incidents"] = await _graph_fetch_incidents(
+            db,
+            limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_INCIDENTS", 50) or 50),
+        )
+    if "audit_log" in include_set:
+        extras["audit_log"] = await _graph_fetch_audit_log(
+            db,
+            limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_AUDIT_EVENTS", 50) or 50),
+        )
+    if "transactions" in include_set:
+        extras["transactions"] = await _graph_fetch_transactions(
+            db,
+            limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_TRANSACTIONS", 50) or 50),
+        )
+    return extras
+
+
+def _graph_response(graph: AdminGraphSnapshotResponse, accept: str | None) -> Response | AdminGraphSnapshotResponse:
+    """Uncached snapshot (with extras) in the negotiated representation."""
+
+    compress = snapshot_codec.requested_compression(accept)
+    if compress is None:
+        return graph
+    try:
+        body = snapshot_codec.encode_admin_graph(graph, compress)
+    except ValueError:
+        return graph
+    return Response(content=body, media_type=snapshot_codec.MEDIA_TYPE, headers={"Vary": "Accept"})
+
+
+@router.get("/graph/snapshot", response_model=AdminGraphSnapshotResponse, responses=snapshot_codec.SNAPSHOT_RESPONSES)
 async def admin_graph_snapshot(
+    request: Request,
     equivalent: str | None = Query(None, description="Optional equivalent code for net visualization"),
     include: str | None = Query(
         None,
         description="Optional extras to include (comma-separated): incidents,audit_log,transactions",
     ),
-    db: AsyncSession = Depends(deps.get_db),
-) -> AdminGraphSnapshotResponse:
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(deps.get_read_db),
+) -> Response | AdminGraphSnapshotResponse:
     """Return a GraphPage-compatible snapshot.
 
     Guardrail: TrustLine direction in output is from→to = creditor→debtor.
+
+    Without `include` the response carries an ETag and honours `If-None-Match` (304);
+    extras are read per request and are not covered by the ETag. `Accept:
+    application/vnd.geo.graph-snapshot` selects the columnar encoding (`snapshot_codec`).
     """
 
     if equivalent is not None:
         validate_equivalent_code(equivalent)
 
-    # Participants
-    participants_rows = (
-        await db.execute(
-            select(Participant.pid, Participant.display_name, Participant.type, Participant.status)
-            .order_by(Participant.pid.asc())
-        )
-    ).all()
-    participants = []
-    for pid, display_name, type_, status in participants_rows:
-        participants.append(
-            AdminGraphParticipant(
-                pid=pid,
-                display_name=display_name,
-                type=type_,
-                status=str(status or "").strip().lower(),
-                net_balance_atoms=None,
-                net_sign=None,
-                viz_color_key=None,
-                viz_size=None,
-            )
-        )
-
-    # Equivalents
-    eq_models = (
-        await db.execute(select(EquivalentModel).order_by(EquivalentModel.code.asc()))
-    ).scalars().all()
-    equivalents = [StoredEquivalent.model_validate(e) for e in eq_models]
-
-    def _eq_precision(code: str) -> int:
-        c = str(code or "").strip().upper()
-        for e in equivalents:
-            if str(e.code).strip().upper() == c:
-                try:
-                    return int(e.precision)
-                except Exception:
-                    return 0
-        return 0
-
-    async def _attach_net_viz(participants_list: list[AdminGraphParticipant], eq_code: str | None) -> None:
-        # Variant A: if no equivalent, keep viz fields null.
-        eqc = str(eq_code or "").strip().upper()
-        if not eqc:
-            return
-
-        precision = _eq_precision(eqc)
-        scale10 = Decimal(10) ** precision
-
-        # Build participant id map for aggregation.
-        pid_list = [p.pid for p in participants_list if p.pid]
-        if not pid_list:
-            return
-
-        # Aggregate credits/debts for the selected equivalent.
-        eq_id = (await db.execute(select(EquivalentModel.id).where(EquivalentModel.code == eqc))).scalar_one_or_none()
-        if not eq_id:
-            return
-
-        debt_by_pid: dict[str, Decimal] = {}
-        credit_by_pid: dict[str, Decimal] = {}
-
-        d_rows = (
-            await db.execute(
-                select(p_debtor.pid, func.coalesce(func.sum(Debt.amount), 0))
-                .select_from(Debt)
-                .join(p_debtor, Debt.debtor_id == p_debtor.id)
-                .where(Debt.equivalent_id == eq_id, Debt.amount > 0, p_debtor.pid.in_(pid_list))
-                .group_by(p_debtor.pid)
-            )
-        ).all()
-        for pid0, s in d_rows:
-            debt_by_pid[str(pid0)] = s
-
-        c_rows = (
-            await db.execute(
-                select(p_creditor.pid, func.coalesce(func.sum(Debt.amount), 0))
-                .select_from(Debt)
-                .join(p_creditor, Debt.creditor_id == p_creditor.id)
-                .where(Debt.equivalent_id == eq_id, Debt.amount > 0, p_creditor.pid.in_(pid_list))
-                .group_by(p_creditor.pid)
-            )
-        ).all()
-        for pid0, s in c_rows:
-            credit_by_pid[str(pid0)] = s
-
-        # Compute atoms + magnitudes for percentile-based sizing.
-        net_atoms_by_pid: dict[str, int] = {}
-        mags: list[int] = []
-        debt_mags: list[int] = []
-
-        def _to_atoms(amount: Decimal) -> int:
-            # amount is Decimal in major units; convert to integer atoms.
-            return int((amount * scale10).to_integral_value(rounding=ROUND_HALF_UP))
-
-        for p in participants_list:
-            deb = debt_by_pid.get(p.pid, Decimal(0))
-            cre = credit_by_pid.get(p.pid, Decimal(0))
-            net_dec = cre - deb
-            atoms = _to_atoms(net_dec)
-            net_atoms_by_pid[p.pid] = atoms
-            mags.append(abs(atoms))
-            if atoms < 0:
-                debt_mags.append(abs(atoms))
-
-        mags_sorted = sorted(mags)
-        n = len(mags_sorted)
-        debt_mags_sorted = sorted(debt_mags)
-        dn = len(debt_mags_sorted)
-
-        def _percentile(mag: int) -> float:
-            if n <= 1:
-                return 0.0
-            # Use bisect-right so equal magnitudes share percentile towards the right.
-            import bisect
-
-            i = bisect.bisect_right(mags_sorted, mag) - 1
-            i = max(0, min(i, n - 1))
-            return i / (n - 1)
-
-        DEBT_BINS = 9
-
-        def _debt_bin(mag: int) -> int:
-            if dn <= 1:
-                return 0
-            import bisect
-
-            i = bisect.bisect_right(debt_mags_sorted, mag) - 1
-            i = max(0, min(i, dn - 1))
-            pct = i / (dn - 1)
-            b = int(round(pct * (DEBT_BINS - 1)))
-            return max(0, min(b, DEBT_BINS - 1))
-
-        max_scale = 1.90
-        gamma = 0.75
-
-        def _scale_from_pct(pct: float) -> float:
-            if pct <= 0:
-                return 1.0
-            if pct >= 1:
-                return max_scale
-            return 1.0 + (max_scale - 1.0) * (pct**gamma)
-
-        for p in participants_list:
-            atoms = net_atoms_by_pid.get(p.pid, 0)
-            p.net_balance_atoms = str(atoms)
-            p.net_sign = -1 if atoms < 0 else (1 if atoms > 0 else 0)
-
-            status_key = str(p.status or "").strip().lower()
-            type_key = str(p.type or "").strip().lower()
-
-            if status_key in {"suspended", "frozen"}:
-                p.viz_color_key = "suspended"
-            elif status_key == "left":
-                p.viz_color_key = "left"
-            elif status_key in {"deleted", "banned"}:
-                p.viz_color_key = "deleted"
-            else:
-                if p.net_sign == -1:
-                    p.viz_color_key = f"debt-{_debt_bin(abs(atoms))}"
-                else:
-                    p.viz_color_key = "business" if type_key == "business" else "person"
-
-            pct = _percentile(abs(atoms))
-            s = _scale_from_pct(pct)
-
-            # Base sizes align with current Cytoscape styling.
-            if type_key == "business":
-                w0, h0 = 26, 22
-            else:
-                w0, h0 = 16, 16
-
-            p.viz_size = {"w": int(round(w0 * s)), "h": int(round(h0 * s))}
-
-    # Net visualization (backend-only) for selected equivalent
-    if equivalent:
-        # Reuse aliased Participants declared later in function.
-        p_debtor = aliased(Participant)
-        p_creditor = aliased(Participant)
-        await _attach_net_viz(participants, equivalent)
-
-    # Trustlines + used/available (no N+1)
-    p_from = aliased(Participant)
-    p_to = aliased(Participant)
-    tl_stmt = (
-        select(
-            TrustLine.id,
-            TrustLine.limit,
-            TrustLine.status,
-            TrustLine.created_at,
-            TrustLine.updated_at,
-            TrustLine.policy,
-            EquivalentModel.code.label("equivalent"),
-            p_from.pid.label("from_pid"),
-            p_from.display_name.label("from_display_name"),
-            p_to.pid.label("to_pid"),
-            p_to.display_name.label("to_display_name"),
-            func.coalesce(Debt.amount, 0).label("used"),
-        )
-        .select_from(TrustLine)
-        .join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id)
-        .join(p_from, TrustLine.from_participant_id == p_from.id)
-        .join(p_to, TrustLine.to_participant_id == p_to.id)
-        .outerjoin(
-            Debt,
-            and_(
-                Debt.debtor_id == TrustLine.to_participant_id,
-                Debt.creditor_id == TrustLine.from_participant_id,
-                Debt.equivalent_id == TrustLine.equivalent_id,
-            ),
-        )
-        .order_by(
-            EquivalentModel.code.asc(),
-            p_from.pid.asc(),
-            p_to.pid.asc(),
-            _TRUSTLINE_LIVE_FIRST.asc(),
-            TrustLine.id.asc(),
-        )
-    )
-
-    tl_rows = _dedupe_trustline_rows(
-        (await db.execute(tl_stmt)).all(),
-        equivalent_index=6,
-        from_index=7,
-        to_index=9,
+    accept = request.headers.get("accept")
+    entry = await _admin_graph_entry(db, equivalent)
+    if not _parse_include_csv(include):
+        entry = snapshot_codec.negotiate(entry, accept, snapshot_codec.encode_admin_graph)
+        return snapshot_cache.snapshot_response(entry, if_none_match=if_none_match)
+
+    graph: AdminGraph = entry.value
+    return _graph_response(
+        AdminGraphSnapshotResponse(
+            participants=graph.participants,
+            trustlines=graph.trustlines,
+            equivalents=graph.equivalents,
+            debts=graph.debts,
+            **(await _graph_fetch_extras(db, include)),
+        ),
+        accept,
     )
-    trustlines: list[TrustLineSchema] = []
-    for (
-        tl_id,
-        limit,
-        status,
-        created_at,
-        updated_at,
-        policy,
-        equivalent_code,
-        from_pid,
-        from_display_name,
-        to_pid,
-        to_display_name,
-        used,
-    ) in tl_rows:
-        used_dec = used
-        available = limit - used_dec
-        trustlines.append(
-            TrustLineSchema.model_validate(
-                {
-                    "id": tl_id,
-                    "from_pid": from_pid,
-                    "to_pid": to_pid,
-                    "from_display_name": from_display_name,
-                    "to_display_name": to_display_name,
-                    "equivalent_code": equivalent_code,
-                    "limit": limit,
-                    "used": used_dec,
-                    "available": available,
-                    "status": status,
-                    "created_at": created_at,
-                    "updated_at": updated_at,
-                    "policy": policy,
-                }
-            )
-        )
 
-    # Debts
-    p_debtor = aliased(Participant)
-    p_creditor = aliased(Participant)
-    debt_stmt = (
-        select(
-            EquivalentModel.code.label("equivalent"),
-            p_debtor.pid.label("debtor"),
-            p_creditor.pid.label("creditor"),
-            Debt.amount,
-        )
-        .select_from(Debt)
-        .join(EquivalentModel, Debt.equivalent_id == EquivalentModel.id)
-        .join(p_debtor, Debt.debtor_id == p_debtor.id)
-        .join(p_creditor, Debt.creditor_id == p_creditor.id)
-        .where(Debt.amount > 0)
-        .order_by(EquivalentModel.code.asc(), p_debtor.pid.asc(), p_creditor.pid.asc())
-    )
-    debt_rows = (await db.execute(debt_stmt)).all()
-    debts = [
-        AdminGraphDebt(equivalent=eq, debtor=debtor, creditor=creditor, amount=amount)
-        for eq, debtor, creditor, amount in debt_rows
-    ]
 
-    include_set = _parse_include_csv(include)
-    incidents: list[Any] = []
-    audit_log: list[Any] = []
-    transactions: list[Any] = []
-    if include_set:
-        if "incidents" in include_set:
-            incidents = await _graph_fetch_incidents(
-                db,
-                limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_INCIDENTS", 50) or 50),
-            )
-        if "audit_log" in include_set:
-            audit_log = await _graph_fetch_audit_log(
-                db,
-                limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_AUDIT_EVENTS", 50) or 50),
-            )
-        if "transactions" in include_set:
-            transactions = await _graph_fetch_transactions(
-                db,
-                limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_TRANSACTIONS", 50) or 50),
-            )
-
-    return AdminGraphSnapshotResponse(
-        participants=participants,
-        trustlines=trustlines,
-        incidents=incidents,
-        equivalents=equivalents,
-        debts=debts,
-        audit_log=audit_log,
-        transactions=transactions,
-    )
-
-
-@router.get("/graph/ego", response_model=AdminGraphEgoResponse)
+@router.get("/graph/ego", response_model=AdminGraphEgoResponse, responses=snapshot_codec.SNAPSHOT_RESPONSES)
 async def admin_graph_ego(
+    request: Request,
     pid: str = Query(..., description="Root participant PID"),
     depth: int = Query(1, ge=1, le=2, description="Neighborhood depth (1–2)"),
     equivalent: str | None = Query(None, description="Optional equivalent code filter"),
@@ -1760,13 +1492,16 @@ async def admin_graph_ego(
         None,
         description="Optional extras to include (comma-separated): incidents,audit_log,transactions",
     ),
-    db: AsyncSession = Depends(deps.get_db),
-) -> AdminGraphEgoResponse:
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(deps.get_read_db),
+) -> Response | AdminGraphEgoResponse:
     """Return a GraphPage-compatible ego snapshot around one participant.
 
     Notes:
     - Neighborhood is computed on the trustline graph as an undirected graph.
     - Returned trustlines and debts are restricted to the ego participant set.
+    - Cut from the cached full graph through its adjacency index; ETag/304 as for
+      `/graph/snapshot`.
     """
 
     root_pid = str(pid or "").strip()
@@ -1776,365 +1511,32 @@ async def admin_graph_ego(
     if equivalent is not None:
         validate_equivalent_code(equivalent)
 
-    status_filter = status
-
-    root = (
-        await db.execute(select(Participant).where(Participant.pid == root_pid))
-    ).scalar_one_or_none()
-    if not root:
-        raise NotFoundException("Participant not found")
-
-    visited_ids: set[Any] = {root.id}
-    frontier_ids: set[Any] = {root.id}
-
-    for _ in range(int(depth)):
-        if not frontier_ids:
-            break
+    entry = await _admin_graph_entry(db, equivalent)
+    graph: AdminGraph = entry.value
 
-        tl_pairs_stmt = (
-            select(TrustLine.from_participant_id, TrustLine.to_participant_id)
-            .select_from(TrustLine)
-            .where(
-                (TrustLine.from_participant_id.in_(list(frontier_ids)))
-                | (TrustLine.to_participant_id.in_(list(frontier_ids)))
-            )
+    def _slice() -> snapshot_cache.CachedSnapshot:
+        participants, trustlines, debts = graph.ego(
+            root_pid, depth=depth, equivalent=equivalent, statuses=status
         )
-
-        if equivalent:
-            tl_pairs_stmt = tl_pairs_stmt.join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id).where(
-                EquivalentModel.code == equivalent
-            )
-        if status:
-            tl_pairs_stmt = tl_pairs_stmt.where(TrustLine.status.in_(list(status)))
-
-        tl_pairs = (await db.execute(tl_pairs_stmt)).all()
-
-        next_frontier: set[Any] = set()
-        for from_id, to_id in tl_pairs:
-            if from_id in frontier_ids and to_id not in visited_ids:
-                next_frontier.add(to_id)
-            if to_id in frontier_ids and from_id not in visited_ids:
-                next_frontier.add(from_id)
-
-        visited_ids |= next_frontier
-        frontier_ids = next_frontier
-
-    # Participants
-    participants_rows = (
-        await db.execute(
-            select(Participant.pid, Participant.display_name, Participant.type, Participant.status)
-            .where(Participant.id.in_(list(visited_ids)))
-            .order_by(Participant.pid.asc())
+        ego = AdminGraphEgoResponse(
+            root_pid=root_pid,
+            participants=participants,
+            trustlines=trustlines,
+            equivalents=graph.equivalents,
+            debts=debts,
+            incidents=[],
+            audit_log=[],
+            transactions=[],
         )
-    ).all()
-    participants = []
-    for pid, display_name, type_, participant_status in participants_rows:
-        participants.append(
-            AdminGraphParticipant(
-                pid=pid,
-                display_name=display_name,
-                type=type_,
-                status=str(participant_status or "").strip().lower(),
-                net_balance_atoms=None,
-                net_sign=None,
-                viz_color_key=None,
-                viz_size=None,
-            )
-        )
-
-    # Equivalents (keep full list for UI dropdown)
-    eq_models = (
-        await db.execute(select(EquivalentModel).order_by(EquivalentModel.code.asc()))
-    ).scalars().all()
-    equivalents = [StoredEquivalent.model_validate(e) for e in eq_models]
-
-    def _eq_precision_ego(code: str) -> int:
-        c = str(code or "").strip().upper()
-        for e in equivalents:
-            if str(e.code).strip().upper() == c:
-                try:
-                    return int(e.precision)
-                except Exception:
-                    return 0
-        return 0
-
-    async def _attach_net_viz_ego(participants_list: list[AdminGraphParticipant], eq_code: str | None) -> None:
-        eqc = str(eq_code or "").strip().upper()
-        if not eqc:
-            return
-
-        precision = _eq_precision_ego(eqc)
-        scale10 = Decimal(10) ** precision
-
-        pid_list = [p.pid for p in participants_list if p.pid]
-        if not pid_list:
-            return
-
-        eq_id = (
-            await db.execute(select(EquivalentModel.id).where(EquivalentModel.code == eqc))
-        ).scalar_one_or_none()
-        if not eq_id:
-            return
-
-        p_debtor = aliased(Participant)
-        p_creditor = aliased(Participant)
-
-        debt_by_pid: dict[str, Decimal] = {}
-        credit_by_pid: dict[str, Decimal] = {}
-
-        d_rows = (
-            await db.execute(
-                select(p_debtor.pid, func.coalesce(func.sum(Debt.amount), 0))
-                .select_from(Debt)
-                .join(p_debtor, Debt.debtor_id == p_debtor.id)
-                .where(Debt.equivalent_id == eq_id, Debt.amount > 0, p_debtor.pid.in_(pid_list))
-                .group_by(p_debtor.pid)
-            )
-        ).all()
-        for pid0, s in d_rows:
-            debt_by_pid[str(pid0)] = s
-
-        c_rows = (
-            await db.execute(
-                select(p_creditor.pid, func.coalesce(func.sum(Debt.amount), 0))
-                .select_from(Debt)
-                .join(p_creditor, Debt.creditor_id == p_creditor.id)
-                .where(Debt.equivalent_id == eq_id, Debt.amount > 0, p_creditor.pid.in_(pid_list))
-                .group_by(p_creditor.pid)
-            )
-        ).all()
-        for pid0, s in c_rows:
-            credit_by_pid[str(pid0)] = s
-
-        def _to_atoms(amount: Decimal) -> int:
-            return int((amount * scale10).to_integral_value(rounding=ROUND_HALF_UP))
-
-        mags: list[int] = []
-        debt_mags: list[int] = []
-        net_atoms_by_pid: dict[str, int] = {}
-        for p in participants_list:
-            deb = debt_by_pid.get(p.pid, Decimal(0))
-            cre = credit_by_pid.get(p.pid, Decimal(0))
-            atoms = _to_atoms(cre - deb)
-            net_atoms_by_pid[p.pid] = atoms
-            mags.append(abs(atoms))
-            if atoms < 0:
-                debt_mags.append(abs(atoms))
-
-        mags_sorted = sorted(mags)
-        n = len(mags_sorted)
-        debt_mags_sorted = sorted(debt_mags)
-        dn = len(debt_mags_sorted)
-
-        def _percentile(mag: int) -> float:
-            if n <= 1:
-                return 0.0
-            import bisect
-
-            i = bisect.bisect_right(mags_sorted, mag) - 1
-            i = max(0, min(i, n - 1))
-            return i / (n - 1)
-
-        DEBT_BINS = 9
-
-        def _debt_bin(mag: int) -> int:
-            if dn <= 1:
-                return 0
-            import bisect
-
-            i = bisect.bisect_right(debt_mags_sorted, mag) - 1
-            i = max(0, min(i, dn - 1))
-            pct = i / (dn - 1)
-            b = int(round(pct * (DEBT_BINS - 1)))
-            return max(0, min(b, DEBT_BINS - 1))
-
-        max_scale = 1.90
-        gamma = 0.75
-
-        def _scale_from_pct(pct: float) -> float:
-            if pct <= 0:
-                return 1.0
-            if pct >= 1:
-                return max_scale
-            return 1.0 + (max_scale - 1.0) * (pct**gamma)
-
-        for p in participants_list:
-            atoms = net_atoms_by_pid.get(p.pid, 0)
-            p.net_balance_atoms = str(atoms)
-            p.net_sign = -1 if atoms < 0 else (1 if atoms > 0 else 0)
-
-            status_key = str(p.status or "").strip().lower()
-            type_key = str(p.type or "").strip().lower()
-
-            if status_key in {"suspended", "frozen"}:
-                p.viz_color_key = "suspended"
-            elif status_key == "left":
-                p.viz_color_key = "left"
-            elif status_key in {"deleted", "banned"}:
-                p.viz_color_key = "deleted"
-            else:
-                if p.net_sign == -1:
-                    p.viz_color_key = f"debt-{_debt_bin(abs(atoms))}"
-                else:
-                    p.viz_color_key = "business" if type_key == "business" else "person"
-
-            pct = _percentile(abs(atoms))
-            s = _scale_from_pct(pct)
-
-            if type_key == "business":
-                w0, h0 = 26, 22
-            else:
-                w0, h0 = 16, 16
-            p.viz_size = {"w": int(round(w0 * s)), "h": int(round(h0 * s))}
-
-    if equivalent:
-        await _attach_net_viz_ego(participants, equivalent)
-
-    # Trustlines + used/available (no N+1)
-    p_from = aliased(Participant)
-    p_to = aliased(Participant)
-    tl_stmt = (
-        select(
-            TrustLine.id,
-            TrustLine.limit,
-            TrustLine.status,
-            TrustLine.created_at,
-            TrustLine.updated_at,
-            TrustLine.policy,
-            EquivalentModel.code.label("equivalent"),
-            p_from.pid.label("from_pid"),
-            p_from.display_name.label("from_display_name"),
-            p_to.pid.label("to_pid"),
-            p_to.display_name.label("to_display_name"),
-            func.coalesce(Debt.amount, 0).label("used"),
-        )
-        .select_from(TrustLine)
-        .join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id)
-        .join(p_from, TrustLine.from_participant_id == p_from.id)
-        .join(p_to, TrustLine.to_participant_id == p_to.id)
-        .outerjoin(
-            Debt,
-            and_(
-                Debt.debtor_id == TrustLine.to_participant_id,
-                Debt.creditor_id == TrustLine.from_participant_id,
-                Debt.equivalent_id == TrustLine.equivalent_id,
-            ),
-        )
-        .where(
-            TrustLine.from_participant_id.in_(list(visited_ids)),
-            TrustLine.to_participant_id.in_(list(visited_ids)),
-        )
-        .order_by(EquivalentModel.code.asc(), p_from.pid.asc(), p_to.pid.asc())
-    )
-
-    if equivalent:
-        tl_stmt = tl_stmt.where(EquivalentModel.code == equivalent)
-    if status_filter:
-        tl_stmt = tl_stmt.where(TrustLine.status.in_(list(status_filter)))
-    tl_stmt = tl_stmt.order_by(_TRUSTLINE_LIVE_FIRST.asc(), TrustLine.id.asc())
-    tl_rows = _dedupe_trustline_rows(
-        (await db.execute(tl_stmt)).all(),
-        equivalent_index=6,
-        from_index=7,
-        to_index=9,
-    )
-    trustlines: list[TrustLineSchema] = []
-    for (
-        tl_id,
-        limit,
-        tl_status,
-        created_at,
-        updated_at,
-        policy,
-        equivalent_code,
-        from_pid,
-        from_display_name,
-        to_pid,
-        to_display_name,
-        used,
-    ) in tl_rows:
-        available = limit - used
-        trustlines.append(
-            TrustLineSchema.model_validate(
-                {
-                    "id": tl_id,
-                    "from_pid": from_pid,
-                    "to_pid": to_pid,
-                    "from_display_name": from_display_name,
-                    "to_display_name": to_display_name,
-                    "equivalent_code": equivalent_code,
-                    "limit": limit,
-                    "used": used,
-                    "available": available,
-                    "status": tl_status,
-                    "created_at": created_at,
-                    "updated_at": updated_at,
-                    "policy": policy,
-                }
-            )
-        )
-
-    # Debts
-    p_debtor = aliased(Participant)
-    p_creditor = aliased(Participant)
-    debt_stmt = (
-        select(
-            EquivalentModel.code.label("equivalent"),
-            p_debtor.pid.label("debtor"),
-            p_creditor.pid.label("creditor"),
-            Debt.amount,
-        )
-        .select_from(Debt)
-        .join(EquivalentModel, Debt.equivalent_id == EquivalentModel.id)
-        .join(p_debtor, Debt.debtor_id == p_debtor.id)
-        .join(p_creditor, Debt.creditor_id == p_creditor.id)
-        .where(
-            Debt.amount > 0,
-            Debt.debtor_id.in_(list(visited_ids)),
-            Debt.creditor_id.in_(list(visited_ids)),
-        )
-        .order_by(EquivalentModel.code.asc(), p_debtor.pid.asc(), p_creditor.pid.asc())
-    )
-
-    if equivalent:
-        debt_stmt = debt_stmt.where(EquivalentModel.code == equivalent)
-    debt_rows = (await db.execute(debt_stmt)).all()
-    debts = [
-        AdminGraphDebt(equivalent=eq, debtor=debtor, creditor=creditor, amount=amount)
-        for eq, debtor, creditor, amount in debt_rows
-    ]
+        return snapshot_cache.make_snapshot(ego, ego.model_dump_json(by_alias=True).encode("utf-8"))
 
-    include_set = _parse_include_csv(include)
-    incidents: list[Any] = []
-    audit_log: list[Any] = []
-    transactions: list[Any] = []
-    if include_set:
-        if "incidents" in include_set:
-            incidents = await _graph_fetch_incidents(
-                db,
-                limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_INCIDENTS", 50) or 50),
-            )
-        if "audit_log" in include_set:
-            audit_log = await _graph_fetch_audit_log(
-                db,
-                limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_AUDIT_EVENTS", 50) or 50),
-            )
-        if "transactions" in include_set:
-            transactions = await _graph_fetch_transactions(
-                db,
-                limit=int(getattr(settings, "ADMIN_GRAPH_INCLUDE_MAX_TRANSACTIONS", 50) or 50),
-            )
+    accept = request.headers.get("accept")
+    ego_entry = entry.derive(("ego", root_pid, int(depth), tuple(status or ())), _slice)
+    if not _parse_include_csv(include):
+        ego_entry = snapshot_codec.negotiate(ego_entry, accept, snapshot_codec.encode_admin_graph)
+        return snapshot_cache.snapshot_response(ego_entry, if_none_match=if_none_match)
 
-    return AdminGraphEgoResponse(
-        root_pid=root_pid,
-        participants=participants,
-        trustlines=trustlines,
-        equivalents=equivalents,
-        debts=debts,
-        incidents=incidents,
-        audit_log=audit_log,
-        transactions=transactions,
-    )
+    return _graph_response(ego_entry.value.model_copy(update=await _graph_fetch_extras(db, include)), accept)
 
 
 @router.get("/clearing/cycles", response_model=AdminClearingCyclesResponse)
@@ -2148,7 +1550,7 @@ async def admin_clearing_cycles(
         description="Optional equivalent code (if omitted, returns cycles for all equivalents)",
     ),
     max_depth: int = Query(6, ge=3, le=10),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminClearingCyclesResponse:
     if equivalent is not None:
         validate_equivalent_code(equivalent)
@@ -2218,6 +1620,6 @@ async def admin_participant_metrics(
     pid: str,
     equivalent: str | None = Query(default=None),
     threshold: _OptionalDecimalThreshold = None,
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
 ) -> AdminParticipantMetricsResponse:
     return await compute_participant_metrics(db, pid=pid, equivalent=equivalent, threshold=threshold)
@@ -15,6 +15,26 @@ from app.schemas.participant import (
 
 router = APIRouter()
 
+
+async def _search(
+    db: AsyncSession,
+    *,
+    q: Optional[str],
+    type: Optional[str],
+    limit: int,
+    page: Optional[int],
+    per_page: Optional[int],
+    cursor: Optional[str],
+) -> ParticipantsList:
+    service = ParticipantService(db)
+    effective_limit = per_page or limit
+    offset = ((page or 1) - 1) * effective_limit if page is not None or per_page is not None else 0
+    result = await service.list_participants(
+        query=q, type_filter=type, limit=effective_limit, offset=offset, cursor=cursor
+    )
+    return ParticipantsList(items=result.items, next_cursor=result.next_cursor)
+
+
 @router.get("", response_model=ParticipantsList)
 async def list_participants(
     q: Optional[str] = None,
@@ -22,14 +42,11 @@ async def list_participants(
     limit: int = Query(20, ge=1, le=200),
     page: Optional[int] = Query(None, ge=1),
     per_page: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None, min_length=1, max_length=512),
     db: AsyncSession = Depends(deps.get_db),
     current_participant: Participant = Depends(deps.get_current_participant),
 ):
-    service = ParticipantService(db)
-    effective_limit = per_page or limit
-    offset = ((page or 1) - 1) * effective_limit if page is not None or per_page is not None else 0
-    items = await service.list_participants(query=q, type_filter=type, limit=effective_limit, offset=offset)
-    return ParticipantsList(items=items)
+    return await _search(db, q=q, type=type, limit=limit, page=page, per_page=per_page, cursor=cursor)
 
 
 @router.get("/search", response_model=ParticipantsList)
@@ -39,14 +56,11 @@ async def search_participants(
     limit: int = Query(20, ge=1, le=200),
     page: Optional[int] = Query(None, ge=1),
     per_page: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None, min_length=1, max_length=512),
     db: AsyncSession = Depends(deps.get_db),
     current_participant: Participant = Depends(deps.get_current_participant),
 ):
-    service = ParticipantService(db)
-    effective_limit = per_page or limit
-    offset = ((page or 1) - 1) * effective_limit if page is not None or per_page is not None else 0
-    items = await service.list_participants(query=q, type_filter=type, limit=effective_limit, offset=offset)
-    return ParticipantsList(items=items)
+    return await _search(db, q=q, type=type, limit=limit, page=page, per_page=per_page, cursor=cursor)
 
 @router.post("", response_model=Participant, status_code=status.HTTP_201_CREATED)
 async def register_participant(
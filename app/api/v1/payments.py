@@ -1,3 +1,4 @@
+from contextlib import AsyncExitStack
 from datetime import datetime
 from typing import Optional, Literal
 
@@ -7,12 +8,13 @@ from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
-from app.core.payments.router import PaymentRouter
+from app.config import settings
+from app.core.payments.read_graph import get_read_router
 from app.core.payments.service import PaymentService
 from app.utils.distributed_lock import redis_distributed_lock
 from app.schemas.payment import (
     CapacityResponse, MaxFlowResponse,
-    PaymentCreateRequest, PaymentResult, PaymentsList
+    PaymentBatchResult, PaymentCreateRequest, PaymentResult, PaymentsList
 )
 from app.db.models.participant import Participant
 from app.utils.exceptions import BadRequestException
@@ -31,8 +33,7 @@ async def check_capacity(
     """
     Check capacity for a concrete payment amount from current user to recipient.
     """
-    payment_router = PaymentRouter(session)
-    await payment_router.build_graph(equivalent)
+    payment_router = await get_read_router(session, equivalent)
     
     amount_decimal = parse_amount_decimal(amount, require_positive=True)
 
@@ -48,8 +49,7 @@ async def get_max_flow(
     """
     Estimate maximum transferable amount and diagnostics.
     """
-    payment_router = PaymentRouter(session)
-    await payment_router.build_graph(equivalent)
+    payment_router = await get_read_router(session, equivalent)
     
     return payment_router.calculate_max_flow(current_participant.pid, to)
 
@@ -88,6 +88,51 @@ async def create_payment(
             idempotency_key=idempotency_key,
         )
 
+@router.post("/batch", response_model=PaymentBatchResult)
+async def create_payments_batch(
+    batch_in: dict,
+    session: AsyncSession = Depends(deps.get_db),
+    current_participant: Participant = Depends(deps.get_current_participant),
+    redis_client=Depends(deps.get_redis_client),
+):
+    """
+    Create and execute many signed payments; each item succeeds or fails on its own.
+    """
+    payments = batch_in.get("payments")
+    max_items = int(settings.PAYMENTS_BATCH_MAX_ITEMS)
+    if not isinstance(payments, list) or not payments:
+        raise BadRequestException("payments must be a non-empty list")
+    if len(payments) > max_items:
+        raise BadRequestException(
+            f"At most {max_items} payments per batch",
+            details={"max_items": max_items, "count": len(payments)},
+        )
+
+    # The same per-sender, per-equivalent locks as single payments, in one order.
+    equivalents = sorted(
+        {
+            item["equivalent"]
+            for item in payments
+            if isinstance(item, dict) and isinstance(item.get("equivalent"), str)
+        }
+    )
+    # Held for the whole batch: one payment timeout per item, plus the margin a single
+    # payment's lock keeps over its own timeout.
+    lock_ttl_seconds = len(payments) * max(1, int(settings.PAYMENT_TOTAL_TIMEOUT_SECONDS)) + 5
+    async with AsyncExitStack() as stack:
+        for equivalent in equivalents:
+            await stack.enter_async_context(
+                redis_distributed_lock(
+                    redis_client,
+                    f"dlock:payment:{current_participant.id}:{equivalent}",
+                    ttl_seconds=lock_ttl_seconds,
+                    wait_timeout_seconds=2.0,
+                )
+            )
+        return await PaymentService(session).create_payments_batch(
+            current_participant.id, payments
+        )
+
 @router.get("/{tx_id}", response_model=PaymentResult)
 async def get_payment(
     tx_id: str,
@@ -113,14 +158,18 @@ async def list_payments(
     to_date: Optional[datetime] = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, min_length=1, max_length=512),
     session: AsyncSession = Depends(deps.get_db),
     current_participant: Participant = Depends(deps.get_current_participant)
 ):
     """
     List payments for current user.
+
+    Pass `next_cursor` from the previous response as `cursor` to page on; `page` is the
+    legacy OFFSET form and is ignored when a cursor is given.
     """
     service = PaymentService(session)
-    items = await service.list_payments(
+    return await service.list_payments(
         requester_participant_id=current_participant.id,
         requester_pid=current_participant.pid,
         direction=direction,
@@ -130,5 +179,5 @@ async def list_payments(
         to_date=to_date,
         page=page,
         per_page=per_page,
+        cursor=cursor,
     )
-    return PaymentsList(items=items)
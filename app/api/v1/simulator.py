@@ -8,7 +8,7 @@ import logging
 import uuid
 from decimal import Decimal
 from datetime import datetime, timezone
-from typing import Any, AsyncIterator, Optional
+from typing import Any, AsyncIterator, Literal, Optional
 from pydantic import BaseModel, Field
 from pydantic.config import ConfigDict
 
@@ -35,6 +35,7 @@ from app.core.simulator.edge_patch_builder import EdgePatchBuilder
 from app.core.simulator.real_scenario_seeder import RealScenarioSeeder
 from app.core.simulator.scenario_equivalent import effective_equivalent
 from app.core.simulator.models import _Subscription
+from app.core.simulator.tick_profiler import folded_stacks
 from app.core.simulator.sse_broadcast import (
     SSE_SUBSCRIPTION_CLOSED_TYPE,
     SseEventEmitter,
@@ -100,6 +101,7 @@ from app.utils.exceptions import (
     RoutingException,
     TimeoutException,
 )
+from app.utils import snapshot_cache, snapshot_codec
 from app.utils.validation import parse_amount_decimal
 
 router = APIRouter(prefix="/simulator")
@@ -2373,11 +2375,13 @@ async def _run_events_stream(
 # -----------------------------
 
 
-@router.get("/graph/snapshot", response_model=SimulatorGraphSnapshot)
+@router.get("/graph/snapshot", response_model=SimulatorGraphSnapshot, responses=snapshot_codec.SNAPSHOT_RESPONSES)
 async def graph_snapshot_active_run(
+    request: Request,
     equivalent: str = Query(...),
     actor: deps.SimulatorActor = Depends(deps.require_simulator_actor),
-    db=Depends(deps.get_db),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db=Depends(deps.get_read_db),
 ):
     run_id = runtime.get_active_run_id(owner_id=actor.owner_id)
     if run_id is None:
@@ -2389,16 +2393,22 @@ async def graph_snapshot_active_run(
         return SimulatorGraphSnapshot(equivalent=equivalent, generated_at=_utc_now(), nodes=[], links=[])
 
     _check_run_access(run, actor, run_id)
-    return await runtime.build_graph_snapshot(run_id=run_id, equivalent=equivalent, session=db)
+    entry = await runtime.cached_graph_snapshot(run_id=run_id, equivalent=equivalent, session=db)
+    entry = snapshot_codec.negotiate(
+        entry, request.headers.get("accept"), snapshot_codec.encode_simulator_snapshot
+    )
+    return snapshot_cache.snapshot_response(entry, if_none_match=if_none_match)
 
 
-@router.get("/graph/ego", response_model=SimulatorGraphSnapshot)
+@router.get("/graph/ego", response_model=SimulatorGraphSnapshot, responses=snapshot_codec.SNAPSHOT_RESPONSES)
 async def ego_snapshot_active_run(
+    request: Request,
     equivalent: str = Query(...),
     pid: str = Query(...),
     depth: int = Query(1, ge=1, le=2),
     actor: deps.SimulatorActor = Depends(deps.require_simulator_actor),
-    db=Depends(deps.get_db),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db=Depends(deps.get_read_db),
 ):
     run_id = runtime.get_active_run_id(owner_id=actor.owner_id)
     if run_id is None:
@@ -2409,7 +2419,13 @@ async def ego_snapshot_active_run(
         return SimulatorGraphSnapshot(equivalent=equivalent, generated_at=_utc_now(), nodes=[], links=[])
 
     _check_run_access(run, actor, run_id)
-    return await runtime.build_ego_snapshot(run_id=run_id, equivalent=equivalent, pid=pid, depth=depth, session=db)
+    entry = await runtime.cached_ego_snapshot(
+        run_id=run_id, equivalent=equivalent, pid=pid, depth=depth, session=db
+    )
+    entry = snapshot_codec.negotiate(
+        entry, request.headers.get("accept"), snapshot_codec.encode_simulator_snapshot
+    )
+    return snapshot_cache.snapshot_response(entry, if_none_match=if_none_match)
 
 
 @router.get(
@@ -2473,14 +2489,59 @@ async def events_stream_active_run(
     )
 
 
-@router.get("/events/poll")
+@router.get(
+    "/events/poll",
+    responses={
+        410: {
+            "model": ErrorEnvelope,
+            "description": "Replay cursor is invalid or no longer retained",
+        }
+    },
+)
 async def events_poll_active_run(
+    response: Response,
     equivalent: str = Query(...),
-    after: Optional[str] = Query(None),
+    after: Optional[str] = Query(None, description="Return events strictly after this event_id"),
+    types: Optional[list[str]] = Query(None, alias="type", description="Only these event types (repeatable)"),
+    limit: int = Query(200, ge=1, le=1000),
+    timeout: float = Query(25.0, ge=0, le=60, description="Seconds to wait for a matching event"),
     actor: deps.SimulatorActor = Depends(deps.require_simulator_actor),
 ):
-    # MVP: no replay buffer.
-    return []
+    """Long-poll fallback for `/events`, served from the run's replay buffer.
+
+    `X-Events-Cursor` carries the `after` for the next poll; it moves past events
+    filtered out by `type` so they are not rescanned.
+    """
+
+    run_id = runtime.get_active_run_id(owner_id=actor.owner_id)
+    if run_id is not None:
+        try:
+            _check_run_access(runtime.get_run(run_id), actor, run_id)
+        except NotFoundException:
+            run_id = None
+
+    if run_id is None:
+        if after is not None:
+            raise GoneException("Event replay is unavailable; please refresh state")
+        # Same pacing as a poll that found nothing, so clients do not spin.
+        await asyncio.sleep(timeout)
+        return []
+
+    try:
+        events, cursor = await runtime.poll_events(
+            run_id,
+            equivalent=equivalent,
+            after_event_id=after,
+            types=set(types) if types else None,
+            limit=limit,
+            timeout_sec=timeout,
+        )
+    except SseReplayUnavailable as exc:
+        raise GoneException("Event replay is unavailable; please refresh state") from exc
+
+    if cursor is not None:
+        response.headers["X-Events-Cursor"] = cursor
+    return events
 
 
 # -----------------------------
@@ -2518,7 +2579,7 @@ async def scenario_graph_preview(
     equivalent: str = Query(...),
     mode: RunMode = Query("fixtures"),
     actor: deps.SimulatorActor = Depends(deps.require_simulator_actor),
-    db=Depends(deps.get_db),
+    db=Depends(deps.get_read_db),
 ):
     """Preview the scenario graph topology without starting a run."""
     return await runtime.build_scenario_preview(scenario_id=scenario_id, equivalent=equivalent, mode=mode, session=db)
@@ -2744,15 +2805,26 @@ async def action_clearing_once(
         client_action_id=body.client_action_id,
     )
 
-@router.get("/runs/{run_id}/graph/snapshot", response_model=SimulatorGraphSnapshot)
+@router.get("/runs/{run_id}/graph/snapshot", response_model=SimulatorGraphSnapshot, responses=snapshot_codec.SNAPSHOT_RESPONSES)
 async def graph_snapshot_for_run(
+    request: Request,
     run_id: str,
     equivalent: str = Query(...),
     actor: deps.SimulatorActor = Depends(deps.require_simulator_actor),
-    db=Depends(deps.get_db),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db=Depends(deps.get_read_db),
 ):
+    """Run graph snapshot; carries an ETag and answers `If-None-Match` with 304.
+
+    `Accept: application/vnd.geo.graph-snapshot` selects the columnar encoding.
+    """
+
     _check_run_access(runtime.get_run(run_id), actor, run_id)
-    return await runtime.build_graph_snapshot(run_id=run_id, equivalent=equivalent, session=db)
+    entry = await runtime.cached_graph_snapshot(run_id=run_id, equivalent=equivalent, session=db)
+    entry = snapshot_codec.negotiate(
+        entry, request.headers.get("accept"), snapshot_codec.encode_simulator_snapshot
+    )
+    return snapshot_cache.snapshot_response(entry, if_none_match=if_none_match)
 
 
 @router.get("/runs/{run_id}/metrics", response_model=MetricsResponse)
@@ -2864,6 +2936,28 @@ async def admin_list_runs(
     return {"items": items, "total": total, "limit": limit, "offset": offset}
 
 
+@router.get("/admin/runs/{run_id}/tick-profiles", summary="Recent tick profiles (admin)")
+async def admin_run_tick_profiles(
+    run_id: str,
+    limit: int = Query(default=20, ge=1, le=1000),
+    format: Literal["json", "folded"] = Query("json"),
+    actor: deps.SimulatorActor = Depends(deps.require_simulator_actor),
+):
+    """Per-phase wall time, SQL statements and rows read for the last real-mode ticks.
+
+    `format=folded` returns folded stacks (self time in microseconds, summed over the
+    selected ticks) for flamegraph.pl / speedscope. Admin only.
+    """
+    if not actor.is_admin:
+        raise ForbiddenException("Admin access required")
+
+    run = runtime.get_run(run_id)
+    profiles = list(run._tick_profiles)[-limit:]
+    if format == "folded":
+        return Response(content=folded_stacks(profiles), media_type="text/plain; charset=utf-8")
+    return {"run_id": run.run_id, "items": profiles}
+
+
 @router.post("/admin/runs/stop-all", summary="Stop all active runs (admin)")
 async def admin_stop_all_runs(
     body: AdminStopAllRequest = Body(default=AdminStopAllRequest()),
@@ -0,0 +1,210 @@
+"""WebSocket stream for simulator runs.
+
+One connection carries every equivalent a viewer follows, plus run_status, instead of
+one SSE connection per (run, equivalent):
+
+    client → {"type": "subscribe", "equivalents": ["UAH", "EUR"],
+              "types": ["tx.updated", ...] | null, "after": "evt_..." | null,
+              "encoding": "json" | "zlib"}
+    server → {"type": "subscribed", ...}, then events
+
+Events are the SSE payloads. `after` resumes strictly after that event id, like
+`Last-Event-ID`; without it the stream starts with a fresh run_status. A later
+`subscribe` swaps filters in place and continues from the last event sent. A cursor
+the replay buffer no longer retains closes the socket with 4410 (the SSE 410).
+
+Delivery reads the run replay buffer through the long-poll waiters (`poll_events`), so
+a connection holds no subscription queue and is not counted against the SSE limits.
+`encoding: "json"` sends one text frame per event and relies on permessage-deflate,
+which uvicorn negotiates by default; `encoding: "zlib"` sends each batch as one binary
+frame holding a zlib-compressed JSON array, for clients that cannot negotiate it.
+
+Credentials are the simulator ones: the `bearer` subprotocol (as on `/ws`),
+X-Admin-Token (+ X-Simulator-Owner), or the simulator session cookie. Cookie
+sessions must come from an allowlisted Origin.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.api import deps
+from app.api.v1.simulator import _check_run_access
+from app.api.v1.websocket import _BEARER_SUBPROTOCOL, _access_token_from_subprotocols
+from app.core.simulator.runtime import runtime
+from app.core.simulator.sse_broadcast import SseReplayUnavailable
+from app.utils.exceptions import GeoException
+
+router = APIRouter()
+
+# Close code for an unrecoverable replay cursor (4000-4999 is application-defined).
+WS_CLOSE_REPLAY_UNAVAILABLE = 4410
+
+_BATCH_MAX = 500
+_IDLE_POLL_SEC = 30.0
+
+
+@dataclass
+class _StreamState:
+    equivalents: frozenset[str] = frozenset()
+    types: Optional[set[str]] = None
+    cursor: Optional[str] = None
+    compress: bool = False
+
+
+def _parse_subscribe(obj: dict[str, Any]) -> _StreamState | str:
+    equivalents = obj.get("equivalents")
+    if (
+        not isinstance(equivalents, list)
+        or not equivalents
+        or not all(isinstance(e, str) and e.strip() for e in equivalents)
+    ):
+        return "invalid_equivalents"
+    types = obj.get("types")
+    if types is not None and (not isinstance(types, list) or not all(isinstance(t, str) for t in types)):
+        return "invalid_types"
+    after = obj.get("after")
+    if after is not None and not isinstance(after, str):
+        return "invalid_after"
+    encoding = obj.get("encoding", "json")
+    if encoding not in ("json", "zlib"):
+        return "invalid_encoding"
+    return _StreamState(
+        equivalents=frozenset(e.strip().upper() for e in equivalents),
+        types=set(types) if types else None,
+        cursor=after,
+        compress=encoding == "zlib",
+    )
+
+
+async def _send_batch(websocket: WebSocket, state: _StreamState, events: list[dict[str, Any]]) -> None:
+    if state.compress:
+        raw = json.dumps(events, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        await websocket.send_bytes(zlib.compress(raw))
+        state.cursor = str(events[-1]["event_id"])
+        return
+    for evt in events:
+        await websocket.send_text(json.dumps(evt, ensure_ascii=False, separators=(",", ":")))
+        state.cursor = str(evt["event_id"])
+
+
+async def _pump(websocket: WebSocket, run_id: str, state: _StreamState) -> None:
+    while True:
+        try:
+            runtime.get_run(run_id)
+        except GeoException:
+            await websocket.send_json({"type": "closed", "reason": "run_not_found"})
+            await websocket.close(code=1000)
+            return
+        try:
+            events, cursor = await runtime.poll_events(
+                run_id,
+                equivalent=state.equivalents,
+                after_event_id=state.cursor,
+                types=state.types,
+                limit=_BATCH_MAX,
+                timeout_sec=_IDLE_POLL_SEC,
+            )
+        except SseReplayUnavailable:
+            await websocket.send_json({"type": "error", "error": "replay_unavailable"})
+            await websocket.close(code=WS_CLOSE_REPLAY_UNAVAILABLE)
+            return
+        if events:
+            await _send_batch(websocket, state, events)
+        state.cursor = cursor
+
+
+@router.websocket("/simulator/runs/{run_id}/ws")
+async def simulator_run_ws(websocket: WebSocket, run_id: str, db: AsyncSession = Depends(deps.get_db)):
+    token = _access_token_from_subprotocols(websocket)
+    try:
+        actor = await deps.resolve_simulator_actor(
+            db,
+            x_admin_token=websocket.headers.get("x-admin-token"),
+            x_simulator_owner=websocket.headers.get("x-simulator-owner"),
+            token=token,
+            cookies=websocket.cookies,
+        )
+        if actor.kind == "anon":
+            deps.check_simulator_origin(websocket.headers.get("origin"))
+        _check_run_access(runtime.get_run(run_id), actor, run_id)
+    except GeoException:
+        await websocket.close(code=1008)
+        return
+    finally:
+        # Credentials are checked once; do not hold a connection for the stream's life.
+        await db.close()
+
+    await websocket.accept(subprotocol=_BEARER_SUBPROTOCOL if token else None)
+    await websocket.send_json(
+        {"type": "hello", "run_id": run_id, "ts": datetime.now(timezone.utc).isoformat()}
+    )
+
+    state: Optional[_StreamState] = None
+    pump_task: asyncio.Task | None = None
+
+    async def _stop_pump() -> None:
+        nonlocal pump_task
+        if pump_task is not None:
+            pump_task.cancel()
+            await asyncio.gather(pump_task, return_exceptions=True)
+            pump_task = None
+
+    try:
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                await websocket.send_text("pong")
+                continue
+
+            try:
+                obj = json.loads(data)
+            except Exception:
+                await websocket.send_json({"type": "error", "error": "invalid_json"})
+                continue
+            if not isinstance(obj, dict) or obj.get("type") != "subscribe":
+                await websocket.send_json({"type": "error", "error": "unknown_message"})
+                continue
+
+            parsed = _parse_subscribe(obj)
+            if isinstance(parsed, str):
+                await websocket.send_json({"type": "error", "error": parsed})
+                continue
+
+            await _stop_pump()
+            if parsed.cursor is None:
+                if state is not None:
+                    parsed.cursor = state.cursor
+                else:
+                    # Fresh stream: start at the head with an authoritative status.
+                    parsed.cursor = runtime.event_cursor(run_id)
+                    runtime.publish_run_status(run_id)
+            state = parsed
+            await websocket.send_json(
+                {
+                    "type": "subscribed",
+                    "equivalents": sorted(state.equivalents),
+                    "types": sorted(state.types) if state.types else None,
+                    "after": state.cursor,
+                }
+            )
+            pump_task = asyncio.create_task(_pump(websocket, run_id, state))
+
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the pump closed the socket (replay gap, run gone).
+        pass
+    finally:
+        await _stop_pump()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
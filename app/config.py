@@ -55,6 +55,11 @@ class Settings(BaseSettings):
         "sqlite+aiosqlite:///./.local-run/geov0.db"
     )
     DATABASE_URL: str = DEFAULT_SQLITE_DATABASE_URL
+    # Optional read replica for read-only admin/analytics endpoints (deps.get_read_db),
+    # with its own pool so dashboards do not take connections from payment commits.
+    # Unset (or equal to DATABASE_URL) keeps those endpoints on the primary session.
+    # Replica lag shows up in these views and in the admin caches filled from them.
+    DATABASE_READ_URL: str | None = None
 
     # Database pool (applies to client/server DBs like Postgres; SQLite uses NullPool)
     DB_POOL_PRE_PING: bool = True
@@ -71,6 +76,12 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_ENABLED: bool = False
 
+    # Participant notifications (/ws): fan publications out to every worker through a
+    # capped Redis stream (requires REDIS_ENABLED); see app/utils/event_bus.py.
+    EVENT_BUS_REDIS_ENABLED: bool = False
+    EVENT_BUS_STREAM_MAXLEN: int = 10000
+    EVENT_BUS_SUBSCRIBER_QUEUE_MAX: int = 100
+
     # JWT
     # NOTE: This default is intentionally insecure and must never be used outside dev/test.
     DEFAULT_JWT_SECRET: ClassVar[str] = "dev-secret-change-me-please-32chars!!"
@@ -97,12 +108,21 @@ class Settings(BaseSettings):
     # Challenge
     AUTH_CHALLENGE_EXPIRE_SECONDS: int = 300
 
+    # Ed25519 signature checks run on this many threads, off the event loop.
+    # 0 verifies inline. See app/core/auth/crypto.py.
+    CRYPTO_VERIFY_WORKERS: int = 4
+
     # Payment Engine
     PREPARE_LOCK_TTL_SECONDS: int = 30
 
     # Recovery (startup + periodic cleanup)
     RECOVERY_ENABLED: bool = True
     RECOVERY_INTERVAL_SECONDS: int = 60
+    # Expired prepare locks: 0 aborts their transactions one by one through the payment
+    # engine; N > 0 resolves them in set-based chunks of N transactions, stopping after
+    # RECOVERY_BULK_MAX_SECONDS (the rest waits for the next iteration).
+    RECOVERY_BULK_BATCH_SIZE: int = 0
+    RECOVERY_BULK_MAX_SECONDS: int = 30
     PAYMENT_TX_STUCK_TIMEOUT_SECONDS: int = 120
 
     # Payment Routing (MVP limits)
@@ -111,12 +131,28 @@ class Settings(BaseSettings):
     # Spec-aligned timeouts
     ROUTING_PATH_FINDING_TIMEOUT_MS: int = 500
     ROUTING_GRAPH_CACHE_TTL_SECONDS: int = 0
+    # Share routing graphs/topology and balance summaries between workers through Redis
+    # (requires REDIS_ENABLED). The local TTLs still govern what is cached; see
+    # app/utils/shared_cache.py. Topology has no local TTL, so the shared copy gets its own.
+    ROUTING_SHARED_CACHE_ENABLED: bool = False
+    ROUTING_TOPOLOGY_SHARED_CACHE_TTL_SECONDS: int = 300
 
     # Payment execution timeouts (spec section 6.9)
     PREPARE_TIMEOUT_SECONDS: int = 3
     COMMIT_TIMEOUT_SECONDS: int = 5
     PAYMENT_TOTAL_TIMEOUT_SECONDS: int = 10
 
+    # POST /payments/batch: items per request, and items per database transaction
+    # (a group commits or fails as a whole; see PaymentService.create_payments_batch).
+    PAYMENTS_BATCH_MAX_ITEMS: int = 100
+    PAYMENTS_BATCH_COMMIT_SIZE: int = 25
+    # Shared read-only graphs for GET /payments/capacity and /payments/max-flow
+    # (app/core/payments/read_graph.py): reused while the equivalent's ledger version holds
+    # and at most TTL seconds; an outdated graph is served for STALE more seconds while it
+    # is rebuilt in the background. TTL 0 builds a graph per request.
+    PAYMENTS_READ_GRAPH_TTL_SECONDS: int = 0
+    PAYMENTS_READ_GRAPH_STALE_SECONDS: int = 5
+
     # Commit retry configuration (used where applicable)
     COMMIT_RETRY_ATTEMPTS: int = 3
     # Base backoff delay (exponential with jitter). Values are intentionally small:
@@ -124,6 +160,11 @@ class Settings(BaseSettings):
     COMMIT_RETRY_BASE_DELAY_MS: int = 50
     # Cap the exponential backoff to avoid unbounded latency.
     COMMIT_RETRY_MAX_DELAY_MS: int = 500
+    # Queue engine-owned payment units of work behind in-process ones that touch the same
+    # segments (reciprocal participant pairs), so payments on a hot corridor run one after
+    # another instead of failing each other's SERIALIZABLE snapshots; disjoint ones still
+    # run concurrently. See app/core/payments/conflict_scheduler.py.
+    PAYMENT_CONFLICT_SCHEDULER_ENABLED: bool = False
 
     # Max-flow diagnostics (MVP limits)
     MAX_FLOW_MAX_HOPS: int = 7
@@ -131,13 +172,44 @@ class Settings(BaseSettings):
     # Balance
     BALANCE_SUMMARY_CACHE_TTL_SECONDS: int = 0
 
+    # Admin/simulator graph snapshots (app/utils/snapshot_cache.py). Entries are dropped as
+    # soon as the ledger version they were built at moves; the TTL only bounds staleness for
+    # writes that bypass the invalidation hooks. 0 disables caching (ETags still work).
+    GRAPH_SNAPSHOT_CACHE_TTL_SECONDS: int = 0
+    GRAPH_SNAPSHOT_CACHE_MAX_ENTRIES: int = 64
+    # Admin liquidity views (app/core/admin/liquidity_view.py), versioned the same way.
+    # 0 disables them and the liquidity endpoints query the database on every request.
+    ADMIN_LIQUIDITY_VIEW_TTL_SECONDS: int = 0
+    # Net-position ranks and histogram behind the admin participant metrics, per
+    # equivalent and versioned the same way (app/core/admin/metrics.py). 0 disables them.
+    ADMIN_PARTICIPANT_RANK_CACHE_TTL_SECONDS: int = 0
+
     # Rate limiting (in-memory, best-effort)
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_WINDOW_SECONDS: int = 60
     RATE_LIMIT_REQUESTS_PER_WINDOW: int = 120
+    # Requests to these routes (full path templates) draw more than 1 from the window
+    # budget; anything unlisted costs 1. See app/utils/rate_limit.py.
+    RATE_LIMIT_ROUTE_COSTS: dict[str, int] = {
+        "/api/v1/payments/max-flow": 5,
+        "/api/v1/payments/capacity": 2,
+        "/api/v1/payments/batch": 10,
+        "/api/v1/clearing/cycles": 3,
+        "/api/v1/admin/graph/snapshot": 10,
+        "/api/v1/admin/graph/ego": 3,
+        "/api/v1/admin/clearing/cycles": 3,
+        "/api/v1/simulator/graph/snapshot": 5,
+        "/api/v1/simulator/runs/{run_id}/graph/snapshot": 5,
+    }
 
     # Observability
     METRICS_ENABLED: bool = True
+    # SQL statement instrumentation: per-fingerprint latency histograms and per-request
+    # statement/row counts (GET /admin/debug/sql).
+    DB_INSTRUMENTATION_ENABLED: bool = True
+    # Statements slower than this are kept for the debug endpoint (0 disables capture).
+    # With ENV=dev the EXPLAIN plan of slow SELECTs is captured as well.
+    DB_SLOW_STATEMENT_MS: int = 200
 
     # Simulator (DB-first UI state)
     # When enabled, simulator persists runs/metrics/bottlenecks/artifacts indexes to the main DB.
@@ -147,6 +219,14 @@ class Settings(BaseSettings):
     # Higher value = fewer DB scans, less accurate viz_size/viz_width_key.
     SIMULATOR_VIZ_QUANTILE_REFRESH_TICKS: int = 10
 
+    # Real-mode clearing: equivalents cleared concurrently per tick, each in its own
+    # session. 1 = one after another. Meant for PostgreSQL; SQLite serialises writers.
+    SIMULATOR_CLEARING_EQ_CONCURRENCY: int = 1
+
+    # Real-mode tick profiles (per-phase wall time / SQL statements / rows) kept per run
+    # for the admin tick-profiles endpoint. 0 disables the in-memory history.
+    SIMULATOR_TICK_PROFILE_HISTORY: int = 100
+
     # --- Simulator session (anonymous visitors) ---
     SIMULATOR_SESSION_SECRET: str = "change-me-in-production"
     SIMULATOR_SESSION_TTL_SEC: int = 604800  # 7 days
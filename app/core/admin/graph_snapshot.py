@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.models.debt import Debt
+from app.db.models.equivalent import Equivalent as EquivalentModel
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+from app.schemas.equivalents import StoredEquivalent
+from app.schemas.graph import AdminGraphDebt, AdminGraphParticipant
+from app.schemas.trustline import TrustLine as TrustLineSchema
+from app.utils.exceptions import NotFoundException
+
+# Live rows first, then a stable tie-break.  Used by the admin graph queries: since
+# migration 019 a closed incarnation may share (from, to, equivalent) with the live one, so
+# a query that does not order deterministically returns them in planner order, and a query
+# that does not de-duplicate emits BOTH as graph edges -- attaching the same `Debt` row to
+# each and doubling `used`/`available`.
+_TRUSTLINE_LIVE_FIRST = case((TrustLine.status == "closed", 1), else_=0)
+
+DEBT_BINS = 9
+_MAX_SCALE = 1.90
+_GAMMA = 0.75
+
+
+def apply_net_viz(participants: list[AdminGraphParticipant], net_atoms_by_pid: dict[str, int]) -> None:
+    """Fill net/viz fields in place; percentiles are taken over `participants` only."""
+
+    mags: list[int] = []
+    debt_mags: list[int] = []
+    for p in participants:
+        atoms = net_atoms_by_pid.get(p.pid, 0)
+        mags.append(abs(atoms))
+        if atoms < 0:
+            debt_mags.append(abs(atoms))
+
+    mags_sorted = sorted(mags)
+    n = len(mags_sorted)
+    debt_mags_sorted = sorted(debt_mags)
+    dn = len(debt_mags_sorted)
+
+    def _percentile(mag: int) -> float:
+        if n <= 1:
+            return 0.0
+        # Use bisect-right so equal magnitudes share percentile towards the right.
+        i = bisect.bisect_right(mags_sorted, mag) - 1
+        i = max(0, min(i, n - 1))
+        return i / (n - 1)
+
+    def _debt_bin(mag: int) -> int:
+        if dn <= 1:
+            return 0
+        i = bisect.bisect_right(debt_mags_sorted, mag) - 1
+        i = max(0, min(i, dn - 1))
+        pct = i / (dn - 1)
+        b = int(round(pct * (DEBT_BINS - 1)))
+        return max(0, min(b, DEBT_BINS - 1))
+
+    def _scale_from_pct(pct: float) -> float:
+        if pct <= 0:
+            return 1.0
+        if pct >= 1:
+            return _MAX_SCALE
+        return 1.0 + (_MAX_SCALE - 1.0) * (pct**_GAMMA)
+
+    for p in participants:
+        atoms = net_atoms_by_pid.get(p.pid, 0)
+        p.net_balance_atoms = str(atoms)
+        p.net_sign = -1 if atoms < 0 else (1 if atoms > 0 else 0)
+
+        status_key = str(p.status or "").strip().lower()
+        type_key = str(p.type or "").strip().lower()
+
+        if status_key in {"suspended", "frozen"}:
+            p.viz_color_key = "suspended"
+        elif status_key == "left":
+            p.viz_color_key = "left"
+        elif status_key in {"deleted", "banned"}:
+            p.viz_color_key = "deleted"
+        else:
+            if p.net_sign == -1:
+                p.viz_color_key = f"debt-{_debt_bin(abs(atoms))}"
+            else:
+                p.viz_color_key = "business" if type_key == "business" else "person"
+
+        s = _scale_from_pct(_percentile(abs(atoms)))
+
+        # Base sizes align with current Cytoscape styling.
+        if type_key == "business":
+            w0, h0 = 26, 22
+        else:
+            w0, h0 = 16, 16
+
+        p.viz_size = {"w": int(round(w0 * s)), "h": int(round(h0 * s))}
+
+
+@dataclass
+class _TrustLineRow:
+    # Position in the snapshot's trustline order, to re-sort slices gathered by adjacency.
+    pos: int
+    equivalent: str
+    from_pid: str
+    to_pid: str
+    status: str
+    schema: TrustLineSchema
+
+
+@dataclass
+class _GraphIndex:
+    participant_pos: dict[str, int]
+    # Undirected: pid -> trustline rows touching it (every incarnation).
+    trustlines_by_pid: dict[str, list[_TrustLineRow]]
+    # pid -> positions in `debts` where the pid is debtor or creditor.
+    debts_by_pid: dict[str, list[int]]
+
+
+@dataclass
+class AdminGraph:
+    """The whole admin graph, as `GET /admin/graph/snapshot` returns it for one equivalent.
+
+    `trustline_rows` keeps every incarnation in query order (live first per triple), so ego
+    views can apply their status filter before de-duplicating, as the per-request queries did.
+    """
+
+    participants: list[AdminGraphParticipant]
+    equivalents: list[StoredEquivalent]
+    trustline_rows: list[_TrustLineRow]
+    trustlines: list[TrustLineSchema]
+    debts: list[AdminGraphDebt]
+    # Signed net position in atoms of the selected equivalent (None without one).
+    net_atoms_by_pid: dict[str, int] | None
+    _index: _GraphIndex | None = field(default=None, repr=False)
+
+    def index(self) -> _GraphIndex:
+        """Adjacency index over the graph, built on first use and kept with it."""
+
+        if self._index is None:
+            trustlines_by_pid: dict[str, list[_TrustLineRow]] = {}
+            for row in self.trustline_rows:
+                trustlines_by_pid.setdefault(row.from_pid, []).append(row)
+                if row.to_pid != row.from_pid:
+                    trustlines_by_pid.setdefault(row.to_pid, []).append(row)
+            debts_by_pid: dict[str, list[int]] = {}
+            for i, d in enumerate(self.debts):
+                debts_by_pid.setdefault(d.debtor, []).append(i)
+                if d.creditor != d.debtor:
+                    debts_by_pid.setdefault(d.creditor, []).append(i)
+            self._index = _GraphIndex(
+                participant_pos={p.pid: i for i, p in enumerate(self.participants)},
+                trustlines_by_pid=trustlines_by_pid,
+                debts_by_pid=debts_by_pid,
+            )
+        return self._index
+
+    def ego(
+        self,
+        root_pid: str,
+        *,
+        depth: int,
+        equivalent: str | None,
+        statuses: list[str] | None,
+    ) -> tuple[list[AdminGraphParticipant], list[TrustLineSchema], list[AdminGraphDebt]]:
+        """Neighbourhood of `root_pid` on the (filtered) trustline graph, taken as undirected.
+
+        Only the rows touching the neighbourhood are visited; output order matches the full
+        snapshot.
+        """
+
+        idx = self.index()
+        if root_pid not in idx.participant_pos:
+            raise NotFoundException("Participant not found")
+
+        status_set = set(statuses) if statuses else None
+
+        def _edge_ok(row: _TrustLineRow) -> bool:
+            if equivalent and row.equivalent != equivalent:
+                return False
+            return status_set is None or row.status in status_set
+
+        visited: set[str] = {root_pid}
+        frontier: set[str] = {root_pid}
+        for _ in range(int(depth)):
+            if not frontier:
+                break
+            nxt: set[str] = set()
+            for pid in frontier:
+                for row in idx.trustlines_by_pid.get(pid, ()):
+                    if not _edge_ok(row):
+                        continue
+                    other = row.to_pid if row.from_pid == pid else row.from_pid
+                    if other not in visited:
+                        nxt.add(other)
+            visited |= nxt
+            frontier = nxt
+
+        positions = sorted(idx.participant_pos[pid] for pid in visited if pid in idx.participant_pos)
+        participants = [self.participants[i] for i in positions]
+        if self.net_atoms_by_pid is not None:
+            # Viz percentiles are relative to the ego set, not to the whole network.
+            participants = [p.model_copy() for p in participants]
+            apply_net_viz(participants, self.net_atoms_by_pid)
+
+        rows: dict[int, _TrustLineRow] = {}
+        debt_positions: set[int] = set()
+        for pid in visited:
+            for row in idx.trustlines_by_pid.get(pid, ()):
+                if row.from_pid in visited and row.to_pid in visited and _edge_ok(row):
+                    rows[row.pos] = row
+            for i in idx.debts_by_pid.get(pid, ()):
+                d = self.debts[i]
+                if d.debtor in visited and d.creditor in visited and (not equivalent or d.equivalent == equivalent):
+                    debt_positions.add(i)
+
+        trustlines = [r.schema for r in _dedupe_rows([rows[pos] for pos in sorted(rows)])]
+        debts = [self.debts[i] for i in sorted(debt_positions)]
+        return participants, trustlines, debts
+
+
+def _dedupe_rows(rows: list[_TrustLineRow]) -> list[_TrustLineRow]:
+    """Keep one row per (equivalent, from, to) -- the live one when it exists.
+
+    Restores the "one edge per triple" shape the graph had while the unique constraint was
+    unconditional, without hiding pairs whose only incarnation is closed.
+    """
+    seen: set[tuple[str, str, str]] = set()
+    out: list[_TrustLineRow] = []
+    for row in rows:
+        key = (row.equivalent, row.from_pid, row.to_pid)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(row)
+    return out
+
+
+async def _net_atoms_by_pid(
+    db: AsyncSession,
+    *,
+    equivalent: str,
+    equivalents: list[StoredEquivalent],
+    pids: list[str],
+) -> dict[str, int] | None:
+    eqc = str(equivalent or "").strip().upper()
+    if not eqc or not pids:
+        return None
+
+    precision = 0
+    for e in equivalents:
+        if str(e.code).strip().upper() == eqc:
+            try:
+                precision = int(e.precision)
+            except Exception:
+                precision = 0
+            break
+    scale10 = Decimal(10) ** precision
+
+    eq_id = (await db.execute(select(EquivalentModel.id).where(EquivalentModel.code == eqc))).scalar_one_or_none()
+    if not eq_id:
+        return None
+
+    p_debtor = aliased(Participant)
+    p_creditor = aliased(Participant)
+    debt_by_pid: dict[str, Decimal] = {}
+    credit_by_pid: dict[str, Decimal] = {}
+
+    d_rows = (
+        await db.execute(
+            select(p_debtor.pid, func.coalesce(func.sum(Debt.amount), 0))
+            .select_from(Debt)
+            .join(p_debtor, Debt.debtor_id == p_debtor.id)
+            .where(Debt.equivalent_id == eq_id, Debt.amount > 0)
+            .group_by(p_debtor.pid)
+        )
+    ).all()
+    for pid0, s in d_rows:
+        debt_by_pid[str(pid0)] = s
+
+    c_rows = (
+        await db.execute(
+            select(p_creditor.pid, func.coalesce(func.sum(Debt.amount), 0))
+            .select_from(Debt)
+            .join(p_creditor, Debt.creditor_id == p_creditor.id)
+            .where(Debt.equivalent_id == eq_id, Debt.amount > 0)
+            .group_by(p_creditor.pid)
+        )
+    ).all()
+    for pid0, s in c_rows:
+        credit_by_pid[str(pid0)] = s
+
+    def _to_atoms(amount: Decimal) -> int:
+        # amount is Decimal in major units; convert to integer atoms.
+        return int((amount * scale10).to_integral_value(rounding=ROUND_HALF_UP))
+
+    return {
+        pid: _to_atoms(credit_by_pid.get(pid, Decimal(0)) - debt_by_pid.get(pid, Decimal(0)))
+        for pid in pids
+    }
+
+
+async def load_admin_graph(db: AsyncSession, *, equivalent: str | None) -> AdminGraph:
+    """Read participants, equivalents, trustlines (with used/available) and debts.
+
+    Guardrail: TrustLine direction in output is from→to = creditor→debtor.
+    """
+
+    participants_rows = (
+        await db.execute(
+            select(Participant.pid, Participant.display_name, Participant.type, Participant.status)
+            .order_by(Participant.pid.asc())
+        )
+    ).all()
+    participants = [
+        AdminGraphParticipant(
+            pid=pid,
+            display_name=display_name,
+            type=type_,
+            status=str(status or "").strip().lower(),
+            net_balance_atoms=None,
+            net_sign=None,
+            viz_color_key=None,
+            viz_size=None,
+        )
+        for pid, display_name, type_, status in participants_rows
+    ]
+
+    eq_models = (
+        await db.execute(select(EquivalentModel).order_by(EquivalentModel.code.asc()))
+    ).scalars().all()
+    equivalents = [StoredEquivalent.model_validate(e) for e in eq_models]
+
+    # Net visualization (backend-only) for the selected equivalent; without one the viz
+    # fields stay null.
+    net_atoms = None
+    if equivalent:
+        net_atoms = await _net_atoms_by_pid(
+            db, equivalent=equivalent, equivalents=equivalents, pids=[p.pid for p in participants if p.pid]
+        )
+        if net_atoms is not None:
+            apply_net_viz(participants, net_atoms)
+
+    # Trustlines + used/available (no N+1)
+    p_from = aliased(Participant)
+    p_to = aliased(Participant)
+    tl_stmt = (
+        select(
+            TrustLine.id,
+            TrustLine.limit,
+            TrustLine.status,
+            TrustLine.created_at,
+            TrustLine.updated_at,
+            TrustLine.policy,
+            EquivalentModel.code.label("equivalent"),
+            p_from.pid.label("from_pid"),
+            p_from.display_name.label("from_display_name"),
+            p_to.pid.label("to_pid"),
+            p_to.display_name.label("to_display_name"),
+            func.coalesce(Debt.amount, 0).label("used"),
+        )
+        .select_from(TrustLine)
+        .join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id)
+        .join(p_from, TrustLine.from_participant_id == p_from.id)
+        .join(p_to, TrustLine.to_participant_id == p_to.id)
+        .outerjoin(
+            Debt,
+            and_(
+                Debt.debtor_id == TrustLine.to_participant_id,
+                Debt.creditor_id == TrustLine.from_participant_id,
+                Debt.equivalent_id == TrustLine.equivalent_id,
+            ),
+        )
+        .order_by(
+            EquivalentModel.code.asc(),
+            p_from.pid.asc(),
+            p_to.pid.asc(),
+            _TRUSTLINE_LIVE_FIRST.asc(),
+            TrustLine.id.asc(),
+        )
+    )
+
+    trustline_rows: list[_TrustLineRow] = []
+    for (
+        tl_id,
+        limit,
+        status,
+        created_at,
+        updated_at,
+        policy,
+        equivalent_code,
+        from_pid,
+        from_display_name,
+        to_pid,
+        to_display_name,
+        used,
+    ) in (await db.execute(tl_stmt)).all():
+        schema = TrustLineSchema.model_validate(
+            {
+                "id": tl_id,
+                "from_pid": from_pid,
+                "to_pid": to_pid,
+                "from_display_name": from_display_name,
+                "to_display_name": to_display_name,
+                "equivalent_code": equivalent_code,
+                "limit": limit,
+                "used": used,
+                "available": limit - used,
+                "status": status,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "policy": policy,
+            }
+        )
+        trustline_rows.append(
+            _TrustLineRow(
+                pos=len(trustline_rows),
+                equivalent=equivalent_code,
+                from_pid=from_pid,
+                to_pid=to_pid,
+                status=status,
+                schema=schema,
+            )
+        )
+
+    # Debts
+    p_debtor = aliased(Participant)
+    p_creditor = aliased(Participant)
+    debt_stmt = (
+        select(
+            EquivalentModel.code.label("equivalent"),
+            p_debtor.pid.label("debtor"),
+            p_creditor.pid.label("creditor"),
+            Debt.amount,
+        )
+        .select_from(Debt)
+        .join(EquivalentModel, Debt.equivalent_id == EquivalentModel.id)
+        .join(p_debtor, Debt.debtor_id == p_debtor.id)
+        .join(p_creditor, Debt.creditor_id == p_creditor.id)
+        .where(Debt.amount > 0)
+        .order_by(EquivalentModel.code.asc(), p_debtor.pid.asc(), p_creditor.pid.asc())
+    )
+    debts = [
+        AdminGraphDebt(equivalent=eq, debtor=debtor, creditor=creditor, amount=amount)
+        for eq, debtor, creditor, amount in (await db.execute(debt_stmt)).all()
+    ]
+
+    return AdminGraph(
+        participants=participants,
+        equivalents=equivalents,
+        trustline_rows=trustline_rows,
+        trustlines=[r.schema for r in _dedupe_rows(trustline_rows)],
+        debts=debts,
+        net_atoms_by_pid=net_atoms,
+    )
+
@@ -0,0 +1,315 @@
+"""Maintained liquidity views behind the admin liquidity dashboard.
+
+`GET /admin/liquidity/summary` and `GET /admin/trustlines/bottlenecks` are polled, and
+without a view every poll rescans trustlines, debts and net positions. A view holds,
+per equivalent:
+
+* the active-trustline totals (count, limit, used, available);
+* the bottleneck candidates ordered by available capacity, plus their available/limit
+  ratios as exact fractions in sorted order, so a threshold is one bisect and a page
+  stops at `limit` rows;
+* the net-position rankings, cut at the largest page the API serves.
+
+Views are versioned like graph snapshots (app/utils/snapshot_cache.py): a payment,
+clearing, trustline change or inject bumps the ledger version of its equivalent, and the
+next read rebuilds only that equivalent. The all-equivalents view is composed from the
+per-equivalent ones. `ADMIN_LIQUIDITY_VIEW_TTL_SECONDS` bounds staleness for writes that
+bypass those hooks; 0 disables the views and the handlers query the database directly.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any
+
+from sqlalchemy import Select, and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+import app.db.session as db_session
+from app.config import settings
+from app.db.models.debt import Debt
+from app.db.models.equivalent import Equivalent as EquivalentModel
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+from app.schemas.admin import AdminLiquidityNetRow
+from app.schemas.trustline import TrustLine as TrustLineSchema
+from app.utils import snapshot_cache
+
+# Largest `limit` accepted by the liquidity endpoints; rankings are kept this deep.
+RANK_DEPTH = 50
+
+_ZERO = Decimal("0")
+
+
+def trustline_rows_stmt(*, active_only: bool = True) -> Select:
+    """Active trustlines with their used/available capacity (Debt runs debtor -> creditor)."""
+
+    p_from = aliased(Participant)
+    p_to = aliased(Participant)
+    used_expr = func.coalesce(Debt.amount, 0)
+    available_expr = TrustLine.limit - used_expr
+
+    stmt = (
+        select(
+            TrustLine.id,
+            TrustLine.limit,
+            TrustLine.status,
+            TrustLine.created_at,
+            TrustLine.updated_at,
+            TrustLine.policy,
+            EquivalentModel.code.label("equivalent"),
+            p_from.pid.label("from_pid"),
+            p_from.display_name.label("from_display_name"),
+            p_to.pid.label("to_pid"),
+            p_to.display_name.label("to_display_name"),
+            used_expr.label("used"),
+            available_expr.label("available"),
+        )
+        .select_from(TrustLine)
+        .join(EquivalentModel, TrustLine.equivalent_id == EquivalentModel.id)
+        .join(p_from, TrustLine.from_participant_id == p_from.id)
+        .join(p_to, TrustLine.to_participant_id == p_to.id)
+        .outerjoin(
+            Debt,
+            and_(
+                Debt.debtor_id == TrustLine.to_participant_id,
+                Debt.creditor_id == TrustLine.from_participant_id,
+                Debt.equivalent_id == TrustLine.equivalent_id,
+            ),
+        )
+    )
+    if active_only:
+        stmt = stmt.where(TrustLine.status == "active")
+    return stmt
+
+
+def trustline_row_schema(row: Any) -> TrustLineSchema:
+    return TrustLineSchema.model_validate(
+        {
+            "id": row.id,
+            "from_pid": row.from_pid,
+            "to_pid": row.to_pid,
+            "from_display_name": row.from_display_name,
+            "to_display_name": row.to_display_name,
+            "equivalent_code": row.equivalent,
+            "limit": row.limit,
+            "used": row.used,
+            "available": row.available,
+            "status": row.status,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "policy": row.policy,
+        }
+    )
+
+
+@dataclass(frozen=True)
+class _Edge:
+    available: Decimal
+    created_at: datetime
+    ratio: Fraction
+    item: TrustLineSchema
+
+
+@dataclass(frozen=True)
+class LiquidityView:
+    active_trustlines: int
+    total_limit: Decimal
+    total_used: Decimal
+    total_available: Decimal
+    # Positive-limit edges by (available, created_at); `ratios` is sorted independently.
+    edges: tuple[_Edge, ...]
+    ratios: tuple[Fraction, ...]
+    # pid -> (display_name, net)
+    net_by_pid: dict[str, tuple[str | None, Decimal]]
+    top_creditors: tuple[AdminLiquidityNetRow, ...]
+    top_debtors: tuple[AdminLiquidityNetRow, ...]
+    top_by_abs_net: tuple[AdminLiquidityNetRow, ...]
+
+    def bottlenecks(self, *, threshold: Decimal, limit: int) -> tuple[int, list[TrustLineSchema]]:
+        """Edges with available/limit below `threshold`: (total, first `limit` by available)."""
+
+        if threshold < 0:
+            return 0, []
+        bound = Fraction(threshold)
+        total = bisect.bisect_left(self.ratios, bound)
+        items: list[TrustLineSchema] = []
+        if total:
+            for edge in self.edges:
+                if edge.ratio < bound:
+                    items.append(edge.item)
+                    if len(items) >= min(limit, total):
+                        break
+        return total, items
+
+
+def _ranked(net_by_pid: dict[str, tuple[str | None, Decimal]]) -> tuple[tuple, tuple, tuple]:
+    rows = [(pid, dn, net) for pid, (dn, net) in net_by_pid.items()]
+
+    def _rows(selected) -> tuple[AdminLiquidityNetRow, ...]:
+        return tuple(AdminLiquidityNetRow(pid=pid, display_name=dn, net=net) for pid, dn, net in selected)
+
+    creditors = heapq.nsmallest(RANK_DEPTH, (r for r in rows if r[2] > 0), key=lambda r: (-r[2], r[0]))
+    debtors = heapq.nsmallest(RANK_DEPTH, (r for r in rows if r[2] < 0), key=lambda r: (r[2], r[0]))
+    by_abs = heapq.nsmallest(RANK_DEPTH, rows, key=lambda r: (-abs(r[2]), r[0]))
+    return _rows(creditors), _rows(debtors), _rows(by_abs)
+
+
+def _make_view(
+    *,
+    active_trustlines: int,
+    total_limit: Decimal,
+    total_used: Decimal,
+    total_available: Decimal,
+    edges: list[_Edge],
+    net_by_pid: dict[str, tuple[str | None, Decimal]],
+) -> LiquidityView:
+    edges.sort(key=lambda e: (e.available, e.created_at))
+    creditors, debtors, by_abs = _ranked(net_by_pid)
+    return LiquidityView(
+        active_trustlines=active_trustlines,
+        total_limit=total_limit,
+        total_used=total_used,
+        total_available=total_available,
+        edges=tuple(edges),
+        ratios=tuple(sorted(e.ratio for e in edges)),
+        net_by_pid=net_by_pid,
+        top_creditors=creditors,
+        top_debtors=debtors,
+        top_by_abs_net=by_abs,
+    )
+
+
+async def _build_view(db: AsyncSession, equivalent: str) -> LiquidityView:
+    stmt = trustline_rows_stmt().where(EquivalentModel.code == equivalent)
+    active_trustlines = 0
+    total_limit = total_used = total_available = _ZERO
+    edges: list[_Edge] = []
+    for row in (await db.execute(stmt)).all():
+        limit_value = Decimal(str(row.limit))
+        used = Decimal(str(row.used))
+        available = Decimal(str(row.available))
+        active_trustlines += 1
+        total_limit += limit_value
+        total_used += used
+        total_available += available
+        if limit_value > 0:
+            edges.append(
+                _Edge(
+                    available=available,
+                    created_at=row.created_at,
+                    ratio=Fraction(available) / Fraction(limit_value),
+                    item=trustline_row_schema(row),
+                )
+            )
+
+    debtor = aliased(Participant)
+    creditor = aliased(Participant)
+    debt_rows = (
+        await db.execute(
+            select(
+                debtor.pid,
+                debtor.display_name,
+                creditor.pid,
+                creditor.display_name,
+                Debt.amount,
+            )
+            .select_from(Debt)
+            .join(EquivalentModel, Debt.equivalent_id == EquivalentModel.id)
+            .join(debtor, Debt.debtor_id == debtor.id)
+            .join(creditor, Debt.creditor_id == creditor.id)
+            .where(EquivalentModel.code == equivalent, Debt.amount > 0)
+        )
+    ).all()
+    net_by_pid: dict[str, tuple[str | None, Decimal]] = {}
+    for debtor_pid, debtor_name, creditor_pid, creditor_name, amount in debt_rows:
+        amount = Decimal(str(amount))
+        net_by_pid[debtor_pid] = (debtor_name, net_by_pid.get(debtor_pid, (None, _ZERO))[1] - amount)
+        net_by_pid[creditor_pid] = (creditor_name, net_by_pid.get(creditor_pid, (None, _ZERO))[1] + amount)
+
+    return _make_view(
+        active_trustlines=active_trustlines,
+        total_limit=total_limit,
+        total_used=total_used,
+        total_available=total_available,
+        edges=edges,
+        net_by_pid=net_by_pid,
+    )
+
+
+def _compose(views: list[LiquidityView]) -> LiquidityView:
+    net_by_pid: dict[str, tuple[str | None, Decimal]] = {}
+    for view in views:
+        for pid, (dn, net) in view.net_by_pid.items():
+            net_by_pid[pid] = (dn, net_by_pid.get(pid, (None, _ZERO))[1] + net)
+    return _make_view(
+        active_trustlines=sum(v.active_trustlines for v in views),
+        total_limit=sum((v.total_limit for v in views), _ZERO),
+        total_used=sum((v.total_used for v in views), _ZERO),
+        total_available=sum((v.total_available for v in views), _ZERO),
+        edges=[edge for v in views for edge in v.edges],
+        net_by_pid=net_by_pid,
+    )
+
+
+_lock = threading.Lock()
+# key (equivalent code, or None for all) -> (version, built_at, view)
+_views: dict[str | None, tuple[Any, float, LiquidityView]] = {}
+
+
+def _ttl_seconds() -> int:
+    return max(0, int(getattr(settings, "ADMIN_LIQUIDITY_VIEW_TTL_SECONDS", 0) or 0))
+
+
+def _cached(key: str | None, version: Any, ttl: int) -> LiquidityView | None:
+    with _lock:
+        entry = _views.get(key)
+    if entry is None or entry[0] != version or time.monotonic() - entry[1] > ttl:
+        return None
+    return entry[2]
+
+
+def _store(key: str | None, version: Any, view: LiquidityView) -> LiquidityView:
+    with _lock:
+        _views[key] = (version, time.monotonic(), view)
+    return view
+
+
+async def _equivalent_view(db: AsyncSession, equivalent: str, ttl: int) -> tuple[Any, LiquidityView]:
+    version = snapshot_cache.ledger_version(equivalent)
+    view = _cached(equivalent, version, ttl)
+    if view is None:
+        async with db_session.primary_session_for(db) as source:
+            view = _store(equivalent, version, await _build_view(source, equivalent))
+    return version, view
+
+
+async def get_liquidity_view(db: AsyncSession, equivalent: str | None) -> LiquidityView | None:
+    """The current view for one equivalent (or all when None); None when views are disabled."""
+
+    ttl = _ttl_seconds()
+    if ttl <= 0:
+        return None
+    if equivalent:
+        return (await _equivalent_view(db, equivalent, ttl))[1]
+
+    codes = sorted((await db.execute(select(EquivalentModel.code))).scalars().all())
+    parts = [await _equivalent_view(db, code, ttl) for code in codes]
+    version = tuple(zip(codes, (v for v, _ in parts)))
+    view = _cached(None, version, ttl)
+    if view is None:
+        view = _store(None, version, _compose([view for _, view in parts]))
+    return view
+
+
+def clear() -> None:
+    with _lock:
+        _views.clear()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import bisect
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_DOWN
@@ -9,6 +12,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
+import app.db.session as db_session
 from app.config import settings
 from app.db.models.audit_log import AuditLog
 from app.db.models.debt import Debt
@@ -32,6 +36,7 @@ from app.schemas.metrics import (
     AdminParticipantRank,
 )
 from app.schemas.trustline import TrustLine as TrustLineSchema
+from app.utils import snapshot_cache
 from app.utils.exceptions import NotFoundException
 from app.utils.validation import validate_equivalent_code
 
@@ -351,12 +356,29 @@ def _compute_concentration(split: AdminParticipantCounterpartySplit) -> AdminPar
     return AdminParticipantConcentration(eq=split.eq, outgoing=side(out_shares), incoming=side(in_shares))
 
 
-async def _compute_rank_and_distribution(
-    db: AsyncSession,
-    *,
-    participant_pid: str,
-    eq: _EquivalentInfo,
-) -> tuple[AdminParticipantNetDistribution, AdminParticipantRank]:
+@dataclass(frozen=True)
+class _NetRanking:
+    # (-net_atoms, pid) for every participant, ascending: index + 1 is the rank.
+    keys: list[tuple[int, str]]
+    net_by_pid: dict[str, int]
+    distribution: AdminParticipantNetDistribution
+
+
+# equivalent code -> (ledger version, built_at, ranking)
+_rankings: dict[str, tuple[Any, float, _NetRanking]] = {}
+_rankings_lock = threading.Lock()
+
+
+def _rank_cache_ttl_seconds() -> int:
+    return max(0, int(getattr(settings, "ADMIN_PARTICIPANT_RANK_CACHE_TTL_SECONDS", 0) or 0))
+
+
+def clear_rank_cache() -> None:
+    with _rankings_lock:
+        _rankings.clear()
+
+
+async def _build_net_ranking(db: AsyncSession, *, eq: _EquivalentInfo) -> _NetRanking:
     # Net = credits - debts.
     all_pids = [
         str(x)
@@ -391,11 +413,11 @@ async def _compute_rank_and_distribution(
     for pid in all_pids:
         net_by_pid[pid] = int(credit_by_pid.get(pid, 0) - debt_by_pid.get(pid, 0))
 
-    sorted_pids = sorted(all_pids, key=lambda p: (-net_by_pid.get(p, 0), p))
+    keys = sorted((-net, pid) for pid, net in net_by_pid.items())
 
-    n = len(sorted_pids)
+    n = len(keys)
 
-    vals = [net_by_pid[p] for p in sorted_pids]
+    vals = [-neg for neg, _ in keys]
     min_v = min(vals) if vals else 0
     max_v = max(vals) if vals else 0
 
@@ -427,22 +449,56 @@ async def _compute_rank_and_distribution(
             to = max_v if i == bins_count - 1 else (frm + w)
             bins.append(AdminParticipantNetDistributionBin(from_atoms=str(frm), to_atoms=str(to), count=buckets[i]))
 
-    try:
-        idx = sorted_pids.index(participant_pid)
-    except ValueError:
-        idx = -1
+    return _NetRanking(
+        keys=keys,
+        net_by_pid=net_by_pid,
+        distribution=AdminParticipantNetDistribution(
+            eq=eq.code, min_atoms=str(min_v), max_atoms=str(max_v), bins=bins
+        ),
+    )
+
+
+async def _get_net_ranking(db: AsyncSession, *, eq: _EquivalentInfo) -> _NetRanking:
+    """The ranking of `eq`, reused while its ledger version (and the TTL) holds.
+
+    Participant registration bumps every equivalent's version, so `n` stays exact.
+    """
+
+    ttl = _rank_cache_ttl_seconds()
+    if ttl <= 0:
+        return await _build_net_ranking(db, eq=eq)
+    version = snapshot_cache.ledger_version(eq.code)
+    with _rankings_lock:
+        entry = _rankings.get(eq.code)
+    if entry is not None and entry[0] == version and time.monotonic() - entry[1] <= ttl:
+        return entry[2]
+    async with db_session.primary_session_for(db) as source:
+        ranking = await _build_net_ranking(source, eq=eq)
+    with _rankings_lock:
+        _rankings[eq.code] = (version, time.monotonic(), ranking)
+    return ranking
+
+
+async def _compute_rank_and_distribution(
+    db: AsyncSession,
+    *,
+    participant_pid: str,
+    eq: _EquivalentInfo,
+) -> tuple[AdminParticipantNetDistribution, AdminParticipantRank]:
+    ranking = await _get_net_ranking(db, eq=eq)
+    n = len(ranking.keys)
 
-    if idx < 0:
+    net_atoms = ranking.net_by_pid.get(participant_pid)
+    if net_atoms is None:
         rank = 0
         percentile = 0.0
         net_atoms = 0
     else:
-        rank = idx + 1
+        rank = bisect.bisect_left(ranking.keys, (-net_atoms, participant_pid)) + 1
         percentile = 1.0 if n <= 1 else float((n - rank) / (n - 1))
-        net_atoms = net_by_pid.get(participant_pid, 0)
 
     return (
-        AdminParticipantNetDistribution(eq=eq.code, min_atoms=str(min_v), max_atoms=str(max_v), bins=bins),
+        ranking.distribution,
         AdminParticipantRank(eq=eq.code, rank=rank, n=n, percentile=percentile, net=_atoms_to_decimal(net_atoms, eq.precision)),
     )
 
@@ -1,19 +1,37 @@
+import asyncio
 import base64
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Sequence, TypeVar
 
 import base58
 from nacl.signing import VerifyKey, SigningKey
 from nacl.exceptions import BadSignatureError
 from nacl.encoding import Base64Encoder
 
+from app.config import settings
 from app.utils.exceptions import CryptoException
 
+T = TypeVar("T")
+
+# Decoded keys per public key string. A participant's key is immutable once registered,
+# so in practice this is one entry per active participant. Invalid keys raise and are
+# therefore never cached.
+VERIFY_KEY_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=VERIFY_KEY_CACHE_SIZE)
+def _verify_key(public_key_b64: str) -> VerifyKey:
+    return VerifyKey(public_key_b64, encoder=Base64Encoder)
+
+
 def verify_signature(public_key_b64: str, message: bytes, signature_b64: str) -> bool:
     """
     Verify Ed25519 signature.
     """
     try:
-        verify_key = VerifyKey(public_key_b64, encoder=Base64Encoder)
+        verify_key = _verify_key(public_key_b64)
         verify_key.verify(message, base64.b64decode(signature_b64))
         return True
     except (BadSignatureError, ValueError) as e:
@@ -21,6 +39,72 @@ def verify_signature(public_key_b64: str, message: bytes, signature_b64: str) ->
     except Exception as e:
         raise CryptoException(f"Unexpected crypto error: {str(e)}")
 
+
+def verify_signatures(items: Sequence[tuple[str, bytes, str]]) -> list[bool]:
+    """
+    Verify many `(public_key_b64, message, signature_b64)` triples.
+
+    Returns one flag per item instead of raising, so one bad signature does not hide
+    the verdict on the rest.
+    """
+    results: list[bool] = []
+    for public_key_b64, message, signature_b64 in items:
+        try:
+            results.append(verify_signature(public_key_b64, message, signature_b64))
+        except CryptoException:
+            results.append(False)
+    return results
+
+
+# libsodium releases the GIL, so verification on these threads runs in parallel with
+# the event loop instead of stalling it.
+_verify_pool: ThreadPoolExecutor | None = None
+
+
+def _get_verify_pool() -> ThreadPoolExecutor | None:
+    global _verify_pool
+    workers = int(getattr(settings, "CRYPTO_VERIFY_WORKERS", 0) or 0)
+    if workers <= 0:
+        return None
+    if _verify_pool is None:
+        _verify_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="geo-verify")
+    return _verify_pool
+
+
+async def offload_verification(fn: Callable[..., T], *args) -> T:
+    """
+    Run a CPU-bound verification callable on the verify pool (inline when disabled).
+
+    Callers pass the function rather than calling a fixed one, so module-level
+    `verify_signature` stays the single seam tests patch.
+    """
+    pool = _get_verify_pool()
+    if pool is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+async def verify_signatures_async(
+    items: Sequence[tuple[str, bytes, str]], *, chunk_size: int = 256
+) -> list[bool]:
+    """
+    Batch `verify_signatures` split into chunks across the verify pool.
+
+    `PaymentService.create_payments_batch` checks a whole bulk request with it before
+    taking any owner lock.
+    """
+    chunk_size = max(1, int(chunk_size))
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    verdicts = await asyncio.gather(*(offload_verification(verify_signatures, chunk) for chunk in chunks))
+    return [flag for chunk in verdicts for flag in chunk]
+
+
+def shutdown_verify_pool() -> None:
+    global _verify_pool
+    pool, _verify_pool = _verify_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 def generate_keypair() -> tuple[str, str]:
     """
     Generate Ed25519 keypair.
@@ -42,9 +126,13 @@ def get_pid_from_public_key(public_key_b64: str) -> str:
     """
     # Validate it's a valid key
     try:
-        VerifyKey(public_key_b64, encoder=Base64Encoder)
-        raw = base64.b64decode(public_key_b64)
-        key_hash = hashlib.sha256(raw).digest()
-        return base58.b58encode(key_hash).decode("utf-8")
+        return _pid_from_public_key(public_key_b64)
     except Exception as e:
-        raise CryptoException(f"Invalid public key: {str(e)}")
\ No newline at end of file
+        raise CryptoException(f"Invalid public key: {str(e)}")
+
+
+@lru_cache(maxsize=VERIFY_KEY_CACHE_SIZE)
+def _pid_from_public_key(public_key_b64: str) -> str:
+    raw = bytes(_verify_key(public_key_b64))
+    key_hash = hashlib.sha256(raw).digest()
+    return base58.b58encode(key_hash).decode("utf-8")
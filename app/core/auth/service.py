@@ -6,7 +6,7 @@ from sqlalchemy import select, delete
 
 from app.db.models.auth_challenge import AuthChallenge
 from app.db.models.participant import Participant
-from app.core.auth.crypto import verify_signature
+from app.core.auth.crypto import offload_verification, verify_signature
 from app.utils.security import decode_token, create_access_token, create_refresh_token, revoke_jti
 from app.utils.exceptions import BadRequestException, UnauthorizedException, NotFoundException
 from app.config import settings
@@ -79,7 +79,7 @@ class AuthService:
         try:
             # Message to verify is the challenge string
             message = challenge.encode('utf-8')
-            verify_signature(participant.public_key, message, signature)
+            await offload_verification(verify_signature, participant.public_key, message, signature)
         except Exception:
             raise UnauthorizedException("Invalid signature")
 
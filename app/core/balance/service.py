@@ -16,11 +16,21 @@ from app.schemas.balance import BalanceSummary, BalanceEquivalent, DebtsDetails,
 from app.utils.exceptions import NotFoundException
 from app.config import settings
 from app.utils.observability import log_duration
+from app.utils.shared_cache import add_invalidation_listener, get_shared_cache
 
 logger = logging.getLogger(__name__)
 
 _summary_cache: "OrderedDict[uuid.UUID, tuple[float, BalanceSummary]]" = OrderedDict()
 
+
+def _drop_local_summaries(equivalent_code: str | None) -> None:
+    # A summary spans every equivalent of a participant, so any remote invalidation
+    # makes all of them suspect.
+    _summary_cache.clear()
+
+
+add_invalidation_listener(_drop_local_summaries)
+
 class BalanceService:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -87,10 +97,34 @@ class BalanceService:
             logger.debug("op=balance.get_summary cache=hit participant_id=%s", participant_id)
             return cached
 
+        # Second tier: keyed by the global epoch, which every routing invalidation bumps.
+        shared = get_shared_cache()
+        token: str | None = None
+        ttl = int(getattr(settings, "BALANCE_SUMMARY_CACHE_TTL_SECONDS", 0) or 0)
+        if ttl > 0 and shared.enabled:
+            token, blob = await shared.get("balance", str(participant_id), scope=None)
+            if blob is not None:
+                try:
+                    summary = BalanceSummary.model_validate_json(blob)
+                except Exception:
+                    logger.warning("op=balance.get_summary shared_cache=decode_failed participant_id=%s", participant_id)
+                else:
+                    logger.debug("op=balance.get_summary cache=shared_hit participant_id=%s", participant_id)
+                    self._set_cached_summary(participant_id, summary)
+                    return summary
+
         with log_duration(logger, "balance.get_summary", participant_id=str(participant_id)):
             summary = await self._compute_summary(participant_id)
 
         self._set_cached_summary(participant_id, summary)
+        if token is not None:
+            await shared.set(
+                "balance",
+                str(participant_id),
+                summary.model_dump_json().encode("utf-8"),
+                token=token,
+                ttl_seconds=ttl,
+            )
         return summary
 
     async def _compute_summary(self, participant_id: uuid.UUID) -> BalanceSummary:
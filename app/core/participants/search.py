@@ -0,0 +1,178 @@
+"""Participant search: indexed matching, relevance buckets and keyset paging.
+
+Matching rules (the same on every backend):
+
+* PIDs are base58 and case-sensitive, so they match by **prefix** (`pid LIKE 'q%'`),
+  which a `varchar_pattern_ops` btree answers without scanning;
+* display names match case-insensitively as a substring;
+* on PostgreSQL with `pg_trgm` installed (migration 021) display names also match by
+  trigram similarity, so a typo still finds the person. The GIN trigram index on
+  `lower(display_name)` serves both the substring LIKE and the similarity operator.
+
+SQLite (dev/test) has neither extension nor pattern ops; there the same predicates run as
+plain LIKE, which is fine at development scale and keeps results identical for exact and
+substring queries.
+
+Results are ordered by a small integer relevance bucket and then by `id`, so a
+`(rank, id)` cursor pages them without OFFSET.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import case, func, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.models.participant import Participant
+from app.utils.exceptions import BadRequestException
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Relevance buckets, best first.
+RANK_PID_EXACT = 0
+RANK_PID_PREFIX = 1
+RANK_NAME_EXACT = 2
+RANK_NAME_PREFIX = 3
+RANK_NAME_WORD_PREFIX = 4
+RANK_NAME_SUBSTRING = 5
+RANK_NAME_SIMILAR = 6
+
+_LIKE_ESCAPE = "\\"
+
+# Keyed by engine URL: whether pg_trgm is usable there. Probed once per process.
+_trigram_available: dict[str, bool] = {}
+
+
+def _escape_like(value: str) -> str:
+    return (
+        value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", _LIKE_ESCAPE + "%")
+        .replace("_", _LIKE_ESCAPE + "_")
+    )
+
+
+@dataclass(frozen=True)
+class SearchTerms:
+    """Normalised query plus whether trigram similarity may be used."""
+
+    raw: str
+    fuzzy: bool = False
+
+    @property
+    def lowered(self) -> str:
+        return self.raw.lower()
+
+    def match_clause(self) -> ColumnElement[bool]:
+        needle = _escape_like(self.raw)
+        lowered = _escape_like(self.lowered)
+        clauses = [
+            Participant.pid.like(f"{needle}%", escape=_LIKE_ESCAPE),
+            func.lower(Participant.display_name).like(f"%{lowered}%", escape=_LIKE_ESCAPE),
+        ]
+        if self.fuzzy:
+            clauses.append(func.lower(Participant.display_name).op("%")(self.lowered))
+        return or_(*clauses)
+
+    def rank_expr(self) -> ColumnElement[int]:
+        needle = _escape_like(self.raw)
+        lowered = _escape_like(self.lowered)
+        name = func.lower(Participant.display_name)
+        return case(
+            (Participant.pid == self.raw, RANK_PID_EXACT),
+            (Participant.pid.like(f"{needle}%", escape=_LIKE_ESCAPE), RANK_PID_PREFIX),
+            (name == self.lowered, RANK_NAME_EXACT),
+            (name.like(f"{lowered}%", escape=_LIKE_ESCAPE), RANK_NAME_PREFIX),
+            (name.like(f"% {lowered}%", escape=_LIKE_ESCAPE), RANK_NAME_WORD_PREFIX),
+            (name.like(f"%{lowered}%", escape=_LIKE_ESCAPE), RANK_NAME_SUBSTRING),
+            else_=RANK_NAME_SIMILAR,
+        )
+
+
+@dataclass
+class ParticipantSearchPage:
+    items: list[Participant]
+    next_cursor: str | None = None
+
+
+def _dialect_name(db: AsyncSession) -> str | None:
+    try:
+        return db.get_bind().dialect.name
+    except Exception:
+        return None
+
+
+async def _has_trigram(db: AsyncSession) -> bool:
+    if _dialect_name(db) != "postgresql":
+        return False
+    key = str(db.get_bind().url)
+    cached = _trigram_available.get(key)
+    if cached is None:
+        found = (
+            await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+        ).first()
+        cached = _trigram_available[key] = found is not None
+    return cached
+
+
+async def search_terms(db: AsyncSession, query: str | None) -> SearchTerms | None:
+    """Normalise a user query; None when there is nothing to search for."""
+    raw = (query or "").strip()
+    if not raw:
+        return None
+    return SearchTerms(raw=raw, fuzzy=await _has_trigram(db))
+
+
+def _decode_search_cursor(cursor: str) -> tuple[int, uuid.UUID]:
+    fields: dict[str, Any] = decode_cursor(cursor)
+    try:
+        return int(fields["r"]), uuid.UUID(fields["id"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise BadRequestException("Invalid cursor", details={"cursor": cursor}) from exc
+
+
+async def search_participants(
+    db: AsyncSession,
+    *,
+    query: str | None = None,
+    type_filter: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> ParticipantSearchPage:
+    """Return one page of participants matching `query`, most relevant first.
+
+    Without a query every participant matches with the same rank, i.e. plain `id` order.
+    `offset` is honoured only when no cursor is given (legacy page/per_page clients).
+    """
+    terms = await search_terms(db, query)
+    rank = terms.rank_expr() if terms is not None else literal(RANK_PID_EXACT)
+
+    stmt = select(Participant, rank.label("rank"))
+    if terms is not None:
+        stmt = stmt.where(terms.match_clause())
+    if type_filter:
+        stmt = stmt.where(Participant.type == type_filter)
+
+    if cursor is not None:
+        cursor_rank, cursor_id = _decode_search_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                rank > cursor_rank,
+                (rank == cursor_rank) & (Participant.id > cursor_id),
+            )
+        )
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    stmt = stmt.order_by(rank.asc(), Participant.id.asc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_participant, last_rank = rows[-1]
+        next_cursor = encode_cursor({"r": int(last_rank), "id": str(last_participant.id)})
+    return ParticipantSearchPage(items=[row[0] for row in rows], next_cursor=next_cursor)
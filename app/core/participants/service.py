@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import List, Optional
+from typing import Optional
 
 from sqlalchemy import or_, select
 from sqlalchemy import func
@@ -11,11 +11,13 @@ from sqlalchemy.exc import IntegrityError
 from app.db.models.participant import Participant
 from app.db.models.trustline import TrustLine
 from app.core.balance.service import BalanceService
+from app.core.participants.search import ParticipantSearchPage, search_participants
 from app.schemas.participant import ParticipantCreateRequest
 from app.schemas.participant import ParticipantStats, ParticipantUpdateRequest
-from app.core.auth.crypto import get_pid_from_public_key, verify_signature
+from app.core.auth.crypto import get_pid_from_public_key, offload_verification, verify_signature
 from app.core.auth.canonical import canonical_json
 from app.utils.exceptions import ConflictException, NotFoundException, BadRequestException, InvalidSignatureException
+from app.utils.snapshot_cache import bump_ledger_version
 
 class ParticipantService:
     def __init__(self, db: AsyncSession):
@@ -52,7 +54,7 @@ class ParticipantService:
 
         message = canonical_json(payload)
         try:
-            verify_signature(participant_in.public_key, message, participant_in.signature)
+            await offload_verification(verify_signature, participant_in.public_key, message, participant_in.signature)
         except Exception:
             raise InvalidSignatureException("Invalid signature")
 
@@ -83,6 +85,7 @@ class ParticipantService:
             # Covers race conditions against unique constraints (pid/public_key).
             await self.db.rollback()
             raise ConflictException("Participant already exists")
+        bump_ledger_version()
         return participant
 
     async def get_participant(self, pid: str) -> Participant:
@@ -165,7 +168,7 @@ class ParticipantService:
             raise BadRequestException("No changes provided")
 
         try:
-            verify_signature(participant.public_key, canonical_json(signed_payload), data.signature)
+            await offload_verification(verify_signature, participant.public_key, canonical_json(signed_payload), data.signature)
         except Exception:
             raise InvalidSignatureException("Invalid signature")
 
@@ -181,27 +184,22 @@ class ParticipantService:
         await self.db.flush()
         await self.db.refresh(participant)
         await self.db.commit()
+        bump_ledger_version()
         return participant
 
     async def list_participants(
-        self, 
-        query: Optional[str] = None, 
-        type_filter: Optional[str] = None, 
-        limit: int = 20, 
-        offset: int = 0
-    ) -> List[Participant]:
-        stmt = select(Participant).order_by(Participant.id.asc())
-        
-        if query:
-            stmt = stmt.where(or_(
-                Participant.display_name.ilike(f"%{query}%"),
-                Participant.pid.ilike(f"%{query}%")
-            ))
-        
-        if type_filter:
-            stmt = stmt.where(Participant.type == type_filter)
-            
-        stmt = stmt.limit(limit).offset(offset)
-
-        result = await self.db.execute(stmt)
-        return list(result.scalars().all())
\ No newline at end of file
+        self,
+        query: Optional[str] = None,
+        type_filter: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> ParticipantSearchPage:
+        return await search_participants(
+            self.db,
+            query=query,
+            type_filter=type_filter,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
@@ -0,0 +1,143 @@
+"""In-process scheduling of payment units of work by the segments they touch.
+
+Under SERIALIZABLE, two payments through the same reciprocal pair conflict whenever their
+snapshots overlap: one commits and the other fails with 40001 (or 40P01 / the known Debt
+insert race), rolls back and retries after a backoff - often into the next payment on the
+same corridor. `PaymentEngine` therefore queues an engine-owned unit of work behind any
+in-process one holding an overlapping segment *before* it opens its snapshot, and lets
+disjoint work proceed. Conflicts with other workers are still resolved by the database and
+the retry policy.
+
+Segments are keyed `(equivalent_id, pid, pid)` with the pids sorted, the same unordered
+identity as the engine's segment advisory locks. Keys are taken in one global order, each
+in FIFO order, and a task may re-enter keys it holds (commit aborts under its own keys).
+Prepare records the keys of its transaction, so commit and abort of the same tx_id queue
+on them too; a tx_id this worker never prepared (recovery, admin) is not queued.
+
+Units of work inside a caller-owned transaction (`commit=False`) are never queued: their
+database locks outlive the unit of work, and queueing on them could wait on a holder that
+in turn waits on the database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Tuple
+from uuid import UUID
+
+from app.config import settings
+
+SegmentKey = Tuple[str, str, str]
+
+# tx_id -> segment keys, for commit/abort after a prepare on this worker.
+_MAX_TRACKED_TX = 10_000
+
+
+def segment_keys(equivalent_id: UUID, paths: Iterable[List[str]]) -> frozenset[SegmentKey]:
+    eq = str(equivalent_id)
+    keys: set[SegmentKey] = set()
+    for path in paths:
+        for a, b in zip(path[:-1], path[1:]):
+            lo, hi = sorted((str(a), str(b)))
+            keys.add((eq, lo, hi))
+    return frozenset(keys)
+
+
+class SegmentConflictScheduler:
+    def __init__(self) -> None:
+        # key -> [owner task, re-entry depth]
+        self._owners: dict[SegmentKey, list] = {}
+        self._waiters: dict[SegmentKey, deque[tuple[asyncio.Task, asyncio.Future]]] = {}
+        self._tx_keys: OrderedDict[str, frozenset[SegmentKey]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(getattr(settings, "PAYMENT_CONFLICT_SCHEDULER_ENABLED", False))
+
+    def remember_tx(self, tx_id: str, keys: frozenset[SegmentKey]) -> None:
+        if not keys:
+            return
+        self._tx_keys[tx_id] = keys
+        self._tx_keys.move_to_end(tx_id)
+        while len(self._tx_keys) > _MAX_TRACKED_TX:
+            self._tx_keys.popitem(last=False)
+
+    def tx_keys(self, tx_id: str) -> frozenset[SegmentKey]:
+        return self._tx_keys.get(tx_id, frozenset())
+
+    def forget_tx(self, tx_id: str) -> None:
+        self._tx_keys.pop(tx_id, None)
+
+    async def _acquire(self, key: SegmentKey, task: asyncio.Task) -> None:
+        owner = self._owners.get(key)
+        if owner is None:
+            self._owners[key] = [task, 1]
+            return
+        if owner[0] is task:
+            owner[1] += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        queue = self._waiters.setdefault(key, deque())
+        queue.append((task, fut))
+        try:
+            # The releasing task hands ownership over before resolving `fut`.
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(key)
+            else:
+                try:
+                    queue.remove((task, fut))
+                except ValueError:
+                    pass
+            raise
+
+    def _release(self, key: SegmentKey) -> None:
+        owner = self._owners[key]
+        owner[1] -= 1
+        if owner[1] > 0:
+            return
+        queue = self._waiters.get(key)
+        while queue:
+            task, fut = queue.popleft()
+            if not fut.done():
+                self._owners[key] = [task, 1]
+                fut.set_result(None)
+                return
+        self._owners.pop(key, None)
+        self._waiters.pop(key, None)
+
+    @asynccontextmanager
+    async def hold(self, keys: Iterable[SegmentKey], *, phase: str) -> AsyncIterator[None]:
+        """Run the block once no other task holds any of `keys` (no-op when disabled)."""
+
+        ordered = sorted(set(keys))
+        task = asyncio.current_task()
+        if not ordered or task is None or not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        acquired: list[SegmentKey] = []
+        try:
+            for key in ordered:
+                await self._acquire(key, task)
+                acquired.append(key)
+            try:
+                from app.utils.metrics import PAYMENT_SCHEDULER_WAIT_SECONDS
+
+                PAYMENT_SCHEDULER_WAIT_SECONDS.labels(phase=phase).observe(
+                    time.perf_counter() - started
+                )
+            except Exception:
+                pass
+            yield
+        finally:
+            for key in reversed(acquired):
+                self._release(key)
+
+
+segment_scheduler = SegmentConflictScheduler()
@@ -28,9 +28,14 @@ from app.utils.exceptions import (
     RetryablePaymentConflictException,
     RoutingException,
 )
-from app.utils.metrics import PAYMENT_EVENTS_TOTAL
+from app.utils.metrics import (
+    PAYMENT_EVENTS_TOTAL,
+    PAYMENT_UOW_CONFLICTS_TOTAL,
+    PAYMENT_UOW_RETRIES_TOTAL,
+)
 
 from app.core.integrity import compute_integrity_checkpoint_for_equivalent
+from app.core.payments.conflict_scheduler import SegmentKey, segment_keys, segment_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +46,21 @@ _T = TypeVar("_T")
 class _EquivalentOwnerPreflightChanged(Exception):
     """Persisted payment flows changed before the tx lock was acquired."""
 
+
+def _count_uow_conflict(phase: str, sqlstate: str | None) -> None:
+    try:
+        PAYMENT_UOW_CONFLICTS_TOTAL.labels(phase=phase, sqlstate=sqlstate or "unknown").inc()
+    except Exception:
+        pass
+
+
+def _count_uow_retry(phase: str) -> None:
+    try:
+        PAYMENT_UOW_RETRIES_TOTAL.labels(phase=phase).inc()
+    except Exception:
+        pass
+
+
 # PostgreSQL's two-int advisory-lock key space is disjoint from the one-BIGINT
 # key space used by segment locks. The first int is a stable domain tag.
 _TX_ADVISORY_LOCK_NAMESPACE = 0x475458
@@ -454,6 +474,7 @@ class PaymentEngine:
         op: str,
         fn: Callable[[], Awaitable[_T]],
         use_savepoint: bool = False,
+        conflict_keys: frozenset[SegmentKey] = frozenset(),
     ) -> _T:
         """Retry wrapper for SERIALIZABLE/deadlock errors.
 
@@ -463,8 +484,14 @@ class PaymentEngine:
         - Rollback.
         - Exponential backoff with jitter, bounded.
         - Re-run the whole unit-of-work `fn()`.
+
+        An engine-owned UoW first queues behind in-process work on any of
+        `conflict_keys` (see conflict_scheduler) and keeps its place across retries.
         """
 
+        phase = op.split("_", 1)[0]
+        gate_keys = frozenset() if use_savepoint else conflict_keys
+
         previous_timeout_enabled = self._advisory_lock_timeout_enabled
         previous_deadline = self._advisory_lock_deadline
         self._advisory_lock_timeout_enabled = (
@@ -484,77 +511,84 @@ class PaymentEngine:
 
         attempt = 0
         try:
-            while True:
-                try:
-                    if use_savepoint:
-                        async with self.session.begin_nested():
-                            return await fn()
-                    return await fn()
-                except _EquivalentOwnerPreflightChanged as exc:
-                    # The safe global order forbids acquiring a newly appeared
-                    # equivalent owner after the tx key. A caller-owned outer UoW
-                    # must restart from a fresh snapshot; an engine-owned UoW can
-                    # rollback and repeat the complete owner -> tx -> pair sequence.
-                    attempt += 1
-                    if use_savepoint or attempt >= self._retry_attempts:
-                        raise RetryablePaymentConflictException(
-                            "Payment owner set changed concurrently; retry the transaction"
-                        ) from exc
-                    await self.session.rollback()
-                    logger.warning(
-                        "event=payment.owner_preflight_retry op=%s attempt=%s/%s",
-                        op,
-                        attempt,
-                        self._retry_attempts,
-                    )
-                    continue
-                except DBAPIError as exc:
-                    pgcode = self._get_pgcode(exc)
-                    if use_savepoint and pgcode in {"40P01", "40001"}:
-                        # A transaction-level owner lock or SERIALIZABLE snapshot
-                        # survives savepoint rollback. Retrying here recreates the
-                        # same conflict; the outer owner must restart its whole UoW.
-                        raise
-                    attempt += 1
-
-                    # A bounded advisory-lock wait is an operational timeout,
-                    # not a generic database failure. Callers already own the
-                    # rollback/abort policy for asyncio timeouts.
-                    if pgcode == "55P03":
-                        raise asyncio.TimeoutError(
-                            "Payment advisory lock timed out"
-                        ) from exc
-
-                    # Only rollback when we are actually going to retry.
-                    # For non-retryable DBAPIError (or on non-Postgres backends), rolling back
-                    # inside a surrounding transaction context manager can close that context
-                    # and cause follow-up errors like:
-                    # "Can't operate on closed transaction inside context manager".
-                    is_retryable = self._is_retryable_db_error(exc, op=op)
-                    if attempt >= self._retry_attempts or not is_retryable:
-                        raise
+            async with segment_scheduler.hold(gate_keys, phase=phase):
+                while True:
+                    try:
+                        if use_savepoint:
+                            async with self.session.begin_nested():
+                                return await fn()
+                        return await fn()
+                    except _EquivalentOwnerPreflightChanged as exc:
+                        # The safe global order forbids acquiring a newly appeared
+                        # equivalent owner after the tx key. A caller-owned outer UoW
+                        # must restart from a fresh snapshot; an engine-owned UoW can
+                        # rollback and repeat the complete owner -> tx -> pair sequence.
+                        attempt += 1
+                        _count_uow_conflict(phase, "owner_preflight")
+                        if use_savepoint or attempt >= self._retry_attempts:
+                            raise RetryablePaymentConflictException(
+                                "Payment owner set changed concurrently; retry the transaction"
+                            ) from exc
+                        await self.session.rollback()
+                        _count_uow_retry(phase)
+                        logger.warning(
+                            "event=payment.owner_preflight_retry op=%s attempt=%s/%s",
+                            op,
+                            attempt,
+                            self._retry_attempts,
+                        )
+                        continue
+                    except DBAPIError as exc:
+                        pgcode = self._get_pgcode(exc)
+                        if use_savepoint and pgcode in {"40P01", "40001"}:
+                            # A transaction-level owner lock or SERIALIZABLE snapshot
+                            # survives savepoint rollback. Retrying here recreates the
+                            # same conflict; the outer owner must restart its whole UoW.
+                            _count_uow_conflict(phase, pgcode)
+                            raise
+                        attempt += 1
+
+                        # A bounded advisory-lock wait is an operational timeout,
+                        # not a generic database failure. Callers already own the
+                        # rollback/abort policy for asyncio timeouts.
+                        if pgcode == "55P03":
+                            raise asyncio.TimeoutError(
+                                "Payment advisory lock timed out"
+                            ) from exc
+
+                        # Only rollback when we are actually going to retry.
+                        # For non-retryable DBAPIError (or on non-Postgres backends), rolling back
+                        # inside a surrounding transaction context manager can close that context
+                        # and cause follow-up errors like:
+                        # "Can't operate on closed transaction inside context manager".
+                        is_retryable = self._is_retryable_db_error(exc, op=op)
+                        if is_retryable:
+                            _count_uow_conflict(phase, pgcode)
+                        if attempt >= self._retry_attempts or not is_retryable:
+                            raise
+
+                        if not use_savepoint:
+                            try:
+                                await self.session.rollback()
+                            except Exception:
+                                pass
+
+                        base = max(0.0, self._retry_base_delay_s)
+                        cap = max(base, self._retry_max_delay_s)
+                        delay = min(cap, base * (2 ** (attempt - 1)))
+                        # Small jitter (0..25%) to avoid thundering herd.
+                        delay = delay * (1.0 + 0.25 * random.random())
 
-                    if not use_savepoint:
-                        try:
-                            await self.session.rollback()
-                        except Exception:
-                            pass
-
-                    base = max(0.0, self._retry_base_delay_s)
-                    cap = max(base, self._retry_max_delay_s)
-                    delay = min(cap, base * (2 ** (attempt - 1)))
-                    # Small jitter (0..25%) to avoid thundering herd.
-                    delay = delay * (1.0 + 0.25 * random.random())
-
-                    logger.warning(
-                        "event=payment.uow_retry op=%s attempt=%s/%s delay_s=%.3f pgcode=%s",
-                        op,
-                        attempt,
-                        self._retry_attempts,
-                        delay,
-                        pgcode,
-                    )
-                    await asyncio.sleep(delay)
+                        logger.warning(
+                            "event=payment.uow_retry op=%s attempt=%s/%s delay_s=%.3f pgcode=%s",
+                            op,
+                            attempt,
+                            self._retry_attempts,
+                            delay,
+                            pgcode,
+                        )
+                        _count_uow_retry(phase)
+                        await asyncio.sleep(delay)
         finally:
             self._advisory_lock_timeout_enabled = previous_timeout_enabled
             self._advisory_lock_deadline = previous_deadline
@@ -813,7 +847,10 @@ class PaymentEngine:
 
         if not commit:
             return await self._run_uow_with_retry(op="prepare_nocommit", fn=_uow, use_savepoint=True)
-        return await self._run_uow_with_retry(op="prepare", fn=_uow)
+        keys = segment_keys(equivalent_id, [path]) if segment_scheduler.enabled else frozenset()
+        result = await self._run_uow_with_retry(op="prepare", fn=_uow, conflict_keys=keys)
+        segment_scheduler.remember_tx(tx_id, keys)
+        return result
 
     async def prepare_routes(
         self,
@@ -995,7 +1032,14 @@ class PaymentEngine:
 
         if not commit:
             return await self._run_uow_with_retry(op="prepare_routes_nocommit", fn=_uow, use_savepoint=True)
-        return await self._run_uow_with_retry(op="prepare_routes", fn=_uow)
+        keys = (
+            segment_keys(equivalent_id, [path for path, _amount in routes])
+            if segment_scheduler.enabled
+            else frozenset()
+        )
+        result = await self._run_uow_with_retry(op="prepare_routes", fn=_uow, conflict_keys=keys)
+        segment_scheduler.remember_tx(tx_id, keys)
+        return result
 
     async def commit(self, tx_id: str, *, commit: bool = True):
         """
@@ -1384,7 +1428,11 @@ class PaymentEngine:
 
         if not commit:
             return await self._run_uow_with_retry(op="commit_nocommit", fn=_uow, use_savepoint=True)
-        return await self._run_uow_with_retry(op="commit", fn=_uow)
+        result = await self._run_uow_with_retry(
+            op="commit", fn=_uow, conflict_keys=segment_scheduler.tx_keys(tx_id)
+        )
+        segment_scheduler.forget_tx(tx_id)
+        return result
 
     async def _apply_flow(
         self, from_id: UUID, to_id: UUID, amount: Decimal, equivalent_id: UUID
@@ -1848,4 +1896,8 @@ class PaymentEngine:
 
         if not commit:
             return await self._run_uow_with_retry(op="abort_nocommit", fn=_uow, use_savepoint=True)
-        return await self._run_uow_with_retry(op="abort", fn=_uow)
+        result = await self._run_uow_with_retry(
+            op="abort", fn=_uow, conflict_keys=segment_scheduler.tx_keys(tx_id)
+        )
+        segment_scheduler.forget_tx(tx_id)
+        return result
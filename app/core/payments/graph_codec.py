@@ -0,0 +1,195 @@
+"""Compact binary encoding of routing graphs for the shared cache tier.
+
+A snapshot is ``MAGIC + format byte + zlib(body)``. The body is a node table followed by
+edges that reference nodes by index, so a PID is stored once however many edges touch it.
+Capacities are written as their exact decimal string: routing math is Decimal and must not
+round-trip through floats.
+
+Node record:   u16 pid length, pid (utf-8), u8 has_uuid, [16 uuid bytes]
+Graph edge:    u32 from, u32 to, u8 flags (bit 0 = can_be_intermediate),
+               u16 capacity length, capacity (ascii), u16 blocked count,
+               blocked PIDs as (u16 length, utf-8)
+Topology edge: u32 from, u32 to
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Set
+from uuid import UUID
+
+GRAPH_MAGIC = b"GEOG"
+TOPOLOGY_MAGIC = b"GEOT"
+FORMAT_VERSION = 1
+
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_EDGE = struct.Struct(">IIB")
+_PAIR = struct.Struct(">II")
+
+
+@dataclass
+class GraphSnapshot:
+    graph: Dict[str, Dict[str, Decimal]]
+    edge_can_be_intermediate: Dict[str, Dict[str, bool]]
+    edge_blocked_participants: Dict[str, Dict[str, Set[str]]]
+    pids: Dict[UUID, str]
+    uuids: Dict[str, UUID]
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self._data, self._pos)
+        self._pos += fmt.size
+        return values
+
+    def take(self, n: int) -> bytes:
+        chunk = bytes(self._data[self._pos : self._pos + n])
+        if len(chunk) != n:
+            raise ValueError("truncated snapshot")
+        self._pos += n
+        return chunk
+
+    def text(self) -> str:
+        (n,) = self.unpack(_U16)
+        return self.take(n).decode("utf-8")
+
+
+def _text(out: list[bytes], value: str) -> None:
+    raw = value.encode("utf-8")
+    out.append(_U16.pack(len(raw)))
+    out.append(raw)
+
+
+def _frame(magic: bytes, body: list[bytes]) -> bytes:
+    return magic + _U8.pack(FORMAT_VERSION) + zlib.compress(b"".join(body))
+
+
+def _unframe(magic: bytes, blob: bytes) -> _Reader:
+    if blob[: len(magic)] != magic or blob[len(magic)] != FORMAT_VERSION:
+        raise ValueError("unsupported snapshot format")
+    return _Reader(zlib.decompress(blob[len(magic) + 1 :]))
+
+
+def _node_table(out: list[bytes], names: list[str], uuids: Dict[str, UUID]) -> Dict[str, int]:
+    out.append(_U32.pack(len(names)))
+    for name in names:
+        _text(out, name)
+        node_uuid = uuids.get(name)
+        if node_uuid is None:
+            out.append(_U8.pack(0))
+        else:
+            out.append(_U8.pack(1))
+            out.append(node_uuid.bytes)
+    return {name: i for i, name in enumerate(names)}
+
+
+def _read_nodes(reader: _Reader) -> tuple[list[str], Dict[str, UUID]]:
+    (count,) = reader.unpack(_U32)
+    names: list[str] = []
+    uuids: Dict[str, UUID] = {}
+    for _ in range(count):
+        name = reader.text()
+        (has_uuid,) = reader.unpack(_U8)
+        if has_uuid:
+            uuids[name] = UUID(bytes=reader.take(16))
+        names.append(name)
+    return names, uuids
+
+
+def encode_graph(snapshot: GraphSnapshot) -> bytes:
+    names = list(snapshot.graph)
+    known = set(names)
+    for targets in snapshot.graph.values():
+        for v in targets:
+            if v not in known:
+                known.add(v)
+                names.append(v)
+    # Participants that never made it into the graph still belong to the pid maps.
+    for name in snapshot.uuids:
+        if name not in known:
+            known.add(name)
+            names.append(name)
+
+    out: list[bytes] = []
+    index = _node_table(out, names, snapshot.uuids)
+    out.append(_U8.pack(1) if snapshot.graph else _U8.pack(0))
+
+    edges = [(u, v, cap) for u, targets in snapshot.graph.items() for v, cap in targets.items()]
+    out.append(_U32.pack(len(edges)))
+    for u, v, cap in edges:
+        flags = 1 if snapshot.edge_can_be_intermediate.get(u, {}).get(v, True) else 0
+        out.append(_EDGE.pack(index[u], index[v], flags))
+        _text(out, str(cap))
+        blocked = sorted(snapshot.edge_blocked_participants.get(u, {}).get(v, set()))
+        out.append(_U16.pack(len(blocked)))
+        for pid in blocked:
+            _text(out, pid)
+    return _frame(GRAPH_MAGIC, out)
+
+
+def decode_graph(blob: bytes) -> GraphSnapshot:
+    reader = _unframe(GRAPH_MAGIC, blob)
+    names, uuids = _read_nodes(reader)
+    (has_graph,) = reader.unpack(_U8)
+
+    # `_build_graph_impl` keys every mapped participant, edges or not.
+    keys = [name for name in names if name in uuids] if has_graph else []
+    graph: Dict[str, Dict[str, Decimal]] = {name: {} for name in keys}
+    policy: Dict[str, Dict[str, bool]] = {name: {} for name in keys}
+    blocked_map: Dict[str, Dict[str, Set[str]]] = {name: {} for name in keys}
+
+    (edge_count,) = reader.unpack(_U32)
+    for _ in range(edge_count):
+        ui, vi, flags = reader.unpack(_EDGE)
+        u, v = names[ui], names[vi]
+        cap = Decimal(reader.text())
+        (n_blocked,) = reader.unpack(_U16)
+        blocked = {reader.text() for _ in range(n_blocked)}
+        graph.setdefault(u, {})[v] = cap
+        policy.setdefault(u, {})[v] = bool(flags & 1)
+        blocked_map.setdefault(u, {})[v] = blocked
+
+    return GraphSnapshot(
+        graph=graph,
+        edge_can_be_intermediate=policy,
+        edge_blocked_participants=blocked_map,
+        pids={node_uuid: name for name, node_uuid in uuids.items()},
+        uuids=uuids,
+    )
+
+
+def encode_topology(adj: Dict[str, Set[str]]) -> bytes:
+    names: list[str] = []
+    seen: Set[str] = set()
+    for u, targets in adj.items():
+        for name in (u, *sorted(targets)):
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+
+    out: list[bytes] = []
+    index = _node_table(out, names, {})
+    pairs = [(index[u], index[v]) for u, targets in adj.items() for v in targets]
+    out.append(_U32.pack(len(pairs)))
+    out.extend(_PAIR.pack(u, v) for u, v in pairs)
+    return _frame(TOPOLOGY_MAGIC, out)
+
+
+def decode_topology(blob: bytes) -> Dict[str, Set[str]]:
+    reader = _unframe(TOPOLOGY_MAGIC, blob)
+    names, _ = _read_nodes(reader)
+    (count,) = reader.unpack(_U32)
+    adj: Dict[str, Set[str]] = {}
+    for _ in range(count):
+        u, v = reader.unpack(_PAIR)
+        adj.setdefault(names[u], set()).add(names[v])
+    return adj
@@ -0,0 +1,111 @@
+"""Warm, read-only routing graphs behind `GET /payments/capacity` and `/payments/max-flow`.
+
+Wallets poll both endpoints, and each request used to build a `PaymentRouter` graph from
+all trustlines, debts and prepare locks of the equivalent for one read-only query. Both
+queries only read `router.graph` (they route on copies), so one built router per
+equivalent can answer every request until the ledger moves.
+
+Entries are versioned like graph snapshots (app/utils/snapshot_cache.py): a payment,
+clearing, trustline change or inject bumps the ledger version of its equivalent. An
+outdated entry (version moved, or older than `PAYMENTS_READ_GRAPH_TTL_SECONDS`) is still
+served for up to `PAYMENTS_READ_GRAPH_STALE_SECONDS` while one background task rebuilds it
+with its own session; past that window the request rebuilds inline. These are estimates:
+`POST /payments` always routes on a graph built inside its own transaction. A TTL of 0
+disables the cache and every request builds its own graph.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.db.session as db_session
+from app.config import settings
+from app.core.payments.router import PaymentRouter
+from app.utils import snapshot_cache
+from app.utils.validation import validate_equivalent_code
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    version: Any
+    built_at: float
+    router: PaymentRouter
+    # When a read first found this entry outdated; None while it is current.
+    outdated_since: float | None = None
+    refresh: asyncio.Task | None = None
+
+
+_entries: dict[str, _Entry] = {}
+
+
+def _ttl_seconds() -> int:
+    return max(0, int(getattr(settings, "PAYMENTS_READ_GRAPH_TTL_SECONDS", 0) or 0))
+
+
+def _stale_seconds() -> float:
+    return max(0.0, float(getattr(settings, "PAYMENTS_READ_GRAPH_STALE_SECONDS", 0) or 0))
+
+
+async def _build(session: AsyncSession, equivalent_code: str) -> PaymentRouter:
+    router = PaymentRouter(session)
+    await router.build_graph(equivalent_code)
+    return router
+
+
+async def _refresh(equivalent_code: str) -> None:
+    version = snapshot_cache.ledger_version(equivalent_code)
+    try:
+        async with db_session.AsyncSessionLocal() as session:
+            router = await _build(session, equivalent_code)
+    except Exception:
+        # The stale entry keeps being served until the window closes; then a request
+        # rebuilds inline and surfaces the error itself.
+        logger.warning("event=payments.read_graph_refresh_failed equivalent=%s", equivalent_code, exc_info=True)
+        return
+    _entries[equivalent_code] = _Entry(version=version, built_at=time.monotonic(), router=router)
+
+
+async def get_read_router(session: AsyncSession, equivalent_code: str) -> PaymentRouter:
+    """A built router for read-only queries (`check_capacity`, `calculate_max_flow`).
+
+    The returned router may be shared with other requests: do not route payments on it
+    or mutate its graph.
+    """
+
+    ttl = _ttl_seconds()
+    if ttl <= 0:
+        return await _build(session, equivalent_code)
+
+    validate_equivalent_code(equivalent_code)
+    version = snapshot_cache.ledger_version(equivalent_code)
+    now = time.monotonic()
+    entry = _entries.get(equivalent_code)
+    if entry is not None:
+        if entry.version == version and now - entry.built_at <= ttl:
+            return entry.router
+        if entry.outdated_since is None:
+            entry.outdated_since = now
+        if now - entry.outdated_since < _stale_seconds():
+            if entry.refresh is None:
+                entry.refresh = asyncio.create_task(_refresh(equivalent_code))
+            return entry.router
+
+    router = await _build(session, equivalent_code)
+    # Versioned as of before the build: a write that lands during it outdates the entry.
+    _entries[equivalent_code] = _Entry(version=version, built_at=time.monotonic(), router=router)
+    return router
+
+
+def clear() -> None:
+    for entry in _entries.values():
+        if entry.refresh is not None and not entry.refresh.done():
+            entry.refresh.cancel()
+    _entries.clear()
@@ -17,7 +17,16 @@ from app.db.models.equivalent import Equivalent
 from app.db.models.prepare_lock import PrepareLock
 from app.schemas.payment import CapacityResponse, MaxFlowResponse, MaxFlowPath
 from app.config import settings
+from app.core.payments.graph_codec import (
+    GraphSnapshot,
+    decode_graph,
+    decode_topology,
+    encode_graph,
+    encode_topology,
+)
 from app.utils.metrics import ROUTING_FAILURES_TOTAL
+from app.utils.shared_cache import add_invalidation_listener, get_shared_cache
+from app.utils.snapshot_cache import bump_ledger_version
 from app.utils.validation import validate_equivalent_code
 from app.utils.exceptions import TimeoutException
 
@@ -42,15 +51,45 @@ class PaymentRouter:
 
     @classmethod
     def invalidate_cache(cls, equivalent_code: str | None = None) -> None:
+        cls.drop_local_cache(equivalent_code)
+        # Other workers drop their copies when the shared tier broadcasts this
+        # (no-op unless ROUTING_SHARED_CACHE_ENABLED; see app/utils/shared_cache.py).
+        get_shared_cache().invalidate(str(equivalent_code) if equivalent_code else None)
+
+    @classmethod
+    def drop_local_cache(cls, equivalent_code: str | None = None) -> None:
         if equivalent_code:
             cls._graph_cache.pop(str(equivalent_code), None)
             cls._topology_cache.pop(str(equivalent_code), None)
         else:
             cls._graph_cache.clear()
             cls._topology_cache.clear()
+        # Graph snapshots are built from the same rows (see app/utils/snapshot_cache.py).
+        bump_ledger_version(equivalent_code)
 
     def __init__(self, session: AsyncSession):
-        self.session = session
+        self._session: Optional[AsyncSession] = session
+        self._init_graph_state()
+
+    @classmethod
+    def in_memory(cls) -> "PaymentRouter":
+        """A router without a database session, over a graph the caller fills and keeps current.
+
+        Routing on `graph` (`find_flow_routes`, `has_topology_path`, the edge policy setters)
+        works as usual; anything that loads from the database raises RuntimeError.
+        """
+        router = cls.__new__(cls)
+        router._session = None
+        router._init_graph_state()
+        return router
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            raise RuntimeError("PaymentRouter.in_memory() has no database session")
+        return self._session
+
+    def _init_graph_state(self) -> None:
         # Graph structure: { from_pid: { to_pid: capacity } }
         self.graph: Dict[str, Dict[str, Decimal]] = {}
         # Edge flags: { from_pid: { to_pid: can_be_intermediate } }
@@ -78,6 +117,20 @@ class PaymentRouter:
             self.topology_adj = {u: set(vs) for u, vs in cached.items()}
             return
 
+        shared = get_shared_cache()
+        token: str | None = None
+        if shared.enabled:
+            token, blob = await shared.get("topology", equivalent_code, scope=equivalent_code)
+            if blob is not None:
+                try:
+                    adj = decode_topology(blob)
+                except Exception:
+                    logger.warning("event=router.shared_topology_decode_failed equivalent=%s", equivalent_code)
+                else:
+                    self.topology_adj = {u: set(vs) for u, vs in adj.items()}
+                    self._topology_cache[equivalent_code] = adj
+                    return
+
         # Join TrustLine -> Equivalent(code) + Participant (creditor/debtor) to avoid N+1 and avoid
         # a second lookup for participant UUID->PID mapping.
         from sqlalchemy.orm import aliased
@@ -112,6 +165,9 @@ class PaymentRouter:
         self.topology_adj = {u: set(vs) for u, vs in adj.items()}
         # Store a copy in cache.
         self._topology_cache[equivalent_code] = {u: set(vs) for u, vs in adj.items()}
+        if token is not None:
+            ttl = int(getattr(settings, "ROUTING_TOPOLOGY_SHARED_CACHE_TTL_SECONDS", 0) or 0)
+            await shared.set("topology", equivalent_code, encode_topology(adj), token=token, ttl_seconds=ttl)
 
     def has_topology_path(self, from_pid: str, to_pid: str, *, max_hops: int = 6) -> bool:
         """Return True if a trustline-topology path exists (ignoring capacity).
@@ -173,11 +229,50 @@ class PaymentRouter:
                         self.uuids = dict(uuids)
                         return
 
+            # Second tier: a graph another worker built for the current version.
+            shared = get_shared_cache()
+            token: str | None = None
+            if use_shared_cache and ttl > 0 and shared.enabled:
+                token, blob = await shared.get("graph", equivalent_code, scope=equivalent_code)
+                if blob is not None and self._load_snapshot(equivalent_code, blob):
+                    return
+
             await self._build_graph_impl(
                 equivalent_code,
                 write_shared_cache=use_shared_cache,
             )
 
+            if token is not None and self.pids:
+                snapshot = GraphSnapshot(
+                    graph=self.graph,
+                    edge_can_be_intermediate=self.edge_can_be_intermediate,
+                    edge_blocked_participants=self.edge_blocked_participants,
+                    pids=self.pids,
+                    uuids=self.uuids,
+                )
+                await shared.set("graph", equivalent_code, encode_graph(snapshot), token=token, ttl_seconds=ttl)
+
+    def _load_snapshot(self, equivalent_code: str, blob: bytes) -> bool:
+        try:
+            snapshot = decode_graph(blob)
+        except Exception:
+            logger.warning("event=router.shared_graph_decode_failed equivalent=%s", equivalent_code)
+            return False
+        self.graph = snapshot.graph
+        self.edge_can_be_intermediate = snapshot.edge_can_be_intermediate
+        self.edge_blocked_participants = snapshot.edge_blocked_participants
+        self.pids = snapshot.pids
+        self.uuids = snapshot.uuids
+        self._graph_cache[equivalent_code] = (
+            time.time(),
+            {u: dict(v) for u, v in self.graph.items()},
+            {u: dict(v) for u, v in self.edge_can_be_intermediate.items()},
+            {u: {v: set(s) for v, s in m.items()} for u, m in self.edge_blocked_participants.items()},
+            dict(self.pids),
+            dict(self.uuids),
+        )
+        return True
+
     async def _build_graph_impl(
         self,
         equivalent_code: str,
@@ -356,6 +451,21 @@ class PaymentRouter:
         current = self.graph[u].get(v, Decimal('0'))
         self.graph[u][v] = current + amount
 
+    def consume_routes(self, routes: Iterable[Tuple[List[str], Decimal]]) -> None:
+        """Subtract routed amounts from this instance's graph (never from the cache).
+
+        Used when one graph routes several payments in a row. Only the forward edges
+        shrink: the reverse capacity a payment frees is left out, so later routes are
+        conservative and never count on capacity that is not committed yet.
+        """
+        for path, amount in routes:
+            for u, v in zip(path[:-1], path[1:]):
+                remaining = self.graph.get(u, {}).get(v, Decimal('0')) - amount
+                if remaining <= 0:
+                    self.graph.get(u, {}).pop(v, None)
+                else:
+                    self.graph[u][v] = remaining
+
     def _set_edge_policy(self, u: str, v: str, can_be_intermediate: bool) -> None:
         if u not in self.edge_can_be_intermediate:
             self.edge_can_be_intermediate[u] = {}
@@ -630,3 +740,6 @@ class PaymentRouter:
             algorithm="Edmonds-Karp (BFS)",
             computed_at=datetime.now(timezone.utc).isoformat(),
         )
+
+
+add_invalidation_listener(PaymentRouter.drop_local_cache)
@@ -4,11 +4,12 @@ import logging
 import asyncio
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import AbstractSet, Any, Awaitable, Callable, List, Literal
+from typing import AbstractSet, Any, Awaitable, Callable, Literal, Sequence
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, or_, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import DBAPIError, IntegrityError
+from pydantic import ValidationError
 
 from app.core.payments.engine import PaymentEngine
 from app.core.payments.router import PaymentRouter
@@ -17,13 +18,16 @@ from app.db.models.transaction import Transaction
 from app.db.models.participant import Participant
 from app.db.models.equivalent import Equivalent
 from app.schemas.payment import (
+    PaymentBatchItemResult,
+    PaymentBatchResult,
     PaymentConstraints,
     PaymentCreateRequest,
     PaymentResult,
     PaymentRoute,
     PaymentError,
+    PaymentsList,
 )
-from app.core.auth.crypto import verify_signature
+from app.core.auth.crypto import offload_verification, verify_signature, verify_signatures_async
 from app.core.auth.canonical import canonical_json
 from app.utils.exceptions import (
     NotFoundException,
@@ -36,6 +40,7 @@ from app.utils.exceptions import (
     TimeoutException,
 )
 from app.utils.error_codes import ErrorCode
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.utils.validation import validate_equivalent_code, validate_tx_id, parse_amount_decimal
 
 logger = logging.getLogger(__name__)
@@ -44,6 +49,21 @@ logger = logging.getLogger(__name__)
 _RETRYABLE_PAYMENT_SQLSTATES = frozenset({"40001", "40P01"})
 
 
+def _encode_payment_cursor(tx: Transaction) -> str:
+    """Opaque keyset cursor pointing just past `tx` in `(created_at, id)` order."""
+    return encode_cursor({"t": tx.created_at.isoformat(), "id": str(tx.id)})
+
+
+def _decode_payment_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    fields = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(fields["t"]), uuid.UUID(fields["id"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise BadRequestException(
+            "Invalid cursor", details={"cursor": cursor}
+        ) from exc
+
+
 def _iter_exception_chain(exc: BaseException):
     pending = [exc]
     seen: set[int] = set()
@@ -184,6 +204,40 @@ class PaymentPostCommitEffects:
         return True
 
 
+def _payment_signing_message(request: PaymentCreateRequest, tx_id: str) -> bytes:
+    # Signature payload (canonical JSON) is part of the API contract for MVP.
+    # IMPORTANT: it must include tx_id and must exclude the `signature` field itself.
+    payload: dict = {
+        "tx_id": tx_id,
+        "to": request.to,
+        "equivalent": request.equivalent,
+        "amount": request.amount,
+    }
+    if request.description is not None:
+        payload["description"] = request.description
+    if request.constraints is not None:
+        payload["constraints"] = request.constraints.model_dump(exclude_unset=True)
+    return canonical_json(payload)
+
+
+def _batch_item_error(
+    index: int,
+    tx_id: str | None,
+    status: Literal["REJECTED", "FAILED"],
+    error: GeoException,
+) -> PaymentBatchItemResult:
+    return PaymentBatchItemResult(
+        index=index,
+        tx_id=tx_id,
+        status=status,
+        error=PaymentError(
+            code=str(error.code),
+            message=str(error.message),
+            details=error.details or None,
+        ),
+    )
+
+
 @dataclass(frozen=True)
 class StagedPaymentResult:
     result: PaymentResult
@@ -299,6 +353,186 @@ class PaymentService:
             commit=True,
         )
 
+    async def create_payments_batch(
+        self,
+        sender_id: uuid.UUID,
+        payments: Sequence[Any],
+    ) -> PaymentBatchResult:
+        """Create many signed payments of one sender; one result per item, in order.
+
+        The routing graph of each equivalent is built once for the whole batch, and every
+        payment consumes its routes from it, so later items route around the capacity the
+        earlier ones took. Items are prepared and committed in groups of
+        `PAYMENTS_BATCH_COMMIT_SIZE`: a group is one database transaction with a savepoint
+        per item, so a 4xx rejects only its item, while a serialization conflict or a
+        failed commit fails the group (its items can be resent with the same tx_id) and
+        leaves the groups before it committed.
+        """
+
+        group_size = max(
+            1, int(getattr(settings, "PAYMENTS_BATCH_COMMIT_SIZE", 25) or 25)
+        )
+        items: list[PaymentBatchItemResult | None] = [None] * len(payments)
+        requests: list[tuple[int, PaymentCreateRequest]] = []
+        for index, raw in enumerate(payments):
+            try:
+                requests.append((index, PaymentCreateRequest.model_validate(raw)))
+            except ValidationError as exc:
+                tx_id = raw.get("tx_id") if isinstance(raw, dict) else None
+                items[index] = _batch_item_error(
+                    index,
+                    tx_id if isinstance(tx_id, str) else None,
+                    "REJECTED",
+                    BadRequestException(
+                        "Validation error", details={"validation": exc.errors()}
+                    ),
+                )
+
+        verified = await self._verify_batch_signatures(sender_id, requests, items)
+        requests = [(index, request) for index, request in requests if items[index] is None]
+
+        routers: dict[str, PaymentRouter] = {}
+        for start in range(0, len(requests), group_size):
+            group = requests[start : start + group_size]
+            staged: list[tuple[int, PaymentResult]] = []
+            effects: list[PaymentPostCommitEffects] = []
+            try:
+                await self.acquire_staged_equivalent_owner_locks(
+                    {request.equivalent for _, request in group}
+                )
+                for index, request in group:
+                    router = routers.get(request.equivalent)
+                    if router is None:
+                        router = PaymentRouter(self.session)
+                        await router.build_graph(
+                            request.equivalent, use_shared_cache=False
+                        )
+                        routers[request.equivalent] = router
+                    try:
+                        async with self.session.begin_nested():
+                            result = await self._create_payment_impl(
+                                sender_id,
+                                request,
+                                require_signature=True,
+                                commit=False,
+                                deferred_effects=effects,
+                                shared_router=router,
+                                signature_verified=index in verified,
+                            )
+                    except RetryablePaymentConflictException:
+                        # The group transaction is no longer usable.
+                        raise
+                    except GeoException as exc:
+                        status = int(getattr(exc, "status_code", 500) or 500)
+                        items[index] = _batch_item_error(
+                            index,
+                            request.tx_id,
+                            "REJECTED" if 400 <= status < 500 else "FAILED",
+                            exc,
+                        )
+                        continue
+                    staged.append((index, result))
+                await self.session.commit()
+            except Exception as exc:
+                public_error = (
+                    exc if isinstance(exc, GeoException) else _classify_payment_db_error(exc)
+                )
+                logger.warning(
+                    "event=payment.batch_group_failed first_index=%s size=%s error_type=%s",
+                    group[0][0],
+                    len(group),
+                    type(exc).__name__,
+                )
+                try:
+                    await self.session.rollback()
+                except Exception as rollback_error:
+                    logger.error(
+                        "event=payment.batch_rollback_failed error_type=%s",
+                        type(rollback_error).__name__,
+                    )
+                    raise GeoException() from rollback_error
+                # A failed commit may still have landed; never serve routes built on
+                # either outcome, and rebuild the batch graphs from the database.
+                for effect in effects:
+                    effect.invalidate_routing_cache_once()
+                routers.clear()
+                for index, request in group:
+                    if items[index] is None:
+                        items[index] = _batch_item_error(
+                            index, request.tx_id, "FAILED", public_error
+                        )
+                continue
+
+            for index, result in staged:
+                items[index] = PaymentBatchItemResult(
+                    index=index,
+                    tx_id=result.tx_id,
+                    status=result.status,
+                    result=result,
+                    error=result.error,
+                )
+            from app.utils.event_bus import event_bus
+
+            with event_bus.batched():
+                for effect in effects:
+                    effect.apply_once()
+
+        results = [item for item in items if item is not None]
+        return PaymentBatchResult(
+            items=results,
+            committed=sum(1 for item in results if item.status == "COMMITTED"),
+            rejected=sum(
+                1 for item in results if item.status in {"REJECTED", "ABORTED"}
+            ),
+            failed=sum(1 for item in results if item.status == "FAILED"),
+        )
+
+    async def _verify_batch_signatures(
+        self,
+        sender_id: uuid.UUID,
+        requests: list[tuple[int, PaymentCreateRequest]],
+        items: list[PaymentBatchItemResult | None],
+    ) -> set[int]:
+        """Verify the batch's signatures at once, before any group takes owner locks.
+
+        Items with a bad signature are rejected in `items`; the returned indexes are
+        verified. Items that cannot be checked here (unknown sender, malformed tx_id,
+        missing signature) are left to the per-item validation.
+        """
+
+        sender = await self.session.get(Participant, sender_id)
+        if sender is None:
+            return set()
+        public_key = str(sender.public_key)
+        checked: list[tuple[int, PaymentCreateRequest]] = []
+        triples: list[tuple[str, bytes, str]] = []
+        for index, request in requests:
+            if not isinstance(request.signature, str) or not request.signature:
+                continue
+            try:
+                message = _payment_signing_message(request, validate_tx_id(request.tx_id))
+            except GeoException:
+                continue
+            checked.append((index, request))
+            triples.append((public_key, message, request.signature))
+
+        verdicts = await verify_signatures_async(triples)
+        verified: set[int] = set()
+        for (index, request), ok in zip(checked, verdicts):
+            if ok:
+                verified.add(index)
+                continue
+            try:
+                from app.utils.metrics import PAYMENT_EVENTS_TOTAL
+
+                PAYMENT_EVENTS_TOTAL.labels(event="create", result="invalid_signature").inc()
+            except Exception:
+                pass
+            items[index] = _batch_item_error(
+                index, request.tx_id, "REJECTED", InvalidSignatureException("Invalid signature")
+            )
+        return verified
+
     @staticmethod
     def _confine_router_to_perimeter(router, allowed: "AbstractSet[str]") -> None:
         """Narrow the router INSTANCE to one run's participants.
@@ -311,9 +545,9 @@ class PaymentService:
         Instance state only.  A cache hit copies the graph and the policy maps into the
         instance (`app/core/payments/router.py:167-173`), and a cache miss stores its own
         copies (`:342-351`), so narrowing here cannot reach the shared cache.  The cache key
-        stays `equivalent_code`: making it composite would silently break the two callers
-        that reach into `_graph_cache` directly and the invalidation done per equivalent by
-        trustlines, clearing and integrity - none of which this program may edit.
+        stays `equivalent_code`: making it composite would silently break the invalidation
+        done per equivalent by trustlines, clearing, integrity and the simulator (and the
+        shared cache tier keyed the same way) - none of which this program may edit.
 
         `graph` is what actually decides the route; the policy maps default to permissive
         (`router.py:369-373`), so narrowing them changes no outcome today and is here to keep
@@ -484,6 +718,8 @@ class PaymentService:
         commit: bool,
         deferred_effects: list[PaymentPostCommitEffects] | None = None,
         allowed_participant_pids: "AbstractSet[str] | None" = None,
+        shared_router: PaymentRouter | None = None,
+        signature_verified: bool = False,
     ) -> PaymentResult:
         """
         Create and execute a payment.
@@ -492,7 +728,13 @@ class PaymentService:
         3. Create Transaction(NEW).
         4. Engine.prepare().
         5. Engine.commit().
+
+        `shared_router` is a graph the caller already built for this equivalent (a
+        batch): it is routed against as is, and the committed routes are consumed from it.
+        `signature_verified` skips the signature check the caller already made on the
+        same signing message.
         """
+        router = shared_router if shared_router is not None else self.router
         try:
             from app.utils.metrics import PAYMENT_EVENTS_TOTAL
 
@@ -585,25 +827,12 @@ class PaymentService:
         equivalent_id = equivalent.id
         equivalent_code = str(equivalent.code)
 
-        # Signature payload (canonical JSON) is part of the API contract for MVP.
-        # IMPORTANT: it must include tx_id and must exclude the `signature` field itself.
-        payload: dict = {
-            "tx_id": tx_id_str,
-            "to": request.to,
-            "equivalent": request.equivalent,
-            "amount": request.amount,
-        }
-        if request.description is not None:
-            payload["description"] = request.description
-        if request.constraints is not None:
-            payload["constraints"] = request.constraints.model_dump(exclude_unset=True)
-
-        message = canonical_json(payload)
+        message = _payment_signing_message(request, tx_id_str)
 
-        if require_signature:
+        if require_signature and not signature_verified:
             # Signature validation (proof-of-possession + binding of request fields).
             try:
-                verify_signature(sender.public_key, message, request.signature)
+                await offload_verification(verify_signature, sender.public_key, message, request.signature)
             except Exception:
                 try:
                     from app.utils.metrics import PAYMENT_EVENTS_TOTAL
@@ -682,20 +911,21 @@ class PaymentService:
         try:
             async with asyncio.timeout(total_timeout_s):
                 # Build routing graph + compute routes under spec-aligned timeout budget.
-                try:
-                    if deferred_effects is None:
-                        build_graph = self.router.build_graph(equivalent_code)
-                    else:
-                        build_graph = self.router.build_graph(
-                            equivalent_code,
-                            use_shared_cache=False,
+                if shared_router is None:
+                    try:
+                        if deferred_effects is None:
+                            build_graph = router.build_graph(equivalent_code)
+                        else:
+                            build_graph = router.build_graph(
+                                equivalent_code,
+                                use_shared_cache=False,
+                            )
+                        await asyncio.wait_for(
+                            build_graph,
+                            timeout=routing_timeout_s,
                         )
-                    await asyncio.wait_for(
-                        build_graph,
-                        timeout=routing_timeout_s,
-                    )
-                except asyncio.TimeoutError:
-                    raise TimeoutException("Routing timed out")
+                    except asyncio.TimeoutError:
+                        raise TimeoutException("Routing timed out")
 
                 # The route is chosen from the graph, so the perimeter has to be applied
                 # here -- after the graph is built (and possibly served from the shared
@@ -711,13 +941,13 @@ class PaymentService:
                             insufficient_capacity=False,
                         )
                     self._confine_router_to_perimeter(
-                        self.router, allowed_participant_pids
+                        router, allowed_participant_pids
                     )
 
                 try:
                     routes_found = await asyncio.wait_for(
                         asyncio.to_thread(
-                            self.router.find_flow_routes,
+                            router.find_flow_routes,
                             sender_pid,
                             receiver_pid,
                             amount,
@@ -1214,6 +1444,8 @@ class PaymentService:
             created_at=created_at,
             committed_at=committed_at,
         )
+        if shared_router is not None:
+            shared_router.consume_routes(routes_found)
         effects = PaymentPostCommitEffects(
             equivalent=equivalent_code,
             recipient_pid=receiver_pid,
@@ -1311,7 +1543,15 @@ class PaymentService:
         to_date: datetime | None = None,
         page: int = 1,
         per_page: int = 20,
-    ) -> List[PaymentResult]:
+        cursor: str | None = None,
+    ) -> PaymentsList:
+        """List PAYMENT transactions of one participant, newest first.
+
+        Filters run on the denormalised `sender_pid` / `receiver_pid` / `equivalent_code`
+        columns and pages follow `(created_at, id)` keyset order, so a deep page costs the
+        same as the first one. `page` is kept for older clients and falls back to OFFSET
+        only when no `cursor` is given.
+        """
         bind = None
         try:
             bind = self.session.get_bind()
@@ -1323,11 +1563,12 @@ class PaymentService:
             dialect_name = bind.dialect.name if bind is not None else None
         except Exception:
             dialect_name = None
+        is_sqlite = dialect_name == "sqlite"
 
         def _normalize_dt(value: datetime | None) -> datetime | None:
             if value is None:
                 return None
-            if dialect_name == "sqlite":
+            if is_sqlite:
                 if value.tzinfo is None:
                     return value
                 return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1339,60 +1580,102 @@ class PaymentService:
         from_date = _normalize_dt(from_date)
         to_date = _normalize_dt(to_date)
 
-        offset = (page - 1) * per_page
+        # SQLite stores CURRENT_TIMESTAMP with second resolution while bound parameters carry
+        # microseconds, so raw string comparison is not chronological there. Compare and
+        # order through datetime() on both sides, as the date filters always did.
+        if is_sqlite:
+            created_expr = func.datetime(Transaction.created_at)
+
+            def _dt_param(value: datetime):
+                return func.datetime(value)
+
+        else:
+            created_expr = Transaction.created_at
+
+            def _dt_param(value: datetime):
+                return value
 
         clauses = [Transaction.type == "PAYMENT"]
         if status != "all":
             clauses.append(Transaction.state == status)
         if from_date is not None:
-            if dialect_name == "sqlite":
+            clauses.append(created_expr >= _dt_param(from_date))
+        if to_date is not None:
+            clauses.append(created_expr <= _dt_param(to_date))
+        if equivalent:
+            clauses.append(Transaction.equivalent_code == equivalent)
+
+        if cursor is not None:
+            cursor_created_at, cursor_id = _decode_payment_cursor(cursor)
+            cursor_created_at = _normalize_dt(cursor_created_at)
+            if is_sqlite:
                 clauses.append(
-                    func.datetime(Transaction.created_at) >= func.datetime(from_date)
+                    or_(
+                        created_expr < _dt_param(cursor_created_at),
+                        and_(
+                            created_expr == _dt_param(cursor_created_at),
+                            Transaction.id < cursor_id,
+                        ),
+                    )
                 )
             else:
-                clauses.append(Transaction.created_at >= from_date)
-        if to_date is not None:
-            if dialect_name == "sqlite":
                 clauses.append(
-                    func.datetime(Transaction.created_at) <= func.datetime(to_date)
+                    tuple_(Transaction.created_at, Transaction.id)
+                    < tuple_(cursor_created_at, cursor_id)
                 )
-            else:
-                clauses.append(Transaction.created_at <= to_date)
-
-        # Direction filtering.
-        payload = Transaction.payload
-        to_expr = payload["to"].as_string()
-        from_expr = payload["from"].as_string()
-        eq_expr = payload["equivalent"].as_string()
 
         if direction == "sent":
-            clauses.append(
-                or_(
-                    Transaction.initiator_id == requester_participant_id,
-                    from_expr == requester_pid,
-                )
-            )
+            party_clauses = [Transaction.sender_pid == requester_pid]
         elif direction == "received":
-            clauses.append(to_expr == requester_pid)
+            party_clauses = [Transaction.receiver_pid == requester_pid]
         else:
-            clauses.append(
-                or_(
-                    Transaction.initiator_id == requester_participant_id,
-                    to_expr == requester_pid,
-                    from_expr == requester_pid,
-                )
+            party_clauses = [
+                Transaction.sender_pid == requester_pid,
+                Transaction.receiver_pid == requester_pid,
+            ]
+
+        def _history_stmt(party_clause, *, limit: int, offset: int = 0):
+            stmt = (
+                select(Transaction)
+                .where(and_(party_clause, *clauses))
+                .order_by(created_expr.desc(), Transaction.id.desc())
+                .limit(limit)
             )
-
-        if equivalent:
-            clauses.append(eq_expr == equivalent)
-
-        stmt = (
-            select(Transaction)
-            .where(and_(*clauses))
-            .order_by(Transaction.created_at.desc())
-            .limit(per_page)
-            .offset(offset)
+            if offset:
+                stmt = stmt.offset(offset)
+            return stmt
+
+        # One extra row tells whether another page exists without a COUNT.
+        fetch = per_page + 1
+        if cursor is None and page > 1:
+            # Legacy OFFSET paging: a single statement over either side.
+            stmt = _history_stmt(
+                or_(*party_clauses), limit=fetch, offset=(page - 1) * per_page
+            )
+            txs = list((await self.session.execute(stmt)).scalars().all())
+        else:
+            # "all" is answered by two index-ordered range scans (one per side) merged
+            # here, instead of an OR that defeats both indexes.
+            by_id: dict[uuid.UUID, Transaction] = {}
+            for party_clause in party_clauses:
+                stmt = _history_stmt(party_clause, limit=fetch)
+                for tx in (await self.session.execute(stmt)).scalars().all():
+                    by_id.setdefault(tx.id, tx)
+
+            def _order_key(tx: Transaction):
+                created_at = tx.created_at
+                if is_sqlite and created_at is not None:
+                    created_at = created_at.replace(microsecond=0)
+                return (created_at, tx.id)
+
+            txs = sorted(by_id.values(), key=_order_key, reverse=True)[:fetch]
+
+        next_cursor = None
+        if len(txs) > per_page:
+            txs = txs[:per_page]
+            next_cursor = _encode_payment_cursor(txs[-1])
+
+        return PaymentsList(
+            items=[self._tx_to_payment_result(tx) for tx in txs],
+            next_cursor=next_cursor,
         )
-
-        txs = (await self.session.execute(stmt)).scalars().all()
-        return [self._tx_to_payment_result(tx) for tx in txs]
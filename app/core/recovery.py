@@ -1,25 +1,30 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.core.payments.engine import PaymentEngine
+from app.core.payments.engine import _TX_ADVISORY_LOCK_NAMESPACE, PaymentEngine
 from app.db.models.prepare_lock import PrepareLock
 from app.db.models.transaction import Transaction
 from app.utils.error_codes import ErrorCode
-from app.utils.metrics import RECOVERY_EVENTS_TOTAL
+from app.utils.metrics import RECOVERY_DURATION_SECONDS, RECOVERY_EVENTS_TOTAL, RECOVERY_ITEMS_TOTAL
 
 logger = logging.getLogger(__name__)
 
 RecoveryIterationObserver = Callable[[str, BaseException | None], None]
 
+_EXPIRED_LOCK_REASON = "Prepare lock expired"
+
 _ACTIVE_TX_STATES: set[str] = {
     "NEW",
     "ROUTED",
@@ -36,6 +41,8 @@ class ExpiredLockCleanupResult:
     transactions_aborted: int = 0
     terminal_transactions_seen: int = 0
     item_failures: int = 0
+    # Bulk mode stopped at RECOVERY_BULK_MAX_SECONDS with expired locks possibly left.
+    deadline_reached: bool = False
 
     @property
     def succeeded(self) -> bool:
@@ -71,6 +78,15 @@ def _classify_abort_outcome(outcome: object) -> tuple[int, int]:
     raise RuntimeError(f"unexpected payment abort outcome: {outcome!r}")
 
 
+def _record_items(event: str, **counts: int) -> None:
+    try:
+        for item, n in counts.items():
+            if n:
+                RECOVERY_ITEMS_TOTAL.labels(event=event, item=item).inc(n)
+    except Exception:
+        pass
+
+
 async def cleanup_expired_prepare_locks(
     session: AsyncSession,
 ) -> ExpiredLockCleanupResult:
@@ -80,6 +96,72 @@ async def cleanup_expired_prepare_locks(
     except Exception:
         pass
 
+    started = time.monotonic()
+    batch_size = int(getattr(settings, "RECOVERY_BULK_BATCH_SIZE", 0) or 0)
+    try:
+        if batch_size > 0:
+            result = await _cleanup_expired_prepare_locks_bulk(session, batch_size=batch_size)
+        else:
+            result = await _cleanup_expired_prepare_locks_per_tx(session)
+    finally:
+        elapsed = time.monotonic() - started
+        try:
+            RECOVERY_DURATION_SECONDS.labels(event="cleanup_expired_prepare_locks").observe(elapsed)
+        except Exception:
+            pass
+
+    _record_items(
+        "cleanup_expired_prepare_locks",
+        expired_lock=result.expired_lock_ids_resolved,
+        transaction_aborted=result.transactions_aborted,
+        transaction_terminal=result.terminal_transactions_seen,
+        failure=result.item_failures,
+    )
+
+    try:
+        if result.expired_lock_ids_resolved or result.item_failures:
+            RECOVERY_EVENTS_TOTAL.labels(
+                event="cleanup_expired_prepare_locks",
+                result="partial_error" if result.item_failures else "success",
+            ).inc()
+        else:
+            RECOVERY_EVENTS_TOTAL.labels(event="cleanup_expired_prepare_locks", result="noop").inc()
+    except Exception:
+        pass
+
+    if result.item_failures:
+        logger.warning(
+            "recovery.cleanup_expired_prepare_locks_partial "
+            "expired_lock_ids_resolved=%s transactions_aborted=%s "
+            "terminal_transactions_seen=%s item_failures=%s",
+            result.expired_lock_ids_resolved,
+            result.transactions_aborted,
+            result.terminal_transactions_seen,
+            result.item_failures,
+        )
+    if result.deadline_reached:
+        logger.warning(
+            "recovery.cleanup_expired_prepare_locks_deadline "
+            "expired_lock_ids_resolved=%s elapsed_sec=%.3f",
+            result.expired_lock_ids_resolved,
+            elapsed,
+        )
+    elif batch_size > 0 and result.expired_lock_ids_resolved:
+        logger.info(
+            "recovery.cleanup_expired_prepare_locks_bulk "
+            "expired_lock_ids_resolved=%s transactions_aborted=%s elapsed_sec=%.3f locks_per_sec=%.1f",
+            result.expired_lock_ids_resolved,
+            result.transactions_aborted,
+            elapsed,
+            result.expired_lock_ids_resolved / elapsed if elapsed > 0 else 0.0,
+        )
+
+    return result
+
+
+async def _cleanup_expired_prepare_locks_per_tx(
+    session: AsyncSession,
+) -> ExpiredLockCleanupResult:
     expired_lock_rows = (
         await session.execute(
             select(PrepareLock.id, PrepareLock.tx_id)
@@ -88,27 +170,28 @@ async def cleanup_expired_prepare_locks(
         )
     ).all()
 
-    if not expired_lock_rows:
-        try:
-            RECOVERY_EVENTS_TOTAL.labels(event="cleanup_expired_prepare_locks", result="noop").inc()
-        except Exception:
-            pass
-        return ExpiredLockCleanupResult()
+    expired_lock_counts_by_tx: dict[str, int] = {}
+    for _lock_id, tx_id in expired_lock_rows:
+        key = str(tx_id)
+        expired_lock_counts_by_tx[key] = expired_lock_counts_by_tx.get(key, 0) + 1
 
-    expired_lock_ids_by_tx: dict[str, list[object]] = {}
-    for lock_id, tx_id in expired_lock_rows:
-        expired_lock_ids_by_tx.setdefault(str(tx_id), []).append(lock_id)
+    return await _abort_expired_lock_transactions(session, expired_lock_counts_by_tx)
 
+
+async def _abort_expired_lock_transactions(
+    session: AsyncSession,
+    expired_lock_counts_by_tx: dict[str, int],
+) -> ExpiredLockCleanupResult:
     engine = PaymentEngine(session)
     expired_lock_ids_resolved = 0
     transactions_aborted = 0
     terminal_transactions_seen = 0
     item_failures = 0
-    for tx_id, expired_lock_ids in expired_lock_ids_by_tx.items():
+    for tx_id, expired_lock_count in expired_lock_counts_by_tx.items():
         try:
             outcome = await engine.abort(
                 tx_id,
-                reason="Prepare lock expired",
+                reason=_EXPIRED_LOCK_REASON,
                 error_code=ErrorCode.E007,
                 return_outcome=True,
             )
@@ -128,32 +211,179 @@ async def cleanup_expired_prepare_locks(
         # expired IDs it observed before delegating ownership to the engine.
         transactions_aborted += newly_aborted
         terminal_transactions_seen += terminal_seen
-        expired_lock_ids_resolved += len(expired_lock_ids)
+        expired_lock_ids_resolved += expired_lock_count
 
-    try:
-        RECOVERY_EVENTS_TOTAL.labels(
-            event="cleanup_expired_prepare_locks",
-            result="partial_error" if item_failures else "success",
-        ).inc()
-    except Exception:
-        pass
+    return ExpiredLockCleanupResult(
+        expired_lock_ids_resolved=expired_lock_ids_resolved,
+        transactions_aborted=transactions_aborted,
+        terminal_transactions_seen=terminal_transactions_seen,
+        item_failures=item_failures,
+    )
 
-    if item_failures:
-        logger.warning(
-            "recovery.cleanup_expired_prepare_locks_partial "
-            "expired_lock_ids_resolved=%s transactions_aborted=%s "
-            "terminal_transactions_seen=%s item_failures=%s",
-            expired_lock_ids_resolved,
-            transactions_aborted,
-            terminal_transactions_seen,
-            item_failures,
+
+def _expired_lock_error_payload(existing: object) -> dict[str, Any]:
+    """The error PaymentEngine.abort records for an expired-lock abort."""
+
+    existing_error: dict[str, Any] = existing if isinstance(existing, dict) else {}
+    details = existing_error.get("details")
+    return {
+        "code": ErrorCode.E007.value,
+        "message": str(existing_error.get("message") or _EXPIRED_LOCK_REASON),
+        "details": details if isinstance(details, dict) else {},
+    }
+
+
+async def _resolve_expired_lock_chunk(
+    session: AsyncSession,
+    expired_lock_counts_by_tx: dict[str, int],
+    *,
+    is_postgres: bool,
+) -> ExpiredLockCleanupResult:
+    """Abort one chunk of transactions and drop their locks in set-based statements.
+
+    Mirrors PaymentEngine.abort per transaction: committed transactions only lose
+    their locks, aborted ones get the expired-lock error, active ones are aborted.
+    """
+
+    tx_ids = sorted(expired_lock_counts_by_tx)
+    if is_postgres:
+        # Same per-tx advisory lock the engine serialises transitions on. `try` never
+        # waits, so a transaction busy in a commit/abort is left for the next pass.
+        tx_ids = list(
+            (
+                await session.execute(
+                    text(
+                        "SELECT t.tx_id FROM unnest(CAST(:tx_ids AS text[]), CAST(:keys AS integer[]))"
+                        " AS t(tx_id, k) WHERE pg_try_advisory_xact_lock(:namespace, t.k)"
+                    ),
+                    {
+                        "tx_ids": tx_ids,
+                        "keys": [PaymentEngine._tx_lock_key(tx_id) for tx_id in tx_ids],
+                        "namespace": _TX_ADVISORY_LOCK_NAMESPACE,
+                    },
+                )
+            ).scalars()
+        )
+        if not tx_ids:
+            return ExpiredLockCleanupResult()
+
+    rows = (
+        await session.execute(
+            select(Transaction.tx_id, Transaction.state, Transaction.error).where(
+                Transaction.tx_id.in_(tx_ids)
+            )
+        )
+    ).all()
+    by_tx_id = {str(row.tx_id): row for row in rows}
+
+    # (abort?, serialised error) -> tx_ids; normally a single group.
+    groups: dict[tuple[bool, str], list[str]] = {}
+    terminal_transactions_seen = 0
+    for tx_id in tx_ids:
+        row = by_tx_id.get(tx_id)
+        if row is None:
+            continue
+        if row.state == "COMMITTED":
+            terminal_transactions_seen += 1
+            continue
+        if row.state == "ABORTED":
+            terminal_transactions_seen += 1
+        payload = _expired_lock_error_payload(row.error)
+        key = (row.state != "ABORTED", json.dumps(payload, sort_keys=True))
+        groups.setdefault(key, []).append(tx_id)
+
+    transactions_aborted = 0
+    for (abort, payload_json), group_tx_ids in groups.items():
+        stmt = update(Transaction).where(Transaction.tx_id.in_(group_tx_ids))
+        if abort:
+            stmt = stmt.where(Transaction.state.notin_(("COMMITTED", "ABORTED"))).values(
+                state="ABORTED", error=json.loads(payload_json), updated_at=func.now()
+            )
+        else:
+            stmt = stmt.where(Transaction.state == "ABORTED").values(error=json.loads(payload_json))
+        result = await session.execute(stmt.execution_options(synchronize_session=False))
+        if abort:
+            transactions_aborted += int(result.rowcount or 0)
+
+    await session.execute(
+        delete(PrepareLock)
+        .where(PrepareLock.tx_id.in_(tx_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+    return ExpiredLockCleanupResult(
+        expired_lock_ids_resolved=sum(expired_lock_counts_by_tx[tx_id] for tx_id in tx_ids),
+        transactions_aborted=transactions_aborted,
+        terminal_transactions_seen=terminal_transactions_seen,
+    )
+
+
+async def _cleanup_expired_prepare_locks_bulk(
+    session: AsyncSession,
+    *,
+    batch_size: int,
+) -> ExpiredLockCleanupResult:
+    max_seconds = max(1, int(getattr(settings, "RECOVERY_BULK_MAX_SECONDS", 30) or 30))
+    deadline = time.monotonic() + max_seconds
+    dialect = getattr(getattr(session.bind, "dialect", None), "name", None)
+    is_postgres = dialect in {"postgresql", "postgres"}
+
+    expired_lock_ids_resolved = 0
+    transactions_aborted = 0
+    terminal_transactions_seen = 0
+    item_failures = 0
+    deadline_reached = False
+    cursor: str | None = None
+    while True:
+        if time.monotonic() >= deadline:
+            deadline_reached = True
+            break
+
+        # Keyset over tx_id: transactions skipped in this pass are not re-read.
+        stmt = (
+            select(PrepareLock.tx_id, func.count())
+            .where(PrepareLock.expires_at <= func.now())
+            .group_by(PrepareLock.tx_id)
+            .order_by(PrepareLock.tx_id.asc())
+            .limit(batch_size)
         )
+        if cursor is not None:
+            stmt = stmt.where(PrepareLock.tx_id > cursor)
+        chunk = {str(tx_id): int(n) for tx_id, n in (await session.execute(stmt)).all()}
+        if not chunk:
+            break
+        cursor = max(chunk)
+
+        try:
+            chunk_result = await _resolve_expired_lock_chunk(session, chunk, is_postgres=is_postgres)
+        except Exception:
+            # E.g. a serialization failure against a concurrent commit: retry the chunk
+            # through the engine, which isolates failures per transaction.
+            logger.warning(
+                "recovery.bulk_expired_lock_chunk_failed size=%d first_tx_id=%s",
+                len(chunk),
+                min(chunk),
+                exc_info=True,
+            )
+            await _rollback_failed_recovery_item(
+                session,
+                operation="bulk_expired_lock_chunk",
+                tx_id=min(chunk),
+            )
+            chunk_result = await _abort_expired_lock_transactions(session, chunk)
+
+        expired_lock_ids_resolved += chunk_result.expired_lock_ids_resolved
+        transactions_aborted += chunk_result.transactions_aborted
+        terminal_transactions_seen += chunk_result.terminal_transactions_seen
+        item_failures += chunk_result.item_failures
 
     return ExpiredLockCleanupResult(
         expired_lock_ids_resolved=expired_lock_ids_resolved,
         transactions_aborted=transactions_aborted,
         terminal_transactions_seen=terminal_transactions_seen,
         item_failures=item_failures,
+        deadline_reached=deadline_reached,
     )
 
 
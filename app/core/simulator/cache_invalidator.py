@@ -11,7 +11,7 @@ from app.core.simulator.scenario_equivalent import effective_equivalent
 
 def invalidate_routing_cache(*, equivalents: set[str]) -> None:
     for eq in equivalents:
-        PaymentRouter._graph_cache.pop(eq, None)
+        PaymentRouter.invalidate_cache(eq)
 
 
 def invalidate_viz_cache(*, run: RunRecord, equivalents: set[str]) -> None:
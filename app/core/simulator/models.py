@@ -233,6 +233,10 @@ class RunRecord:
     # Keep track of an in-flight clearing task to prevent overlapping clearing runs.
     _real_clearing_task: Optional[asyncio.Task[dict[str, float]]] = None
 
+    # Real-mode per-phase tick profiles, newest last (bounded by
+    # SIMULATOR_TICK_PROFILE_HISTORY; see tick_profiler.record_tick_profile).
+    _tick_profiles: "deque[dict[str, Any]]" = field(default_factory=deque)
+
     # Trust drift: per-edge clearing history and config.
     # Key format: "{creditor_pid}:{debtor_pid}:{equivalent_code}"
     _edge_clearing_history: dict[str, EdgeClearingHistory] = field(
@@ -122,7 +122,20 @@ class RealClearingEngine:
         session_local = async_session_local or db_session.AsyncSessionLocal
         service_cls = clearing_service_cls or ClearingService
 
-        for eq in equivalents:
+        concurrency = min(
+            len(equivalents),
+            max(1, int(getattr(settings, "SIMULATOR_CLEARING_EQ_CONCURRENCY", 1) or 1)),
+        )
+        # Concurrent mode holds clearing.done back until every equivalent finished.
+        pending_done: dict[str, dict[str, Any]] = {}
+
+        def emit_done(**kwargs: Any) -> None:
+            if concurrency > 1:
+                pending_done[str(kwargs["equivalent"])] = kwargs
+            else:
+                emitter.emit_clearing_done(**kwargs)
+
+        async def _clear_equivalent(eq: str) -> None:
             plan_id = ""
             cleared_cycles = 0
             cleared_amount_dec = Decimal("0")
@@ -173,7 +186,7 @@ class RealClearingEngine:
                         int(_fc_ms),
                     )
                     if not cycles:
-                        continue
+                        return
 
                     def _prioritize_cycle_for_tick(cycles_in: list[Any]) -> list[Any]:
                         if len(cycles_in) <= 1:
@@ -585,7 +598,7 @@ class RealClearingEngine:
 
                         if out_edges:
                             done_cycle_edges = out_edges
-                    emitter.emit_clearing_done(
+                    emit_done(
                         run_id=run_id,
                         run=run,
                         equivalent=eq,
@@ -630,7 +643,7 @@ class RealClearingEngine:
                             break
 
                     try:
-                        emitter.emit_clearing_done(
+                        emit_done(
                             run_id=run_id,
                             run=run,
                             equivalent=eq,
@@ -676,6 +689,33 @@ class RealClearingEngine:
                         "message": GeoException().message,
                         "at": self._utc_now().isoformat(),
                     }
-                continue
+
+        if concurrency <= 1:
+            for eq in equivalents:
+                await _clear_equivalent(eq)
+            return cleared_amount_by_eq
+
+        # Debts of different equivalents never share a cycle, so each equivalent clears
+        # in its own session concurrently; a tick then costs its slowest equivalent.
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _clear_bounded(eq: str) -> None:
+            async with semaphore:
+                await _clear_equivalent(eq)
+
+        tasks = [asyncio.create_task(_clear_bounded(eq)) for eq in equivalents]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # clearing.done goes out in equivalent order, as in sequential mode.
+            for eq in equivalents:
+                done_kwargs = pending_done.pop(str(eq), None)
+                if done_kwargs is not None:
+                    emitter.emit_clearing_done(**done_kwargs)
 
         return cleared_amount_by_eq
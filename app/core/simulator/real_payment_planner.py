@@ -3,10 +3,199 @@ from __future__ import annotations
 import logging
 import math
 import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from decimal import Decimal, ROUND_DOWN
 from typing import Any, Callable
 
-from app.core.simulator.scenario_equivalent import effective_equivalent
+from app.core.simulator.scenario_equivalent import effective_equivalent, scenario_default_equivalent
+
+# Compiled scenarios kept per planner (one per concurrently running scenario object).
+_COMPILED_SCENARIOS_MAX = 8
+
+
+def _scenario_signature(scenario: dict[str, Any]) -> tuple[Any, ...]:
+    """Cheap fingerprint of everything the compiled indexes are derived from.
+
+    Trustlines and participants are mutated in place (inject, trust drift, turbo
+    limits), so the fingerprint reads the raw fields instead of trusting identity.
+    Profiles are tracked by object: their props are read live.
+    """
+
+    return (
+        scenario_default_equivalent(scenario),
+        tuple(
+            (tl.get("from"), tl.get("to"), tl.get("status"), tl.get("limit"), tl.get("equivalent"))
+            for tl in (scenario.get("trustlines") or [])
+            if isinstance(tl, dict)
+        ),
+        tuple(
+            (p.get("id"), p.get("participant_id"), p.get("behaviorProfileId"), p.get("groupId"))
+            for p in (scenario.get("participants") or [])
+            if isinstance(p, dict)
+        ),
+        tuple(id(bp) for bp in (scenario.get("behaviorProfiles") or [])),
+    )
+
+
+@dataclass(frozen=True)
+class _Reachable:
+    nodes: list[str]
+    # Same order as `nodes`; participants without a group are left out.
+    by_group: dict[str, list[str]]
+
+
+class _CompiledScenario:
+    """Per-scenario planner indexes, rebuilt only when the signature changes.
+
+    Reachability is computed lazily per (equivalent, sender) and survives recompiles
+    that only change limits (trust drift), since it depends on topology and groups.
+    """
+
+    def __init__(
+        self,
+        *,
+        signature: tuple[Any, ...],
+        candidates: list[dict[str, Any]],
+        scenario: dict[str, Any],
+        previous: "_CompiledScenario | None" = None,
+    ) -> None:
+        self.signature = signature
+        self.candidates = candidates
+
+        self.profiles_props_by_id: dict[str, dict[str, Any]] = {}
+        profiles_full_by_id: dict[str, dict[str, Any]] = {}
+        for bp in scenario.get("behaviorProfiles") or []:
+            if not isinstance(bp, dict):
+                continue
+            bp_id = str(bp.get("id") or "").strip()
+            if not bp_id:
+                continue
+            props = bp.get("props")
+            self.profiles_props_by_id[bp_id] = props if isinstance(props, dict) else {}
+            profiles_full_by_id[bp_id] = bp
+
+        self.participant_profile_id_by_pid: dict[str, str] = {}
+        self.participant_group_by_pid: dict[str, str] = {}
+        for p in scenario.get("participants") or []:
+            if not isinstance(p, dict):
+                continue
+            pid = str(p.get("id") or p.get("participant_id") or "").strip()
+            if not pid:
+                continue
+            profile_id = str(p.get("behaviorProfileId") or "").strip()
+            if profile_id:
+                self.participant_profile_id_by_pid[pid] = profile_id
+            group_id = str(p.get("groupId") or "").strip()
+            if group_id:
+                self.participant_group_by_pid[pid] = group_id
+
+        # ── Phase 4: profile_by_pid lookup for flow/periodicity/reciprocity ──
+        self.profile_by_pid: dict[str, dict[str, Any]] = {}
+        for _pid, _prof_id in self.participant_profile_id_by_pid.items():
+            if _prof_id in profiles_full_by_id:
+                self.profile_by_pid[_pid] = profiles_full_by_id[_prof_id]
+        # ── /Phase 4 profile_by_pid ──────────────────────────────────────────
+
+        # Build adjacency (payment direction debtor->creditor) and per-sender/receiver limit hints.
+        # NOTE: TrustLine direction is creditor->debtor, but candidates are already inverted to debtor->creditor.
+        self.adjacency_by_eq: dict[str, dict[str, list[tuple[str, Decimal]]]] = {}
+        self.max_outgoing_limit: dict[tuple[str, str], Decimal] = {}
+        self.max_incoming_limit: dict[tuple[str, str], Decimal] = {}
+        self.direct_edge_limit: dict[tuple[str, str, str], Decimal] = {}
+        for c in candidates:
+            eq = str(c.get("equivalent") or "").strip()
+            sender = str(c.get("sender_pid") or "").strip()
+            receiver = str(c.get("receiver_pid") or "").strip()
+            limit = c.get("limit")
+            if not eq or not sender or not receiver:
+                continue
+            if not isinstance(limit, Decimal):
+                continue
+            self.adjacency_by_eq.setdefault(eq, {}).setdefault(sender, []).append(
+                (receiver, limit)
+            )
+
+            self.direct_edge_limit[(sender, receiver, eq)] = limit
+
+            k = (sender, eq)
+            prev = self.max_outgoing_limit.get(k)
+            if prev is None or limit > prev:
+                self.max_outgoing_limit[k] = limit
+
+            k_in = (receiver, eq)
+            prev_in = self.max_incoming_limit.get(k_in)
+            if prev_in is None or limit > prev_in:
+                self.max_incoming_limit[k_in] = limit
+
+        for eq, m in self.adjacency_by_eq.items():
+            for sender, edges in m.items():
+                # Deterministic neighbor order.
+                edges.sort(key=lambda x: x[0])
+
+        self.group_ids: tuple[str, ...] = tuple(
+            sorted({g for g in self.participant_group_by_pid.values() if g})
+        )
+
+        self.topology_key = (
+            tuple(
+                (eq, sender, tuple(pid for pid, _lim in edges))
+                for eq in sorted(self.adjacency_by_eq)
+                for sender, edges in sorted(self.adjacency_by_eq[eq].items())
+            ),
+            tuple(sorted(self.participant_group_by_pid.items())),
+        )
+        self._reachable: dict[tuple[str, str], _Reachable] = {}
+        if previous is not None and previous.topology_key == self.topology_key:
+            self._reachable = previous._reachable
+
+    def _reachable_nodes(
+        self, eq: str, sender: str, *, max_depth: int = 3, max_nodes: int = 200
+    ) -> list[str]:
+        graph = self.adjacency_by_eq.get(eq) or {}
+        if sender not in graph:
+            return []
+
+        visited: set[str] = {sender}
+        # (node, depth)
+        queue: list[tuple[str, int]] = [(sender, 0)]
+        qi = 0
+        while qi < len(queue) and len(visited) < max_nodes:
+            node, depth = queue[qi]
+            qi += 1
+            if depth >= max_depth:
+                continue
+            for nxt, _lim in graph.get(node) or []:
+                if nxt in visited:
+                    continue
+                visited.add(nxt)
+                queue.append((nxt, depth + 1))
+                if len(visited) >= max_nodes:
+                    break
+
+        visited.discard(sender)
+        return sorted(visited)
+
+    def reachable(self, eq: str, sender: str) -> _Reachable:
+        key = (eq, sender)
+        cached = self._reachable.get(key)
+        if cached is not None:
+            return cached
+
+        nodes = self._reachable_nodes(eq, sender)
+        if not nodes:
+            # Fallback to direct neighbors.
+            direct = [pid for (pid, _lim) in (self.adjacency_by_eq.get(eq) or {}).get(sender, [])]
+            nodes = sorted({p for p in direct if p and p != sender})
+        by_group: dict[str, list[str]] = {}
+        for pid in nodes:
+            group = self.participant_group_by_pid.get(pid)
+            if group:
+                by_group.setdefault(group, []).append(pid)
+        cached = _Reachable(nodes=nodes, by_group=by_group)
+        self._reachable[key] = cached
+        return cached
 
 
 class RealPaymentPlanner:
@@ -22,6 +211,8 @@ class RealPaymentPlanner:
         self._amount_cap_limit = amount_cap_limit
         self._logger = logger
         self._action_factory = action_factory
+        self._compiled_lock = threading.Lock()
+        self._compiled: OrderedDict[int, tuple[dict[str, Any], _CompiledScenario]] = OrderedDict()
 
     def _parse_event_time_ms(self, evt: Any) -> int | None:
         if not isinstance(evt, dict):
@@ -248,6 +439,32 @@ class RealPaymentPlanner:
             return None
         return format(amt, "f")
 
+    def compile_scenario(self, scenario: dict[str, Any]) -> _CompiledScenario:
+        """Return the planner indexes for `scenario`, reusing them while it is unchanged."""
+
+        signature = _scenario_signature(scenario)
+        key = id(scenario)
+        with self._compiled_lock:
+            entry = self._compiled.get(key)
+            previous = entry[1] if entry is not None and entry[0] is scenario else None
+            if previous is not None and previous.signature == signature:
+                self._compiled.move_to_end(key)
+                return previous
+
+        compiled = _CompiledScenario(
+            signature=signature,
+            candidates=self.candidates_from_scenario(scenario),
+            scenario=scenario,
+            previous=previous,
+        )
+        with self._compiled_lock:
+            # Holding the scenario keeps its id() from being reused by another object.
+            self._compiled[key] = (scenario, compiled)
+            self._compiled.move_to_end(key)
+            while len(self._compiled) > _COMPILED_SCENARIOS_MAX:
+                self._compiled.popitem(last=False)
+        return compiled
+
     def plan_payments(
         self,
         run: Any,
@@ -300,43 +517,15 @@ class RealPaymentPlanner:
         if target_actions <= 0:
             return []
 
-        candidates = self.candidates_from_scenario(scenario)
+        compiled = self.compile_scenario(scenario)
+        candidates = compiled.candidates
         if not candidates:
             return []
 
-        profiles_props_by_id: dict[str, dict[str, Any]] = {}
-        profiles_full_by_id: dict[str, dict[str, Any]] = {}
-        for bp in scenario.get("behaviorProfiles") or []:
-            if not isinstance(bp, dict):
-                continue
-            bp_id = str(bp.get("id") or "").strip()
-            if not bp_id:
-                continue
-            props = bp.get("props")
-            profiles_props_by_id[bp_id] = props if isinstance(props, dict) else {}
-            profiles_full_by_id[bp_id] = bp
-
-        participant_profile_id_by_pid: dict[str, str] = {}
-        participant_group_by_pid: dict[str, str] = {}
-        for p in scenario.get("participants") or []:
-            if not isinstance(p, dict):
-                continue
-            pid = str(p.get("id") or p.get("participant_id") or "").strip()
-            if not pid:
-                continue
-            profile_id = str(p.get("behaviorProfileId") or "").strip()
-            if profile_id:
-                participant_profile_id_by_pid[pid] = profile_id
-            group_id = str(p.get("groupId") or "").strip()
-            if group_id:
-                participant_group_by_pid[pid] = group_id
-
-        # ── Phase 4: profile_by_pid lookup for flow/periodicity/reciprocity ──
-        profile_by_pid: dict[str, dict[str, Any]] = {}
-        for _pid, _prof_id in participant_profile_id_by_pid.items():
-            if _prof_id in profiles_full_by_id:
-                profile_by_pid[_pid] = profiles_full_by_id[_prof_id]
-        # ── /Phase 4 profile_by_pid ──────────────────────────────────────────
+        profiles_props_by_id = compiled.profiles_props_by_id
+        participant_profile_id_by_pid = compiled.participant_profile_id_by_pid
+        participant_group_by_pid = compiled.participant_group_by_pid
+        profile_by_pid = compiled.profile_by_pid
 
         def _clamp01(v: Any, default: float) -> float:
             try:
@@ -387,41 +576,9 @@ class RealPaymentPlanner:
             except Exception:
                 return 1.0
 
-        # Build adjacency (payment direction debtor->creditor) and per-sender/receiver limit hints.
-        # NOTE: TrustLine direction is creditor->debtor, but candidates are already inverted to debtor->creditor.
-        adjacency_by_eq: dict[str, dict[str, list[tuple[str, Decimal]]]] = {}
-        max_outgoing_limit: dict[tuple[str, str], Decimal] = {}
-        max_incoming_limit: dict[tuple[str, str], Decimal] = {}
-        direct_edge_limit: dict[tuple[str, str, str], Decimal] = {}
-        for c in candidates:
-            eq = str(c.get("equivalent") or "").strip()
-            sender = str(c.get("sender_pid") or "").strip()
-            receiver = str(c.get("receiver_pid") or "").strip()
-            limit = c.get("limit")
-            if not eq or not sender or not receiver:
-                continue
-            if not isinstance(limit, Decimal):
-                continue
-            adjacency_by_eq.setdefault(eq, {}).setdefault(sender, []).append(
-                (receiver, limit)
-            )
-
-            direct_edge_limit[(sender, receiver, eq)] = limit
-
-            k = (sender, eq)
-            prev = max_outgoing_limit.get(k)
-            if prev is None or limit > prev:
-                max_outgoing_limit[k] = limit
-
-            k_in = (receiver, eq)
-            prev_in = max_incoming_limit.get(k_in)
-            if prev_in is None or limit > prev_in:
-                max_incoming_limit[k_in] = limit
-
-        for eq, m in adjacency_by_eq.items():
-            for sender, edges in m.items():
-                # Deterministic neighbor order.
-                edges.sort(key=lambda x: x[0])
+        max_outgoing_limit = compiled.max_outgoing_limit
+        max_incoming_limit = compiled.max_incoming_limit
+        direct_edge_limit = compiled.direct_edge_limit
 
         # ── Phase 1.4: pre-aggregate debt snapshot for O(1) lookups ───
         _ZERO = Decimal("0")
@@ -435,7 +592,8 @@ class RealPaymentPlanner:
                 _debt_in_agg[k_in] = _debt_in_agg.get(k_in, _ZERO) + amt
         # ── /Phase 1.4 pre-aggregate ──────────────────────────────────
 
-        all_group_ids = sorted({g for g in participant_group_by_pid.values() if g})
+        # Shuffled in place by the receiver choice below, so each tick starts sorted.
+        all_group_ids = list(compiled.group_ids)
 
         def _pick_group(rng: random.Random, sender_props: dict[str, Any]) -> str | None:
             weights = sender_props.get("recipient_group_weights")
@@ -459,44 +617,11 @@ class RealPaymentPlanner:
             except Exception:
                 return None
 
-        def _reachable_nodes(
-            eq: str, sender: str, *, max_depth: int = 3, max_nodes: int = 200
-        ) -> list[str]:
-            graph = adjacency_by_eq.get(eq) or {}
-            if sender not in graph:
-                return []
-
-            visited: set[str] = {sender}
-            # (node, depth)
-            queue: list[tuple[str, int]] = [(sender, 0)]
-            qi = 0
-            while qi < len(queue) and len(visited) < max_nodes:
-                node, depth = queue[qi]
-                qi += 1
-                if depth >= max_depth:
-                    continue
-                for nxt, _lim in graph.get(node) or []:
-                    if nxt in visited:
-                        continue
-                    visited.add(nxt)
-                    queue.append((nxt, depth + 1))
-                    if len(visited) >= max_nodes:
-                        break
-
-            visited.discard(sender)
-            return sorted(visited)
-
         def _choose_receiver(
             *, rng: random.Random, eq: str, sender: str, sender_props: dict[str, Any]
         ) -> str | None:
-            reachable = _reachable_nodes(eq, sender)
-            if not reachable:
-                # Fallback to direct neighbors.
-                direct = [
-                    pid
-                    for (pid, _lim) in (adjacency_by_eq.get(eq) or {}).get(sender, [])
-                ]
-                reachable = sorted({p for p in direct if p and p != sender})
+            reach = compiled.reachable(eq, sender)
+            reachable = reach.nodes
             if not reachable:
                 return None
 
@@ -525,22 +650,14 @@ class RealPaymentPlanner:
                             ]
                             if target_groups_flow:
                                 target_group_flow = rng.choice(target_groups_flow)
-                                in_target = [
-                                    pid
-                                    for pid in reachable
-                                    if participant_group_by_pid.get(pid) == target_group_flow
-                                ]
+                                in_target = reach.by_group.get(target_group_flow)
                                 if in_target:
                                     return rng.choice(in_target)
             # ── /Flow Directionality ─────────────────────────────────
 
             target_group = _pick_group(rng, sender_props)
             if target_group:
-                in_group = [
-                    pid
-                    for pid in reachable
-                    if participant_group_by_pid.get(pid) == target_group
-                ]
+                in_group = reach.by_group.get(target_group)
                 if in_group:
                     return rng.choice(in_group)
 
@@ -548,17 +665,15 @@ class RealPaymentPlanner:
             if all_group_ids:
                 rng.shuffle(all_group_ids)
                 for g in all_group_ids:
-                    in_group = [
-                        pid
-                        for pid in reachable
-                        if participant_group_by_pid.get(pid) == g
-                    ]
+                    in_group = reach.by_group.get(g)
                     if in_group:
                         return rng.choice(in_group)
 
             return rng.choice(reachable)
 
         planned: list[Any] = []
+        # Re-seeded per attempt: same streams as a fresh Random(action_seed), without the allocation.
+        action_rng = random.Random()
         i = 0
         max_iters = max(1, target_actions) * 50
         while len(planned) < target_actions and i < max_iters:
@@ -585,7 +700,7 @@ class RealPaymentPlanner:
                 continue
 
             action_seed = (tick_seed * 1_000_003 + i) & 0xFFFFFFFF
-            action_rng = random.Random(action_seed)
+            action_rng.seed(action_seed)
 
             if action_rng.random() > accept_prob:
                 i += 1
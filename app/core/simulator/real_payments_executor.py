@@ -18,6 +18,7 @@ from app.core.simulator.viz_patch_helper import VizPatchHelper
 from app.core.simulator.models import RunRecord
 from app.core.simulator.run_perimeter import run_perimeter_pids
 from app.db.models.participant import Participant
+from app.utils.event_bus import event_bus
 from app.utils.exceptions import (
     GeoException,
     RetryablePaymentConflictException,
@@ -78,31 +79,34 @@ class DeferredRealPaymentEffects:
             return False
         self._resolution = resolution
 
-        for item in sorted(self.items, key=lambda observation: observation.seq):
-            if resolution != "commit" and item.outcome == "committed":
-                if resolution == "unknown" and item.payment_effects is not None:
-                    try:
-                        item.payment_effects.invalidate_routing_cache_once()
-                    except Exception:
-                        self.logger.warning(
-                            "simulator.real.payment_unknown_cache_invalidation_failed "
-                            "run_id=%s seq=%s",
-                            self.run_id,
-                            item.seq,
-                            exc_info=True,
-                        )
-                continue
-            try:
-                self._apply_observation(item)
-            except Exception:
-                # One malformed/broken observation must not suppress later seq items.
-                self.logger.warning(
-                    "simulator.real.payment_observation_failed run_id=%s seq=%s outcome=%s",
-                    self.run_id,
-                    item.seq,
-                    item.outcome,
-                    exc_info=True,
-                )
+        # One tick commits many payments; publish their participant notifications as
+        # one event-bus batch instead of one fan-out (and stream entry) per payment.
+        with event_bus.batched():
+            for item in sorted(self.items, key=lambda observation: observation.seq):
+                if resolution != "commit" and item.outcome == "committed":
+                    if resolution == "unknown" and item.payment_effects is not None:
+                        try:
+                            item.payment_effects.invalidate_routing_cache_once()
+                        except Exception:
+                            self.logger.warning(
+                                "simulator.real.payment_unknown_cache_invalidation_failed "
+                                "run_id=%s seq=%s",
+                                self.run_id,
+                                item.seq,
+                                exc_info=True,
+                            )
+                    continue
+                try:
+                    self._apply_observation(item)
+                except Exception:
+                    # One malformed/broken observation must not suppress later seq items.
+                    self.logger.warning(
+                        "simulator.real.payment_observation_failed run_id=%s seq=%s outcome=%s",
+                        self.run_id,
+                        item.seq,
+                        item.outcome,
+                        exc_info=True,
+                    )
         return True
 
     def _apply_observation(self, item: _PaymentObservation) -> None:
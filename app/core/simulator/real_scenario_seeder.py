@@ -3,10 +3,11 @@ from __future__ import annotations
 import hashlib
 import uuid
 from decimal import Decimal, InvalidOperation
-from typing import Any
+from typing import Any, Iterable
 
 from sqlalchemy import select
 
+from app.db.bulk import bulk_insert_ignore
 from app.db.models.equivalent import Equivalent
 from app.db.models.participant import Participant
 from app.db.models.trustline import TrustLine
@@ -14,8 +15,20 @@ from app.core.simulator.scenario_equivalent import (
     effective_equivalent,
     scenario_default_equivalent,
 )
+from app.utils.json_stream import batched, iter_json_array, load_json_object_without
 from app.utils.validation import validate_equivalent_code
 
+_DEFAULT_POLICY = {
+    "auto_clearing": True,
+    "can_be_intermediate": True,
+    "max_hop_usage": None,
+    "daily_limit": None,
+    "blocked_participants": [],
+}
+
+# Rows per bulk statement batch, and PIDs per `IN (...)` lookup.
+_SEED_BATCH = 5000
+
 
 class RealScenarioSeeder:
     async def load_real_participants(
@@ -47,7 +60,45 @@ class RealScenarioSeeder:
         return out
 
     async def seed_scenario_into_db(self, *, session: Any, scenario: dict[str, Any]) -> None:
-        # Equivalents
+        """Idempotently create the scenario's equivalents, participants and trustlines.
+
+        Rows that already exist are left alone. Does NOT commit.
+        """
+
+        participants = scenario.get("participants") or []
+        trustlines = scenario.get("trustlines") or []
+        eq_by_code = await self._seed_equivalents(
+            session=session,
+            eq_codes=self._equivalent_codes(scenario, trustlines),
+        )
+        await self._seed_participants(session=session, participants=participants)
+        await self._seed_trustlines(
+            session=session, scenario=scenario, trustlines=trustlines, eq_by_code=eq_by_code
+        )
+
+    async def seed_scenario_file_into_db(self, *, session: Any, path: str) -> None:
+        """`seed_scenario_into_db` for a scenario file too large to load whole.
+
+        Participants and trustlines are streamed and written in batches, so memory stays
+        bounded by the batch size rather than by the scenario. Does NOT commit.
+        """
+
+        header = load_json_object_without(path, ("participants", "trustlines"))
+        eq_by_code = await self._seed_equivalents(
+            session=session,
+            eq_codes=self._equivalent_codes(header, iter_json_array(path, key="trustlines")),
+        )
+        for batch in batched(iter_json_array(path, key="participants"), _SEED_BATCH):
+            await self._seed_participants(session=session, participants=batch)
+        for batch in batched(iter_json_array(path, key="trustlines"), _SEED_BATCH):
+            await self._seed_trustlines(
+                session=session, scenario=header, trustlines=batch, eq_by_code=eq_by_code
+            )
+
+    @staticmethod
+    def _equivalent_codes(
+        scenario: dict[str, Any], trustlines: Iterable[dict[str, Any]]
+    ) -> list[str]:
         # Scenarios may omit the top-level 'equivalents' list (schema doesn't require it).
         # Derive equivalent codes from:
         # - scenario.equivalents[]
@@ -62,7 +113,7 @@ class RealScenarioSeeder:
         if default_eq:
             eq_set.add(default_eq)
 
-        for tl in (scenario.get("trustlines") or []):
+        for tl in trustlines:
             eq = effective_equivalent(scenario, tl)
             if eq:
                 eq_set.add(str(eq).strip().upper())
@@ -73,154 +124,167 @@ class RealScenarioSeeder:
         # catalog. Reject noncanonical codes before any ORM objects are staged.
         for code in eq_codes:
             validate_equivalent_code(code)
+        return eq_codes
 
-        if eq_codes:
-            existing_eq = (
-                (
-                    await session.execute(
-                        select(Equivalent).where(Equivalent.code.in_(eq_codes))
-                    )
-                )
-                .scalars()
-                .all()
-            )
-            have = {e.code for e in existing_eq}
-            for code in eq_codes:
-                if code in have:
-                    continue
-                session.add(Equivalent(code=code, is_active=True, metadata_={}))
-
-        # Participants
-        participants = scenario.get("participants") or []
-        pids = [str(p.get("id") or "").strip() for p in participants]
-        pids = [p for p in pids if p]
-        if pids:
-            existing_p = (
-                (
-                    await session.execute(
-                        select(Participant).where(Participant.pid.in_(pids))
-                    )
-                )
-                .scalars()
-                .all()
-            )
-            have_p = {p.pid for p in existing_p}
-            for p in participants:
-                pid = str(p.get("id") or "").strip()
-                if not pid or pid in have_p:
-                    continue
-                name = str(p.get("name") or pid)
-                p_type = str(p.get("type") or "person").strip() or "person"
-                status = str(p.get("status") or "active").strip().lower()
-                if status == "frozen":
-                    status = "suspended"
-                elif status == "banned":
-                    status = "deleted"
-                elif status not in {"active", "suspended", "left", "deleted"}:
-                    status = "active"
-                public_key = hashlib.sha256(pid.encode("utf-8")).hexdigest()
-                session.add(
-                    Participant(
-                        pid=pid,
-                        display_name=name,
-                        public_key=public_key,
-                        type=(
-                            p_type if p_type in {"person", "business", "hub"} else "person"
-                        ),
-                        status=status,
-                        profile={},
-                    )
-                )
+    async def _seed_equivalents(
+        self, *, session: Any, eq_codes: list[str]
+    ) -> dict[str, uuid.UUID]:
+        # A handful of rows: the ORM keeps Equivalent's code/precision validators in play.
+        if not eq_codes:
+            return {}
+        existing_eq = (
+            (await session.execute(select(Equivalent).where(Equivalent.code.in_(eq_codes))))
+            .scalars()
+            .all()
+        )
+        have = {e.code for e in existing_eq}
+        for code in eq_codes:
+            if code in have:
+                continue
+            session.add(Equivalent(code=code, is_active=True, metadata_={}))
 
         # NOTE: app.db.session.AsyncSessionLocal has autoflush=False.
         # We must flush pending inserts before querying IDs for trustlines.
         await session.flush()
+        rows = (
+            await session.execute(
+                select(Equivalent.code, Equivalent.id).where(Equivalent.code.in_(eq_codes))
+            )
+        ).all()
+        return {code: eq_id for code, eq_id in rows}
 
-        # Trustlines
-        trustlines = scenario.get("trustlines") or []
-        if trustlines and eq_codes and pids:
-            default_policy = {
-                "auto_clearing": True,
-                "can_be_intermediate": True,
-                "max_hop_usage": None,
-                "daily_limit": None,
-                "blocked_participants": [],
-            }
-
-            eq_rows = (
-                (
-                    await session.execute(
-                        select(Equivalent).where(Equivalent.code.in_(eq_codes))
-                    )
-                )
-                .scalars()
-                .all()
+    async def _seed_participants(
+        self, *, session: Any, participants: list[dict[str, Any]]
+    ) -> None:
+        rows: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        for p in participants:
+            pid = str(p.get("id") or "").strip()
+            if not pid or pid in seen:
+                continue
+            seen.add(pid)
+            p_type = str(p.get("type") or "person").strip() or "person"
+            status = str(p.get("status") or "active").strip().lower()
+            if status == "frozen":
+                status = "suspended"
+            elif status == "banned":
+                status = "deleted"
+            elif status not in {"active", "suspended", "left", "deleted"}:
+                status = "active"
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "pid": pid,
+                    "display_name": str(p.get("name") or pid),
+                    "public_key": hashlib.sha256(pid.encode("utf-8")).hexdigest(),
+                    "type": p_type if p_type in {"person", "business", "hub"} else "person",
+                    "status": status,
+                    "verification_level": 0,
+                    "profile": {},
+                }
             )
-            eq_by_code = {e.code: e for e in eq_rows}
+        # Existing PIDs (and their derived public keys) conflict and are skipped.
+        await bulk_insert_ignore(session, Participant.__table__, rows)
 
-            p_rows = (
-                (
-                    await session.execute(
-                        select(Participant).where(Participant.pid.in_(pids))
-                    )
+    async def _participant_ids(
+        self, *, session: Any, pids: Iterable[str]
+    ) -> dict[str, uuid.UUID]:
+        out: dict[str, uuid.UUID] = {}
+        for chunk in batched(sorted(set(pids)), _SEED_BATCH):
+            rows = (
+                await session.execute(
+                    select(Participant.pid, Participant.id).where(Participant.pid.in_(chunk))
                 )
-                .scalars()
-                .all()
-            )
-            p_by_pid = {p.pid: p for p in p_rows}
-
-            for tl in trustlines:
-                eq = str(effective_equivalent(scenario, tl) or "").strip().upper()
-                if not eq or eq not in eq_by_code:
-                    continue
-                from_pid = str(tl.get("from") or "").strip()
-                to_pid = str(tl.get("to") or "").strip()
-                if not from_pid or not to_pid:
-                    continue
-                p_from = p_by_pid.get(from_pid)
-                p_to = p_by_pid.get(to_pid)
-                if p_from is None or p_to is None:
-                    continue
-
-                raw_limit = tl.get("limit")
-                try:
-                    limit = Decimal(str(raw_limit))
-                except (InvalidOperation, ValueError):
-                    continue
-                if limit < 0:
-                    continue
-
-                # Only a LIVE row occupies the triple: since migration 019 a closed
-                # incarnation may coexist with it, so an unfiltered lookup can return
-                # several rows and raise MultipleResultsFound.
-                existing = (
+            ).all()
+            out.update({pid: pid_id for pid, pid_id in rows})
+        return out
+
+    async def _seed_trustlines(
+        self,
+        *,
+        session: Any,
+        scenario: dict[str, Any],
+        trustlines: list[dict[str, Any]],
+        eq_by_code: dict[str, uuid.UUID],
+    ) -> None:
+        if not trustlines or not eq_by_code:
+            return
+
+        parsed: list[tuple[str, str, str, Decimal, str, dict[str, Any]]] = []
+        for tl in trustlines:
+            eq = str(effective_equivalent(scenario, tl) or "").strip().upper()
+            if not eq or eq not in eq_by_code:
+                continue
+            from_pid = str(tl.get("from") or "").strip()
+            to_pid = str(tl.get("to") or "").strip()
+            if not from_pid or not to_pid:
+                continue
+
+            raw_limit = tl.get("limit")
+            try:
+                limit = Decimal(str(raw_limit))
+            except (InvalidOperation, ValueError):
+                continue
+            if limit < 0:
+                continue
+
+            status = str(tl.get("status") or "active").strip().lower()
+            if status not in {"active", "frozen", "closed"}:
+                status = "active"
+
+            policy = tl.get("policy")
+            if not isinstance(policy, dict):
+                policy = dict(_DEFAULT_POLICY)
+            parsed.append((from_pid, to_pid, eq, limit, status, policy))
+        if not parsed:
+            return
+
+        id_by_pid = await self._participant_ids(
+            session=session, pids=(p for row in parsed for p in row[:2])
+        )
+
+        # Only a LIVE row occupies the triple: since migration 019 a closed incarnation
+        # may coexist with it. One lookup for the batch instead of one per trustline.
+        live: set[tuple[uuid.UUID, uuid.UUID, uuid.UUID]] = set()
+        from_ids = sorted({id_by_pid[r[0]] for r in parsed if r[0] in id_by_pid}, key=str)
+        for chunk in batched(from_ids, _SEED_BATCH):
+            live.update(
+                (
                     await session.execute(
-                        select(TrustLine).where(
-                            TrustLine.from_participant_id == p_from.id,
-                            TrustLine.to_participant_id == p_to.id,
-                            TrustLine.equivalent_id == eq_by_code[eq].id,
+                        select(
+                            TrustLine.from_participant_id,
+                            TrustLine.to_participant_id,
+                            TrustLine.equivalent_id,
+                        ).where(
+                            TrustLine.from_participant_id.in_(chunk),
+                            TrustLine.equivalent_id.in_(list(eq_by_code.values())),
                             TrustLine.status != "closed",
                         )
                     )
-                ).scalar_one_or_none()
-                if existing is not None:
-                    continue
-
-                status = str(tl.get("status") or "active").strip().lower()
-                if status not in {"active", "frozen", "closed"}:
-                    status = "active"
-
-                policy = tl.get("policy")
-                if not isinstance(policy, dict):
-                    policy = default_policy
-
-                session.add(
-                    TrustLine(
-                        from_participant_id=p_from.id,
-                        to_participant_id=p_to.id,
-                        equivalent_id=eq_by_code[eq].id,
-                        limit=limit,
-                        status=status,
-                        policy=policy,
-                    )
-                )
+                ).all()
+            )
+
+        rows: list[dict[str, Any]] = []
+        for from_pid, to_pid, eq, limit, status, policy in parsed:
+            from_id = id_by_pid.get(from_pid)
+            to_id = id_by_pid.get(to_pid)
+            if from_id is None or to_id is None:
+                continue
+            key = (from_id, to_id, eq_by_code[eq])
+            if key in live:
+                continue
+            if status != "closed":
+                # A duplicate in the scenario itself would trip the live-triple index.
+                live.add(key)
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "from_participant_id": from_id,
+                    "to_participant_id": to_id,
+                    "equivalent_id": key[2],
+                    "limit": limit,
+                    "status": status,
+                    "policy": policy,
+                }
+            )
+        await bulk_insert_ignore(session, TrustLine.__table__, rows)
@@ -17,6 +17,7 @@ from app.core.simulator.scenario_equivalent import (
     effective_equivalent,
     scenario_default_equivalent,
 )
+from app.core.simulator.tick_profiler import TickProfiler, record_tick_profile
 from app.db.models.audit_log import IntegrityAuditLog
 
 
@@ -210,6 +211,21 @@ class RealTickOrchestrator:
             except Exception:
                 pass
 
+    def _finish_tick_profile(self, run: RunRecord, profiler: TickProfiler) -> None:
+        rr = self._runner
+        try:
+            profile = profiler.finish()
+            profiler.observe()
+            with rr._lock:
+                record_tick_profile(run, profile)
+        except Exception:
+            rr._logger.debug(
+                "simulator.real.tick_profile_failed run_id=%s tick=%s",
+                str(run.run_id),
+                int(profiler.tick_index),
+                exc_info=True,
+            )
+
     async def tick_real_mode(self, run_id: str) -> None:
         rr = self._runner
 
@@ -230,6 +246,8 @@ class RealTickOrchestrator:
         # from the previous tick (lost updates under Postgres).
         await self._await_pending_clearing(run_id, run=run)
 
+        profiler = TickProfiler(run_id=str(run.run_id), tick_index=int(run.tick_index or 0))
+        profiler.start()
         try:
             async with db_session.AsyncSessionLocal() as session:
                 payments_phase = None
@@ -288,29 +306,41 @@ class RealTickOrchestrator:
 
                     # Apply due scenario timeline events (note/stress/inject). Best-effort.
                     # IMPORTANT: inject modifies DB state and must happen before payments.
-                    await rr._apply_due_scenario_events(
-                        session, run_id=run_id, run=run, scenario=scenario
-                    )
-
-                    payments_phase, should_stop = await rr._real_tick_payments_coordinator.run_payments_phase(
-                        session=session,
-                        run_id=run_id,
-                        run=run,
-                        scenario=scenario,
-                        participants=participants,
-                        equivalents=equivalents,
-                        load_debt_snapshot_by_pid=rr._load_debt_snapshot_by_pid,
-                        plan_payments=lambda _run, _scenario, _debt_snapshot: rr._plan_real_payments(
-                            _run, _scenario, debt_snapshot=_debt_snapshot
-                        ),
-                        payments_executor=rr._real_payments_executor,
-                        max_in_flight=int(run._real_max_in_flight),
-                        max_timeouts_per_tick=int(rr._real_max_timeouts_per_tick_limit),
-                        max_errors_total=int(rr._real_max_errors_total_limit),
-                        fail_run=lambda _run_id, code, message: rr.fail_run(
-                            _run_id, code=code, message=message
-                        ),
-                    )
+                    with profiler.phase("events"):
+                        await rr._apply_due_scenario_events(
+                            session, run_id=run_id, run=run, scenario=scenario
+                        )
+
+                    async def _load_debt_snapshot(_session, _participants, _equivalents):
+                        with profiler.phase("debt_snapshot"):
+                            return await rr._load_debt_snapshot_by_pid(
+                                _session, _participants, _equivalents
+                            )
+
+                    def _plan_payments(_run, _scenario, _debt_snapshot):
+                        with profiler.phase("planning"):
+                            return rr._plan_real_payments(
+                                _run, _scenario, debt_snapshot=_debt_snapshot
+                            )
+
+                    with profiler.phase("payments"):
+                        payments_phase, should_stop = await rr._real_tick_payments_coordinator.run_payments_phase(
+                            session=session,
+                            run_id=run_id,
+                            run=run,
+                            scenario=scenario,
+                            participants=participants,
+                            equivalents=equivalents,
+                            load_debt_snapshot_by_pid=_load_debt_snapshot,
+                            plan_payments=_plan_payments,
+                            payments_executor=rr._real_payments_executor,
+                            max_in_flight=int(run._real_max_in_flight),
+                            max_timeouts_per_tick=int(rr._real_max_timeouts_per_tick_limit),
+                            max_errors_total=int(rr._real_max_errors_total_limit),
+                            fail_run=lambda _run_id, code, message: rr.fail_run(
+                                _run_id, code=code, message=message
+                            ),
+                        )
                     if should_stop:
                         return
 
@@ -328,177 +358,186 @@ class RealTickOrchestrator:
                     per_eq_edge_stats = payments_phase.per_eq_edge_stats
 
                     # Best-effort clearing (optional MVP): once in a while, attempt clearing per equivalent.
-                    clearing_volume_by_eq = await rr._real_tick_clearing_coordinator.maybe_run_clearing(
-                        session=session,
-                        run_id=run_id,
-                        run=run,
-                        equivalents=equivalents,
-                        planned_len=len(planned or []),
-                        tick_t0=tick_t0,
-                        clearing_enabled=bool(getattr(settings, "CLEARING_ENABLED", True)),
-                        safe_int_env=_safe_int_env,
-                        run_clearing=lambda: rr.tick_real_mode_clearing(
-                            session, run_id, run, equivalents
-                        ),
-                        run_clearing_for_eq=lambda eq, *, time_budget_ms_override=None, max_depth_override=None: rr.tick_real_mode_clearing(
-                            session, run_id, run, [eq],
-                            time_budget_ms_override=time_budget_ms_override,
-                            max_depth_override=max_depth_override,
-                        ),
-                        payments_result=payments_phase,
-                    )
+                    with profiler.phase("clearing"):
+                        clearing_volume_by_eq = await rr._real_tick_clearing_coordinator.maybe_run_clearing(
+                            session=session,
+                            run_id=run_id,
+                            run=run,
+                            equivalents=equivalents,
+                            planned_len=len(planned or []),
+                            tick_t0=tick_t0,
+                            clearing_enabled=bool(getattr(settings, "CLEARING_ENABLED", True)),
+                            safe_int_env=_safe_int_env,
+                            run_clearing=lambda: rr.tick_real_mode_clearing(
+                                session, run_id, run, equivalents
+                            ),
+                            run_clearing_for_eq=lambda eq, *, time_budget_ms_override=None, max_depth_override=None: rr.tick_real_mode_clearing(
+                                session, run_id, run, [eq],
+                                time_budget_ms_override=time_budget_ms_override,
+                                max_depth_override=max_depth_override,
+                            ),
+                            payments_result=payments_phase,
+                        )
 
                     # ── Trust Drift: decay overloaded edges ─────────────
-                    await rr._real_tick_trust_drift_coordinator.apply_trust_decay_and_broadcast(
-                        session=session,
-                        run_id=run_id,
-                        run=run,
-                        tick_index=int(run.tick_index or 0),
-                        debt_snapshot=debt_snapshot,
-                        scenario=scenario,
-                        trust_drift_engine=rr._trust_drift_engine,
-                        build_edge_patch_for_equivalent=rr._build_edge_patch_for_equivalent,
-                        broadcast_topology_edge_patch=rr._broadcast_topology_edge_patch,
-                        on_commit=payments_phase.apply_deferred_effects,
-                        on_rollback=payments_phase.apply_rollback_observations,
-                        on_unknown=payments_phase.apply_unknown_transaction_observations,
-                    )
-
-                    await rr._real_tick_metrics.populate_per_eq_metric_values(
-                        session=session,
-                        run=run,
-                        scenario=scenario,
-                        equivalents=equivalents,
-                        per_eq_route=per_eq_route,
-                        clearing_volume_by_eq=clearing_volume_by_eq,
-                        per_eq_metric_values=per_eq_metric_values,
-                        should_warn=lambda key: rr._should_warn_this_tick(run, key=key),
-                    )
-
-                    await rr._real_tick_persistence.persist_tick_tail(
-                        session=session,
-                        run=run,
-                        equivalents=equivalents,
-                        tick_t0=tick_t0,
-                        planned_len=len(planned),
-                        committed=committed,
-                        rejected=rejected,
-                        errors=errors,
-                        timeouts=timeouts,
-                        per_eq=per_eq,
-                        per_eq_metric_values=per_eq_metric_values,
-                        per_eq_edge_stats=per_eq_edge_stats,
-                        on_commit=payments_phase.apply_deferred_effects,
-                        on_rollback=payments_phase.apply_rollback_observations,
-                        on_unknown=payments_phase.apply_unknown_transaction_observations,
-                    )
+                    async def _build_edge_patch(**kwargs):
+                        with profiler.phase("edge_patches"):
+                            return await rr._build_edge_patch_for_equivalent(**kwargs)
+
+                    with profiler.phase("trust_drift"):
+                        await rr._real_tick_trust_drift_coordinator.apply_trust_decay_and_broadcast(
+                            session=session,
+                            run_id=run_id,
+                            run=run,
+                            tick_index=int(run.tick_index or 0),
+                            debt_snapshot=debt_snapshot,
+                            scenario=scenario,
+                            trust_drift_engine=rr._trust_drift_engine,
+                            build_edge_patch_for_equivalent=_build_edge_patch,
+                            broadcast_topology_edge_patch=rr._broadcast_topology_edge_patch,
+                            on_commit=payments_phase.apply_deferred_effects,
+                            on_rollback=payments_phase.apply_rollback_observations,
+                            on_unknown=payments_phase.apply_unknown_transaction_observations,
+                        )
 
-                    # ── Post-tick audit (best-effort): detect participant drift ──
-                    try:
-                        emitter = getattr(rr, "_sse_emitter", None)
-                        sim_idem = getattr(rr._real_payments_executor, "_sim_idempotency_key", None)
-
-                        for eq_code in equivalents:
-                            audit = await audit_tick_balance(
-                                session=session,
-                                equivalent_code=str(eq_code),
-                                tick_index=int(run.tick_index or 0),
-                                payments_result=payments_phase,
-                                clearing_volume_by_eq=clearing_volume_by_eq,
-                                run_id=str(run_id),
-                                sim_idempotency_key=sim_idem,
-                            )
-                            if audit.ok:
-                                continue
+                    with profiler.phase("metrics"):
+                        await rr._real_tick_metrics.populate_per_eq_metric_values(
+                            session=session,
+                            run=run,
+                            scenario=scenario,
+                            equivalents=equivalents,
+                            per_eq_route=per_eq_route,
+                            clearing_volume_by_eq=clearing_volume_by_eq,
+                            per_eq_metric_values=per_eq_metric_values,
+                            should_warn=lambda key: rr._should_warn_this_tick(run, key=key),
+                        )
 
-                            # Severity heuristic: warning if drift < 1% of tick volume.
-                            severity = "critical"
-                            if audit.tick_volume > 0:
-                                try:
-                                    ratio = audit.total_drift / audit.tick_volume
-                                    if ratio < Decimal("0.01"):
-                                        severity = "warning"
-                                except Exception:
-                                    severity = "critical"
+                    with profiler.phase("persistence"):
+                        await rr._real_tick_persistence.persist_tick_tail(
+                            session=session,
+                            run=run,
+                            equivalents=equivalents,
+                            tick_t0=tick_t0,
+                            planned_len=len(planned),
+                            committed=committed,
+                            rejected=rejected,
+                            errors=errors,
+                            timeouts=timeouts,
+                            per_eq=per_eq,
+                            per_eq_metric_values=per_eq_metric_values,
+                            per_eq_edge_stats=per_eq_edge_stats,
+                            on_commit=payments_phase.apply_deferred_effects,
+                            on_rollback=payments_phase.apply_rollback_observations,
+                            on_unknown=payments_phase.apply_unknown_transaction_observations,
+                        )
 
-                            rr._logger.warning(
-                                "event=post_tick_audit.drift run_id=%s tick=%s eq=%s total_drift=%s severity=%s",
-                                str(run_id),
-                                int(run.tick_index or 0),
-                                str(eq_code),
-                                str(audit.total_drift),
-                                str(severity),
-                            )
+                    # ── Post-tick audit (best-effort): detect participant drift ──
+                    with profiler.phase("audit"):
+                        try:
+                            emitter = getattr(rr, "_sse_emitter", None)
+                            sim_idem = getattr(rr._real_payments_executor, "_sim_idempotency_key", None)
+
+                            for eq_code in equivalents:
+                                audit = await audit_tick_balance(
+                                    session=session,
+                                    equivalent_code=str(eq_code),
+                                    tick_index=int(run.tick_index or 0),
+                                    payments_result=payments_phase,
+                                    clearing_volume_by_eq=clearing_volume_by_eq,
+                                    run_id=str(run_id),
+                                    sim_idempotency_key=sim_idem,
+                                )
+                                if audit.ok:
+                                    continue
+
+                                # Severity heuristic: warning if drift < 1% of tick volume.
+                                severity = "critical"
+                                if audit.tick_volume > 0:
+                                    try:
+                                        ratio = audit.total_drift / audit.tick_volume
+                                        if ratio < Decimal("0.01"):
+                                            severity = "warning"
+                                    except Exception:
+                                        severity = "critical"
 
-                            # 1) SSE event (best-effort).
-                            try:
-                                if emitter is not None:
-                                    emitter.emit_audit_drift(
-                                        run_id=str(run_id),
-                                        run=run,
-                                        equivalent=str(eq_code),
-                                        tick_index=int(run.tick_index or 0),
-                                        severity=str(severity),
-                                        total_drift=str(audit.total_drift),
-                                        drifts=list(audit.drifts or []),
-                                        source="post_tick_audit",
-                                    )
-                            except Exception:
                                 rr._logger.warning(
-                                    "event=post_tick_audit.emit_failed run_id=%s tick=%s eq=%s",
+                                    "event=post_tick_audit.drift run_id=%s tick=%s eq=%s total_drift=%s severity=%s",
                                     str(run_id),
                                     int(run.tick_index or 0),
                                     str(eq_code),
-                                    exc_info=True,
+                                    str(audit.total_drift),
+                                    str(severity),
                                 )
 
-                            # 2) IntegrityAuditLog (best-effort).
-                            try:
-                                session.add(
-                                    IntegrityAuditLog(
-                                        operation_type="SIMULATOR_AUDIT_DRIFT",
-                                        tx_id=None,
-                                        equivalent_code=str(eq_code).strip().upper(),
-                                        state_checksum_before="",
-                                        state_checksum_after="",
-                                        affected_participants={
-                                            "drifts": list(audit.drifts or []),
-                                            "tick_index": int(run.tick_index or 0),
-                                            "source": "post_tick_audit",
-                                        },
-                                        invariants_checked={
-                                            "post_tick_balance": {
-                                                "passed": False,
-                                                "total_drift": str(audit.total_drift),
-                                            }
-                                        },
-                                        verification_passed=False,
-                                        error_details={
-                                            "drifts": list(audit.drifts or []),
-                                            "severity": str(severity),
-                                        },
+                                # 1) SSE event (best-effort).
+                                try:
+                                    if emitter is not None:
+                                        emitter.emit_audit_drift(
+                                            run_id=str(run_id),
+                                            run=run,
+                                            equivalent=str(eq_code),
+                                            tick_index=int(run.tick_index or 0),
+                                            severity=str(severity),
+                                            total_drift=str(audit.total_drift),
+                                            drifts=list(audit.drifts or []),
+                                            source="post_tick_audit",
+                                        )
+                                except Exception:
+                                    rr._logger.warning(
+                                        "event=post_tick_audit.emit_failed run_id=%s tick=%s eq=%s",
+                                        str(run_id),
+                                        int(run.tick_index or 0),
+                                        str(eq_code),
+                                        exc_info=True,
                                     )
-                                )
-                                await session.commit()
-                            except Exception:
+
+                                # 2) IntegrityAuditLog (best-effort).
                                 try:
-                                    await session.rollback()
+                                    session.add(
+                                        IntegrityAuditLog(
+                                            operation_type="SIMULATOR_AUDIT_DRIFT",
+                                            tx_id=None,
+                                            equivalent_code=str(eq_code).strip().upper(),
+                                            state_checksum_before="",
+                                            state_checksum_after="",
+                                            affected_participants={
+                                                "drifts": list(audit.drifts or []),
+                                                "tick_index": int(run.tick_index or 0),
+                                                "source": "post_tick_audit",
+                                            },
+                                            invariants_checked={
+                                                "post_tick_balance": {
+                                                    "passed": False,
+                                                    "total_drift": str(audit.total_drift),
+                                                }
+                                            },
+                                            verification_passed=False,
+                                            error_details={
+                                                "drifts": list(audit.drifts or []),
+                                                "severity": str(severity),
+                                            },
+                                        )
+                                    )
+                                    await session.commit()
                                 except Exception:
-                                    pass
-                                rr._logger.warning(
-                                    "event=post_tick_audit.persist_failed run_id=%s tick=%s eq=%s",
-                                    str(run_id),
-                                    int(run.tick_index or 0),
-                                    str(eq_code),
-                                    exc_info=True,
-                                )
-                    except Exception:
-                        rr._logger.warning(
-                            "event=post_tick_audit.failed run_id=%s tick=%s",
-                            str(run_id),
-                            int(run.tick_index or 0),
-                            exc_info=True,
-                        )
+                                    try:
+                                        await session.rollback()
+                                    except Exception:
+                                        pass
+                                    rr._logger.warning(
+                                        "event=post_tick_audit.persist_failed run_id=%s tick=%s eq=%s",
+                                        str(run_id),
+                                        int(run.tick_index or 0),
+                                        str(eq_code),
+                                        exc_info=True,
+                                    )
+                        except Exception:
+                            rr._logger.warning(
+                                "event=post_tick_audit.failed run_id=%s tick=%s",
+                                str(run_id),
+                                int(run.tick_index or 0),
+                                exc_info=True,
+                            )
                 except Exception as tick_error:
                     # CRITICAL: always attempt rollback on tick failure.
                     # Otherwise the underlying pooled connection can be returned
@@ -570,6 +609,8 @@ class RealTickOrchestrator:
                     code="REAL_MODE_TICK_FAILED_REPEATED",
                     message=f"Real-mode tick failed {run._real_consec_tick_failures} times in a row",
                 )
+        finally:
+            self._finish_tick_profile(run, profiler)
 
     async def tick_real_mode_clearing(
         self,
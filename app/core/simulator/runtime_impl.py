@@ -5,7 +5,7 @@ import logging
 import os
 import threading
 import time
-from typing import Any, Optional
+from typing import Any, Collection, Optional
 from pathlib import Path
 import secrets
 import hashlib
@@ -48,6 +48,7 @@ from app.core.simulator.scenario_registry import ScenarioRegistry
 from app.core.simulator.snapshot_builder import SnapshotBuilder, scenario_to_snapshot
 import app.core.simulator.storage as simulator_storage
 from app.core.simulator.sse_broadcast import SseBroadcast, SseEventEmitter
+from app.utils import snapshot_cache
 from app.utils.exceptions import NotFoundException
 from app.utils.exceptions import ConflictException
 
@@ -839,6 +840,28 @@ class _SimulatorRuntimeBase:
     async def unsubscribe(self, run_id: str, sub: _Subscription) -> None:
         await self._sse.unsubscribe(run_id, sub)
 
+    def event_cursor(self, run_id: str) -> Optional[str]:
+        return self._sse.event_cursor(run_id)
+
+    async def poll_events(
+        self,
+        run_id: str,
+        *,
+        equivalent: str | Collection[str],
+        after_event_id: Optional[str],
+        types: Optional[set[str]] = None,
+        limit: int,
+        timeout_sec: float,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        return await self._sse.poll_events(
+            run_id,
+            equivalent=equivalent,
+            after_event_id=after_event_id,
+            types=types,
+            limit=limit,
+            timeout_sec=timeout_sec,
+        )
+
     async def build_graph_snapshot(
         self,
         *,
@@ -852,7 +875,20 @@ class _SimulatorRuntimeBase:
             session=session,
         )
 
-    async def build_ego_snapshot(
+    async def cached_graph_snapshot(
+        self,
+        *,
+        run_id: str,
+        equivalent: str,
+        session=None,
+    ) -> snapshot_cache.CachedSnapshot:
+        return await self._snapshot_builder.cached_graph_snapshot(
+            run_id=run_id,
+            equivalent=equivalent,
+            session=session,
+        )
+
+    async def cached_ego_snapshot(
         self,
         *,
         run_id: str,
@@ -860,46 +896,28 @@ class _SimulatorRuntimeBase:
         pid: str,
         depth: int,
         session=None,
-    ) -> SimulatorGraphSnapshot:
-        snap = await self.build_graph_snapshot(
-            run_id=run_id, equivalent=equivalent, session=session
+    ) -> snapshot_cache.CachedSnapshot:
+        return await self._snapshot_builder.cached_ego_snapshot(
+            run_id=run_id,
+            equivalent=equivalent,
+            pid=pid,
+            depth=depth,
+            session=session,
         )
-        if depth <= 0:
-            return snap
 
-        # Undirected BFS on links.
-        neighbors: dict[str, set[str]] = {}
-        for link in snap.links:
-            neighbors.setdefault(link.source, set()).add(link.target)
-            neighbors.setdefault(link.target, set()).add(link.source)
-
-        visited: set[str] = {pid}
-        frontier: set[str] = {pid}
-
-        for _ in range(depth):
-            nxt: set[str] = set()
-            for cur in frontier:
-                nxt |= neighbors.get(cur, set())
-            nxt -= visited
-            if not nxt:
-                break
-            visited |= nxt
-            frontier = nxt
-
-        nodes = [n for n in snap.nodes if n.id in visited]
-        links = [
-            edge
-            for edge in snap.links
-            if edge.source in visited and edge.target in visited
-        ]
-        return SimulatorGraphSnapshot(
-            equivalent=snap.equivalent,
-            generated_at=snap.generated_at,
-            nodes=nodes,
-            links=links,
-            palette=snap.palette,
-            limits=snap.limits,
+    async def build_ego_snapshot(
+        self,
+        *,
+        run_id: str,
+        equivalent: str,
+        pid: str,
+        depth: int,
+        session=None,
+    ) -> SimulatorGraphSnapshot:
+        entry = await self.cached_ego_snapshot(
+            run_id=run_id, equivalent=equivalent, pid=pid, depth=depth, session=session
         )
+        return entry.value
 
     async def _heartbeat_loop(self, run_id: str) -> None:
         try:
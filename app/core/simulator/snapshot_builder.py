@@ -22,6 +22,7 @@ from app.schemas.simulator import (
     SimulatorGraphSnapshot,
     SimulatorVizSize,
 )
+from app.utils import snapshot_cache
 from app.utils.exceptions import NotFoundException
 
 
@@ -69,6 +70,95 @@ class SnapshotBuilder:
             return snap
         return await self._enrich_snapshot_from_db(snap, equivalent=equivalent, session=session)
 
+    def _snapshot_version(self, run: RunRecord, scenario: dict[str, Any], equivalent: str) -> tuple:
+        # Inject and trust drift mutate the run's scenario in place and then invalidate
+        # routing for the touched equivalents, which moves the ledger version; the sizes
+        # catch topology changes of runs that never touch the DB.
+        real = run.mode == "real" and self._db_enabled()
+        return (
+            run.mode,
+            snapshot_cache.ledger_version(equivalent) if real else None,
+            id(scenario),
+            len(scenario.get("participants") or ()),
+            len(scenario.get("trustlines") or ()),
+        )
+
+    async def cached_graph_snapshot(
+        self,
+        *,
+        run_id: str,
+        equivalent: str,
+        session=None,
+    ) -> snapshot_cache.CachedSnapshot:
+        """`build_graph_snapshot` through the snapshot cache; the value must not be mutated."""
+
+        run = self._get_run(run_id)
+        scenario = getattr(run, "_scenario_raw", None) or self._get_scenario(run.scenario_id).raw
+        key = ("simulator_graph", run_id, str(equivalent or "").strip().upper())
+        version = self._snapshot_version(run, scenario, equivalent)
+        entry = snapshot_cache.get_snapshot(key, version=version)
+        if entry is not None:
+            return entry
+
+        async with db_session.primary_session_for(session) as source:
+            snap = await self.build_graph_snapshot(run_id=run_id, equivalent=equivalent, session=source)
+        return snapshot_cache.store_snapshot(key, _snapshot_entry(snap, version=version))
+
+    async def cached_ego_snapshot(
+        self,
+        *,
+        run_id: str,
+        equivalent: str,
+        pid: str,
+        depth: int,
+        session=None,
+    ) -> snapshot_cache.CachedSnapshot:
+        """Ego view cut from the cached run snapshot through its adjacency index."""
+
+        entry = await self.cached_graph_snapshot(run_id=run_id, equivalent=equivalent, session=session)
+        if depth <= 0:
+            return entry
+        snap: SimulatorGraphSnapshot = entry.value
+
+        def _adjacency() -> dict[str, set[str]]:
+            neighbors: dict[str, set[str]] = {}
+            for link in snap.links:
+                neighbors.setdefault(link.source, set()).add(link.target)
+                neighbors.setdefault(link.target, set()).add(link.source)
+            return neighbors
+
+        def _slice() -> snapshot_cache.CachedSnapshot:
+            neighbors = entry.derive("adjacency", _adjacency)
+
+            # Undirected BFS on links.
+            visited: set[str] = {pid}
+            frontier: set[str] = {pid}
+            for _ in range(depth):
+                nxt: set[str] = set()
+                for cur in frontier:
+                    nxt |= neighbors.get(cur, set())
+                nxt -= visited
+                if not nxt:
+                    break
+                visited |= nxt
+                frontier = nxt
+
+            ego = SimulatorGraphSnapshot(
+                equivalent=snap.equivalent,
+                generated_at=snap.generated_at,
+                nodes=[n for n in snap.nodes if n.id in visited],
+                links=[
+                    edge
+                    for edge in snap.links
+                    if edge.source in visited and edge.target in visited
+                ],
+                palette=snap.palette,
+                limits=snap.limits,
+            )
+            return _snapshot_entry(ego)
+
+        return entry.derive(("ego", pid, int(depth)), _slice)
+
     async def _enrich_snapshot_from_db(
         self,
         snap: SimulatorGraphSnapshot,
@@ -328,6 +418,17 @@ class SnapshotBuilder:
         return await self._enrich_snapshot_from_db(snap, equivalent=equivalent, session=session)
 
 
+def _snapshot_entry(snap: SimulatorGraphSnapshot, *, version=None) -> snapshot_cache.CachedSnapshot:
+    # `generated_at` is left out of the ETag so uncached rebuilds of an unchanged graph
+    # still validate.
+    return snapshot_cache.make_snapshot(
+        snap,
+        snap.model_dump_json(by_alias=True).encode("utf-8"),
+        version=version,
+        etag_body=snap.model_dump_json(by_alias=True, exclude={"generated_at"}).encode("utf-8"),
+    )
+
+
 def scenario_to_snapshot(raw: dict[str, Any], *, equivalent: str, utc_now) -> SimulatorGraphSnapshot:
     participants = raw.get("participants") or []
     trustlines = raw.get("trustlines") or []
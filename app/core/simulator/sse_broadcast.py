@@ -4,7 +4,7 @@ import asyncio
 import logging
 import time
 import threading
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Collection, Optional
 
 from app.core.simulator.models import RunRecord, _Subscription
 from app.core.simulator.runtime_utils import safe_int_env as _safe_int_env
@@ -26,6 +26,11 @@ class SseReplayUnavailable(Exception):
 SSE_SUBSCRIPTION_CLOSED_TYPE = "__subscription_closed__"
 
 
+def _resolve_waiter(fut: asyncio.Future[None]) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
 class SseBroadcast:
     def __init__(
         self,
@@ -59,6 +64,12 @@ class SseBroadcast:
             "SIMULATOR_SSE_MAX_CONNECTIONS_PER_RUN", 10
         )
 
+        # Long-poll waiters per run. Each is resolved by the next dispatch and then
+        # rescans the replay buffer; no subscription queue is created per poll.
+        self._poll_waiters: dict[
+            str, list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]]
+        ] = {}
+
     def _count_total_subs_locked(self) -> int:
         """Counts subscriptions across all runs.
 
@@ -135,10 +146,11 @@ class SseBroadcast:
         self,
         *,
         run: RunRecord,
-        equivalent: str,
+        equivalent: str | Collection[str],
         after_event_id: str,
     ) -> list[dict[str, Any]]:
         """Return a validated replay snapshot while the caller holds ``_lock``."""
+        wanted = {equivalent} if isinstance(equivalent, str) else equivalent
         after_seq = self.event_seq_from_event_id(
             run_id=run.run_id, event_id=after_event_id
         )
@@ -166,7 +178,7 @@ class SseBroadcast:
             if seq is None or seq <= after_seq:
                 continue
             event_type = str(payload.get("type") or "")
-            if event_type != "run_status" and event_equivalent != equivalent:
+            if event_type != "run_status" and event_equivalent not in wanted:
                 continue
             out.append(payload)
         return out
@@ -195,10 +207,20 @@ class SseBroadcast:
                 break
         sub.queue.put_nowait({"type": SSE_SUBSCRIPTION_CLOSED_TYPE, "reason": reason})
 
+    def _wake_pollers_locked(self, run_id: str) -> None:
+        # Producers may run off the event loop thread, hence call_soon_threadsafe.
+        for loop, fut in self._poll_waiters.pop(run_id, ()):
+            try:
+                loop.call_soon_threadsafe(_resolve_waiter, fut)
+            except RuntimeError:
+                # Loop already closed: its poller is gone too.
+                pass
+
     def _dispatch_locked(self, *, run: RunRecord, payload: dict[str, Any]) -> None:
         event_type = str(payload.get("type") or "")
         event_equivalent = str(payload.get("equivalent") or "")
         self._append_to_event_buffer_locked(run=run, payload=payload)
+        self._wake_pollers_locked(run.run_id)
 
         for sub in list(run._subs):
             if sub.closed:
@@ -397,6 +419,71 @@ class SseBroadcast:
             sub.replay_bootstrap_pending = False
             return tail
 
+    def event_cursor(self, run_id: str) -> Optional[str]:
+        """Id of the newest event allocated for the run (a cursor at its head)."""
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            return f"evt_{run.run_id}_{int(run._event_seq):06d}"
+
+    async def poll_events(
+        self,
+        run_id: str,
+        *,
+        equivalent: str | Collection[str],
+        after_event_id: Optional[str],
+        types: Optional[set[str]] = None,
+        limit: int,
+        timeout_sec: float,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """Long-poll the replay buffer for events after `after_event_id`.
+
+        Returns as soon as at least one retained event matches `equivalent` (one code or
+        a collection) and `types` (run_status events match every equivalent), or with no events once `timeout_sec`
+        passes. `after_event_id=None` starts at the current head of the run.
+
+        The second item is the cursor for the next poll: the last returned event when
+        the batch was cut at `limit`, otherwise the newest event scanned (so filtered-out
+        events are not rescanned). Raises `SseReplayUnavailable` when the cursor is no
+        longer retained, as for an SSE reconnect.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, float(timeout_sec))
+        limit = max(1, int(limit))
+        cursor = after_event_id
+        while True:
+            with self._lock:
+                run = self._runs.get(run_id)
+                if run is None:
+                    return [], cursor
+                head = f"evt_{run.run_id}_{int(run._event_seq):06d}"
+                if cursor is None:
+                    cursor = head
+                events = self._replay_events_locked(
+                    run=run, equivalent=equivalent, after_event_id=cursor
+                )
+                if types:
+                    events = [e for e in events if str(e.get("type") or "") in types]
+                if len(events) > limit:
+                    events = events[:limit]
+                    return events, str(events[-1]["event_id"])
+                cursor = head
+                remaining = deadline - loop.time()
+                if events or remaining <= 0:
+                    return events, cursor
+                waiter = (loop, loop.create_future())
+                self._poll_waiters.setdefault(run_id, []).append(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    waiters = self._poll_waiters.get(run_id)
+                    if waiters and waiter in waiters:
+                        waiters.remove(waiter)
+
     async def unsubscribe(self, run_id: str, sub: _Subscription) -> None:
         """Removes a previously created subscription (best-effort)."""
         with self._lock:
@@ -0,0 +1,216 @@
+"""Parameter sweeps over turbo simulation runs.
+
+A sweep expands a grid (intensity x clearing policy x trust drift x seed) into independent
+turbo runs, fans them out over a process pool and folds the per-tick metric series into a
+single comparison report. Runs share nothing: each worker builds its own in-memory ledger
+from the scenario, so results do not depend on the pool size or on completion order.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Mapping
+
+from app.core.simulator.adaptive_clearing_policy import AdaptiveClearingPolicyConfig
+from app.core.simulator.models import TrustDriftConfig
+from app.core.simulator.turbo_engine import TurboConfig, run_turbo
+
+
+@dataclass(frozen=True)
+class SweepGrid:
+    """Axes of a sweep. Labels name the variants in the report.
+
+    A clearing policy of None means the static cadence of `base.clearing_every_n_ticks`;
+    a trust drift of None means the scenario's own `settings.trust_drift`.
+    """
+
+    base: TurboConfig
+    intensities: tuple[int, ...] = (50,)
+    seeds: tuple[int, ...] = (0,)
+    clearing_policies: Mapping[str, AdaptiveClearingPolicyConfig | None] = field(
+        default_factory=lambda: {"static": None}
+    )
+    trust_drifts: Mapping[str, TrustDriftConfig | None] = field(
+        default_factory=lambda: {"scenario": None}
+    )
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    intensity_percent: int
+    clearing: str
+    trust_drift: str
+    seed: int
+    config: TurboConfig
+
+    @property
+    def group(self) -> tuple[int, str, str]:
+        """Variant key: the same point across all seeds."""
+        return (self.intensity_percent, self.clearing, self.trust_drift)
+
+
+@dataclass
+class SweepRunSummary:
+    point: SweepPoint
+    totals: dict[str, Any]
+    # Per tick, summed over equivalents.
+    committed: list[int]
+    rejected: list[int]
+    clearing_volume: list[float]
+    total_debt: list[float]
+
+
+def expand_grid(grid: SweepGrid) -> list[SweepPoint]:
+    points: list[SweepPoint] = []
+    for intensity, (clearing, adaptive), (drift_label, drift), seed in itertools.product(
+        grid.intensities,
+        grid.clearing_policies.items(),
+        grid.trust_drifts.items(),
+        grid.seeds,
+    ):
+        config = replace(
+            grid.base,
+            intensity_percent=int(intensity),
+            seed=int(seed),
+            clearing_policy="adaptive" if adaptive is not None else "static",
+            adaptive_config=adaptive,
+            trust_drift=drift,
+            # Sweeps compare aggregates; per-event detail would only bloat the pipe.
+            collect_events=False,
+        )
+        points.append(
+            SweepPoint(
+                intensity_percent=int(intensity),
+                clearing=str(clearing),
+                trust_drift=str(drift_label),
+                seed=int(seed),
+                config=config,
+            )
+        )
+    return points
+
+
+def _summarize(point: SweepPoint, scenario: dict[str, Any]) -> SweepRunSummary:
+    result = run_turbo(scenario, point.config)
+    totals = result.totals()
+    totals["clearing_volume"] = float(totals["clearing_volume"])
+    totals["total_debt"] = float(totals["total_debt"])
+    return SweepRunSummary(
+        point=point,
+        totals=totals,
+        committed=[t.committed for t in result.ticks],
+        rejected=[t.rejected for t in result.ticks],
+        clearing_volume=[float(sum(t.clearing_volume.values())) for t in result.ticks],
+        total_debt=[float(sum(t.total_debt.values())) for t in result.ticks],
+    )
+
+
+# Set once per worker process so the scenario is pickled per worker, not per run.
+_worker_scenario: dict[str, Any] | None = None
+
+
+def _init_worker(scenario: dict[str, Any]) -> None:
+    global _worker_scenario
+    _worker_scenario = scenario
+
+
+def _run_in_worker(point: SweepPoint) -> SweepRunSummary:
+    assert _worker_scenario is not None
+    return _summarize(point, _worker_scenario)
+
+
+def run_sweep(
+    scenario: dict[str, Any], grid: SweepGrid, *, workers: int | None = None
+) -> "SweepReport":
+    """Run every grid point; `workers` <= 1 runs inline (no pool), None uses all cores."""
+
+    points = expand_grid(grid)
+    n_workers = int(workers) if workers is not None else (os.cpu_count() or 1)
+    n_workers = max(1, min(n_workers, len(points) or 1))
+
+    if n_workers == 1:
+        runs = [_summarize(point, scenario) for point in points]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_workers, initializer=_init_worker, initargs=(scenario,)
+        ) as pool:
+            # map() yields in submission order, so the report is stable across pool sizes.
+            runs = list(pool.map(_run_in_worker, points))
+    return SweepReport(scenario_id=str(scenario.get("scenario_id") or ""), runs=runs)
+
+
+def _spread(values: list[float]) -> dict[str, float]:
+    return {
+        "mean": statistics.fmean(values) if values else 0.0,
+        "min": min(values, default=0.0),
+        "max": max(values, default=0.0),
+    }
+
+
+def _mean_series(series: list[list[float]]) -> list[float]:
+    return [statistics.fmean(column) for column in zip(*series)] if series else []
+
+
+def _sum_codes(runs: list[SweepRunSummary]) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for run in runs:
+        for code, n in (run.totals.get("rejection_codes") or {}).items():
+            out[code] = out.get(code, 0) + int(n)
+    return dict(sorted(out.items()))
+
+
+@dataclass
+class SweepReport:
+    scenario_id: str
+    runs: list[SweepRunSummary]
+
+    def variants(self) -> list[dict[str, Any]]:
+        """One row per variant, aggregated across seeds, best success rate first."""
+
+        groups: dict[tuple[int, str, str], list[SweepRunSummary]] = {}
+        for run in self.runs:
+            groups.setdefault(run.point.group, []).append(run)
+
+        rows: list[dict[str, Any]] = []
+        for (intensity, clearing, drift), runs in groups.items():
+            rows.append(
+                {
+                    "intensity_percent": intensity,
+                    "clearing": clearing,
+                    "trust_drift": drift,
+                    "seeds": [r.point.seed for r in runs],
+                    "success_rate": _spread([r.totals["success_rate"] for r in runs]),
+                    "clearing_volume": _spread([r.totals["clearing_volume"] for r in runs]),
+                    "final_total_debt": _spread([r.totals["total_debt"] for r in runs]),
+                    "trust_drift_updates": _spread(
+                        [float(r.totals["trust_drift_updates"]) for r in runs]
+                    ),
+                    "rejection_codes": _sum_codes(runs),
+                    "series": {
+                        "committed": _mean_series([[float(x) for x in r.committed] for r in runs]),
+                        "rejected": _mean_series([[float(x) for x in r.rejected] for r in runs]),
+                        "clearing_volume": _mean_series([r.clearing_volume for r in runs]),
+                        "total_debt": _mean_series([r.total_debt for r in runs]),
+                    },
+                }
+            )
+        rows.sort(
+            key=lambda row: (
+                -row["success_rate"]["mean"],
+                row["intensity_percent"],
+                row["clearing"],
+                row["trust_drift"],
+            )
+        )
+        return rows
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scenario_id": self.scenario_id,
+            "runs": len(self.runs),
+            "variants": self.variants(),
+        }
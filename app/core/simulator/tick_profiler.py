@@ -0,0 +1,167 @@
+"""Per-phase profiling of real-mode simulator ticks.
+
+A `TickProfiler` is created per tick; the orchestrator wraps each phase in
+`profiler.phase(name)`. Per phase we record wall time, SQL statements issued and rows
+read. Phases nest (planning runs inside payments, edge patches inside trust drift):
+wall time is inclusive, statements and rows go to the innermost open phase only.
+
+Each phase is a `StatementTally` (app.db.instrumentation), so SQL is counted by the
+shared cursor listeners. Tasks spawned inside a phase inherit it, so concurrent payment
+workers are attributed to the phase that spawned them.
+
+Finished profiles are exported as Prometheus histograms and kept on the run record for
+`GET /simulator/admin/runs/{run_id}/tick-profiles` (JSON or folded stacks for
+flamegraph tools).
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+
+from app.config import settings
+from app.db.instrumentation import StatementTally, current_tally, enter_tally, exit_tally
+from app.utils.metrics import (
+    SIMULATOR_TICK_PHASE_ROWS,
+    SIMULATOR_TICK_PHASE_SECONDS,
+    SIMULATOR_TICK_PHASE_STATEMENTS,
+)
+
+ROOT_PHASE = "tick"
+
+
+@dataclass(kw_only=True)
+class PhaseStats(StatementTally):
+    name: str
+    # Semicolon-joined stack from the root, e.g. "tick;payments;planning".
+    path: str
+    calls: int = 0
+    wall_ms: float = 0.0
+
+
+class TickProfiler:
+    def __init__(self, *, run_id: str, tick_index: int) -> None:
+        self.run_id = str(run_id)
+        self.tick_index = int(tick_index)
+        self._phases: dict[str, PhaseStats] = {}
+        self._order: list[str] = []
+        self._root_t0: float | None = None
+        self._root_token: Any = None
+
+    def start(self) -> None:
+        """Open the root phase; statements outside any named phase are counted there."""
+
+        root = PhaseStats(name=ROOT_PHASE, path=ROOT_PHASE)
+        self._phases[ROOT_PHASE] = root
+        self._order.insert(0, ROOT_PHASE)
+        self._root_token = enter_tally(root)
+        self._root_t0 = time.perf_counter()
+
+    def finish(self) -> dict[str, Any]:
+        """Close the root phase (same task as `start`) and return the profile."""
+
+        root = self._phases.get(ROOT_PHASE)
+        if root is not None and self._root_t0 is not None:
+            root.wall_ms = (time.perf_counter() - self._root_t0) * 1000.0
+            root.calls = 1
+            self._root_t0 = None
+            exit_tally(self._root_token)
+        return self.to_dict()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        """Attribute wall time and SQL to `name` until the block exits.
+
+        Re-entering a phase at the same stack position accumulates into one entry
+        (e.g. edge patches built once per touched equivalent).
+        """
+
+        parent = current_tally()
+        if isinstance(parent, PhaseStats) and self._phases.get(parent.path) is parent:
+            path = f"{parent.path};{name}"
+        else:
+            path = name
+        stats = self._phases.get(path)
+        if stats is None:
+            stats = PhaseStats(name=name, path=path)
+            self._phases[path] = stats
+            self._order.append(path)
+
+        token = enter_tally(stats)
+        t0 = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.wall_ms += (time.perf_counter() - t0) * 1000.0
+            stats.calls += 1
+            exit_tally(token)
+
+    def to_dict(self) -> dict[str, Any]:
+        phases: list[dict[str, Any]] = []
+        for path in self._order:
+            stats = self._phases[path]
+            children_ms = sum(
+                child.wall_ms
+                for child_path, child in self._phases.items()
+                if child_path.rpartition(";")[0] == path
+            )
+            phases.append(
+                {
+                    "phase": stats.name,
+                    "path": stats.path,
+                    "calls": stats.calls,
+                    "wall_ms": round(stats.wall_ms, 3),
+                    "self_ms": round(max(0.0, stats.wall_ms - children_ms), 3),
+                    "statements": stats.statements,
+                    "rows": stats.rows,
+                    "db_ms": round(stats.db_ms, 3),
+                }
+            )
+        root = self._phases.get(ROOT_PHASE)
+        return {
+            "run_id": self.run_id,
+            "tick_index": self.tick_index,
+            "wall_ms": round(root.wall_ms, 3) if root is not None else None,
+            "statements": sum(s.statements for s in self._phases.values()),
+            "rows": sum(s.rows for s in self._phases.values()),
+            "phases": phases,
+        }
+
+    def observe(self) -> None:
+        for stats in self._phases.values():
+            SIMULATOR_TICK_PHASE_SECONDS.labels(phase=stats.name).observe(stats.wall_ms / 1000.0)
+            SIMULATOR_TICK_PHASE_STATEMENTS.labels(phase=stats.name).observe(stats.statements)
+            SIMULATOR_TICK_PHASE_ROWS.labels(phase=stats.name).observe(stats.rows)
+
+
+def record_tick_profile(run: Any, profile: dict[str, Any]) -> None:
+    """Append to the run's bounded profile history (caller holds the runner lock)."""
+
+    limit = int(getattr(settings, "SIMULATOR_TICK_PROFILE_HISTORY", 100) or 0)
+    history = run._tick_profiles
+    if limit <= 0:
+        history.clear()
+        return
+    history.append(profile)
+    while len(history) > limit:
+        history.popleft()
+
+
+def folded_stacks(profiles: Iterable[dict[str, Any]]) -> str:
+    """Render profiles as folded stacks ("tick;payments;planning <self µs>").
+
+    Self time is summed per stack over all given ticks; the output feeds
+    flamegraph.pl, speedscope or inferno as-is.
+    """
+
+    totals: dict[str, int] = {}
+    for profile in profiles:
+        for phase in profile.get("phases") or []:
+            path = str(phase.get("path") or "")
+            if not path:
+                continue
+            micros = int(round(float(phase.get("self_ms") or 0.0) * 1000.0))
+            totals[path] = totals.get(path, 0) + micros
+    return "".join(f"{path} {micros}\n" for path, micros in totals.items() if micros > 0)
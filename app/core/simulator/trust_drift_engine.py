@@ -87,6 +87,49 @@ def broadcast_trust_drift_changed(
         )
 
 
+def grown_limit(
+    *, current_limit: Decimal, original_limit: Decimal, cfg: TrustDriftConfig
+) -> Decimal:
+    """Limit after one clearing through the edge, capped at ``original * max_growth``."""
+
+    rate_mult = (Decimal("1") + Decimal(str(cfg.growth_rate))).quantize(
+        Decimal("0.0000001")
+    )
+    max_growth = Decimal(str(cfg.max_growth))
+    return min(
+        (current_limit * rate_mult),
+        (original_limit * max_growth),
+    ).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
+
+
+def decayed_limit(
+    *,
+    current_limit: Decimal,
+    original_limit: Decimal,
+    debt_amount: Decimal,
+    cfg: TrustDriftConfig,
+) -> Decimal:
+    """Limit of an overloaded edge after one tick of decay.
+
+    The caller decides whether the edge is overloaded; this only computes the new value.
+    """
+
+    decay_mult = Decimal(str(1 - cfg.decay_rate))
+    min_ratio = Decimal(str(cfg.min_limit_ratio))
+
+    # Guardrail: trust drift must never shrink limit below already-used debt,
+    # otherwise we can create a TRUST_LIMIT_VIOLATION without any new payment.
+    try:
+        debt_floor = Decimal(str(debt_amount)).quantize(Decimal("0.01"), rounding=ROUND_UP)
+    except Exception:
+        debt_floor = Decimal("0")
+    return max(
+        (current_limit * decay_mult),
+        (original_limit * min_ratio),
+        debt_floor,
+    ).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
+
+
 class TrustDriftEngine:
     def __init__(
         self,
@@ -130,7 +173,7 @@ class TrustDriftEngine:
                     break
 
         for equivalent in result.touched_equivalents:
-            PaymentRouter._graph_cache.pop(str(equivalent).strip().upper(), None)
+            PaymentRouter.invalidate_cache(str(equivalent).strip().upper())
 
     def init_trust_drift(self, run: RunRecord, scenario: dict[str, Any]) -> None:
         """Initialize trust drift config and edge clearing history from scenario."""
@@ -270,14 +313,9 @@ class TrustDriftEngine:
             except Exception:
                 continue
 
-            rate_mult = (Decimal("1") + Decimal(str(cfg.growth_rate))).quantize(
-                Decimal("0.0000001")
+            new_limit = grown_limit(
+                current_limit=current_limit, original_limit=original_limit, cfg=cfg
             )
-            max_growth = Decimal(str(cfg.max_growth))
-            new_limit = min(
-                (current_limit * rate_mult),
-                (original_limit * max_growth),
-            ).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
 
             if new_limit != current_limit:
                 await clearing_session.execute(
@@ -399,10 +437,6 @@ class TrustDriftEngine:
             if ratio < Decimal(str(cfg.overload_threshold)):
                 continue
 
-            # Calculate new limit
-            decay_mult = Decimal(str(1 - cfg.decay_rate))
-            min_ratio = Decimal(str(cfg.min_limit_ratio))
-
             try:
                 original_limit = Decimal(str(hist.original_limit)).quantize(
                     Decimal("0.01"), rounding=ROUND_DOWN
@@ -410,20 +444,12 @@ class TrustDriftEngine:
             except Exception:
                 continue
 
-            # Guardrail: trust drift must never shrink limit below already-used debt,
-            # otherwise we can create a TRUST_LIMIT_VIOLATION without any new payment.
-            try:
-                debt_floor = Decimal(str(debt_amount)).quantize(
-                    Decimal("0.01"), rounding=ROUND_UP
-                )
-            except Exception:
-                debt_floor = Decimal("0")
-            new_limit = max(
-                (current_limit * decay_mult),
-                (original_limit * min_ratio),
-                debt_floor,
-            ).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
-
+            new_limit = decayed_limit(
+                current_limit=current_limit,
+                original_limit=original_limit,
+                debt_amount=debt_amount,
+                cfg=cfg,
+            )
             if new_limit == current_limit:
                 continue
 
@@ -0,0 +1,713 @@
+"""DB-free ("turbo") real-mode simulation for offline what-if runs.
+
+Runs the real-mode tick loop against an in-memory ledger instead of SQLAlchemy sessions:
+
+- payments are planned by the same `RealPaymentPlanner` (same seed -> same actions);
+- routing uses `PaymentRouter.find_flow_routes` over a graph kept in sync with the ledger,
+  with the capacity formula of `PaymentRouter._build_graph_impl`;
+- applying a route follows `PaymentEngine._apply_flow`: reduce the reverse debt first,
+  the remainder becomes new debt;
+- clearing closes debt cycles (shortest first, `auto_clearing` policy honoured) on the
+  static cadence or through `AdaptiveClearingPolicy`;
+- trust drift uses the `grown_limit` / `decayed_limit` rules of `TrustDriftEngine`.
+
+There are no prepare locks, no concurrency and no integrity checkpoints, so a thousand
+ticks of a 100-participant scenario take seconds. Results are metric series per tick plus
+the end-state ledger, which `persist_end_state` can optionally write to a database.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_DOWN
+from typing import Any, Iterator, Literal
+
+from pydantic import BaseModel
+
+from sqlalchemy import delete, select, update
+
+from app.core.clearing.service import ClearingService
+from app.core.payments.router import PaymentRouter
+from app.core.simulator.adaptive_clearing_policy import (
+    AdaptiveClearingPolicy,
+    AdaptiveClearingPolicyConfig,
+    AdaptiveClearingState,
+    TickSignals,
+)
+from app.core.simulator.models import EdgeClearingHistory, TrustDriftConfig
+from app.core.simulator.real_payment_action import _RealPaymentAction
+from app.core.simulator.real_payment_planner import RealPaymentPlanner
+from app.core.simulator.real_scenario_seeder import RealScenarioSeeder
+from app.core.simulator.scenario_equivalent import effective_equivalent
+from app.core.simulator.trust_drift_engine import decayed_limit, grown_limit
+from app.db.models.debt import Debt
+from app.db.models.equivalent import Equivalent
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+from app.schemas.simulator import (
+    SimulatorClearingDoneEvent,
+    SimulatorTopologyChangedEvent,
+    SimulatorTxFailedEvent,
+    SimulatorTxUpdatedEvent,
+    TopologyChangedPayload,
+)
+from app.utils.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+_ZERO = Decimal("0")
+_CENT = Decimal("0.01")
+
+# Same cap as one real-mode clearing pass (ClearingService ranks at most 100 cycles).
+_MAX_CYCLES_PER_CLEARING = 100
+
+# Event timestamps are simulated time from this origin, so runs stay reproducible.
+_SIM_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class TurboConfig:
+    """Run parameters; defaults mirror the real-mode runtime defaults."""
+
+    ticks: int
+    seed: int = 0
+    intensity_percent: int = 50
+    tick_ms: int = 1000
+    actions_per_tick_max: int = 20
+    amount_cap_limit: Decimal | None = None
+    clearing_policy: Literal["static", "adaptive"] = "static"
+    clearing_every_n_ticks: int = 25
+    clearing_max_depth: int = 6
+    adaptive_config: AdaptiveClearingPolicyConfig | None = None
+    max_hops: int = 6
+    max_paths: int = 3
+    # Generous: a wall-clock timeout would make results depend on machine load.
+    routing_timeout_ms: int = 1000
+    # None = take `settings.trust_drift` from the scenario, like real mode.
+    trust_drift: TrustDriftConfig | None = None
+    collect_events: bool = False
+
+
+@dataclass
+class TurboTickMetrics:
+    tick_index: int
+    attempted: int = 0
+    committed: int = 0
+    rejected: int = 0
+    rejection_codes: dict[str, int] = field(default_factory=dict)
+    # Per equivalent, with the metric names of `RealTickMetrics`.
+    avg_route_length: dict[str, float] = field(default_factory=dict)
+    total_debt: dict[str, Decimal] = field(default_factory=dict)
+    clearing_volume: dict[str, Decimal] = field(default_factory=dict)
+    active_trustlines: dict[str, int] = field(default_factory=dict)
+    trust_drift_updates: int = 0
+
+
+@dataclass
+class TurboRunResult:
+    scenario: dict[str, Any]
+    config: TurboConfig
+    ticks: list[TurboTickMetrics]
+    debts: dict[tuple[str, str, str], Decimal]
+    limits: dict[tuple[str, str, str], Decimal]
+    events: list[dict[str, Any]]
+    elapsed_ms: float
+
+    def totals(self) -> dict[str, Any]:
+        codes: dict[str, int] = {}
+        for t in self.ticks:
+            for code, n in t.rejection_codes.items():
+                codes[code] = codes.get(code, 0) + n
+        committed = sum(t.committed for t in self.ticks)
+        attempted = sum(t.attempted for t in self.ticks)
+        return {
+            "ticks": len(self.ticks),
+            "attempted": attempted,
+            "committed": committed,
+            "rejected": sum(t.rejected for t in self.ticks),
+            "success_rate": (committed / attempted) if attempted else 0.0,
+            "rejection_codes": codes,
+            "clearing_volume": sum(
+                (v for t in self.ticks for v in t.clearing_volume.values()), _ZERO
+            ),
+            "total_debt": sum(self.debts.values(), _ZERO),
+            "trust_drift_updates": sum(t.trust_drift_updates for t in self.ticks),
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+@dataclass
+class _TurboRun:
+    """The subset of `RunRecord` read by the planner and the trust drift rules."""
+
+    run_id: str
+    seed: int
+    intensity_percent: int
+    tick_index: int = 0
+    sim_time_ms: int = 0
+    _edge_clearing_history: dict[str, EdgeClearingHistory] = field(default_factory=dict)
+    _trust_drift_config: TrustDriftConfig | None = None
+
+
+@dataclass
+class _Line:
+    limit: Decimal
+    can_be_intermediate: bool
+    blocked: set[str]
+    auto_clearing: bool
+    raw: dict[str, Any]
+
+
+class InMemoryLedger:
+    """Active trustlines and debts of one scenario, with a live routing graph per equivalent."""
+
+    def __init__(self, scenario: dict[str, Any]) -> None:
+        self.pids: list[str] = sorted(
+            {str(p.get("id") or "").strip() for p in (scenario.get("participants") or [])}
+            - {""}
+        )
+        # (creditor, debtor) -> line, per equivalent.
+        self.lines: dict[str, dict[tuple[str, str], _Line]] = {}
+        # (debtor, creditor) -> amount > 0, per equivalent.
+        self.debts: dict[str, dict[tuple[str, str], Decimal]] = {}
+        self.routers: dict[str, PaymentRouter] = {}
+
+        for tl in scenario.get("trustlines") or []:
+            eq = str(effective_equivalent(scenario, tl) or "").strip().upper()
+            creditor = str(tl.get("from") or "").strip()
+            debtor = str(tl.get("to") or "").strip()
+            status = str(tl.get("status") or "active").strip().lower()
+            if not eq or not creditor or not debtor or status != "active":
+                continue
+            try:
+                limit = Decimal(str(tl.get("limit", 0)))
+            except Exception:
+                continue
+            if limit < 0:
+                continue
+
+            # Policy flags as `_build_graph_impl` and `ClearingService` read them.
+            policy = tl.get("policy") if isinstance(tl.get("policy"), dict) else {}
+            can_be_intermediate = bool(policy.get("can_be_intermediate", True))
+            try:
+                if int(policy.get("max_hop_usage", 1)) == 0:
+                    can_be_intermediate = False
+            except Exception:
+                pass
+            bp = policy.get("blocked_participants")
+            blocked = {str(x) for x in bp if isinstance(x, str) and x} if isinstance(bp, list) else set()
+
+            self.lines.setdefault(eq, {})[(creditor, debtor)] = _Line(
+                limit=limit,
+                can_be_intermediate=can_be_intermediate,
+                blocked=blocked,
+                auto_clearing=ClearingService._policy_flag(policy, "auto_clearing", default=True),
+                raw=tl,
+            )
+
+        for eq, lines in self.lines.items():
+            self.debts[eq] = {}
+            router = PaymentRouter.in_memory()
+            router.graph = {pid: {} for pid in self.pids}
+            for creditor, debtor in lines:
+                router.topology_adj.setdefault(debtor, set()).add(creditor)
+            self.routers[eq] = router
+            for creditor, debtor in lines:
+                self._refresh_edge(eq, debtor, creditor)
+
+    @property
+    def equivalents(self) -> list[str]:
+        return sorted(self.lines)
+
+    def debt(self, eq: str, debtor: str, creditor: str) -> Decimal:
+        return self.debts.get(eq, {}).get((debtor, creditor), _ZERO)
+
+    def debt_snapshot(self) -> dict[tuple[str, str, str], Decimal]:
+        return {
+            (debtor, creditor, eq): amount
+            for eq, debts in self.debts.items()
+            for (debtor, creditor), amount in debts.items()
+        }
+
+    def total_debt(self, eq: str) -> Decimal:
+        return sum(self.debts.get(eq, {}).values(), _ZERO)
+
+    def _refresh_edge(self, eq: str, debtor: str, creditor: str) -> None:
+        """Recompute routing capacity debtor -> creditor (payment direction)."""
+
+        router = self.routers[eq]
+        line = self.lines[eq].get((creditor, debtor))
+        targets = router.graph.setdefault(debtor, {})
+        if line is None:
+            targets.pop(creditor, None)
+            return
+        cap = line.limit - self.debt(eq, debtor, creditor) + self.debt(eq, creditor, debtor)
+        if cap > 0:
+            targets[creditor] = cap
+            router._set_edge_policy(debtor, creditor, line.can_be_intermediate)
+            router._set_edge_blocked_participants(debtor, creditor, line.blocked)
+        else:
+            targets.pop(creditor, None)
+
+    def _set_debt(self, eq: str, debtor: str, creditor: str, amount: Decimal) -> None:
+        if amount > 0:
+            self.debts[eq][(debtor, creditor)] = amount
+        else:
+            self.debts[eq].pop((debtor, creditor), None)
+
+    def apply_flow(self, eq: str, u: str, v: str, amount: Decimal) -> None:
+        """u pays v: settle what v owes u first, the remainder becomes u's debt to v."""
+
+        reverse = self.debt(eq, v, u)
+        offset = min(reverse, amount)
+        self._set_debt(eq, v, u, reverse - offset)
+        if amount > offset:
+            self._set_debt(eq, u, v, self.debt(eq, u, v) + (amount - offset))
+        self._refresh_edge(eq, u, v)
+        self._refresh_edge(eq, v, u)
+
+    def set_limit(self, eq: str, creditor: str, debtor: str, limit: Decimal) -> None:
+        line = self.lines[eq][(creditor, debtor)]
+        line.limit = limit
+        # Keep the scenario in sync for the planner, as `apply_committed_effects` does.
+        line.raw["limit"] = float(limit)
+        self._refresh_edge(eq, debtor, creditor)
+
+    def _clearable(self, eq: str, debtor: str, creditor: str) -> bool:
+        line = self.lines[eq].get((creditor, debtor))
+        return line is not None and line.auto_clearing
+
+    def _cycles(self, eq: str, length: int) -> Iterator[list[str]]:
+        """Debt cycles with exactly `length` edges, rooted at their smallest PID."""
+
+        adj: dict[str, list[str]] = {}
+        for debtor, creditor in sorted(self.debts[eq]):
+            if self._clearable(eq, debtor, creditor):
+                adj.setdefault(debtor, []).append(creditor)
+
+        for start in sorted(adj):
+            stack: list[tuple[list[str], int]] = [([start], 0)]
+            while stack:
+                path, i = stack.pop()
+                nexts = adj.get(path[-1], [])
+                if i >= len(nexts):
+                    continue
+                stack.append((path, i + 1))
+                nxt = nexts[i]
+                if len(path) == length:
+                    if nxt == start:
+                        yield list(path)
+                    continue
+                if nxt > start and nxt not in path:
+                    stack.append((path + [nxt], 0))
+
+    def clear(
+        self, eq: str, *, max_depth: int
+    ) -> tuple[Decimal, int, dict[tuple[str, str], Decimal]]:
+        """Clear debt cycles, shortest first. Returns volume, cycles and per-edge amounts.
+
+        Edges in the per-edge map are keyed (creditor, debtor) like `touched_edges` in
+        the real clearing engine.
+        """
+
+        volume = _ZERO
+        cycles = 0
+        per_edge: dict[tuple[str, str], Decimal] = {}
+        for length in range(3, max(3, int(max_depth)) + 1):
+            for cycle in self._cycles(eq, length):
+                edges = list(zip(cycle, cycle[1:] + cycle[:1]))
+                # Earlier cycles in this pass may have drained a shared edge.
+                amount = min(self.debt(eq, d, c) for d, c in edges)
+                if amount <= 0:
+                    continue
+                for debtor, creditor in edges:
+                    self._set_debt(eq, debtor, creditor, self.debt(eq, debtor, creditor) - amount)
+                    key = (creditor, debtor)
+                    per_edge[key] = per_edge.get(key, _ZERO) + amount
+                for debtor, creditor in edges:
+                    self._refresh_edge(eq, debtor, creditor)
+                    self._refresh_edge(eq, creditor, debtor)
+                volume += amount
+                cycles += 1
+                if cycles >= _MAX_CYCLES_PER_CLEARING:
+                    return volume, cycles, per_edge
+        return volume, cycles, per_edge
+
+
+class TurboSimulation:
+    """One offline run of a scenario. Not thread-safe; create one per run."""
+
+    def __init__(self, scenario: dict[str, Any], config: TurboConfig) -> None:
+        # Trust drift rewrites limits in the scenario; never touch the caller's copy.
+        self.scenario = copy.deepcopy(scenario)
+        self.config = config
+        self.ledger = InMemoryLedger(self.scenario)
+        self.run = _TurboRun(
+            run_id=f"turbo-{uuid.uuid4().hex[:12]}",
+            seed=int(config.seed),
+            intensity_percent=int(config.intensity_percent),
+        )
+        self.events: list[dict[str, Any]] = []
+        self._event_seq = 0
+        self._planner = RealPaymentPlanner(
+            actions_per_tick_max=int(config.actions_per_tick_max),
+            amount_cap_limit=config.amount_cap_limit,
+            logger=logger,
+            action_factory=lambda seq, eq, sender_pid, receiver_pid, amount: _RealPaymentAction(
+                seq=int(seq),
+                equivalent=str(eq),
+                sender_pid=str(sender_pid),
+                receiver_pid=str(receiver_pid),
+                amount=str(amount),
+            ),
+        )
+        adaptive_config = config.adaptive_config or AdaptiveClearingPolicyConfig()
+        self._adaptive_policy = AdaptiveClearingPolicy(adaptive_config)
+        self._adaptive_state = AdaptiveClearingState(adaptive_config)
+        self._init_trust_drift()
+
+    def _init_trust_drift(self) -> None:
+        cfg = self.config.trust_drift or TrustDriftConfig.from_scenario(self.scenario)
+        self.run._trust_drift_config = cfg
+        for eq, lines in self.ledger.lines.items():
+            for (creditor, debtor), line in lines.items():
+                limit = line.limit.quantize(_CENT, rounding=ROUND_DOWN)
+                if limit > 0:
+                    self.run._edge_clearing_history[f"{creditor}:{debtor}:{eq}"] = (
+                        EdgeClearingHistory(original_limit=limit)
+                    )
+
+    def _emit(self, model: type[BaseModel], **fields: Any) -> None:
+        """Record an event in the real-mode SSE schema, with synthetic id and time."""
+
+        if not self.config.collect_events:
+            return
+        self._event_seq += 1
+        event = model(
+            event_id=f"evt_{self.run.run_id}_{self._event_seq:06d}",
+            ts=_SIM_EPOCH + timedelta(milliseconds=self.run.sim_time_ms),
+            tick_index=self.run.tick_index,
+            **fields,
+        )
+        self.events.append(event.model_dump(mode="json", by_alias=True))
+
+    def run_all(self) -> TurboRunResult:
+        started = time.perf_counter()
+        ticks = [self.step() for _ in range(max(0, int(self.config.ticks)))]
+        return TurboRunResult(
+            scenario=self.scenario,
+            config=self.config,
+            ticks=ticks,
+            debts=self.ledger.debt_snapshot(),
+            limits={
+                (creditor, debtor, eq): line.limit
+                for eq, lines in self.ledger.lines.items()
+                for (creditor, debtor), line in lines.items()
+            },
+            events=self.events,
+            elapsed_ms=(time.perf_counter() - started) * 1000.0,
+        )
+
+    def step(self) -> TurboTickMetrics:
+        run = self.run
+        run.tick_index += 1
+        run.sim_time_ms = run.tick_index * int(self.config.tick_ms)
+        tick = run.tick_index
+        metrics = TurboTickMetrics(tick_index=tick)
+
+        attempted_by_eq: dict[str, int] = {}
+        no_capacity_by_eq: dict[str, int] = {}
+        route_len: dict[str, tuple[int, int]] = {}
+
+        actions = self._planner.plan_payments(
+            run, self.scenario, debt_snapshot=self.ledger.debt_snapshot()
+        )
+        for action in actions:
+            eq = str(action.equivalent).strip().upper()
+            metrics.attempted += 1
+            attempted_by_eq[eq] = attempted_by_eq.get(eq, 0) + 1
+            routes, code = self._route(eq, action)
+            if code is not None:
+                metrics.rejected += 1
+                metrics.rejection_codes[code] = metrics.rejection_codes.get(code, 0) + 1
+                if code == "ROUTING_NO_CAPACITY":
+                    no_capacity_by_eq[eq] = no_capacity_by_eq.get(eq, 0) + 1
+                self._emit(
+                    SimulatorTxFailedEvent,
+                    type="tx.failed",
+                    equivalent=eq,
+                    from_=action.sender_pid,
+                    to=action.receiver_pid,
+                    amount=action.amount,
+                    error={
+                        "code": code,
+                        "message": code,
+                        "at": _SIM_EPOCH + timedelta(milliseconds=run.sim_time_ms),
+                    },
+                )
+                continue
+
+            for path, amount in routes:
+                for u, v in zip(path[:-1], path[1:]):
+                    self.ledger.apply_flow(eq, u, v, amount)
+            hops, n = route_len.get(eq, (0, 0))
+            route_len[eq] = (hops + sum(len(p) - 1 for p, _ in routes), n + len(routes))
+            metrics.committed += 1
+            self._emit(
+                SimulatorTxUpdatedEvent,
+                type="tx.updated",
+                equivalent=eq,
+                from_=action.sender_pid,
+                to=action.receiver_pid,
+                amount=action.amount,
+                amount_flyout=True,
+                edges=[
+                    {"from": u, "to": v}
+                    for path, _ in routes
+                    for u, v in zip(path[:-1], path[1:])
+                ],
+                routes=[{"path": p, "amount": str(a)} for p, a in routes],
+            )
+
+        for eq in self.ledger.equivalents:
+            volume, grown = self._maybe_clear(
+                eq,
+                tick,
+                attempted=attempted_by_eq.get(eq, 0),
+                rejected_no_capacity=no_capacity_by_eq.get(eq, 0),
+            )
+            metrics.clearing_volume[eq] = volume
+            metrics.trust_drift_updates += grown
+
+        metrics.trust_drift_updates += self._apply_decay(tick)
+
+        for eq in self.ledger.equivalents:
+            hops, n = route_len.get(eq, (0, 0))
+            # Same as RealTickMetrics: no successful route leaves the average unmeasured.
+            if n > 0:
+                metrics.avg_route_length[eq] = hops / n
+            metrics.total_debt[eq] = self.ledger.total_debt(eq)
+            metrics.active_trustlines[eq] = len(self.ledger.lines[eq])
+        return metrics
+
+    def _route(
+        self, eq: str, action: _RealPaymentAction
+    ) -> tuple[list[tuple[list[str], Decimal]], str | None]:
+        router = self.ledger.routers.get(eq)
+        if router is None:
+            return [], "EQUIVALENT_NOT_FOUND"
+        try:
+            amount = Decimal(str(action.amount))
+        except Exception:
+            return [], "INVALID_INPUT"
+        if amount <= 0 or action.sender_pid == action.receiver_pid:
+            return [], "INVALID_INPUT"
+
+        try:
+            routes = router.find_flow_routes(
+                action.sender_pid,
+                action.receiver_pid,
+                amount,
+                max_hops=int(self.config.max_hops),
+                max_paths=int(self.config.max_paths),
+                timeout_ms=int(self.config.routing_timeout_ms),
+            )
+        except TimeoutException:
+            return [], "ROUTING_TIMEOUT"
+        if routes:
+            return routes, None
+        # Same split as PaymentService: a trustline path that is merely exhausted is
+        # a capacity problem, no path at all is a routing one.
+        if router.has_topology_path(
+            action.sender_pid, action.receiver_pid, max_hops=int(self.config.max_hops)
+        ):
+            return [], "ROUTING_NO_CAPACITY"
+        return [], "ROUTING_NO_ROUTE"
+
+    def _maybe_clear(
+        self, eq: str, tick: int, *, attempted: int, rejected_no_capacity: int
+    ) -> tuple[Decimal, int]:
+        """Run clearing if the policy asks for it; returns (volume, trust growth updates)."""
+
+        cfg = self.config
+        max_depth = int(cfg.clearing_max_depth)
+
+        if cfg.clearing_policy == "adaptive":
+            self._adaptive_state.record_tick_signals(
+                eq,
+                TickSignals(
+                    attempted_payments=attempted,
+                    rejected_no_capacity=rejected_no_capacity,
+                    total_debt=float(self.ledger.total_debt(eq)),
+                ),
+            )
+            decision = self._adaptive_policy.evaluate(eq, self._adaptive_state, tick)
+            if not decision.should_run:
+                return _ZERO, 0
+            max_depth = int(decision.max_depth or max_depth)
+        else:
+            every = int(cfg.clearing_every_n_ticks)
+            if every <= 0 or tick % every != 0:
+                return _ZERO, 0
+
+        started = time.perf_counter()
+        volume, cycles, per_edge = self.ledger.clear(eq, max_depth=max_depth)
+        cost_ms = (time.perf_counter() - started) * 1000.0
+        if cfg.clearing_policy == "adaptive":
+            self._adaptive_state.update_clearing_result(
+                eq, volume=float(volume), cost_ms=cost_ms, tick=tick
+            )
+        if not cycles:
+            return volume, 0
+        self._emit(
+            SimulatorClearingDoneEvent,
+            type="clearing.done",
+            equivalent=eq,
+            plan_id=f"plan_{self.run.run_id}_{tick:06d}_{eq}",
+            cleared_cycles=cycles,
+            cleared_amount=str(volume),
+            cycle_edges=[{"from": c, "to": d} for c, d in sorted(per_edge)],
+        )
+        return volume, self._apply_growth(eq, tick, per_edge)
+
+    def _apply_growth(
+        self, eq: str, tick: int, per_edge: dict[tuple[str, str], Decimal]
+    ) -> int:
+        cfg = self.run._trust_drift_config
+        if not cfg or not cfg.enabled:
+            return 0
+        updated = 0
+        for (creditor, debtor), cleared in sorted(per_edge.items()):
+            hist = self.run._edge_clearing_history.get(f"{creditor}:{debtor}:{eq}")
+            line = self.ledger.lines[eq].get((creditor, debtor))
+            if hist is None or line is None:
+                continue
+            hist.clearing_count += 1
+            hist.last_clearing_tick = tick
+            hist.cleared_volume += cleared.quantize(_CENT, rounding=ROUND_DOWN)
+
+            current = line.limit.quantize(_CENT, rounding=ROUND_DOWN)
+            new_limit = grown_limit(
+                current_limit=current, original_limit=hist.original_limit, cfg=cfg
+            )
+            if new_limit != current:
+                self.ledger.set_limit(eq, creditor, debtor, new_limit)
+                self._emit_limit_change(eq, creditor, debtor, new_limit, "trust_drift_growth")
+                updated += 1
+        return updated
+
+    def _apply_decay(self, tick: int) -> int:
+        cfg = self.run._trust_drift_config
+        if not cfg or not cfg.enabled:
+            return 0
+        threshold = Decimal(str(cfg.overload_threshold))
+        updated = 0
+        for eq in self.ledger.equivalents:
+            for (creditor, debtor), line in sorted(self.ledger.lines[eq].items()):
+                hist = self.run._edge_clearing_history.get(f"{creditor}:{debtor}:{eq}")
+                if hist is None or hist.last_clearing_tick == tick:
+                    continue
+                current = line.limit.quantize(_CENT, rounding=ROUND_DOWN)
+                if current <= 0:
+                    continue
+                debt = self.ledger.debt(eq, debtor, creditor)
+                if debt / current < threshold:
+                    continue
+                new_limit = decayed_limit(
+                    current_limit=current,
+                    original_limit=hist.original_limit,
+                    debt_amount=debt,
+                    cfg=cfg,
+                )
+                if new_limit != current:
+                    self.ledger.set_limit(eq, creditor, debtor, new_limit)
+                    self._emit_limit_change(eq, creditor, debtor, new_limit, "trust_drift_decay")
+                    updated += 1
+        return updated
+
+    def _emit_limit_change(
+        self, eq: str, creditor: str, debtor: str, limit: Decimal, reason: str
+    ) -> None:
+        used = self.ledger.debt(eq, debtor, creditor)
+        patch = {
+            "source": creditor,
+            "target": debtor,
+            "trust_limit": str(limit.quantize(_CENT)),
+            "used": str(used.quantize(_CENT)),
+            "available": str(max(limit - used, _ZERO).quantize(_CENT)),
+        }
+        self._emit(
+            SimulatorTopologyChangedEvent,
+            type="topology.changed",
+            equivalent=eq,
+            payload=TopologyChangedPayload(edge_patch=[patch]),
+            reason=reason,
+        )
+
+
+def run_turbo(scenario: dict[str, Any], config: TurboConfig) -> TurboRunResult:
+    return TurboSimulation(scenario, config).run_all()
+
+
+async def persist_end_state(session: Any, result: TurboRunResult) -> None:
+    """Write the end-state debts and limits of a turbo run. Does NOT commit.
+
+    Seeds the scenario first (idempotent), then replaces the debts between scenario
+    participants and updates the limits of their active trustlines.
+    """
+
+    await RealScenarioSeeder().seed_scenario_into_db(session=session, scenario=result.scenario)
+    await session.flush()
+
+    pids = sorted({p for key in result.limits for p in key[:2]})
+    uuid_by_pid = dict(
+        (
+            await session.execute(select(Participant.pid, Participant.id).where(Participant.pid.in_(pids)))
+        ).all()
+    )
+    eq_codes = sorted({key[2] for key in result.limits})
+    eq_id_by_code = dict(
+        (
+            await session.execute(select(Equivalent.code, Equivalent.id).where(Equivalent.code.in_(eq_codes)))
+        ).all()
+    )
+    participant_ids = list(uuid_by_pid.values())
+
+    for eq_id in eq_id_by_code.values():
+        await session.execute(
+            delete(Debt).where(
+                Debt.equivalent_id == eq_id,
+                Debt.debtor_id.in_(participant_ids),
+                Debt.creditor_id.in_(participant_ids),
+            )
+        )
+    for (debtor, creditor, eq), amount in sorted(result.debts.items()):
+        if amount <= 0 or eq not in eq_id_by_code:
+            continue
+        session.add(
+            Debt(
+                debtor_id=uuid_by_pid[debtor],
+                creditor_id=uuid_by_pid[creditor],
+                equivalent_id=eq_id_by_code[eq],
+                amount=amount,
+            )
+        )
+    for (creditor, debtor, eq), limit in sorted(result.limits.items()):
+        if eq not in eq_id_by_code:
+            continue
+        await session.execute(
+            update(TrustLine)
+            .where(
+                TrustLine.from_participant_id == uuid_by_pid[creditor],
+                TrustLine.to_participant_id == uuid_by_pid[debtor],
+                TrustLine.equivalent_id == eq_id_by_code[eq],
+                TrustLine.status == "active",
+            )
+            .values(limit=limit)
+        )
+    await session.flush()
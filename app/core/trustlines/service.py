@@ -12,7 +12,7 @@ from app.utils.exceptions import (
     InvalidSignatureException,
 )
 from app.core.auth.canonical import canonical_json
-from app.core.auth.crypto import verify_signature
+from app.core.auth.crypto import offload_verification, verify_signature
 
 from app.db.models.trustline import TrustLine
 from app.db.models.participant import Participant
@@ -128,7 +128,7 @@ class TrustLineService:
             signed_payload["policy"] = data.policy
 
         try:
-            verify_signature(from_participant.public_key, canonical_json(signed_payload), data.signature)
+            await offload_verification(verify_signature, from_participant.public_key, canonical_json(signed_payload), data.signature)
         except Exception:
             raise InvalidSignatureException("Invalid signature")
 
@@ -309,7 +309,7 @@ class TrustLineService:
             signed_payload["policy"] = data.policy
 
         try:
-            verify_signature(user.public_key, canonical_json(signed_payload), data.signature)
+            await offload_verification(verify_signature, user.public_key, canonical_json(signed_payload), data.signature)
         except Exception:
             raise InvalidSignatureException("Invalid signature")
 
@@ -431,7 +431,7 @@ class TrustLineService:
 
         signed_payload: dict = {"id": str(trustline_id)}
         try:
-            verify_signature(user.public_key, canonical_json(signed_payload), data.signature)
+            await offload_verification(verify_signature, user.public_key, canonical_json(signed_payload), data.signature)
         except Exception:
             raise InvalidSignatureException("Invalid signature")
 
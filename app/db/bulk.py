@@ -0,0 +1,102 @@
+"""Set-based inserts for seeding and other bulk loads.
+
+`bulk_insert_ignore` writes many rows and silently skips the ones that collide with a
+unique constraint, so seeding stays idempotent without one existence query per row:
+
+- SQLite: chunked multi-row ``INSERT ... VALUES (...), (...) ON CONFLICT DO NOTHING``;
+- Postgres: ``COPY`` into a temporary table, then one ``INSERT ... SELECT ... ON CONFLICT
+  DO NOTHING`` into the real table (COPY itself cannot skip conflicts).
+
+Rows bypass the ORM, so Python-side column defaults are not applied: callers pass every
+column that has no server default, primary keys included.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping, Sequence
+
+from sqlalchemy import JSON, Table, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# Bound parameters per statement; SQLite >= 3.32 allows 32766.
+_SQLITE_MAX_VARIABLES = 32_000
+
+
+def _dialect_name(session: Any) -> str | None:
+    try:
+        bind = session.get_bind()
+    except Exception:
+        bind = getattr(session, "bind", None)
+    try:
+        return bind.dialect.name if bind is not None else None
+    except Exception:
+        return None
+
+
+async def bulk_insert_ignore(
+    session: Any, table: Table, rows: Sequence[Mapping[str, Any]]
+) -> int:
+    """Insert `rows` into `table`, skipping unique conflicts. Returns rows inserted.
+
+    All rows must carry the same keys. Runs inside the session's transaction; does NOT commit.
+    """
+
+    if not rows:
+        return 0
+    columns = list(rows[0].keys())
+    dialect_name = _dialect_name(session)
+
+    if dialect_name == "sqlite":
+        per_chunk = max(1, _SQLITE_MAX_VARIABLES // max(1, len(columns)))
+        inserted = 0
+        for start in range(0, len(rows), per_chunk):
+            chunk = [dict(r) for r in rows[start : start + per_chunk]]
+            result = await session.execute(
+                sqlite_insert(table).values(chunk).on_conflict_do_nothing()
+            )
+            inserted += max(0, int(result.rowcount or 0))
+        return inserted
+
+    if dialect_name in {"postgresql", "postgres"}:
+        return await _copy_insert_ignore(session, table, rows, columns)
+
+    raise RuntimeError(f"Unsupported SQL dialect for bulk insert: {dialect_name!r}")
+
+
+async def _copy_insert_ignore(
+    session: Any, table: Table, rows: Sequence[Mapping[str, Any]], columns: list[str]
+) -> int:
+    staging = f"_bulk_{table.name}"
+    quoted = ", ".join(f'"{c}"' for c in columns)
+
+    # Statement through SQLAlchemy first: it opens the transaction the temp table and the
+    # COPY below must live in (ON COMMIT DROP cleans up).
+    await session.execute(
+        text(
+            f'CREATE TEMP TABLE IF NOT EXISTS "{staging}" '
+            f'(LIKE "{table.name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+        )
+    )
+    await session.execute(text(f'TRUNCATE "{staging}"'))
+
+    # asyncpg's COPY wants JSON columns as text.
+    json_columns = {c for c in columns if isinstance(table.c[c].type, JSON)}
+    records = [
+        tuple(
+            json.dumps(row[c]) if c in json_columns and row[c] is not None else row[c]
+            for c in columns
+        )
+        for row in rows
+    ]
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(staging, records=records, columns=columns)
+
+    result = await session.execute(
+        text(
+            f'INSERT INTO "{table.name}" ({quoted}) SELECT {quoted} FROM "{staging}" '
+            "ON CONFLICT DO NOTHING"
+        )
+    )
+    return max(0, int(result.rowcount or 0))
@@ -0,0 +1,291 @@
+"""Statement-level SQL instrumentation.
+
+Two cursor listeners on every `Engine` time each statement and attribute it to:
+
+- the innermost open `StatementTally` (an HTTP request, a simulator tick phase, ...),
+  carried in a context variable so SQLAlchemy's greenlet and spawned tasks inherit it;
+- a normalised fingerprint (literals and bind placeholders replaced by `?`, IN/VALUES
+  lists collapsed), exported as the `geo_db_statement_duration_seconds` histogram and
+  aggregated in-process for `GET /admin/debug/sql`.
+
+Statements slower than `DB_SLOW_STATEMENT_MS` are kept in a short ring buffer; with
+ENV=dev the capture also runs EXPLAIN for slow SELECTs on the same connection. Bind
+parameter values are never recorded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.utils.metrics import DB_STATEMENT_DURATION_SECONDS
+from app.utils.request_id import request_id_var
+
+logger = logging.getLogger(__name__)
+
+# Distinct fingerprints tracked before new ones fold into "other" (label cardinality).
+_MAX_FINGERPRINTS = 1000
+_SLOW_HISTORY = 200
+_REQUEST_HISTORY = 200
+_SQL_TEXT_LIMIT = 2000
+
+
+@dataclass
+class StatementTally:
+    statements: int = 0
+    rows: int = 0
+    db_ms: float = 0.0
+
+
+_T = TypeVar("_T", bound=StatementTally)
+
+_current_tally: ContextVar[StatementTally | None] = ContextVar("db_statement_tally", default=None)
+
+
+def current_tally() -> StatementTally | None:
+    return _current_tally.get()
+
+
+@contextmanager
+def tally_statements(tally: _T) -> Iterator[_T]:
+    """Attribute statements to `tally` (and not to enclosing tallies) inside the block."""
+
+    token = _current_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _current_tally.reset(token)
+
+
+def enter_tally(tally: StatementTally) -> Any:
+    """Non-block form of `tally_statements`; pass the token to `exit_tally` in the same task."""
+
+    return _current_tally.set(tally)
+
+
+def exit_tally(token: Any) -> None:
+    _current_tally.reset(token)
+
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+# psycopg "%(name)s", asyncpg "$1", SQLAlchemy ":name" (but not PostgreSQL "::type" casts).
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):(?!:)\w+")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_ROW_RE = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_VALUES_RE = re.compile(rf"\bVALUES\s*{_ROW_RE}(?:\s*,\s*{_ROW_RE})*", re.I)
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so that executions differing only in values group together."""
+
+    sql = _COMMENT_RE.sub(" ", statement)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _VALUES_RE.sub("VALUES (...)", sql)
+    return _WS_RE.sub(" ", sql).strip()[:_SQL_TEXT_LIMIT]
+
+
+def _operation(sql: str) -> str:
+    head = sql.split(None, 1)[0].upper() if sql.strip() else ""
+    return head if head in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"} else "OTHER"
+
+
+@dataclass
+class _FingerprintStats:
+    fingerprint_id: str
+    operation: str
+    sql: str
+    calls: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+_lock = threading.Lock()
+_fingerprints: dict[str, _FingerprintStats] = {}
+_slow: deque[dict[str, Any]] = deque(maxlen=_SLOW_HISTORY)
+_requests: deque[dict[str, Any]] = deque(maxlen=_REQUEST_HISTORY)
+
+
+@lru_cache(maxsize=4096)
+def _fingerprint_key(statement: str) -> tuple[str, str, str]:
+    sql = fingerprint(statement)
+    return hashlib.sha1(sql.encode("utf-8")).hexdigest()[:12], _operation(sql), sql
+
+
+def _fingerprint_stats(statement: str) -> _FingerprintStats:
+    fp_id, operation, sql = _fingerprint_key(statement)
+    stats = _fingerprints.get(fp_id)
+    if stats is None:
+        with _lock:
+            stats = _fingerprints.get(fp_id)
+            if stats is None:
+                if len(_fingerprints) >= _MAX_FINGERPRINTS:
+                    fp_id, sql = "other", "(fingerprint limit reached)"
+                    stats = _fingerprints.get(fp_id)
+                if stats is None:
+                    stats = _FingerprintStats(fingerprint_id=fp_id, operation=operation, sql=sql)
+                    _fingerprints[fp_id] = stats
+    return stats
+
+
+def _explain(conn, statement: str, parameters: Any) -> list[str] | None:
+    if _operation(statement) not in {"SELECT", "WITH"}:
+        return None
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect in {"postgresql", "postgres"}:
+        prefix = "EXPLAIN "
+    else:
+        return None
+    # Raw DBAPI cursor on the same connection: sees the same transaction and does not
+    # re-enter these listeners. On Postgres a failed statement aborts the whole
+    # transaction, so the EXPLAIN runs inside a savepoint that is always rolled back.
+    use_savepoint = dialect != "sqlite"
+    cursor = conn.connection.cursor()
+    try:
+        if use_savepoint:
+            cursor.execute("SAVEPOINT geo_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [str(row[-1]) for row in cursor.fetchall()]
+        finally:
+            if use_savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT geo_explain")
+                cursor.execute("RELEASE SAVEPOINT geo_explain")
+    finally:
+        cursor.close()
+
+
+def _is_dev() -> bool:
+    return (settings.ENV or "").strip().lower() == "dev"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._geo_statement_t0 = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    t0 = getattr(context, "_geo_statement_t0", None)
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0 if t0 is not None else 0.0
+
+    rows = 0
+    if cursor.description is not None:
+        # Async adapters (aiosqlite, asyncpg) buffer the whole result on execute; server-side
+        # and plain DBAPI cursors do not expose a count up front and read as zero.
+        buffered = getattr(cursor, "_rows", None)
+        if buffered is not None:
+            rows = len(buffered)
+
+    tally = _current_tally.get()
+    if tally is not None:
+        tally.statements += 1
+        tally.rows += rows
+        tally.db_ms += elapsed_ms
+
+    if not getattr(settings, "DB_INSTRUMENTATION_ENABLED", True):
+        return
+
+    try:
+        stats = _fingerprint_stats(statement)
+        stats.calls += 1
+        stats.rows += rows
+        stats.total_ms += elapsed_ms
+        if elapsed_ms > stats.max_ms:
+            stats.max_ms = elapsed_ms
+        DB_STATEMENT_DURATION_SECONDS.labels(
+            operation=stats.operation, fingerprint=stats.fingerprint_id
+        ).observe(elapsed_ms / 1000.0)
+
+        slow_ms = int(getattr(settings, "DB_SLOW_STATEMENT_MS", 0) or 0)
+        if slow_ms <= 0 or elapsed_ms < slow_ms:
+            return
+        plan = None
+        if _is_dev() and not executemany:
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception:
+                logger.debug("event=db.explain_failed", exc_info=True)
+                plan = None
+        _slow.append(
+            {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "fingerprint": stats.fingerprint_id,
+                "sql": statement[:_SQL_TEXT_LIMIT],
+                "duration_ms": round(elapsed_ms, 3),
+                "rows": rows,
+                "request_id": request_id_var.get(),
+                "phase": getattr(tally, "path", None),
+                "plan": plan,
+            }
+        )
+    except Exception:
+        # Observability must never fail a statement.
+        pass
+
+
+def record_request(summary: dict[str, Any]) -> None:
+    _requests.append(summary)
+
+
+def snapshot(*, limit: int = 50, request_id: str | None = None) -> dict[str, Any]:
+    """Top fingerprints by total time, recent slow statements and request summaries."""
+
+    with _lock:
+        fingerprints = list(_fingerprints.values())
+    fingerprints.sort(key=lambda s: s.total_ms, reverse=True)
+    requests = list(_requests)
+    slow = list(_slow)
+    if request_id is not None:
+        requests = [r for r in requests if r.get("request_id") == request_id]
+        slow = [s for s in slow if s.get("request_id") == request_id]
+    return {
+        "enabled": bool(getattr(settings, "DB_INSTRUMENTATION_ENABLED", True)),
+        "slow_statement_ms": int(getattr(settings, "DB_SLOW_STATEMENT_MS", 0) or 0),
+        "fingerprints": [
+            {
+                "fingerprint": s.fingerprint_id,
+                "operation": s.operation,
+                "sql": s.sql,
+                "calls": s.calls,
+                "rows": s.rows,
+                "total_ms": round(s.total_ms, 3),
+                "mean_ms": round(s.total_ms / s.calls, 3) if s.calls else 0.0,
+                "max_ms": round(s.max_ms, 3),
+            }
+            for s in fingerprints[:limit]
+        ],
+        "slow_statements": slow[-limit:],
+        "requests": requests[-limit:],
+    }
+
+
+def reset() -> None:
+    with _lock:
+        _fingerprints.clear()
+        _slow.clear()
+        _requests.clear()
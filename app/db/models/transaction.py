@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import CheckConstraint, DateTime, ForeignKey, JSON, String, UniqueConstraint, Uuid, func
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Index, JSON, String, UniqueConstraint, Uuid, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -18,10 +18,47 @@ class Transaction(Base):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Denormalised PAYMENT routing keys (migration 020). They mirror payload['from'],
+    # payload['to'] and payload['equivalent'] so history listing can use plain btree
+    # indexes and keyset pagination instead of JSON expressions. NULL for other types.
+    sender_pid: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    receiver_pid: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    equivalent_code: Mapped[str | None] = mapped_column(String(16), nullable=True)
+
     initiator = relationship("Participant", foreign_keys=[initiator_id])
 
     __table_args__ = (
         CheckConstraint("type IN ('TRUST_LINE_CREATE', 'TRUST_LINE_UPDATE', 'TRUST_LINE_CLOSE', 'PAYMENT', 'CLEARING', 'COMPENSATION', 'COMMODITY_REDEMPTION')", name='chk_transaction_type'),
         CheckConstraint("state IN ('NEW', 'ROUTED', 'PREPARE_IN_PROGRESS', 'PREPARED', 'COMMITTED', 'ABORTED', 'PROPOSED', 'WAITING', 'REJECTED')", name='chk_transaction_state'),
         UniqueConstraint('initiator_id', 'type', 'idempotency_key', name='uq_transactions_initiator_type_idempotency'),
-    )
\ No newline at end of file
+        Index('ix_transactions_sender_created_id', 'sender_pid', 'created_at', 'id'),
+        Index('ix_transactions_receiver_created_id', 'receiver_pid', 'created_at', 'id'),
+    )
+
+
+def _payload_str(payload: dict | None, key: str) -> str | None:
+    if not isinstance(payload, dict):
+        return None
+    value = payload.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+@event.listens_for(Transaction, "before_insert")
+def _fill_payment_columns(_mapper, _connection, target: Transaction) -> None:
+    """Populate the denormalised PAYMENT columns from the payload on every insert path.
+
+    Payments are written by the service, the simulator, seed scripts and tests; deriving
+    the columns here keeps them consistent without each writer having to remember them.
+    Explicitly set values win.
+    """
+    if target.type != "PAYMENT":
+        return
+    if target.sender_pid is None:
+        target.sender_pid = _payload_str(target.payload, "from")
+    if target.receiver_pid is None:
+        target.receiver_pid = _payload_str(target.payload, "to")
+    if target.equivalent_code is None:
+        target.equivalent_code = _payload_str(target.payload, "equivalent")
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
@@ -18,8 +19,8 @@ def _ensure_default_sqlite_parent(url: str) -> None:
         Path(database).parent.mkdir(parents=True, exist_ok=True)
 
 
-def _create_engine():
-    url = settings.DATABASE_URL
+def _create_engine(url: str | None = None, *, read_only: bool = False):
+    url = url or settings.DATABASE_URL
     common_kwargs = {
         "echo": settings.DEBUG,
         "future": True,
@@ -58,7 +59,8 @@ def _create_engine():
     # Postgres/MySQL/etc: use pool settings to improve stability under load.
     backend = make_url(url).get_backend_name()
     db_kwargs = {}
-    if backend in {"postgresql", "postgres"}:
+    # A hot standby rejects SERIALIZABLE; replica reads keep the server default.
+    if backend in {"postgresql", "postgres"} and not read_only:
         db_kwargs["isolation_level"] = settings.DB_POSTGRES_ISOLATION_LEVEL
 
     return create_async_engine(
@@ -85,3 +87,67 @@ AsyncSessionLocal = async_sessionmaker(
 async def get_db_session():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Read-only sessions (DATABASE_READ_URL), created on first use so the URL can be set
+# after import (tests point it at a second SQLite file).
+_read_engine = None
+_read_engine_url: str | None = None
+_ReadSessionLocal: async_sessionmaker | None = None
+
+
+def read_replica_url() -> str | None:
+    url = str(getattr(settings, "DATABASE_READ_URL", None) or "").strip()
+    if not url or url == settings.DATABASE_URL:
+        return None
+    return url
+
+
+def get_read_sessionmaker() -> async_sessionmaker | None:
+    """Session factory bound to the read replica, or None when none is configured."""
+
+    global _read_engine, _read_engine_url, _ReadSessionLocal
+    url = read_replica_url()
+    if url is None:
+        return None
+    if _ReadSessionLocal is None or _read_engine_url != url:
+        _read_engine = _create_engine(url, read_only=True)
+        _read_engine_url = url
+        _ReadSessionLocal = async_sessionmaker(
+            bind=_read_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            info={"read_replica": True},
+        )
+    return _ReadSessionLocal
+
+
+def is_read_replica(session) -> bool:
+    return bool((getattr(session, "info", None) or {}).get("read_replica", False))
+
+
+@asynccontextmanager
+async def primary_session_for(session):
+    """`session` itself, or a fresh primary session when `session` reads the replica.
+
+    Cache entries versioned by `snapshot_cache.ledger_version` are built through this: the
+    version moves on the primary's commit, so an entry built from a lagging replica would
+    keep serving pre-commit rows under the post-commit version until the next write.
+    """
+
+    if not is_read_replica(session):
+        yield session
+        return
+    async with AsyncSessionLocal() as primary:
+        yield primary
+
+
+async def dispose_read_engine() -> None:
+    global _read_engine, _read_engine_url, _ReadSessionLocal
+    read_engine = _read_engine
+    _read_engine = None
+    _read_engine_url = None
+    _ReadSessionLocal = None
+    if read_engine is not None:
+        await read_engine.dispose()
@@ -19,7 +19,7 @@ from sqlalchemy.engine.url import make_url
 
 from app.api.router import api_router
 from app.config import settings
-from app.db.session import engine
+from app.db.session import dispose_read_engine, engine
 from app.schemas.common import ErrorEnvelope, HealthResponse
 from app.utils.error_codes import ERROR_MESSAGES, ErrorCode
 from app.utils.exceptions import GeoException
@@ -378,6 +378,29 @@ async def lifespan(app: FastAPI):
         app.state.redis = client
         security.set_redis_client(client)
 
+        if getattr(settings, "ROUTING_SHARED_CACHE_ENABLED", False):
+            from app.utils.shared_cache import RedisSharedCache, set_shared_cache
+
+            # Snapshots are binary, so the cache tier gets its own non-decoding client.
+            shared_cache = RedisSharedCache(redis.from_url(settings.REDIS_URL))
+            set_shared_cache(shared_cache)
+            _start_supervised_background_task(
+                app,
+                name="shared_cache_listener",
+                coroutine_factory=lambda: shared_cache.listen(app.state._bg_stop_event),
+            )
+
+        if getattr(settings, "EVENT_BUS_REDIS_ENABLED", False):
+            from app.utils.event_bus import RedisStreamsTransport, event_bus
+
+            transport = RedisStreamsTransport(client, maxlen=settings.EVENT_BUS_STREAM_MAXLEN)
+            event_bus.set_transport(transport)
+            _start_supervised_background_task(
+                app,
+                name="event_bus_listener",
+                coroutine_factory=lambda: transport.listen(event_bus.deliver_local, app.state._bg_stop_event),
+            )
+
     # These maintenance jobs are degradable: startup continues, while job state,
     # logs, metrics, and /health expose their absence or unexpected exit.
     _start_configured_background_tasks(app)
@@ -399,6 +422,13 @@ async def lifespan(app: FastAPI):
             await asyncio.gather(*tasks, return_exceptions=True)
         app.state._bg_tasks = []
 
+        try:
+            from app.core.auth.crypto import shutdown_verify_pool
+
+            shutdown_verify_pool()
+        except Exception:
+            logger.warning("crypto.verify_pool_shutdown_failed", exc_info=True)
+
         # Simulator runtime graceful shutdown (best-effort).
         try:
             from app.core.simulator.runtime import runtime
@@ -408,6 +438,22 @@ async def lifespan(app: FastAPI):
             logger.exception("simulator.runtime.shutdown_failed")
 
         from app.utils import security
+        from app.utils.event_bus import event_bus
+        from app.utils.shared_cache import get_shared_cache, set_shared_cache
+
+        transport = event_bus.transport
+        event_bus.set_transport(None)
+        try:
+            await transport.aclose()
+        except Exception:
+            logger.warning("event_bus.transport_close_failed", exc_info=True)
+
+        shared_cache = get_shared_cache()
+        set_shared_cache(None)
+        try:
+            await shared_cache.aclose()
+        except Exception:
+            logger.warning("shared_cache.close_failed", exc_info=True)
 
         security.set_redis_client(None)
         client = getattr(app.state, "redis", None)
@@ -423,6 +469,10 @@ async def lifespan(app: FastAPI):
             await engine.dispose()
         except Exception:
             pass
+        try:
+            await dispose_read_engine()
+        except Exception:
+            pass
 
 
 app = FastAPI(title="GEO Hub Backend", debug=settings.DEBUG, lifespan=lifespan)
@@ -439,6 +489,48 @@ app.add_middleware(
 )
 
 
+# Declared before request_id_middleware so it runs inside it and sees the request id.
+@app.middleware("http")
+async def db_statements_middleware(request: Request, call_next):
+    if not getattr(settings, "DB_INSTRUMENTATION_ENABLED", True):
+        return await call_next(request)
+
+    from app.db.instrumentation import StatementTally, record_request, tally_statements
+    from app.utils.request_id import request_id_var
+
+    start = time.perf_counter()
+    status = 500
+    with tally_statements(StatementTally()) as tally:
+        try:
+            response = await call_next(request)
+            status = int(getattr(response, "status_code", 0))
+        finally:
+            try:
+                from app.utils.metrics import HTTP_REQUEST_DB_ROWS, HTTP_REQUEST_DB_STATEMENTS
+
+                route_path = getattr(request.scope.get("route"), "path", None)
+                path_label = route_path if isinstance(route_path, str) and route_path else "__unmatched__"
+                HTTP_REQUEST_DB_STATEMENTS.labels(method=request.method, path=path_label).observe(
+                    tally.statements
+                )
+                HTTP_REQUEST_DB_ROWS.labels(method=request.method, path=path_label).observe(tally.rows)
+                record_request(
+                    {
+                        "request_id": request_id_var.get(),
+                        "method": request.method,
+                        "path": path_label,
+                        "status": status,
+                        "statements": tally.statements,
+                        "rows": tally.rows,
+                        "db_ms": round(tally.db_ms, 3),
+                        "elapsed_ms": round((time.perf_counter() - start) * 1000.0, 3),
+                    }
+                )
+            except Exception:
+                pass
+    return response
+
+
 @app.middleware("http")
 async def request_id_middleware(request: Request, call_next):
     from app.utils.request_id import request_id_var, new_request_id, validate_request_id
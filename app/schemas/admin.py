@@ -193,6 +193,47 @@ class AdminMigrationsStatus(BaseModel):
     is_up_to_date: bool
 
 
+class AdminSqlFingerprint(BaseModel):
+    fingerprint: str
+    operation: str
+    sql: str
+    calls: int
+    rows: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+
+
+class AdminSqlSlowStatement(BaseModel):
+    at: str
+    fingerprint: str
+    sql: str
+    duration_ms: float
+    rows: int
+    request_id: Optional[str] = None
+    phase: Optional[str] = None
+    plan: Optional[list[str]] = None
+
+
+class AdminSqlRequestSummary(BaseModel):
+    request_id: Optional[str] = None
+    method: str
+    path: str
+    status: int
+    statements: int
+    rows: int
+    db_ms: float
+    elapsed_ms: float
+
+
+class AdminSqlDebugResponse(BaseModel):
+    enabled: bool
+    slow_statement_ms: int
+    fingerprints: list[AdminSqlFingerprint] = Field(default_factory=list)
+    slow_statements: list[AdminSqlSlowStatement] = Field(default_factory=list)
+    requests: list[AdminSqlRequestSummary] = Field(default_factory=list)
+
+
 class AdminEquivalentCreateRequest(BaseModel):
     code: str = Field(..., pattern=r"^[A-Z0-9_]{1,16}$")
     symbol: Optional[str] = None
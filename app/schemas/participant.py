@@ -39,6 +39,8 @@ class Participant(ParticipantBase):
 
 class ParticipantsList(BaseModel):
     items: List[Participant]
+    # Opaque (relevance, id) keyset cursor for the next page; null on the last page.
+    next_cursor: Optional[str] = None
 
 
 class ParticipantPublic(BaseModel):
@@ -1,4 +1,4 @@
-from typing import List, Optional, Any, Dict
+from typing import List, Literal, Optional, Any, Dict
 
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
@@ -68,6 +68,21 @@ class PaymentResult(BaseModel):
     created_at: datetime
     committed_at: Optional[datetime] = None
 
+class PaymentBatchItemResult(BaseModel):
+    index: int
+    tx_id: Optional[str] = None
+    # COMMITTED/ABORTED come from the payment itself (ABORTED only for a replayed tx_id);
+    # REJECTED is a 4xx for this item alone; FAILED means its commit group was rolled back.
+    status: Literal["COMMITTED", "ABORTED", "REJECTED", "FAILED"]
+    result: Optional[PaymentResult] = None
+    error: Optional[PaymentError] = None
+
+class PaymentBatchResult(BaseModel):
+    items: List[PaymentBatchItemResult]
+    committed: int
+    rejected: int
+    failed: int
+
 class PaymentDetail(BaseModel):
     tx_id: str
     type: str
@@ -78,3 +93,5 @@ class PaymentDetail(BaseModel):
 
 class PaymentsList(BaseModel):
     items: List[PaymentResult]
+    # Opaque keyset cursor for the next page; null when this page is the last one.
+    next_cursor: Optional[str] = None
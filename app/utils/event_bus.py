@@ -1,12 +1,45 @@
+"""Participant notification bus (`payment.received` and friends) behind `/ws`.
+
+Subscribers are the WebSocket connections of this worker, indexed by recipient PID so
+a publication only looks at that participant's sockets. Publications go to local
+subscribers directly and, through the installed transport, to the other workers:
+
+* the default `EventBusTransport` is a no-op, so single-process deployments and tests
+  behave as an in-process bus;
+* `RedisStreamsTransport` (installed by the app lifespan when `REDIS_ENABLED` and
+  `EVENT_BUS_REDIS_ENABLED` are set) appends each batch as one entry of a capped Redis
+  stream. Every worker tails the stream and delivers batches of other origins to its own
+  subscribers; its own batches were already delivered locally.
+
+`batched()` collects the publications of a block (e.g. the post-commit effects of one
+simulator tick) into a single local fan-out and a single stream entry.
+
+Delivery stays at-most-once: a full subscriber queue drops the newest message and a
+worker that is down misses what was published meanwhile.
+"""
+
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import contextvars
+import json
+import logging
 import threading
+import uuid
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterable, Iterator
 
+from app.config import settings
 from app.utils.metrics import EVENT_BUS_DROPPED_TOTAL
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM = "geo:events:notifications"
+
+# (recipient_pid, event, payload)
+Publication = tuple[str, str, dict[str, Any]]
+
 
 @dataclass
 class _Subscription:
@@ -17,37 +50,76 @@ class _Subscription:
     active: bool = True
 
 
+class EventBusTransport:
+    """No-op transport: publications stay within this process."""
+
+    enabled = False
+
+    def send(self, batch: list[Publication]) -> None:
+        return None
+
+    async def listen(self, deliver, stop_event: asyncio.Event) -> None:
+        await stop_event.wait()
+
+    async def aclose(self) -> None:
+        return None
+
+
+_current_batch: contextvars.ContextVar[list[Publication] | None] = contextvars.ContextVar(
+    "event_bus_batch", default=None
+)
+
+
 class InMemoryEventBus:
-    """Best-effort in-process event bus.
+    """Best-effort event bus with per-worker subscribers and a pluggable transport.
 
-    This is intentionally minimal for MVP/testing. It provides at-most-once delivery
-    to currently connected subscribers.
+    It provides at-most-once delivery to currently connected subscribers.
     """
 
     def __init__(self) -> None:
         self._lock = threading.Lock()
-        self._subs: list[_Subscription] = []
+        self._subs_by_pid: dict[str, list[_Subscription]] = {}
+        self._transport: EventBusTransport = EventBusTransport()
+
+    @property
+    def _subs(self) -> list[_Subscription]:
+        with self._lock:
+            return [sub for subs in self._subs_by_pid.values() for sub in subs]
+
+    @property
+    def transport(self) -> EventBusTransport:
+        return self._transport
+
+    def set_transport(self, transport: EventBusTransport | None) -> None:
+        self._transport = transport if transport is not None else EventBusTransport()
 
     async def subscribe(self, *, pid: str, events: list[str]) -> _Subscription:
         loop = asyncio.get_running_loop()
-        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=100)
+        queue_max = max(1, int(getattr(settings, "EVENT_BUS_SUBSCRIBER_QUEUE_MAX", 100) or 1))
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_max)
         sub = _Subscription(pid=pid, events=set(events), queue=queue, loop=loop)
         with self._lock:
-            self._subs.append(sub)
+            self._subs_by_pid.setdefault(pid, []).append(sub)
         return sub
 
+    def _remove_locked(self, sub: _Subscription) -> bool:
+        subs = self._subs_by_pid.get(sub.pid)
+        if not subs or sub not in subs:
+            return False
+        subs.remove(sub)
+        if not subs:
+            del self._subs_by_pid[sub.pid]
+        return True
+
     async def unsubscribe(self, sub: _Subscription) -> None:
         with self._lock:
             sub.active = False
-            try:
-                self._subs.remove(sub)
-            except ValueError:
-                return
+            self._remove_locked(sub)
 
     @staticmethod
-    def _record_drop(reason: str) -> None:
+    def _record_drop(reason: str, count: int = 1) -> None:
         try:
-            EVENT_BUS_DROPPED_TOTAL.labels(reason=reason).inc()
+            EVENT_BUS_DROPPED_TOTAL.labels(reason=reason).inc(count)
         except Exception:
             # Observability must not make a best-effort publication fail.
             pass
@@ -55,42 +127,171 @@ class InMemoryEventBus:
     def _deliver_if_active(
         self,
         sub: _Subscription,
-        message: dict[str, Any],
+        messages: list[dict[str, Any]],
     ) -> None:
-        dropped = False
+        dropped = 0
         with self._lock:
             if not sub.active:
                 return
-            try:
-                sub.queue.put_nowait(message)
-            except asyncio.QueueFull:
-                # Deterministic overload policy: preserve queued messages and drop
-                # the newest publication without blocking the payment path.
-                dropped = True
+            for message in messages:
+                try:
+                    sub.queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    # Deterministic overload policy: preserve queued messages and drop
+                    # the newest publication without blocking the payment path.
+                    dropped += 1
         if dropped:
-            self._record_drop("queue_full")
+            self._record_drop("queue_full", dropped)
 
     def _deactivate(self, sub: _Subscription) -> None:
         with self._lock:
             sub.active = False
-            try:
-                self._subs.remove(sub)
-            except ValueError:
-                pass
+            self._remove_locked(sub)
 
-    def publish(self, *, recipient_pid: str, event: str, payload: dict[str, Any]) -> None:
+    def deliver_local(self, batch: Iterable[Publication]) -> None:
+        """Fan a batch out to this worker's subscribers (one loop callback per socket)."""
+
+        per_sub: dict[int, tuple[_Subscription, list[dict[str, Any]]]] = {}
         with self._lock:
-            subs = [s for s in self._subs if s.pid == recipient_pid and event in s.events]
+            for recipient_pid, event, payload in batch:
+                for sub in self._subs_by_pid.get(recipient_pid, ()):
+                    if event in sub.events:
+                        slot = per_sub.setdefault(id(sub), (sub, []))
+                        slot[1].append({"event": event, "payload": payload})
 
-        message = {"event": event, "payload": payload}
-        for sub in subs:
+        for sub, messages in per_sub.values():
             try:
-                sub.loop.call_soon_threadsafe(self._deliver_if_active, sub, message)
+                sub.loop.call_soon_threadsafe(self._deliver_if_active, sub, messages)
             except RuntimeError:
                 # A closed subscriber loop cannot consume future messages. Remove
                 # it so subsequent publications do not repeat the same failure.
                 self._deactivate(sub)
-                self._record_drop("loop_closed")
+                self._record_drop("loop_closed", len(messages))
+
+    def publish_many(self, batch: Iterable[Publication]) -> None:
+        batch = list(batch)
+        if not batch:
+            return
+        self.deliver_local(batch)
+        try:
+            self._transport.send(batch)
+        except Exception:
+            logger.warning("event=event_bus.transport_send_failed size=%d", len(batch), exc_info=True)
+
+    def publish(self, *, recipient_pid: str, event: str, payload: dict[str, Any]) -> None:
+        pending = _current_batch.get()
+        if pending is not None:
+            pending.append((recipient_pid, event, payload))
+            return
+        self.publish_many([(recipient_pid, event, payload)])
+
+    @contextlib.contextmanager
+    def batched(self) -> Iterator[None]:
+        """Defer publications made in this block and publish them as one batch on exit."""
+
+        if _current_batch.get() is not None:
+            # Nested: the outermost block flushes.
+            yield
+            return
+        pending: list[Publication] = []
+        token = _current_batch.set(pending)
+        try:
+            yield
+        finally:
+            _current_batch.reset(token)
+            self.publish_many(pending)
+
+
+class RedisStreamsTransport(EventBusTransport):
+    """Cross-worker fan-out through one capped Redis stream.
+
+    Each batch is one entry ``{"o": origin, "m": JSON list of [pid, event, payload]}``.
+    Works with decoding and non-decoding redis.asyncio clients.
+    """
+
+    enabled = True
+
+    def __init__(self, client: Any, *, stream: str = DEFAULT_STREAM, maxlen: int = 10000) -> None:
+        self._client = client
+        self._stream = stream
+        self._maxlen = max(1, int(maxlen))
+        # Entries carry the origin so a worker skips batches it already delivered.
+        self._origin = uuid.uuid4().hex
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    def send(self, batch: list[Publication]) -> None:
+        fields = {
+            "o": self._origin,
+            "m": json.dumps(batch, separators=(",", ":"), default=str),
+        }
+        # Called from synchronous post-commit hooks, possibly off the event loop thread;
+        # the XADD is scheduled on the loop that runs the listener.
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None and (self._loop is None or loop is self._loop):
+            self._schedule(fields)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._schedule, fields)
+        else:
+            logger.warning("event=event_bus.send_skipped reason=no_event_loop size=%d", len(batch))
+
+    def _schedule(self, fields: dict[str, str]) -> None:
+        task = asyncio.get_running_loop().create_task(self._xadd(fields))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _xadd(self, fields: dict[str, str]) -> None:
+        try:
+            await self._client.xadd(self._stream, fields, maxlen=self._maxlen, approximate=True)
+        except Exception:
+            logger.warning("event=event_bus.xadd_failed stream=%s", self._stream, exc_info=True)
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def _handle_entry(self, fields: dict[Any, Any], deliver) -> None:
+        decoded = {self._text(k): self._text(v) for k, v in (fields or {}).items()}
+        if decoded.get("o") == self._origin:
+            return
+        try:
+            batch = [(str(pid), str(event), payload) for pid, event, payload in json.loads(decoded.get("m") or "[]")]
+        except (TypeError, ValueError):
+            logger.warning("event=event_bus.bad_entry stream=%s", self._stream)
+            return
+        deliver(batch)
+
+    async def listen(self, deliver, stop_event: asyncio.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        # Start after the newest entry: earlier batches were for sockets of that moment.
+        last_id = "0-0"
+        try:
+            newest = await self._client.xrevrange(self._stream, count=1)
+            if newest:
+                last_id = self._text(newest[0][0])
+        except Exception:
+            # "$" (only entries added from now on) rather than replaying the whole stream.
+            last_id = "$"
+            logger.warning("event=event_bus.tail_failed stream=%s", self._stream, exc_info=True)
+
+        while not stop_event.is_set():
+            try:
+                res = await self._client.xread({self._stream: last_id}, count=100, block=1000)
+            except Exception:
+                logger.warning("event=event_bus.xread_failed stream=%s", self._stream, exc_info=True)
+                await asyncio.sleep(1.0)
+                continue
+            for _stream, entries in res or []:
+                for entry_id, fields in entries:
+                    last_id = self._text(entry_id)
+                    self._handle_entry(fields, deliver)
+
+    async def aclose(self) -> None:
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
 
 
 event_bus = InMemoryEventBus()
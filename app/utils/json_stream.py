@@ -0,0 +1,185 @@
+"""Incremental reading of large JSON documents.
+
+Stress scenarios and fixture packs can hold hundreds of thousands of participants and
+trustlines. `json.load` materialises the whole document (and the whole file as one
+string) before the first row can be written; these helpers keep one item in memory at a
+time. They only understand the two shapes we ship: a top-level array, or a top-level
+object whose large members are arrays.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Iterator, TextIO
+
+_WS = " \t\r\n"
+_CHUNK = 1 << 16
+
+
+class _Stream:
+    def __init__(self, fp: TextIO, chunk_size: int) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed text so the buffer stays around one chunk plus one item.
+        if self.pos > self._chunk_size:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk.
+            if end >= len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip(self) -> None:
+        """Consume one value without building it."""
+        if self.peek() not in "[{":
+            self.value()
+            return
+        depth = 0
+        in_string = False
+        escaped = False
+        while True:
+            if self.pos >= len(self.buf) and not self.fill():
+                raise ValueError("unexpected end of JSON input")
+            ch = self.buf[self.pos]
+            self.pos += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in "[{":
+                depth += 1
+            elif ch in "]}":
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"expected ',' or ']' at offset {self.pos - 1}, found {sep!r}")
+
+    def members(self) -> Iterator[str]:
+        """Walk a top-level object, yielding each key with the stream at its value.
+
+        The consumer must consume the value (`value`, `skip` or `items`) before resuming.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield str(key)
+            sep = self.peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"expected ',' or '}}' at offset {self.pos - 1}, found {sep!r}")
+
+
+def iter_json_array(
+    path: str, *, key: str | None = None, chunk_size: int = _CHUNK
+) -> Iterator[Any]:
+    """Yield the items of a top-level array, or of the array member `key` of a top-level object.
+
+    A missing `key` yields nothing.
+    """
+
+    with open(path, "r", encoding="utf-8") as fp:
+        stream = _Stream(fp, chunk_size)
+        if key is None:
+            yield from stream.items()
+            return
+        for member in stream.members():
+            if member == key:
+                if stream.peek() == "[":
+                    yield from stream.items()
+                else:
+                    stream.skip()
+                return
+            stream.skip()
+
+
+def load_json_object_without(
+    path: str, skip: Iterable[str], *, chunk_size: int = _CHUNK
+) -> dict[str, Any]:
+    """Load a top-level object, leaving out the (large) members named in `skip`."""
+
+    skipped = set(skip)
+    out: dict[str, Any] = {}
+    with open(path, "r", encoding="utf-8") as fp:
+        stream = _Stream(fp, chunk_size)
+        for member in stream.members():
+            if member in skipped:
+                stream.skip()
+            else:
+                out[member] = stream.value()
+    return out
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    batch: list[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -15,6 +15,27 @@ HTTP_REQUEST_DURATION_SECONDS = Histogram(
     ["method", "path"],
 )
 
+HTTP_REQUEST_DB_STATEMENTS = Histogram(
+    "geo_http_request_db_statements",
+    "SQL statements issued while serving an HTTP request",
+    ["method", "path"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+HTTP_REQUEST_DB_ROWS = Histogram(
+    "geo_http_request_db_rows",
+    "Rows read while serving an HTTP request",
+    ["method", "path"],
+    buckets=(0, 10, 100, 1000, 5000, 10000, 50000, 100000),
+)
+
+DB_STATEMENT_DURATION_SECONDS = Histogram(
+    "geo_db_statement_duration_seconds",
+    "SQL statement latency by normalised statement fingerprint (see GET /admin/debug/sql)",
+    ["operation", "fingerprint"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
 
 ROUTING_FAILURES_TOTAL = Counter(
     "geo_routing_failures_total",
@@ -34,6 +55,25 @@ CLEARING_EVENTS_TOTAL = Counter(
     ["event", "result"],
 )
 
+PAYMENT_UOW_CONFLICTS_TOTAL = Counter(
+    "geo_payment_uow_conflicts_total",
+    "Retryable conflicts (serialization, deadlock, concurrent debt insert) in payment units of work",
+    ["phase", "sqlstate"],
+)
+
+PAYMENT_UOW_RETRIES_TOTAL = Counter(
+    "geo_payment_uow_retries_total",
+    "Payment units of work rerun after a retryable conflict",
+    ["phase"],
+)
+
+PAYMENT_SCHEDULER_WAIT_SECONDS = Histogram(
+    "geo_payment_scheduler_wait_seconds",
+    "Time a payment unit of work queued behind in-process work on overlapping segments",
+    ["phase"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
 
 RECOVERY_EVENTS_TOTAL = Counter(
     "geo_recovery_events_total",
@@ -41,6 +81,19 @@ RECOVERY_EVENTS_TOTAL = Counter(
     ["event", "result"],
 )
 
+RECOVERY_DURATION_SECONDS = Histogram(
+    "geo_recovery_duration_seconds",
+    "Recovery phase wall time (seconds)",
+    ["event"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+RECOVERY_ITEMS_TOTAL = Counter(
+    "geo_recovery_items_total",
+    "Prepare locks and transactions resolved by recovery (rate() gives throughput)",
+    ["event", "item"],
+)
+
 
 EVENT_BUS_DROPPED_TOTAL = Counter(
     "geo_event_bus_dropped_total",
@@ -56,5 +109,27 @@ BACKGROUND_JOB_EVENTS_TOTAL = Counter(
 )
 
 
+SIMULATOR_TICK_PHASE_SECONDS = Histogram(
+    "geo_simulator_tick_phase_seconds",
+    "Real-mode simulator tick phase wall time (seconds, including nested phases)",
+    ["phase"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+SIMULATOR_TICK_PHASE_STATEMENTS = Histogram(
+    "geo_simulator_tick_phase_statements",
+    "SQL statements issued by a real-mode simulator tick phase (excluding nested phases)",
+    ["phase"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+
+SIMULATOR_TICK_PHASE_ROWS = Histogram(
+    "geo_simulator_tick_phase_rows",
+    "Rows read by a real-mode simulator tick phase (excluding nested phases)",
+    ["phase"],
+    buckets=(0, 10, 100, 1000, 5000, 10000, 50000, 100000, 500000),
+)
+
+
 def render_metrics() -> tuple[bytes, str]:
     return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from app.utils.exceptions import BadRequestException
+
+
+def encode_cursor(fields: dict[str, Any]) -> str:
+    """Encode keyset position fields as an opaque URL-safe cursor string."""
+    raw = json.dumps(fields, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Raises BadRequestException for anything that is not a well-formed cursor; callers
+    still validate the individual fields they need.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise BadRequestException("Invalid cursor", details={"cursor": cursor}) from exc
+    if not isinstance(data, dict):
+        raise BadRequestException("Invalid cursor", details={"cursor": cursor})
+    return data
@@ -0,0 +1,237 @@
+"""Optional cross-worker tier for the routing and balance caches.
+
+The process-local caches (`PaymentRouter._graph_cache`, `PaymentRouter._topology_cache`,
+`app.core.balance.service._summary_cache`) stay the first tier that requests read. With
+several uvicorn workers each of them used to hold its own copy, and `invalidate_cache()`
+only cleared the copy of the worker that committed. This module adds a second tier that
+every worker of a hub shares:
+
+* values live under versioned keys ``{prefix}:{namespace}:{epoch}.{version}:{key}``, where
+  ``version`` is a per-scope (per-equivalent) counter and ``epoch`` a global one.
+  Invalidating a scope increments both counters in Redis, so superseded entries are never
+  read again and simply expire by TTL;
+* the same invalidation is PUBLISHed, and every other worker's listener drops its matching
+  first-tier entries, so local copies stay coherent too.
+
+A reader takes the version token *before* it queries the database and stores what it
+built under that token. If another worker commits in between, the token is already
+outdated and the possibly stale value is never served.
+
+The default `SharedCache` is a no-op, so single-process deployments and tests behave as
+before. `RedisSharedCache` is installed by the app lifespan when both `REDIS_ENABLED` and
+`ROUTING_SHARED_CACHE_ENABLED` are set.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "*"
+DEFAULT_PREFIX = "geo:cache"
+
+InvalidationListener = Callable[[Optional[str]], None]
+
+_listeners: list[InvalidationListener] = []
+
+
+def add_invalidation_listener(listener: InvalidationListener) -> None:
+    """Register a callback that drops first-tier entries for a scope (None = everything)."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def notify_invalidation(scope: str | None) -> None:
+    for listener in list(_listeners):
+        try:
+            listener(scope)
+        except Exception:
+            logger.warning("event=shared_cache.listener_failed scope=%s", scope, exc_info=True)
+
+
+class SharedCache:
+    """No-op tier: nothing is shared and invalidations stay process-local."""
+
+    enabled = False
+
+    async def get(
+        self, namespace: str, key: str, *, scope: str | None
+    ) -> tuple[str | None, bytes | None]:
+        """Return `(version_token, value)`; a None token means "do not store"."""
+        return None, None
+
+    async def set(
+        self, namespace: str, key: str, value: bytes, *, token: str, ttl_seconds: int
+    ) -> None:
+        return None
+
+    def invalidate(self, scope: str | None) -> None:
+        return None
+
+    async def listen(self, stop_event: asyncio.Event) -> None:
+        await stop_event.wait()
+
+    async def aclose(self) -> None:
+        return None
+
+
+# Reads both counters and the value in one round trip. The value key is derived from the
+# token inside the script, so the token and the value always belong together.
+_GET_LUA = """
+local epoch = redis.call('get', KEYS[1]) or '0'
+local version = '0'
+if KEYS[2] ~= KEYS[1] then
+  version = redis.call('get', KEYS[2]) or '0'
+end
+local token = epoch .. '.' .. version
+return {token, redis.call('get', ARGV[1] .. token .. ':' .. ARGV[2])}
+""".strip()
+
+_INVALIDATE_LUA = """
+redis.call('incr', KEYS[1])
+if KEYS[2] ~= KEYS[1] then
+  redis.call('incr', KEYS[2])
+end
+return redis.call('publish', ARGV[1], ARGV[2])
+""".strip()
+
+
+class RedisSharedCache(SharedCache):
+    """Redis-backed tier. Expects a client created with ``decode_responses=False``."""
+
+    enabled = True
+
+    def __init__(self, client: Any, *, prefix: str = DEFAULT_PREFIX) -> None:
+        self._client = client
+        self._prefix = prefix
+        self._channel = f"{prefix}:invalidate"
+        # Messages carry the origin so a worker does not drop entries it rebuilt after
+        # its own invalidation already cleared them.
+        self._origin = uuid.uuid4().hex
+        self._pending: set[asyncio.Task] = set()
+        # Scopes whose counter bump is still in flight. Until it lands, Redis may still
+        # return the superseded value, so reads of these scopes bypass the shared tier.
+        self._dirty: Counter[str] = Counter()
+
+    def _version_key(self, scope: str | None) -> str:
+        return f"{self._prefix}:v:{scope or GLOBAL_SCOPE}"
+
+    def _is_dirty(self, scope: str | None) -> bool:
+        return bool(self._dirty[GLOBAL_SCOPE] or (scope and self._dirty[scope]))
+
+    async def get(
+        self, namespace: str, key: str, *, scope: str | None
+    ) -> tuple[str | None, bytes | None]:
+        if self._is_dirty(scope):
+            return None, None
+        try:
+            res = await self._client.eval(
+                _GET_LUA,
+                2,
+                self._version_key(None),
+                self._version_key(scope),
+                f"{self._prefix}:{namespace}:",
+                key,
+            )
+        except Exception:
+            logger.warning("event=shared_cache.get_failed namespace=%s key=%s", namespace, key, exc_info=True)
+            return None, None
+        if not res:
+            return None, None
+        token = res[0].decode() if isinstance(res[0], bytes) else str(res[0])
+        value = res[1] if len(res) > 1 else None
+        if self._is_dirty(scope):
+            # An invalidation started while we were waiting for Redis.
+            return None, None
+        return token, value
+
+    async def set(
+        self, namespace: str, key: str, value: bytes, *, token: str, ttl_seconds: int
+    ) -> None:
+        if ttl_seconds <= 0:
+            return
+        try:
+            await self._client.set(
+                f"{self._prefix}:{namespace}:{token}:{key}", value, ex=int(ttl_seconds)
+            )
+        except Exception:
+            logger.warning("event=shared_cache.set_failed namespace=%s key=%s", namespace, key, exc_info=True)
+
+    def invalidate(self, scope: str | None) -> None:
+        # Called from synchronous post-commit hooks; the Redis round trip is scheduled on
+        # the running loop. Outside a loop there is nothing shared to invalidate.
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("event=shared_cache.invalidate_skipped reason=no_event_loop scope=%s", scope)
+            return
+        name = scope or GLOBAL_SCOPE
+        self._dirty[name] += 1
+        task = loop.create_task(self._publish_invalidation(scope))
+        self._pending.add(task)
+
+        def _done(t: asyncio.Task, name: str = name) -> None:
+            self._pending.discard(t)
+            self._dirty[name] -= 1
+            if self._dirty[name] <= 0:
+                del self._dirty[name]
+
+        task.add_done_callback(_done)
+
+    async def _publish_invalidation(self, scope: str | None) -> None:
+        try:
+            await self._client.eval(
+                _INVALIDATE_LUA,
+                2,
+                self._version_key(None),
+                self._version_key(scope),
+                self._channel,
+                f"{self._origin}|{scope or GLOBAL_SCOPE}",
+            )
+        except Exception:
+            logger.warning("event=shared_cache.invalidate_failed scope=%s", scope, exc_info=True)
+
+    def _handle_message(self, data: Any) -> None:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8", errors="replace")
+        origin, _, scope = str(data).partition("|")
+        if not scope or origin == self._origin:
+            return
+        notify_invalidation(None if scope == GLOBAL_SCOPE else scope)
+
+    async def listen(self, stop_event: asyncio.Event) -> None:
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self._channel)
+        try:
+            while not stop_event.is_set():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    self._handle_message(message.get("data"))
+        finally:
+            try:
+                await pubsub.unsubscribe(self._channel)
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def aclose(self) -> None:
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        await self._client.aclose()
+
+
+_shared_cache: SharedCache = SharedCache()
+
+
+def get_shared_cache() -> SharedCache:
+    return _shared_cache
+
+
+def set_shared_cache(cache: SharedCache | None) -> None:
+    global _shared_cache
+    _shared_cache = cache if cache is not None else SharedCache()
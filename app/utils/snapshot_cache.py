@@ -0,0 +1,178 @@
+"""Versioned cache for polled graph snapshots.
+
+Dashboards poll `GET /admin/graph/snapshot` and `GET /simulator/runs/{run_id}/graph/snapshot`;
+every build reads all participants, trustlines and debts and recomputes the viz sizing.
+This module keeps built snapshots under a base key (which graph, which equivalent) together
+with the *ledger version* they were built at:
+
+* the ledger version is a process-local counter per equivalent plus a global epoch. It is
+  bumped by `PaymentRouter.drop_local_cache`, i.e. whenever a payment, clearing, trustline
+  change, trust drift or inject invalidates routing for an equivalent (locally, or on another
+  worker via the shared cache tier), and by the handlers that change participant or
+  equivalent metadata;
+* `GRAPH_SNAPSHOT_CACHE_TTL_SECONDS` bounds staleness for writes that bypass those hooks
+  (seeding scripts, manual SQL, metadata changes made on another worker). 0 disables the
+  cache, as for the routing and balance caches.
+
+Entries hold the serialised body and a strong ETag over it, so an unchanged poll is a dict
+lookup and, with `If-None-Match`, a bodiless 304. Derived views (ego slices) are memoised on
+the entry they were cut from and die with it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Hashable
+
+from fastapi import Response
+
+from app.config import settings
+
+# OpenAPI `responses=` for routes served through `snapshot_response`.
+NOT_MODIFIED_RESPONSES: dict[int | str, dict[str, Any]] = {
+    304: {"description": "The snapshot identified by `If-None-Match` is still current (no body)."}
+}
+
+# Derived views memoised per entry (ego slices for distinct roots/depths/filters).
+_MAX_DERIVED_PER_ENTRY = 256
+
+_lock = threading.Lock()
+_epoch = 0
+_versions: dict[str, int] = {}
+_total = 0
+
+
+def bump_ledger_version(equivalent_code: str | None = None) -> None:
+    """Mark snapshots of `equivalent_code` (None = every equivalent) as outdated."""
+
+    global _epoch, _total
+    with _lock:
+        _total += 1
+        if equivalent_code:
+            key = str(equivalent_code).strip().upper()
+            _versions[key] = _versions.get(key, 0) + 1
+        else:
+            _epoch += 1
+
+
+def ledger_version(equivalent_code: str | None = None) -> tuple[int, int]:
+    """Version token for state of one equivalent, or of the whole ledger when None."""
+
+    if equivalent_code:
+        return _epoch, _versions.get(str(equivalent_code).strip().upper(), 0)
+    return _epoch, _total
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """RFC 9110 weak comparison of an `If-None-Match` header against `etag`."""
+
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+@dataclass
+class CachedSnapshot:
+    value: Any
+    body: bytes
+    etag: str
+    version: Hashable = None
+    stored_at: float = 0.0
+    media_type: str = "application/json"
+    derived: dict[Hashable, Any] = field(default_factory=dict)
+
+    def derive(self, key: Hashable, build) -> Any:
+        """Memoise `build()` (a view cut from `value`) on this entry."""
+
+        hit = self.derived.get(key)
+        if hit is None:
+            hit = build()
+            if len(self.derived) >= _MAX_DERIVED_PER_ENTRY:
+                self.derived.clear()
+            self.derived[key] = hit
+        return hit
+
+
+_entries: "OrderedDict[Hashable, CachedSnapshot]" = OrderedDict()
+
+
+def _ttl_seconds() -> int:
+    return int(getattr(settings, "GRAPH_SNAPSHOT_CACHE_TTL_SECONDS", 0) or 0)
+
+
+def get_snapshot(key: Hashable, *, version: Hashable) -> CachedSnapshot | None:
+    ttl = _ttl_seconds()
+    if ttl <= 0:
+        return None
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if entry.version != version or (time.monotonic() - entry.stored_at) > ttl:
+            _entries.pop(key, None)
+            return None
+        _entries.move_to_end(key, last=True)
+        return entry
+
+
+def make_snapshot(
+    value: Any,
+    body: bytes,
+    *,
+    version: Hashable = None,
+    etag_body: bytes | None = None,
+    media_type: str = "application/json",
+) -> CachedSnapshot:
+    """Wrap a freshly built snapshot; `etag_body` excludes volatile fields such as timestamps."""
+
+    return CachedSnapshot(
+        value=value,
+        body=body,
+        etag=compute_etag(body if etag_body is None else etag_body),
+        version=version,
+        stored_at=time.monotonic(),
+        media_type=media_type,
+    )
+
+
+def store_snapshot(key: Hashable, entry: CachedSnapshot) -> CachedSnapshot:
+    if _ttl_seconds() <= 0:
+        return entry
+    max_entries = max(1, int(getattr(settings, "GRAPH_SNAPSHOT_CACHE_MAX_ENTRIES", 64) or 1))
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key, last=True)
+        while len(_entries) > max_entries:
+            _entries.popitem(last=False)
+    return entry
+
+
+def snapshot_response(entry: CachedSnapshot, *, if_none_match: str | None) -> Response:
+    """Serve a cached body, or 304 when the client already holds this version."""
+
+    # Representations are negotiated on Accept (see `snapshot_codec`).
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
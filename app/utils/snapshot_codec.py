@@ -0,0 +1,482 @@
+"""Columnar binary encoding of graph snapshots for large-network visualisation.
+
+JSON snapshots repeat every key and viz token per node and link and carry money as decimal
+strings; for thousands of links that is megabytes per poll. Clients that send
+``Accept: application/vnd.geo.graph-snapshot`` get the same graph as a columnar frame
+instead (``;compression=none`` skips zlib, e.g. behind a compressing proxy). The JSON
+representation stays the default and the fallback for anything the frame cannot express.
+
+Frame:   ``b"GEOS"``, u8 format version, u8 flags (bit 0 = zlib), body
+Body:    meta, string table, node columns, link columns, debt columns
+Meta:    u32 length, JSON object (kind, equivalent, generated_at, amount_scale, palette,
+         limits, equivalents, root_pid, incidents/audit_log/transactions when non-empty)
+Strings: u32 count, then (u32 length, utf-8) per entry. String columns hold u32 refs into
+         this table, 1-based; 0 is null. Ids, names, statuses, viz keys, equivalent codes
+         and JSON-encoded policies/extra fields are all interned here.
+Nodes:   u32 count, then one column per field, all big-endian:
+         refs id, name, type, status, net_balance, viz_color_key, viz_shape_key,
+         viz_badge_key, extra; i32 links_count (-1 = null); i64 net_balance_atoms;
+         f32 viz_w, viz_h (NaN = null)
+Links:   u32 count; u32 source, target (node indices); refs id, equivalent, status,
+         viz_color_key, viz_width_key, viz_alpha_key, policy, extra; i64 trust_limit,
+         used, available (atoms); i64 created_at, updated_at (epoch ms)
+Debts:   u32 count; ref equivalent; u32 debtor, creditor (node indices); i64 amount (atoms)
+
+Amounts are integers scaled by ``10 ** amount_scale`` (the largest number of fractional
+digits present, at most 18) and i64 null is ``-2**63``. Admin participants map
+``pid``/``display_name`` to ``id``/``name``; admin trustline endpoint display names are
+not repeated (they are the node names).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import struct
+import zlib
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Iterable, Optional
+
+from app.utils import snapshot_cache
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "application/vnd.geo.graph-snapshot"
+MAGIC = b"GEOS"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 1
+
+MAX_AMOUNT_SCALE = 18
+_NULL_I64 = -(2**63)
+_I64_MAX = 2**63 - 1
+
+_U8 = struct.Struct(">B")
+_U32 = struct.Struct(">I")
+
+_NODE_REFS = (
+    "id",
+    "name",
+    "type",
+    "status",
+    "net_balance",
+    "viz_color_key",
+    "viz_shape_key",
+    "viz_badge_key",
+    "extra",
+)
+_LINK_REFS = (
+    "id",
+    "equivalent",
+    "status",
+    "viz_color_key",
+    "viz_width_key",
+    "viz_alpha_key",
+    "policy",
+    "extra",
+)
+_LINK_AMOUNTS = ("trust_limit", "used", "available")
+_LINK_TIMES = ("created_at", "updated_at")
+
+# OpenAPI `responses=` for snapshot routes that negotiate this encoding.
+SNAPSHOT_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {"content": {MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}},
+    **snapshot_cache.NOT_MODIFIED_RESPONSES,
+}
+
+
+def requested_compression(accept: str | None) -> bool | None:
+    """None when `accept` does not ask for the binary encoding, else whether to zlib it."""
+
+    for part in (accept or "").split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        if media.lower() != MEDIA_TYPE:
+            continue
+        options = {}
+        for param in params:
+            name, _, value = param.partition("=")
+            options[name.strip().lower()] = value.strip().strip('"').lower()
+        try:
+            if float(options.get("q", "1")) <= 0:
+                continue
+        except ValueError:
+            continue
+        return options.get("compression", "zlib") != "none"
+    return None
+
+
+def negotiate(
+    entry: snapshot_cache.CachedSnapshot,
+    accept: str | None,
+    encode: Callable[[Any, bool], bytes],
+) -> snapshot_cache.CachedSnapshot:
+    """The representation of `entry` the client asked for; the binary one is memoised on it.
+
+    The binary ETag is derived from the JSON one, so it is equally stable across rebuilds
+    of an unchanged graph.
+    """
+
+    compress = requested_compression(accept)
+    if compress is None:
+        return entry
+
+    def _build() -> snapshot_cache.CachedSnapshot:
+        return snapshot_cache.make_snapshot(
+            entry.value,
+            encode(entry.value, compress),
+            version=entry.version,
+            etag_body=f"{entry.etag};{MEDIA_TYPE};{int(compress)}".encode("ascii"),
+            media_type=MEDIA_TYPE,
+        )
+
+    try:
+        return entry.derive(("binary", compress), _build)
+    except ValueError as exc:
+        logger.warning("graph_snapshot.binary_fallback reason=%s", exc)
+        return entry
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+
+class _Strings:
+    def __init__(self) -> None:
+        self._refs: dict[str, int] = {}
+        self.items: list[str] = []
+
+    def ref(self, value: Any) -> int:
+        if value is None:
+            return 0
+        if not isinstance(value, str):
+            value = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+        ref = self._refs.get(value)
+        if ref is None:
+            self.items.append(value)
+            ref = self._refs[value] = len(self.items)
+        return ref
+
+
+def _decimal(value: Any) -> Decimal | None:
+    if value is None or value == "":
+        return None
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(str(value))
+    except InvalidOperation as exc:
+        raise ValueError(f"amount is not a decimal: {value!r}") from exc
+    if not amount.is_finite():
+        raise ValueError(f"amount is not finite: {value!r}")
+    return amount
+
+
+def _amount_scale(amounts: Iterable[Decimal | None]) -> int:
+    scale = 0
+    for amount in amounts:
+        if amount is not None:
+            scale = max(scale, -int(amount.as_tuple().exponent))
+    if scale > MAX_AMOUNT_SCALE:
+        raise ValueError(f"amount scale {scale} exceeds {MAX_AMOUNT_SCALE}")
+    return scale
+
+
+def _atoms(amount: Decimal | None, scale: int) -> int:
+    if amount is None:
+        return _NULL_I64
+    atoms = int(amount.scaleb(scale))
+    if not -_I64_MAX <= atoms <= _I64_MAX:
+        raise ValueError(f"amount {amount} does not fit in i64 atoms")
+    return atoms
+
+
+def _int_atoms(value: Any) -> int:
+    if value is None or value == "":
+        return _NULL_I64
+    atoms = int(value)
+    if not -_I64_MAX <= atoms <= _I64_MAX:
+        raise ValueError(f"net balance {value} does not fit in i64 atoms")
+    return atoms
+
+
+def _epoch_ms(value: datetime | None) -> int:
+    if value is None:
+        return _NULL_I64
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _size(size: Any, axis: str) -> float:
+    if size is None:
+        return math.nan
+    value = size.get(axis) if isinstance(size, dict) else getattr(size, axis, None)
+    return math.nan if value is None else float(value)
+
+
+def _column(out: list[bytes], code: str, values: list) -> None:
+    out.append(struct.pack(f">{len(values)}{code}", *values))
+
+
+def _encode(
+    meta: dict[str, Any],
+    nodes: list[dict[str, Any]],
+    links: list[dict[str, Any]],
+    debts: list[dict[str, Any]],
+    *,
+    compress: bool,
+) -> bytes:
+    index = {node["id"]: i for i, node in enumerate(nodes)}
+
+    def _node(pid: Any) -> int:
+        try:
+            return index[pid]
+        except KeyError:
+            raise ValueError(f"edge references unknown node {pid!r}") from None
+
+    for link in links:
+        for name in _LINK_AMOUNTS:
+            link[name] = _decimal(link.get(name))
+    for debt in debts:
+        debt["amount"] = _decimal(debt["amount"])
+    scale = _amount_scale(
+        [link[name] for link in links for name in _LINK_AMOUNTS] + [d["amount"] for d in debts]
+    )
+
+    strings = _Strings()
+    columns: list[bytes] = []
+
+    _column(columns, "I", [len(nodes)])
+    for name in _NODE_REFS:
+        _column(columns, "I", [strings.ref(node.get(name)) for node in nodes])
+    links_count = [node.get("links_count") for node in nodes]
+    _column(columns, "i", [-1 if n is None else int(n) for n in links_count])
+    _column(columns, "q", [_int_atoms(node.get("net_balance_atoms")) for node in nodes])
+    for axis in ("w", "h"):
+        _column(columns, "f", [_size(node.get("viz_size"), axis) for node in nodes])
+
+    _column(columns, "I", [len(links)])
+    _column(columns, "I", [_node(link["source"]) for link in links])
+    _column(columns, "I", [_node(link["target"]) for link in links])
+    for name in _LINK_REFS:
+        _column(columns, "I", [strings.ref(link.get(name)) for link in links])
+    for name in _LINK_AMOUNTS:
+        _column(columns, "q", [_atoms(link[name], scale) for link in links])
+    for name in _LINK_TIMES:
+        _column(columns, "q", [_epoch_ms(link.get(name)) for link in links])
+
+    _column(columns, "I", [len(debts)])
+    _column(columns, "I", [strings.ref(debt["equivalent"]) for debt in debts])
+    _column(columns, "I", [_node(debt["debtor"]) for debt in debts])
+    _column(columns, "I", [_node(debt["creditor"]) for debt in debts])
+    _column(columns, "q", [_atoms(debt["amount"], scale) for debt in debts])
+
+    body: list[bytes] = []
+    meta_raw = json.dumps({**meta, "amount_scale": scale}, separators=(",", ":"), default=str).encode("utf-8")
+    body.append(_U32.pack(len(meta_raw)))
+    body.append(meta_raw)
+    body.append(_U32.pack(len(strings.items)))
+    for value in strings.items:
+        raw = value.encode("utf-8")
+        body.append(_U32.pack(len(raw)))
+        body.append(raw)
+    body.extend(columns)
+
+    payload = b"".join(body)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload)
+        flags |= FLAG_ZLIB
+    return MAGIC + _U8.pack(FORMAT_VERSION) + _U8.pack(flags) + payload
+
+
+def encode_simulator_snapshot(snapshot: Any, compress: bool = True) -> bytes:
+    """Encode a `SimulatorGraphSnapshot` (full graph or ego slice)."""
+
+    nodes = []
+    for node in snapshot.nodes:
+        nodes.append(
+            {
+                "id": node.id,
+                "name": node.name,
+                "type": node.type,
+                "status": node.status,
+                "net_balance": node.net_balance,
+                "viz_color_key": node.viz_color_key,
+                "viz_shape_key": node.viz_shape_key,
+                "viz_badge_key": node.viz_badge_key,
+                "extra": node.model_extra or None,
+                "links_count": node.links_count,
+                "net_balance_atoms": node.net_balance_atoms,
+                "viz_size": node.viz_size,
+            }
+        )
+    links = [
+        {
+            "source": link.source,
+            "target": link.target,
+            "id": link.id,
+            "status": link.status,
+            "viz_color_key": link.viz_color_key,
+            "viz_width_key": link.viz_width_key,
+            "viz_alpha_key": link.viz_alpha_key,
+            "extra": link.model_extra or None,
+            "trust_limit": link.trust_limit,
+            "used": link.used,
+            "available": link.available,
+        }
+        for link in snapshot.links
+    ]
+    meta = {
+        "kind": "simulator",
+        "equivalent": snapshot.equivalent,
+        "generated_at": snapshot.generated_at.isoformat(),
+        "palette": (
+            {key: entry.model_dump(exclude_none=True) for key, entry in snapshot.palette.items()}
+            if snapshot.palette
+            else None
+        ),
+        "limits": snapshot.limits.model_dump(exclude_none=True) if snapshot.limits else None,
+        **(snapshot.model_extra or {}),
+    }
+    return _encode(meta, nodes, links, [], compress=compress)
+
+
+def encode_admin_graph(graph: Any, compress: bool = True) -> bytes:
+    """Encode an admin graph (`AdminGraph`, or a snapshot/ego response model)."""
+
+    nodes = [
+        {
+            "id": p.pid,
+            "name": p.display_name,
+            "type": p.type,
+            "status": p.status,
+            "viz_color_key": p.viz_color_key,
+            "net_balance_atoms": p.net_balance_atoms,
+            "viz_size": p.viz_size,
+        }
+        for p in graph.participants
+    ]
+    links = [
+        {
+            "source": t.from_pid,
+            "target": t.to_pid,
+            "id": str(t.id),
+            "equivalent": t.equivalent_code,
+            "status": t.status,
+            "policy": t.policy,
+            "trust_limit": t.limit,
+            "used": t.used,
+            "available": t.available,
+            "created_at": t.created_at,
+            "updated_at": t.updated_at,
+        }
+        for t in graph.trustlines
+    ]
+    debts = [
+        {"equivalent": d.equivalent, "debtor": d.debtor, "creditor": d.creditor, "amount": d.amount}
+        for d in graph.debts
+    ]
+    meta: dict[str, Any] = {
+        "kind": "admin",
+        "equivalents": [e.model_dump(mode="json", by_alias=True) for e in graph.equivalents],
+        "root_pid": getattr(graph, "root_pid", None),
+    }
+    for extra in ("incidents", "audit_log", "transactions"):
+        if getattr(graph, extra, None):
+            meta[extra] = getattr(graph, extra)
+    return _encode(meta, nodes, links, debts, compress=compress)
+
+
+# ---------------------------------------------------------------------------
+# Decoding (reference implementation; the UIs carry their own)
+# ---------------------------------------------------------------------------
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def column(self, code: str, n: int) -> tuple:
+        fmt = struct.Struct(f">{n}{code}")
+        if self._pos + fmt.size > len(self._data):
+            raise ValueError("truncated snapshot")
+        values = fmt.unpack_from(self._data, self._pos)
+        self._pos += fmt.size
+        return values
+
+    def count(self) -> int:
+        return self.column("I", 1)[0]
+
+    def take(self, n: int) -> bytes:
+        chunk = bytes(self._data[self._pos : self._pos + n])
+        if len(chunk) != n:
+            raise ValueError("truncated snapshot")
+        self._pos += n
+        return chunk
+
+
+def _amount(atoms: int, scale: int) -> Optional[str]:
+    return None if atoms == _NULL_I64 else str(Decimal(atoms).scaleb(-scale))
+
+
+def decode_snapshot(blob: bytes) -> dict[str, Any]:
+    """Decode a frame into ``{"meta", "nodes", "links", "debts"}`` with row dicts.
+
+    Amounts come back as decimal strings at `amount_scale`, timestamps as epoch ms and
+    endpoints as node ids.
+    """
+
+    if len(blob) < len(MAGIC) + 2 or blob[: len(MAGIC)] != MAGIC or blob[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError("unsupported snapshot format")
+    flags = blob[len(MAGIC) + 1]
+    payload = blob[len(MAGIC) + 2 :]
+    reader = _Reader(zlib.decompress(payload) if flags & FLAG_ZLIB else payload)
+
+    meta = json.loads(reader.take(reader.count()).decode("utf-8"))
+    scale = int(meta.get("amount_scale") or 0)
+    strings: list[Optional[str]] = [None]
+    for _ in range(reader.count()):
+        strings.append(reader.take(reader.count()).decode("utf-8"))
+
+    def _refs(n: int) -> list[Optional[str]]:
+        return [strings[ref] for ref in reader.column("I", n)]
+
+    n = reader.count()
+    node_cols: dict[str, list] = {name: _refs(n) for name in _NODE_REFS}
+    node_cols["extra"] = [None if v is None else json.loads(v) for v in node_cols["extra"]]
+    node_cols["links_count"] = [None if v < 0 else v for v in reader.column("i", n)]
+    node_cols["net_balance_atoms"] = [None if v == _NULL_I64 else str(v) for v in reader.column("q", n)]
+    widths = reader.column("f", n)
+    heights = reader.column("f", n)
+    node_cols["viz_size"] = [
+        None if math.isnan(w) else {"w": w, "h": h} for w, h in zip(widths, heights)
+    ]
+    nodes = [{name: col[i] for name, col in node_cols.items()} for i in range(n)]
+    ids = node_cols["id"]
+
+    m = reader.count()
+    link_cols: dict[str, list] = {
+        "source": [ids[i] for i in reader.column("I", m)],
+        "target": [ids[i] for i in reader.column("I", m)],
+    }
+    link_cols.update({name: _refs(m) for name in _LINK_REFS})
+    for name in ("policy", "extra"):
+        link_cols[name] = [None if v is None else json.loads(v) for v in link_cols[name]]
+    for name in _LINK_AMOUNTS:
+        link_cols[name] = [_amount(v, scale) for v in reader.column("q", m)]
+    for name in _LINK_TIMES:
+        link_cols[name] = [None if v == _NULL_I64 else v for v in reader.column("q", m)]
+    links = [{name: col[i] for name, col in link_cols.items()} for i in range(m)]
+
+    k = reader.count()
+    debt_cols = {
+        "equivalent": _refs(k),
+        "debtor": [ids[i] for i in reader.column("I", k)],
+        "creditor": [ids[i] for i in reader.column("I", k)],
+        "amount": [_amount(v, scale) for v in reader.column("q", k)],
+    }
+    debts = [{name: col[i] for name, col in debt_cols.items()} for i in range(k)]
+
+    return {"meta": meta, "nodes": nodes, "links": links, "debts": debts}
@@ -0,0 +1,91 @@
+"""transactions: denormalised payment party columns for keyset history paging
+
+Revision ID: 020_transactions_payment_party_columns
+Revises: 019_trust_lines_partial_unique_live
+Create Date: 2026-10-18
+
+`GET /payments` filtered PAYMENT rows by `payload->>'from'`, `payload->>'to'` and
+`payload->>'equivalent'` (OR-ed with `initiator_id`) and paged with OFFSET, so every
+deeper page re-scanned everything before it.
+
+This revision adds `sender_pid`, `receiver_pid` and `equivalent_code`, backfills them
+from the payload of existing PAYMENT rows, and indexes `(sender_pid, created_at, id)`
+and `(receiver_pid, created_at, id)` so the listing becomes two ordered range scans with
+a `(created_at, id)` keyset cursor. New rows are filled by the ORM `before_insert` hook
+on `Transaction`.
+
+The payload expression indexes from 011 served nothing but that listing and are
+dropped; downgrade restores them. SQLite development databases get the same columns
+from `scripts/init_sqlite_db.py`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "020_transactions_payment_party_columns"
+down_revision = "019_trust_lines_partial_unique_live"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("transactions", sa.Column("sender_pid", sa.String(64), nullable=True))
+    op.add_column("transactions", sa.Column("receiver_pid", sa.String(64), nullable=True))
+    op.add_column("transactions", sa.Column("equivalent_code", sa.String(16), nullable=True))
+
+    op.execute(
+        """
+        UPDATE transactions
+        SET sender_pid = LEFT(payload->>'from', 64),
+            receiver_pid = LEFT(payload->>'to', 64),
+            equivalent_code = LEFT(payload->>'equivalent', 16)
+        WHERE type = 'PAYMENT'
+        """
+    )
+
+    op.create_index(
+        "ix_transactions_sender_created_id",
+        "transactions",
+        ["sender_pid", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_transactions_receiver_created_id",
+        "transactions",
+        ["receiver_pid", "created_at", "id"],
+    )
+
+    op.execute("DROP INDEX IF EXISTS ix_transactions_payment_payload_equivalent")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_payment_payload_to")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_payment_payload_from")
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_transactions_payment_payload_from
+        ON transactions ((payload->>'from'))
+        WHERE type = 'PAYMENT'
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_transactions_payment_payload_to
+        ON transactions ((payload->>'to'))
+        WHERE type = 'PAYMENT'
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_transactions_payment_payload_equivalent
+        ON transactions ((payload->>'equivalent'))
+        WHERE type = 'PAYMENT'
+        """
+    )
+
+    op.drop_index("ix_transactions_receiver_created_id", table_name="transactions")
+    op.drop_index("ix_transactions_sender_created_id", table_name="transactions")
+    op.drop_column("transactions", "equivalent_code")
+    op.drop_column("transactions", "receiver_pid")
+    op.drop_column("transactions", "sender_pid")
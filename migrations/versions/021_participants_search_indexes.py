@@ -0,0 +1,48 @@
+"""participants: trigram and PID-prefix indexes for participant search
+
+Revision ID: 021_participants_search_indexes
+Revises: 020_transactions_payment_party_columns
+Create Date: 2026-10-18
+
+Participant search used `ILIKE '%q%'` on `display_name` and `pid`, a sequential scan
+behind the UI search box. `app/core/participants/search.py` now matches
+
+* PIDs by prefix (`pid LIKE 'q%'`) -> btree with `varchar_pattern_ops`, which makes a
+  LIKE prefix indexable under any database collation;
+* display names by `lower(display_name) LIKE '%q%'` and the trigram similarity
+  operator -> GIN `gin_trgm_ops` over `lower(display_name)`.
+
+`pg_trgm` ships with PostgreSQL contrib; the search code probes for it and falls back to
+plain LIKE when a database was built without this migration.
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "021_participants_search_indexes"
+down_revision = "020_transactions_payment_party_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_participants_display_name_trgm
+        ON participants USING GIN (lower(display_name) gin_trgm_ops)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_participants_pid_prefix
+        ON participants (pid varchar_pattern_ops)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_participants_pid_prefix")
+    op.execute("DROP INDEX IF EXISTS ix_participants_display_name_trgm")
+    # The extension is left installed: other objects may depend on it by now.
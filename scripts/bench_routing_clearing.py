@@ -0,0 +1,454 @@
+"""Deterministic benchmark of the routing and clearing primitives over fixture seeds.
+
+Each admin-fixtures pack (participants, equivalents, trustlines, debts) is loaded into a
+fresh SQLite database, optionally replicated `--scales` times into a larger ring of
+communities, and the hot paths are timed against it:
+
+* `PaymentRouter.build_graph`;
+* `PaymentRouter._bfs_single_path` and `find_flow_routes` per hop limit;
+* `PaymentRouter.calculate_max_flow`;
+* `ClearingService.find_cycles` per max depth.
+
+Query pairs come from a seeded RNG over the sorted PIDs, so two runs with the same
+arguments exercise the same calls. Every case carries a digest of its results next to
+the timings: a changed digest means the primitive now answers differently, not just at
+another speed.
+
+    python scripts/bench_routing_clearing.py --output .local-run/bench/base.json
+    python scripts/bench_routing_clearing.py --baseline .local-run/bench/base.json
+
+With `--baseline`, cases whose median got slower by more than `--max-regression` (or
+whose digest changed) are reported and the exit code is 1.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Awaitable, Callable
+
+# Add repo root to import path (so `import app` works when run as a script)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.clearing.service import ClearingService  # noqa: E402
+from app.core.payments.router import PaymentRouter  # noqa: E402
+from app.db.models import Base, Debt, Equivalent, Participant, TrustLine  # noqa: E402
+
+SCHEMA_VERSION = 1
+
+DEFAULT_PACKS = {
+    "admin-fixtures-v1": os.path.join(REPO_ROOT, "admin-fixtures", "v1", "datasets"),
+    "riverside-town-50-v2": os.path.join(
+        REPO_ROOT, "admin-fixtures", "packs", "riverside-town-50-v2", "v1", "datasets"
+    ),
+    "greenfield-village-100-v2": os.path.join(
+        REPO_ROOT, "admin-fixtures", "packs", "greenfield-village-100-v2", "v1", "datasets"
+    ),
+}
+
+# Capacity of the trustlines that join replicated communities into a ring.
+_BRIDGE_LIMIT = Decimal("1000.00")
+
+
+def _load_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _csv_ints(value: str) -> list[int]:
+    return [int(v) for v in str(value).split(",") if v.strip()]
+
+
+def _replicated_pid(pid: str, copy: int) -> str:
+    return pid if copy == 0 else f"{pid}_x{copy}"
+
+
+def load_pack(datasets_dir: str, *, scale: int) -> dict[str, list[dict[str, Any]]]:
+    """Read a fixture pack and replicate it `scale` times, bridged into a ring."""
+
+    participants = _load_json(os.path.join(datasets_dir, "participants.json"))
+    equivalents = _load_json(os.path.join(datasets_dir, "equivalents.json"))
+    trustlines = _load_json(os.path.join(datasets_dir, "trustlines.json"))
+    debts = _load_json(os.path.join(datasets_dir, "debts.json"))
+
+    out: dict[str, list[dict[str, Any]]] = {
+        "equivalents": [dict(e) for e in equivalents],
+        "participants": [],
+        "trustlines": [],
+        "debts": [],
+    }
+    for copy in range(scale):
+        for p in participants:
+            out["participants"].append({**p, "pid": _replicated_pid(p["pid"], copy)})
+        for tl in trustlines:
+            out["trustlines"].append(
+                {**tl, "from": _replicated_pid(tl["from"], copy), "to": _replicated_pid(tl["to"], copy)}
+            )
+        for d in debts:
+            out["debts"].append(
+                {
+                    **d,
+                    "debtor": _replicated_pid(d["debtor"], copy),
+                    "creditor": _replicated_pid(d["creditor"], copy),
+                }
+            )
+
+    if scale > 1:
+        hub = sorted(p["pid"] for p in participants)[0]
+        bridges: set[tuple[str, str]] = set()
+        for copy in range(scale):
+            a = _replicated_pid(hub, copy)
+            b = _replicated_pid(hub, (copy + 1) % scale)
+            bridges.update({(a, b), (b, a)})
+        for creditor, debtor in sorted(bridges):
+            for eq in out["equivalents"]:
+                out["trustlines"].append(
+                    {
+                        "equivalent": eq["code"],
+                        "from": creditor,
+                        "to": debtor,
+                        "limit": str(_BRIDGE_LIMIT),
+                        "status": "active",
+                        "policy": {"auto_clearing": True, "can_be_intermediate": True},
+                    }
+                )
+    return out
+
+
+async def seed_database(session: AsyncSession, pack: dict[str, list[dict[str, Any]]]) -> None:
+    eq_ids: dict[str, uuid.UUID] = {}
+    for item in pack["equivalents"]:
+        code = str(item["code"]).upper()
+        eq = Equivalent(
+            code=code,
+            symbol=item.get("symbol"),
+            description=item.get("description"),
+            precision=int(item.get("precision", 2)),
+            metadata_=item.get("metadata") or {},
+            is_active=bool(item.get("is_active", True)),
+        )
+        session.add(eq)
+        await session.flush()
+        eq_ids[code] = eq.id
+
+    p_ids: dict[str, uuid.UUID] = {}
+    for item in pack["participants"]:
+        pid = str(item["pid"])
+        p_ids[pid] = uuid.uuid4()
+        session.add(
+            Participant(
+                id=p_ids[pid],
+                pid=pid,
+                display_name=str(item.get("display_name") or pid),
+                public_key=hashlib.sha256(pid.encode("utf-8")).hexdigest(),
+                type=str(item.get("type") or "person"),
+                status="active" if item.get("status") in (None, "", "active") else "suspended",
+            )
+        )
+    await session.flush()
+
+    for item in pack["trustlines"]:
+        session.add(
+            TrustLine(
+                from_participant_id=p_ids[item["from"]],
+                to_participant_id=p_ids[item["to"]],
+                equivalent_id=eq_ids[str(item["equivalent"]).upper()],
+                limit=Decimal(str(item["limit"])),
+                policy=item.get("policy"),
+                status=str(item.get("status") or "active"),
+            )
+        )
+    for item in pack["debts"]:
+        session.add(
+            Debt(
+                debtor_id=p_ids[item["debtor"]],
+                creditor_id=p_ids[item["creditor"]],
+                equivalent_id=eq_ids[str(item["equivalent"]).upper()],
+                amount=Decimal(str(item["amount"])),
+            )
+        )
+    await session.commit()
+
+
+def _digest(values: list[Any]) -> str:
+    raw = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _stats(samples: list[float]) -> dict[str, Any]:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "calls": len(ordered),
+        "min_us": round(ordered[0] * 1e6, 1),
+        "median_us": round(statistics.median(ordered) * 1e6, 1),
+        "p95_us": round(p95 * 1e6, 1),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 1),
+    }
+
+
+def _timed(fn: Callable[[], Any], repeat: int, samples: list[float]) -> Any:
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return result
+
+
+async def _timed_async(fn: Callable[[], Awaitable[Any]], repeat: int, samples: list[float]) -> Any:
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn()
+        samples.append(time.perf_counter() - started)
+    return result
+
+
+async def bench_equivalent(
+    session: AsyncSession,
+    equivalent: str,
+    *,
+    hop_limits: list[int],
+    pairs: int,
+    repeat: int,
+    seed: int,
+    amount: Decimal,
+) -> dict[str, dict[str, Any]]:
+    cases: dict[str, dict[str, Any]] = {}
+
+    router = PaymentRouter(session)
+    samples: list[float] = []
+    await _timed_async(lambda: router.build_graph(equivalent, use_shared_cache=False), repeat, samples)
+    cases["build_graph"] = {**_stats(samples), "digest": _digest([len(router.graph), len(router.pids)])}
+
+    nodes = sorted(router.graph)
+    if len(nodes) < 2:
+        return cases
+    rng = random.Random(f"{seed}:{equivalent}")
+    query_pairs = [tuple(rng.sample(nodes, 2)) for _ in range(pairs)]
+
+    for hops in hop_limits:
+        samples, found = [], []
+        for src, dst in query_pairs:
+            found.append(
+                _timed(
+                    lambda: router._bfs_single_path(src, dst, Decimal("0.01"), max_hops=hops),
+                    repeat,
+                    samples,
+                )
+            )
+        cases[f"bfs_single_path/hops={hops}"] = {**_stats(samples), "digest": _digest(found)}
+
+        samples, found = [], []
+        for src, dst in query_pairs:
+            routes = _timed(
+                lambda: router.find_flow_routes(src, dst, amount, max_hops=hops, max_paths=3, timeout_ms=60_000),
+                repeat,
+                samples,
+            )
+            found.append([[path, str(flow)] for path, flow in routes])
+        cases[f"find_flow_routes/hops={hops}"] = {**_stats(samples), "digest": _digest(found)}
+
+    samples, found = [], []
+    for src, dst in query_pairs:
+        res = _timed(lambda: router.calculate_max_flow(src, dst), repeat, samples)
+        found.append(str(res.max_amount))
+    cases["calculate_max_flow"] = {**_stats(samples), "digest": _digest(found)}
+
+    clearing = ClearingService(session)
+    for depth in hop_limits:
+        samples = []
+        cycles = await _timed_async(lambda: clearing.find_cycles(equivalent, max_depth=depth), repeat, samples)
+        shape = sorted(sorted((e["debtor"], e["creditor"], str(e["amount"])) for e in c) for c in cycles or [])
+        cases[f"find_cycles/depth={depth}"] = {**_stats(samples), "cycles": len(shape), "digest": _digest(shape)}
+
+    return cases
+
+
+async def bench_pack(
+    datasets_dir: str,
+    *,
+    scale: int,
+    hop_limits: list[int],
+    pairs: int,
+    repeat: int,
+    seed: int,
+    amount: Decimal,
+) -> dict[str, Any]:
+    pack = load_pack(datasets_dir, scale=scale)
+    with tempfile.TemporaryDirectory(prefix="geo-bench-") as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            sessions = async_sessionmaker(engine, expire_on_commit=False)
+            async with sessions() as session:
+                await seed_database(session, pack)
+            equivalents: dict[str, Any] = {}
+            for code in sorted(str(e["code"]).upper() for e in pack["equivalents"]):
+                async with sessions() as session:
+                    equivalents[code] = await bench_equivalent(
+                        session,
+                        code,
+                        hop_limits=hop_limits,
+                        pairs=pairs,
+                        repeat=repeat,
+                        seed=seed,
+                        amount=amount,
+                    )
+        finally:
+            await engine.dispose()
+    return {
+        "participants": len(pack["participants"]),
+        "trustlines": len(pack["trustlines"]),
+        "debts": len(pack["debts"]),
+        "equivalents": equivalents,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10
+        )
+    except Exception:
+        return None
+    return out.stdout.strip() or None
+
+
+async def run_benchmark(
+    packs: dict[str, str],
+    *,
+    scales: list[int],
+    hop_limits: list[int],
+    pairs: int,
+    repeat: int,
+    seed: int,
+    amount: Decimal,
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for name in sorted(packs):
+        for scale in scales:
+            results[f"{name}/x{scale}"] = await bench_pack(
+                packs[name],
+                scale=scale,
+                hop_limits=hop_limits,
+                pairs=pairs,
+                repeat=repeat,
+                seed=seed,
+                amount=amount,
+            )
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "scales": scales,
+            "hop_limits": hop_limits,
+            "pairs": pairs,
+            "repeat": repeat,
+            "seed": seed,
+            "amount": str(amount),
+        },
+        "results": results,
+    }
+
+
+def _flatten(report: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    flat: dict[str, dict[str, Any]] = {}
+    for graph, body in (report.get("results") or {}).items():
+        for eq, cases in (body.get("equivalents") or {}).items():
+            for case, stats in cases.items():
+                flat[f"{graph}/{eq}/{case}"] = stats
+    return flat
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    *,
+    max_regression: float,
+) -> list[str]:
+    """Human-readable regressions of `current` against `baseline` (empty when none)."""
+
+    problems: list[str] = []
+    base, cur = _flatten(baseline), _flatten(current)
+    for key in sorted(base.keys() & cur.keys()):
+        if base[key].get("digest") != cur[key].get("digest"):
+            problems.append(f"{key}: result digest changed {base[key].get('digest')} -> {cur[key].get('digest')}")
+        before, after = float(base[key]["median_us"]), float(cur[key]["median_us"])
+        if before > 0 and after > before * (1.0 + max_regression):
+            problems.append(f"{key}: median {before:.1f}us -> {after:.1f}us (+{(after / before - 1.0) * 100:.0f}%)")
+    return problems
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark routing and clearing primitives over fixture seeds")
+    parser.add_argument(
+        "--pack",
+        action="append",
+        choices=sorted(DEFAULT_PACKS),
+        help="Fixture pack to load (repeatable; default: all)",
+    )
+    parser.add_argument("--scales", default="1,4", help="Comma-separated replication factors (default: 1,4)")
+    parser.add_argument("--hops", default="2,3,4,6", help="Comma-separated hop limits / cycle depths")
+    parser.add_argument("--pairs", type=int, default=20, help="Query pairs per equivalent (default: 20)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per call (default: 3)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for query pair selection")
+    parser.add_argument("--amount", default="50", help="Amount for find_flow_routes (default: 50)")
+    parser.add_argument("--output", default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed relative median slowdown against --baseline (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    names = args.pack or sorted(DEFAULT_PACKS)
+    report = await run_benchmark(
+        {name: DEFAULT_PACKS[name] for name in names},
+        scales=_csv_ints(args.scales),
+        hop_limits=_csv_ints(args.hops),
+        pairs=max(1, args.pairs),
+        repeat=max(1, args.repeat),
+        seed=args.seed,
+        amount=Decimal(str(args.amount)),
+    )
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        problems = compare_reports(_load_json(args.baseline), report, max_regression=args.max_regression)
+        for line in problems:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    sys.exit(asyncio.run(main()))
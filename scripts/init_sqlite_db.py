@@ -68,17 +68,65 @@ def repair_stale_trustline_uniqueness(conn) -> bool:
     return True
 
 
+# Migration 020 denormalised the PAYMENT party keys into `transactions`.  `create_all`
+# does not add columns to an existing table, so an older SQLite database would fail every
+# payment listing with "no such column".  Unlike 019 this needs no rebuild: ADD COLUMN is
+# enough, followed by the same payload backfill and the keyset indexes.
+PAYMENT_PARTY_COLUMNS = (
+    ("sender_pid", "VARCHAR(64)", "$.from", 64),
+    ("receiver_pid", "VARCHAR(64)", "$.to", 64),
+    ("equivalent_code", "VARCHAR(16)", "$.equivalent", 16),
+)
+PAYMENT_PARTY_INDEXES = frozenset(
+    {"ix_transactions_sender_created_id", "ix_transactions_receiver_created_id"}
+)
+
+
+def repair_missing_payment_party_columns(conn) -> bool:
+    """Add and backfill the 020 payment columns if `transactions` predates them.
+
+    Takes a *sync* SQLAlchemy connection.  Returns True when columns were added.
+    """
+
+    existing = {str(r[1]) for r in conn.exec_driver_sql("PRAGMA table_info(transactions)")}
+    if not existing:
+        return False
+    missing = [c for c in PAYMENT_PARTY_COLUMNS if c[0] not in existing]
+    if not missing:
+        return False
+
+    for name, ddl_type, _path, _size in missing:
+        conn.exec_driver_sql(f"ALTER TABLE transactions ADD COLUMN {name} {ddl_type}")
+    assignments = ", ".join(
+        f"{name} = substr(json_extract(payload, '{path}'), 1, {size})"
+        for name, _ddl_type, path, size in missing
+    )
+    conn.exec_driver_sql(
+        f"UPDATE transactions SET {assignments} WHERE type = 'PAYMENT'"
+    )
+    for index in Base.metadata.tables["transactions"].indexes:
+        if index.name in PAYMENT_PARTY_INDEXES:
+            index.create(bind=conn, checkfirst=True)
+    return True
+
+
 async def init_db() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
         # After create_all, so a brand-new database skips it on the first check.
         rebuilt = await conn.run_sync(repair_stale_trustline_uniqueness)
+        payment_columns_added = await conn.run_sync(repair_missing_payment_party_columns)
 
     if rebuilt:
         print(
             "trust_lines rebuilt: the pre-019 unconditional UNIQUE was replaced by the "
             f"live-only index {LIVE_TRUSTLINE_INDEX}; rows were preserved."
         )
+    if payment_columns_added:
+        print(
+            "transactions: added and backfilled sender_pid / receiver_pid / "
+            "equivalent_code (migration 020)."
+        )
 
     await engine.dispose()
 
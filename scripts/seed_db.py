@@ -15,8 +15,11 @@ from sqlalchemy import select
 # Добавляем корень проекта в путь поиска
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.core.simulator.real_scenario_seeder import RealScenarioSeeder
+from app.db.bulk import bulk_insert_ignore
 from app.db.session import get_db_session
 from app.db.models import AuditLog, Debt, Equivalent, Participant, Transaction, TrustLine
+from app.utils.json_stream import batched, iter_json_array
 from app.utils.validation import (
     validate_equivalent_code,
     validate_equivalent_metadata,
@@ -24,6 +27,10 @@ from app.utils.validation import (
 )
 
 
+# Rows per multi-row INSERT / COPY batch while streaming fixture files.
+_BULK_BATCH = 5000
+
+
 def _parse_dt(s: str | None) -> datetime | None:
     if not s:
         return None
@@ -254,9 +261,6 @@ async def _seed_from_admin_fixtures_datasets(
         raise RuntimeError(f"Fixtures datasets dir not found: {datasets_dir}")
 
     equivalents_data = _load_json(os.path.join(datasets_dir, "equivalents.json"))
-    participants_data = _load_json(os.path.join(datasets_dir, "participants.json"))
-    trustlines_data = _load_json(os.path.join(datasets_dir, "trustlines.json"))
-    debts_data = _load_json(os.path.join(datasets_dir, "debts.json"))
     # Some fixture packs may not include transactions.
     transactions_data = _load_json_optional(os.path.join(datasets_dir, "transactions.json"), [])
     audit_data = _load_json_optional(os.path.join(datasets_dir, "audit-log.json"), [])
@@ -297,32 +301,33 @@ async def _seed_from_admin_fixtures_datasets(
             }
 
             # --- Participants ---
-            existing_pids = set((await session.execute(select(Participant.pid))).scalars().all())
-            p_models: list[Participant] = []
-            for item in participants_data or []:
-                pid = str(item.get("pid") or "").strip()
-                if not pid:
-                    continue
-
-                if pid in existing_pids:
-                    continue
-                p_models.append(
-                    Participant(
-                        pid=pid,
-                        display_name=str(item.get("display_name") or pid),
-                        public_key=_public_key_for_pid(pid),
-                        type=str(item.get("type") or "person"),
-                        status=_map_participant_status_to_db(item.get("status")),
-                        verification_level=int(item.get("verification_level") or 0),
-                        profile=item.get("profile") or {},
+            # Streamed and written with set-based inserts: existing PIDs conflict and
+            # are skipped by the database instead of being filtered row by row here.
+            participants_path = os.path.join(datasets_dir, "participants.json")
+            n_participants = 0
+            for batch in batched(iter_json_array(participants_path), _BULK_BATCH):
+                rows: list[dict[str, Any]] = []
+                for item in batch:
+                    pid = str(item.get("pid") or "").strip()
+                    if not pid:
+                        continue
+                    rows.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "pid": pid,
+                            "display_name": str(item.get("display_name") or pid),
+                            "public_key": _public_key_for_pid(pid),
+                            "type": str(item.get("type") or "person"),
+                            "status": _map_participant_status_to_db(item.get("status")),
+                            "verification_level": int(item.get("verification_level") or 0),
+                            "profile": item.get("profile") or {},
+                        }
                     )
-                )
-            session.add_all(p_models)
-            await session.flush()
+                n_participants += await bulk_insert_ignore(session, Participant.__table__, rows)
 
-            p_by_pid: dict[str, Participant] = {
-                p.pid: p for p in (await session.execute(select(Participant))).scalars().all()
-            }
+            p_by_pid: dict[str, uuid.UUID] = dict(
+                (await session.execute(select(Participant.pid, Participant.id))).all()
+            )
 
             # --- TrustLines ---
             # A closed incarnation does not occupy the triple since migration 019, so it
@@ -338,95 +343,95 @@ async def _seed_from_admin_fixtures_datasets(
                     )
                 ).all()
             )
-            tl_models: list[TrustLine] = []
-            for item in trustlines_data or []:
-                from_pid = str(item.get("from") or item.get("from_pid") or "").strip()
-                to_pid = str(item.get("to") or item.get("to_pid") or "").strip()
-                eq_code = str(item.get("equivalent") or item.get("equivalent_code") or "").strip().upper()
-                if not (from_pid and to_pid and eq_code):
-                    continue
-
-                p_from = p_by_pid.get(from_pid)
-                p_to = p_by_pid.get(to_pid)
-                eq = eq_by_code.get(eq_code)
-                if not (p_from and p_to and eq):
-                    continue
-
-                key = (p_from.id, p_to.id, eq.id)
-                if key in existing_trustlines:
-                    continue
-
-                policy = item.get("policy") or {}
-                if not isinstance(policy, dict):
-                    policy = {}
-                # Merge with defaults used by the model.
-                policy = {
-                    "auto_clearing": True,
-                    "can_be_intermediate": True,
-                    "max_hop_usage": None,
-                    "daily_limit": None,
-                    "blocked_participants": [],
-                    **policy,
-                }
+            trustlines_path = os.path.join(datasets_dir, "trustlines.json")
+            n_trustlines = 0
+            for batch in batched(iter_json_array(trustlines_path), _BULK_BATCH):
+                rows = []
+                for item in batch:
+                    from_pid = str(item.get("from") or item.get("from_pid") or "").strip()
+                    to_pid = str(item.get("to") or item.get("to_pid") or "").strip()
+                    eq_code = str(item.get("equivalent") or item.get("equivalent_code") or "").strip().upper()
+                    if not (from_pid and to_pid and eq_code):
+                        continue
 
-                created_at = _parse_dt(item.get("created_at")) or datetime.now(timezone.utc)
-                updated_at = _parse_dt(item.get("updated_at")) or created_at
+                    p_from = p_by_pid.get(from_pid)
+                    p_to = p_by_pid.get(to_pid)
+                    eq = eq_by_code.get(eq_code)
+                    if not (p_from and p_to and eq):
+                        continue
 
-                tl_models.append(
-                    TrustLine(
-                        from_participant_id=p_from.id,
-                        to_participant_id=p_to.id,
-                        equivalent_id=eq.id,
-                        limit=Decimal(str(item.get("limit") or "0")),
-                        status=str(item.get("status") or "active"),
-                        policy=policy,
-                        created_at=created_at,
-                        updated_at=updated_at,
+                    key = (p_from, p_to, eq.id)
+                    if key in existing_trustlines:
+                        continue
+                    status = str(item.get("status") or "active")
+                    if status != "closed":
+                        existing_trustlines.add(key)
+
+                    policy = item.get("policy") or {}
+                    if not isinstance(policy, dict):
+                        policy = {}
+                    # Merge with defaults used by the model.
+                    policy = {
+                        "auto_clearing": True,
+                        "can_be_intermediate": True,
+                        "max_hop_usage": None,
+                        "daily_limit": None,
+                        "blocked_participants": [],
+                        **policy,
+                    }
+
+                    created_at = _parse_dt(item.get("created_at")) or datetime.now(timezone.utc)
+                    updated_at = _parse_dt(item.get("updated_at")) or created_at
+
+                    rows.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "from_participant_id": p_from,
+                            "to_participant_id": p_to,
+                            "equivalent_id": eq.id,
+                            "limit": Decimal(str(item.get("limit") or "0")),
+                            "status": status,
+                            "policy": policy,
+                            "created_at": created_at,
+                            "updated_at": updated_at,
+                        }
                     )
-                )
-            session.add_all(tl_models)
-            await session.flush()
+                n_trustlines += await bulk_insert_ignore(session, TrustLine.__table__, rows)
 
             # --- Debts ---
-            existing_debts = set(
-                (
-                    await session.execute(
-                        select(Debt.debtor_id, Debt.creditor_id, Debt.equivalent_id)
-                    )
-                ).all()
-            )
-            debt_models: list[Debt] = []
-            for item in debts_data or []:
-                debtor_pid = str(item.get("debtor") or "").strip()
-                creditor_pid = str(item.get("creditor") or "").strip()
-                eq_code = str(item.get("equivalent") or "").strip().upper()
-                if not (debtor_pid and creditor_pid and eq_code):
-                    continue
-
-                debtor = p_by_pid.get(debtor_pid)
-                creditor = p_by_pid.get(creditor_pid)
-                eq = eq_by_code.get(eq_code)
-                if not (debtor and creditor and eq):
-                    continue
+            debts_path = os.path.join(datasets_dir, "debts.json")
+            n_debts = 0
+            for batch in batched(iter_json_array(debts_path), _BULK_BATCH):
+                rows = []
+                for item in batch:
+                    debtor_pid = str(item.get("debtor") or "").strip()
+                    creditor_pid = str(item.get("creditor") or "").strip()
+                    eq_code = str(item.get("equivalent") or "").strip().upper()
+                    if not (debtor_pid and creditor_pid and eq_code):
+                        continue
 
-                amt = Decimal(str(item.get("amount") or "0"))
-                if amt <= 0:
-                    continue
+                    debtor = p_by_pid.get(debtor_pid)
+                    creditor = p_by_pid.get(creditor_pid)
+                    eq = eq_by_code.get(eq_code)
+                    if not (debtor and creditor and eq):
+                        continue
 
-                key = (debtor.id, creditor.id, eq.id)
-                if key in existing_debts:
-                    continue
+                    amt = Decimal(str(item.get("amount") or "0"))
+                    if amt <= 0:
+                        continue
 
-                debt_models.append(
-                    Debt(
-                        debtor_id=debtor.id,
-                        creditor_id=creditor.id,
-                        equivalent_id=eq.id,
-                        amount=amt,
+                    # uq_debts_debtor_creditor_equivalent makes existing debts conflict.
+                    rows.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "debtor_id": debtor,
+                            "creditor_id": creditor,
+                            "equivalent_id": eq.id,
+                            "amount": amt,
+                            "version": 0,
+                        }
                     )
-                )
-            session.add_all(debt_models)
-            await session.flush()
+                n_debts += await bulk_insert_ignore(session, Debt.__table__, rows)
 
             # --- Transactions (subset, plus a few "stuck" ones for Incidents dashboard) ---
             existing_tx_ids = set((await session.execute(select(Transaction.id))).scalars().all())
@@ -458,7 +463,7 @@ async def _seed_from_admin_fixtures_datasets(
                         tx_id=tx_id,
                         idempotency_key=item.get("idempotency_key"),
                         type=str(item.get("type") or "PAYMENT"),
-                        initiator_id=initiator.id,
+                        initiator_id=initiator,
                         payload=item.get("payload") or {},
                         signatures=item.get("signatures") or [],
                         state=str(item.get("state") or "NEW"),
@@ -486,7 +491,7 @@ async def _seed_from_admin_fixtures_datasets(
                         tx_id=tx_id,
                         idempotency_key=None,
                         type="PAYMENT",
-                        initiator_id=initiator.id,
+                        initiator_id=initiator,
                         payload={
                             "from": initiator_pid,
                             "to": initiator_pid,
@@ -578,7 +583,7 @@ async def _seed_from_admin_fixtures_datasets(
             await session.commit()
             print(
                 "Seeding completed successfully. "
-                f"equivalents={len(eq_models)} participants={len(p_models)} trustlines={len(tl_models)} debts={len(debt_models)} "
+                f"equivalents={len(eq_models)} participants={n_participants} trustlines={n_trustlines} debts={n_debts} "
                 f"transactions={len(tx_models)} audit_log={len(al_models)}"
             )
         except Exception as e:
@@ -588,6 +593,20 @@ async def _seed_from_admin_fixtures_datasets(
         break
 
 
+async def _seed_from_scenario_file(path: str) -> None:
+    async for session in get_db_session():
+        print(f"Starting seeding process (source=scenario, path={path})...")
+        try:
+            await RealScenarioSeeder().seed_scenario_file_into_db(session=session, path=path)
+            await session.commit()
+            print("Seeding completed successfully!")
+        except Exception as e:
+            await session.rollback()
+            print(f"Seeding failed: {e}")
+            raise
+        break
+
+
 async def main() -> None:
     repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -629,8 +648,20 @@ async def main() -> None:
         action="store_true",
         help="Force regeneration of the selected --community fixture pack in .local-run.",
     )
+    parser.add_argument(
+        "--scenario",
+        default=None,
+        help=(
+            "Seed participants and trustlines of a simulator scenario.json instead. The file is "
+            "streamed, so large stress scenarios do not have to fit in memory."
+        ),
+    )
     args = parser.parse_args()
 
+    if args.scenario:
+        await _seed_from_scenario_file(args.scenario)
+        return
+
     source = args.source
     if source is None:
         # Ergonomic default: if fixtures datasets exist, use them (best UI demo experience).
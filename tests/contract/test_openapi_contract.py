@@ -31,14 +31,22 @@ PARAMETER_SCHEMA_DRIFT_SHA256 = (
     "09c00b95eafbd980730a4709209a7038c7e791e66a819bb169353529c3cccbe3"
 )
 PARAMETER_SCHEMA_DRIFT_COUNT = 22
+# 2026-10-18 / tick profiler: GET /simulator/admin/runs/{run_id}/tick-profiles
+# carries the same admin transport drift as GET /simulator/admin/runs (required
+# X-Admin-Token in YAML, optional dependency headers generated); count 59 -> 60.
+# 2026-10-18 / SQL instrumentation: GET /admin/debug/sql has the router-level
+# admin token dependency like GET /admin/migrations; count 60 -> 61.
 TRANSPORT_HEADER_DRIFT_SHA256 = (
-    "a1b51fa7bd53346733f5debe5284e46449e2d36ac790ea2b9ceea1159ff492f1"
+    "7e9a534ee162a1b84c7ca0db713b6b823fb4999db6e2132b6eef3a6e38306927"
 )
-TRANSPORT_HEADER_DRIFT_COUNT = 59
+TRANSPORT_HEADER_DRIFT_COUNT = 61
+# 2026-10-18 / payment batches: POST /payments/batch takes a plain dict body like
+# POST /payments (items are validated one by one), so only the canonical side
+# declares PaymentBatchRequest; count 13 -> 14.
 REQUEST_SCHEMA_DRIFT_SHA256 = (
-    "7eee1624c958db4900f2d24bf529bf7e6bab92aff055fd15403eb847dd7e5c25"
+    "e913677b3727987c64afbd9a984a29a4530574daadc7d40523156435f9e027e8"
 )
-REQUEST_SCHEMA_DRIFT_COUNT = 13
+REQUEST_SCHEMA_DRIFT_COUNT = 14
 # 2026-08-20 / p007_unblock_f0071: MetricPoint.v became nullable on both sides
 # (canonical YAML and generated schema) so "not measured" is distinguishable from
 # a measured zero. The GET /simulator/runs/{run_id}/metrics entry already carried
@@ -60,24 +68,56 @@ REQUEST_SCHEMA_DRIFT_COUNT = 13
 #  -> "v": {"nullable": true, "type": "string"}
 # Both sides moved together, so this entry still drifts only for the unrelated
 # pre-existing reasons, and the entry count stays 71.
+# 2026-10-18 / payment history keyset paging: `PaymentsList` gained a nullable
+# `next_cursor` on both sides. GET /payments already drifted for unrelated
+# reasons (status enum, equivalent pattern), so only its content moved and the
+# entry count stays 71.
+# 2026-10-18 / participant search: `ParticipantsList` gained the same nullable
+# `next_cursor` on both sides. GET /participants and /participants/search
+# already drifted, so only their content moved; the count stays 71.
+# 2026-10-18 / tick profiler: the new admin tick-profiles operation returns a
+# plain dict (or folded-stack text) without a response model, so only the
+# canonical side declares its schema; count 71 -> 72.
+# 2026-10-18 / SQL instrumentation: tick-profile phases gained `db_ms` in the
+# canonical schema (only its content moved). GET /admin/debug/sql matches the
+# generated AdminSqlDebugResponse exactly, so the count stays 72.
+# 2026-10-18 / binary graph snapshots: the five snapshot/ego routes declare the
+# application/vnd.geo.graph-snapshot 200 representation on both sides; they were
+# already drifting on their JSON schema, so only the content moved (count 72).
+# 2026-10-18 / payment batches: PaymentBatchResult embeds PaymentResult, which
+# carries the same status-enum/equivalent-pattern drift as POST /payments; 72 -> 73.
 SUCCESS_SCHEMA_DRIFT_SHA256 = (
-    "ccb4001a18a198528e7915b308c7cd98983ff42b8c223da10dba9aab520370ee"
+    "4d427391edb7fea23b1bb15feeb4d4c9e334027d637b51bf1ee992055a029da2"
 )
-SUCCESS_SCHEMA_DRIFT_COUNT = 71
+SUCCESS_SCHEMA_DRIFT_COUNT = 73
 # 2026-08-11 / T501: public DB health no longer declares exception details;
 # the new admin diagnostic operation matches generated responses, so count stays 84.
 # 2026-08-20 / p007_unblock_f0071: simulator metrics/bottlenecks declare 503 in the
 # canonical contract (real mode refuses to substitute synthetic data). FastAPI does
 # not know about it because the routes carry no `responses=`, so both operations —
 # which already drifted for other reasons — gained a canonical-only 503; count stays 84.
+# 2026-10-18 / tick profiler: the admin tick-profiles operation declares 403/404
+# canonically and only the framework 422 is generated, like the other simulator
+# admin routes; count 84 -> 85. Its security drift (anonymous + X-Admin-Token in
+# YAML vs the router's bearer dependency) matches GET /simulator/admin/runs; 59 -> 60.
+# 2026-10-18 / SQL instrumentation: GET /admin/debug/sql declares 403 while only
+# 422 is generated (85 -> 86) and carries the usual required-vs-optional
+# X-Admin-Token security drift of the admin router (60 -> 61).
+# 2026-10-18 / snapshot ETags: the five graph snapshot/ego operations now declare a
+# bodiless 304 on both sides; they were already in this set for their framework 422,
+# so only the digest moves (count stays 86).
+# 2026-10-18 / long-poll events: GET /simulator/events/poll declares its replay 410
+# on both sides; already listed for 401/422, so only the digest moves (86).
+# 2026-10-18 / payment batches: POST /payments/batch declares 400/401/409/429 while
+# only the framework 422 is generated, as for POST /payments; 86 -> 87.
 ERROR_RESPONSE_DRIFT_SHA256 = (
-    "b0af8a86310cdf916a93a5fcae795b95effa067204d89108c15a4c3e6ef214ec"
+    "fcb74f87f8d1e20147792eafffbb58b7257286eab182c9804959ebfa48f9e426"
 )
-ERROR_RESPONSE_DRIFT_COUNT = 84
+ERROR_RESPONSE_DRIFT_COUNT = 87
 SECURITY_DRIFT_SHA256 = (
-    "7fe6aad6a6fdae404bcea8e2a7696bb1e0788cbc95c2634ba90a3520ca89a5bd"
+    "da3133f1b346dff2475cc15d68b96f20088c629957b1a269b03de93c9421034c"
 )
-SECURITY_DRIFT_COUNT = 59
+SECURITY_DRIFT_COUNT = 61
 
 
 def _repo_root() -> Path:
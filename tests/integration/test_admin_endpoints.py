@@ -18,3 +18,24 @@ async def test_admin_config_ok_with_token(client: AsyncClient):
     assert resp.status_code == 200
     payload = resp.json()
     assert "items" in payload
+
+
+@pytest.mark.asyncio
+async def test_admin_sql_debug_reports_statements_per_request_id(client: AsyncClient):
+    resp = await client.get(
+        "/api/v1/admin/equivalents",
+        headers={"X-Admin-Token": settings.ADMIN_TOKEN, "X-Request-ID": "sql-debug-probe"},
+    )
+    assert resp.status_code == 200
+
+    resp = await client.get(
+        "/api/v1/admin/debug/sql",
+        params={"request_id": "sql-debug-probe"},
+        headers={"X-Admin-Token": settings.ADMIN_TOKEN},
+    )
+    assert resp.status_code == 200
+    payload = resp.json()
+    [summary] = payload["requests"]
+    assert summary["path"] == "/api/v1/admin/equivalents"
+    assert summary["statements"] >= 1
+    assert payload["fingerprints"]
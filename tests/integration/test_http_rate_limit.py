@@ -11,23 +11,27 @@ from app.main import app
 
 
 class _FakeRedis:
+    """Evaluates the sliding-window script's contract in Python."""
+
     def __init__(self) -> None:
         self.counts: defaultdict[str, int] = defaultdict(int)
         self.expirations: list[tuple[str, int]] = []
+        self.evals = 0
 
-    async def incr(self, key: str) -> int:
-        self.counts[key] += 1
-        return self.counts[key]
-
-    async def expire(self, key: str, seconds: int) -> None:
-        self.expirations.append((key, seconds))
+    async def eval(self, script, numkeys, current_key, previous_key, limit, cost, weight, ttl):
+        self.evals += 1
+        estimate = self.counts.get(previous_key, 0) * float(weight) + self.counts.get(current_key, 0)
+        if estimate + int(cost) > int(limit):
+            return 0
+        self.counts[current_key] += int(cost)
+        self.expirations.append((current_key, int(ttl)))
+        return 1
 
 
 @pytest.fixture(autouse=True)
 def _isolated_http_rate_limit(monkeypatch: pytest.MonkeyPatch):
     clock = {"monotonic": 600.0, "wall": 600.0}
-    deps._rate_limit_counters.clear()
-    monkeypatch.setattr(deps, "_rate_limit_last_cleanup_bucket", None)
+    deps._rate_limit_windows.clear()
     monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
     monkeypatch.setattr(settings, "RATE_LIMIT_WINDOW_SECONDS", 10)
     monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS_PER_WINDOW", 2)
@@ -35,7 +39,7 @@ def _isolated_http_rate_limit(monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setattr(deps.time, "time", lambda: clock["wall"])
     monkeypatch.setattr(app.state, "redis", None, raising=False)
     yield clock
-    deps._rate_limit_counters.clear()
+    deps._rate_limit_windows.clear()
 
 
 @pytest.mark.asyncio
@@ -58,13 +62,15 @@ async def test_http_rate_limit_falls_back_to_memory_and_resets_next_window(
             "details": {"window_seconds": 10, "limit": 2},
         }
     }
-    assert {bucket for bucket, _host in deps._rate_limit_counters} == {60}
-
+    # Sliding window: right after the boundary the previous burst still counts...
     _isolated_http_rate_limit["monotonic"] = 610.0
-    next_window = await client.get("/api/v1/healthz")
+    still_limited = await client.get("/api/v1/healthz")
+    assert still_limited.status_code == 429
 
+    # ...and once it has slid halfway out there is room again.
+    _isolated_http_rate_limit["monotonic"] = 615.0
+    next_window = await client.get("/api/v1/healthz")
     assert next_window.status_code == 200
-    assert {bucket for bucket, _host in deps._rate_limit_counters} == {60, 61}
 
 
 @pytest.mark.asyncio
@@ -82,10 +88,11 @@ async def test_http_rate_limit_uses_redis_counter_and_expiry(
 
     assert allowed.status_code == 200
     assert limited.status_code == 429
-    assert len(redis.counts) == 1
+    # One script call per request; only the admitted request is counted.
+    assert redis.evals == 2
     [(key, count)] = redis.counts.items()
     assert key.startswith("rl:")
     assert key.endswith(":60")
-    assert count == 2
-    assert redis.expirations == [(key, 11)]
-    assert deps._rate_limit_counters == {}
+    assert count == 1
+    assert redis.expirations == [(key, 21)]
+    assert len(deps._rate_limit_windows) == 0
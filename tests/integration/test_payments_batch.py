@@ -0,0 +1,209 @@
+import base64
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from nacl.signing import SigningKey
+from sqlalchemy import select
+
+from app.config import settings
+from app.db.models.equivalent import Equivalent
+from tests.integration.test_scenarios import (
+    register_and_login,
+    _sign_payment_request,
+    _sign_trustline_create_request,
+)
+
+
+async def _seed_usd(db_session):
+    usd = (await db_session.execute(select(Equivalent).where(Equivalent.code == "USD"))).scalar_one_or_none()
+    if not usd:
+        db_session.add(Equivalent(code="USD", description="US Dollar", precision=2))
+        await db_session.commit()
+
+
+async def _trust(client, creditor, debtor, limit):
+    key = SigningKey(base64.b64decode(creditor["priv"]))
+    resp = await client.post(
+        "/api/v1/trustlines",
+        json={
+            "to": debtor["pid"],
+            "equivalent": "USD",
+            "limit": limit,
+            "signature": _sign_trustline_create_request(
+                signing_key=key, to_pid=debtor["pid"], equivalent="USD", limit=limit
+            ),
+        },
+        headers=creditor["headers"],
+    )
+    assert resp.status_code == 201, resp.text
+
+
+def _payment(sender, to, amount, *, signer=None):
+    tx_id = str(uuid.uuid4())
+    key = SigningKey(base64.b64decode((signer or sender)["priv"]))
+    return {
+        "tx_id": tx_id,
+        "to": to["pid"],
+        "equivalent": "USD",
+        "amount": amount,
+        "signature": _sign_payment_request(
+            signing_key=key,
+            tx_id=tx_id,
+            from_pid=sender["pid"],
+            to_pid=to["pid"],
+            equivalent="USD",
+            amount=amount,
+        ),
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_routes_against_one_graph_and_reports_each_item(client: AsyncClient, db_session, monkeypatch):
+    await _seed_usd(db_session)
+    alice = await register_and_login(client, "Alice_Batch")
+    bob = await register_and_login(client, "Bob_Batch")
+    carol = await register_and_login(client, "Carol_Batch")
+    await _trust(client, bob, alice, "50.00")
+    await _trust(client, carol, alice, "20.00")
+    monkeypatch.setattr(settings, "PAYMENTS_BATCH_COMMIT_SIZE", 2)
+
+    payments = [
+        _payment(alice, bob, "30.00"),
+        # Fits the trustline on its own, not after the first payment.
+        _payment(alice, bob, "30.00"),
+        {"tx_id": "batch-missing-fields", "to": bob["pid"]},
+        _payment(alice, carol, "10.00", signer=bob),
+        _payment(alice, carol, "20.00"),
+    ]
+    resp = await client.post("/api/v1/payments/batch", json={"payments": payments}, headers=alice["headers"])
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+
+    assert [(i["index"], i["status"]) for i in body["items"]] == [
+        (0, "COMMITTED"),
+        (1, "REJECTED"),
+        (2, "REJECTED"),
+        (3, "REJECTED"),
+        (4, "COMMITTED"),
+    ]
+    assert (body["committed"], body["rejected"], body["failed"]) == (2, 3, 0)
+    assert body["items"][1]["error"]["code"] == "E002"
+    assert body["items"][2]["tx_id"] == "batch-missing-fields"
+    assert body["items"][2]["error"]["code"] == "E009"
+    assert body["items"][3]["error"]["code"] == "E005"
+    assert body["items"][0]["result"]["routes"] == [{"path": [alice["pid"], bob["pid"]], "amount": "30.00"}]
+
+    listed = await client.get("/api/v1/payments", params={"direction": "sent"}, headers=alice["headers"])
+    assert sorted(p["tx_id"] for p in listed.json()["items"]) == sorted([payments[0]["tx_id"], payments[4]["tx_id"]])
+
+    # Resending the batch replays the committed items instead of paying twice.
+    again = await client.post("/api/v1/payments/batch", json={"payments": payments[:1]}, headers=alice["headers"])
+    assert again.json()["items"][0]["result"]["tx_id"] == payments[0]["tx_id"]
+    listed = await client.get("/api/v1/payments", params={"direction": "sent"}, headers=alice["headers"])
+    assert len(listed.json()["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_fails_only_its_group(client: AsyncClient, db_session, monkeypatch):
+    await _seed_usd(db_session)
+    alice = await register_and_login(client, "Alice_BatchFail")
+    bob = await register_and_login(client, "Bob_BatchFail")
+    await _trust(client, bob, alice, "100.00")
+    monkeypatch.setattr(settings, "PAYMENTS_BATCH_COMMIT_SIZE", 2)
+
+    real_commit = db_session.commit
+    commits = []
+
+    async def _commit_failing_once():
+        commits.append(1)
+        if len(commits) == 1:
+            raise RuntimeError("connection lost")
+        await real_commit()
+
+    monkeypatch.setattr(db_session, "commit", _commit_failing_once)
+    payments = [_payment(alice, bob, "10.00") for _ in range(3)]
+    resp = await client.post("/api/v1/payments/batch", json={"payments": payments}, headers=alice["headers"])
+    assert resp.status_code == 200, resp.text
+
+    body = resp.json()
+    assert [i["status"] for i in body["items"]] == ["FAILED", "FAILED", "COMMITTED"]
+    assert body["items"][0]["error"]["code"] == "E010"
+    # The graph is rebuilt after the failed group, so the third payment takes the direct route.
+    assert body["items"][2]["result"]["routes"][0]["amount"] == "10.00"
+
+
+@pytest.mark.asyncio
+async def test_batch_size_is_bounded(client: AsyncClient, monkeypatch):
+    alice = await register_and_login(client, "Alice_BatchSize")
+    monkeypatch.setattr(settings, "PAYMENTS_BATCH_MAX_ITEMS", 2)
+
+    for payments in ([], [{}, {}, {}]):
+        resp = await client.post("/api/v1/payments/batch", json={"payments": payments}, headers=alice["headers"])
+        assert resp.status_code == 400, resp.text
+
+
+@pytest.mark.asyncio
+async def test_batch_verifies_signatures_once_before_routing(client: AsyncClient, db_session, monkeypatch):
+    from app.core.auth import crypto
+    from app.core.payments import service
+
+    await _seed_usd(db_session)
+    alice = await register_and_login(client, "Alice_BatchSig")
+    bob = await register_and_login(client, "Bob_BatchSig")
+    await _trust(client, bob, alice, "50.00")
+
+    def _per_item_verification(*_args):
+        raise AssertionError("batch items must not be re-verified one by one")
+
+    batches = []
+    real_verify_batch = crypto.verify_signatures_async
+
+    async def _verify_batch(items, **kwargs):
+        batches.append(len(items))
+        return await real_verify_batch(items, **kwargs)
+
+    monkeypatch.setattr(service, "verify_signature", _per_item_verification)
+    monkeypatch.setattr(service, "verify_signatures_async", _verify_batch)
+
+    payments = [_payment(alice, bob, "10.00"), _payment(alice, bob, "5.00", signer=bob)]
+    resp = await client.post("/api/v1/payments/batch", json={"payments": payments}, headers=alice["headers"])
+    assert resp.status_code == 200, resp.text
+
+    body = resp.json()
+    assert [i["status"] for i in body["items"]] == ["COMMITTED", "REJECTED"]
+    assert body["items"][1]["error"]["code"] == "E005"
+    assert batches == [2]
+
+
+@pytest.mark.asyncio
+async def test_batch_lock_ttl_covers_every_item(client: AsyncClient, db_session, monkeypatch):
+    from app.api import deps
+    from app.main import app
+
+    class _RecordingRedis:
+        def __init__(self):
+            self.ttls = {}
+
+        async def set(self, key, value, nx=False, ex=None):
+            self.ttls[key] = ex
+            return True
+
+        async def eval(self, *_args):
+            return 1
+
+    await _seed_usd(db_session)
+    alice = await register_and_login(client, "Alice_BatchTtl")
+    bob = await register_and_login(client, "Bob_BatchTtl")
+    await _trust(client, bob, alice, "50.00")
+
+    redis = _RecordingRedis()
+    app.dependency_overrides[deps.get_redis_client] = lambda: redis
+    monkeypatch.setattr(settings, "PAYMENT_TOTAL_TIMEOUT_SECONDS", 10)
+
+    payments = [_payment(alice, bob, "1.00") for _ in range(7)]
+    resp = await client.post("/api/v1/payments/batch", json={"payments": payments}, headers=alice["headers"])
+    assert resp.status_code == 200, resp.text
+    ((key, ttl),) = redis.ttls.items()
+    assert key.startswith("dlock:payment:") and key.endswith(":USD")
+    assert ttl >= 7 * 10
@@ -0,0 +1,117 @@
+import base64
+import uuid
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from nacl.signing import SigningKey
+from sqlalchemy import select
+
+from app.config import settings
+from app.core.payments import read_graph
+from app.db.models.equivalent import Equivalent
+from tests.integration.test_scenarios import (
+    register_and_login,
+    _sign_payment_request,
+    _sign_trustline_create_request,
+)
+
+
+async def _pay(client, sender, receiver, amount):
+    tx_id = str(uuid.uuid4())
+    resp = await client.post(
+        "/api/v1/payments",
+        json={
+            "tx_id": tx_id,
+            "to": receiver["pid"],
+            "equivalent": "USD",
+            "amount": amount,
+            "signature": _sign_payment_request(
+                signing_key=SigningKey(base64.b64decode(sender["priv"])),
+                tx_id=tx_id,
+                from_pid=sender["pid"],
+                to_pid=receiver["pid"],
+                equivalent="USD",
+                amount=amount,
+            ),
+        },
+        headers=sender["headers"],
+    )
+    assert resp.status_code == 200, resp.text
+
+
+@pytest.mark.asyncio
+async def test_capacity_queries_share_a_graph_and_revalidate_in_background(
+    client: AsyncClient, db_session, monkeypatch
+):
+    if (await db_session.execute(select(Equivalent).where(Equivalent.code == "USD"))).scalar_one_or_none() is None:
+        db_session.add(Equivalent(code="USD", description="US Dollar", precision=2))
+        await db_session.commit()
+    alice = await register_and_login(client, "Alice_ReadGraph")
+    bob = await register_and_login(client, "Bob_ReadGraph")
+    resp = await client.post(
+        "/api/v1/trustlines",
+        json={
+            "to": alice["pid"],
+            "equivalent": "USD",
+            "limit": "100.00",
+            "signature": _sign_trustline_create_request(
+                signing_key=SigningKey(base64.b64decode(bob["priv"])),
+                to_pid=alice["pid"],
+                equivalent="USD",
+                limit="100.00",
+            ),
+        },
+        headers=bob["headers"],
+    )
+    assert resp.status_code == 201, resp.text
+
+    monkeypatch.setattr(settings, "PAYMENTS_READ_GRAPH_TTL_SECONDS", 60)
+    monkeypatch.setattr(settings, "PAYMENTS_READ_GRAPH_STALE_SECONDS", 60)
+    read_graph.clear()
+    builds = []
+    real_build = read_graph._build
+
+    async def _counting_build(session, equivalent_code):
+        builds.append(equivalent_code)
+        return await real_build(session, equivalent_code)
+
+    monkeypatch.setattr(read_graph, "_build", _counting_build)
+
+    async def _max_flow():
+        r = await client.get(
+            "/api/v1/payments/max-flow", params={"to": bob["pid"], "equivalent": "USD"}, headers=alice["headers"]
+        )
+        assert r.status_code == 200, r.text
+        return Decimal(r.json()["max_amount"])
+
+    async def _can_pay(amount):
+        r = await client.get(
+            "/api/v1/payments/capacity",
+            params={"to": bob["pid"], "equivalent": "USD", "amount": amount},
+            headers=alice["headers"],
+        )
+        assert r.status_code == 200, r.text
+        return r.json()["can_pay"]
+
+    try:
+        assert await _max_flow() == Decimal("100.00")
+        assert await _can_pay("100") is True
+        assert builds == ["USD"]
+
+        # The payment bumps the ledger version: the outdated graph is served once more
+        # while the background task rebuilds it.
+        await _pay(client, alice, bob, "30.00")
+        assert await _max_flow() == Decimal("100.00")
+        await read_graph._entries["USD"].refresh
+        assert builds == ["USD", "USD"]
+        assert await _max_flow() == Decimal("70.00")
+        assert await _can_pay("71") is False
+
+        # Without a stale window an outdated graph is rebuilt inline.
+        monkeypatch.setattr(settings, "PAYMENTS_READ_GRAPH_STALE_SECONDS", 0)
+        await _pay(client, alice, bob, "10.00")
+        assert await _max_flow() == Decimal("60.00")
+        assert builds == ["USD", "USD", "USD"]
+    finally:
+        read_graph.clear()
@@ -288,6 +288,20 @@ async def test_post_tick_audit_drift_emits_sse_and_persists_integrity_log(
 
     assert injected["done"] is True, "Expected drift injection to run"
 
+    # The tick profile covers every orchestrator phase, including the nested ones.
+    profile = run._tick_profiles[-1]
+    paths = {phase["path"] for phase in profile["phases"]}
+    assert {
+        "tick;events",
+        "tick;payments;debt_snapshot",
+        "tick;payments;planning",
+        "tick;clearing",
+        "tick;trust_drift",
+        "tick;persistence",
+        "tick;audit",
+    } <= paths, paths
+    assert profile["statements"] > 0 and profile["rows"] > 0
+
     drift_events = [e for e in captured if isinstance(e, dict) and e.get("type") == "audit.drift"]
     assert drift_events, f"Expected at least one audit.drift event, got types={[e.get('type') for e in captured]}"
     assert any(e.get("source") == "post_tick_audit" for e in drift_events), drift_events
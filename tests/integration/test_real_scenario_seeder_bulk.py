@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.simulator.real_scenario_seeder import RealScenarioSeeder
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+
+
+def _scenario(n: int) -> dict:
+    return {
+        "baseEquivalent": "UAH",
+        "participants": [{"id": f"P{i:04d}", "status": "frozen" if i == 1 else "active"} for i in range(n)],
+        "trustlines": [{"from": "P0000", "to": f"P{i:04d}", "limit": 100 + i} for i in range(1, n)]
+        # Duplicate of a live line: must not trip the live-triple unique index.
+        + [{"from": "P0000", "to": "P0001", "limit": 5}],
+    }
+
+
+async def _counts(session) -> tuple[int, int]:
+    participants = (await session.execute(select(func.count()).select_from(Participant))).scalar_one()
+    trustlines = (await session.execute(select(func.count()).select_from(TrustLine))).scalar_one()
+    return participants, trustlines
+
+
+@pytest.mark.asyncio
+async def test_bulk_seed_is_idempotent(db_session):
+    seeder = RealScenarioSeeder()
+    scenario = _scenario(50)
+
+    await seeder.seed_scenario_into_db(session=db_session, scenario=scenario)
+    await db_session.commit()
+    assert await _counts(db_session) == (50, 49)
+
+    await seeder.seed_scenario_into_db(session=db_session, scenario=scenario)
+    await db_session.commit()
+    assert await _counts(db_session) == (50, 49)
+
+    frozen = (await db_session.execute(select(Participant).where(Participant.pid == "P0001"))).scalar_one()
+    assert frozen.status == "suspended"
+    first = (
+        await db_session.execute(select(TrustLine).where(TrustLine.to_participant_id == frozen.id))
+    ).scalar_one()
+    assert first.limit == 101
+    assert first.policy["auto_clearing"] is True
+
+
+@pytest.mark.asyncio
+async def test_streamed_file_seed_matches_in_memory_seed(db_session, tmp_path, monkeypatch):
+    from app.core.simulator import real_scenario_seeder
+
+    # Force several batches so the streamed path is exercised across batch edges.
+    monkeypatch.setattr(real_scenario_seeder, "_SEED_BATCH", 7)
+    path = tmp_path / "scenario.json"
+    path.write_text(json.dumps(_scenario(30)), encoding="utf-8")
+
+    await RealScenarioSeeder().seed_scenario_file_into_db(session=db_session, path=str(path))
+    await db_session.commit()
+
+    assert await _counts(db_session) == (30, 29)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.core.admin import liquidity_view
+from app.core.payments.router import PaymentRouter
+from app.db.models.debt import Debt
+from app.db.models.equivalent import Equivalent
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+
+HEADERS = {"X-Admin-Token": settings.ADMIN_TOKEN}
+
+
+async def _seed(db_session):
+    alice = Participant(pid="alice", display_name="Alice", public_key="A" * 64, type="person", status="active")
+    bob = Participant(pid="bob", display_name="Bob", public_key="B" * 64, type="person", status="active")
+    carol = Participant(pid="carol", display_name="Carol", public_key="C" * 64, type="person", status="active")
+    uah = Equivalent(code="UAH", symbol="₴", description="Hryvnia", precision=2, metadata_={}, is_active=True)
+    usd = Equivalent(code="USD", symbol="$", description="Dollar", precision=2, metadata_={}, is_active=True)
+    db_session.add_all([alice, bob, carol, uah, usd])
+    await db_session.flush()
+
+    def _tl(creditor, debtor, eq, limit):
+        return TrustLine(
+            from_participant_id=creditor.id,
+            to_participant_id=debtor.id,
+            equivalent_id=eq.id,
+            limit=Decimal(limit),
+            policy=None,
+            status="active",
+        )
+
+    db_session.add_all(
+        [
+            _tl(alice, bob, uah, "100.00"),
+            _tl(carol, bob, uah, "100.00"),
+            _tl(bob, alice, uah, "100.00"),
+            _tl(alice, carol, usd, "50.00"),
+        ]
+    )
+    await db_session.flush()
+    db_session.add_all(
+        [
+            Debt(debtor_id=bob.id, creditor_id=alice.id, equivalent_id=uah.id, amount=Decimal("95.00")),
+            Debt(debtor_id=bob.id, creditor_id=carol.id, equivalent_id=uah.id, amount=Decimal("98.00")),
+            # Exactly on the 0.10 boundary: not a bottleneck at threshold=0.10.
+            Debt(debtor_id=alice.id, creditor_id=bob.id, equivalent_id=uah.id, amount=Decimal("90.00")),
+            Debt(debtor_id=carol.id, creditor_id=alice.id, equivalent_id=usd.id, amount=Decimal("49.00")),
+        ]
+    )
+    await db_session.commit()
+
+
+async def _summaries(client):
+    out = []
+    for params in ({"equivalent": "UAH"}, {"equivalent": "USD"}, {}):
+        r = await client.get("/api/v1/admin/liquidity/summary", headers=HEADERS, params={**params, "limit": 2})
+        assert r.status_code == 200
+        body = r.json()
+        body.pop("updated_at")
+        out.append(body)
+    r = await client.get("/api/v1/admin/trustlines/bottlenecks", headers=HEADERS, params={"threshold": "0.1"})
+    out.append(r.json())
+    return out
+
+
+@pytest.mark.asyncio
+async def test_liquidity_view_matches_database_queries(client, db_session, monkeypatch):
+    await _seed(db_session)
+
+    from_db = await _summaries(client)
+    monkeypatch.setattr(settings, "ADMIN_LIQUIDITY_VIEW_TTL_SECONDS", 60)
+    liquidity_view.clear()
+    try:
+        from_view = await _summaries(client)
+    finally:
+        liquidity_view.clear()
+
+    uah, _usd, _all, bottlenecks = from_view
+    assert (uah["bottlenecks"], uah["active_trustlines"]) == (2, 3)
+    assert [(e["from"], e["to"]) for e in bottlenecks["items"]] == [
+        ("alice", "carol"),
+        ("carol", "bob"),
+        ("alice", "bob"),
+    ]
+    assert from_view == from_db
+
+
+@pytest.mark.asyncio
+async def test_liquidity_view_refreshes_only_the_invalidated_equivalent(client, db_session, monkeypatch):
+    await _seed(db_session)
+    monkeypatch.setattr(settings, "ADMIN_LIQUIDITY_VIEW_TTL_SECONDS", 60)
+    liquidity_view.clear()
+
+    built: list[str] = []
+    real_build = liquidity_view._build_view
+
+    async def _counting_build(db, equivalent):
+        built.append(equivalent)
+        return await real_build(db, equivalent)
+
+    monkeypatch.setattr(liquidity_view, "_build_view", _counting_build)
+    try:
+        first = await client.get("/api/v1/admin/liquidity/summary", headers=HEADERS)
+        again = await client.get("/api/v1/admin/liquidity/summary", headers=HEADERS)
+        assert first.json()["total_used"] == again.json()["total_used"]
+        assert sorted(built) == ["UAH", "USD"]
+
+        # A committed payment invalidates its equivalent through the router cache hook.
+        await db_session.execute(update(Debt).where(Debt.amount == Decimal("90.00")).values(amount=Decimal("95.00")))
+        await db_session.commit()
+        PaymentRouter.invalidate_cache("UAH")
+
+        after = await client.get("/api/v1/admin/liquidity/summary", headers=HEADERS)
+        assert Decimal(after.json()["total_used"]) == Decimal(first.json()["total_used"]) + Decimal("5.00")
+        assert sorted(built) == ["UAH", "UAH", "USD"]
+    finally:
+        liquidity_view.clear()
@@ -233,3 +233,64 @@ async def test_admin_participant_metrics_activity_counts(client, db_session):
     assert act["payment_committed"]["7"] == 1
     assert act["payment_committed"]["30"] == 1
     assert act["payment_committed"]["90"] == 1
+
+
+@pytest.mark.asyncio
+async def test_admin_participant_rank_cache_matches_and_follows_ledger_version(client, db_session, monkeypatch):
+    from sqlalchemy import update
+
+    from app.core.admin import metrics
+    from app.core.payments.router import PaymentRouter
+
+    people = [
+        Participant(pid=pid, display_name=pid, public_key=pid[0].upper() * 64, type="person", status="active")
+        for pid in ("alice", "bob", "carol", "dave")
+    ]
+    usd = Equivalent(code="USD", precision=2)
+    db_session.add_all([*people, usd])
+    await db_session.commit()
+    alice, bob, carol, _dave = people
+    db_session.add_all(
+        [
+            Debt(debtor_id=bob.id, creditor_id=alice.id, equivalent_id=usd.id, amount=Decimal("90")),
+            Debt(debtor_id=carol.id, creditor_id=alice.id, equivalent_id=usd.id, amount=Decimal("5")),
+            Debt(debtor_id=alice.id, creditor_id=carol.id, equivalent_id=usd.id, amount=Decimal("10")),
+        ]
+    )
+    await db_session.commit()
+    headers = {"X-Admin-Token": settings.ADMIN_TOKEN}
+
+    async def _ranks():
+        out = {}
+        for pid in ("alice", "bob", "carol", "dave"):
+            body = (
+                await client.get(f"/api/v1/admin/participants/{pid}/metrics?equivalent=USD", headers=headers)
+            ).json()
+            out[pid] = (body["rank"], body["distribution"])
+        return out
+
+    uncached = await _ranks()
+    monkeypatch.setattr(settings, "ADMIN_PARTICIPANT_RANK_CACHE_TTL_SECONDS", 60)
+    metrics.clear_rank_cache()
+    built = []
+    real_build = metrics._build_net_ranking
+
+    async def _counting_build(db, *, eq):
+        built.append(eq.code)
+        return await real_build(db, eq=eq)
+
+    monkeypatch.setattr(metrics, "_build_net_ranking", _counting_build)
+    try:
+        assert await _ranks() == uncached
+        assert built == ["USD"]
+        assert [uncached[p][0]["rank"] for p in ("alice", "carol", "dave", "bob")] == [1, 2, 3, 4]
+
+        # A committed payment bumps the ledger version through the routing cache hook.
+        await db_session.execute(update(Debt).where(Debt.amount == Decimal("90")).values(amount=Decimal("1")))
+        await db_session.commit()
+        PaymentRouter.invalidate_cache("USD")
+        after = await _ranks()
+        assert built == ["USD", "USD"]
+        assert after["dave"][0]["rank"] == 2
+    finally:
+        metrics.clear_rank_cache()
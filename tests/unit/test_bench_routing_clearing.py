@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import copy
+from decimal import Decimal
+
+import pytest
+
+from scripts.bench_routing_clearing import DEFAULT_PACKS, compare_reports, load_pack, run_benchmark
+
+
+def test_replicated_pack_is_a_bridged_ring():
+    base = load_pack(DEFAULT_PACKS["riverside-town-50-v2"], scale=1)
+    tripled = load_pack(DEFAULT_PACKS["riverside-town-50-v2"], scale=3)
+
+    assert len(tripled["participants"]) == 3 * len(base["participants"])
+    # Two directed bridges per adjacent pair of copies, per equivalent.
+    assert len(tripled["trustlines"]) == 3 * len(base["trustlines"]) + 2 * 3 * len(base["equivalents"])
+    assert len({p["pid"] for p in tripled["participants"]}) == len(tripled["participants"])
+
+
+@pytest.mark.asyncio
+async def test_benchmark_results_are_reproducible_and_comparable():
+    kwargs = dict(scales=[1], hop_limits=[3], pairs=3, repeat=1, seed=7, amount=Decimal("50"))
+    packs = {"riverside-town-50-v2": DEFAULT_PACKS["riverside-town-50-v2"]}
+
+    first = await run_benchmark(packs, **kwargs)
+    second = await run_benchmark(packs, **kwargs)
+
+    cases = first["results"]["riverside-town-50-v2/x1"]["equivalents"]["UAH"]
+    assert set(cases) == {
+        "build_graph",
+        "bfs_single_path/hops=3",
+        "find_flow_routes/hops=3",
+        "calculate_max_flow",
+        "find_cycles/depth=3",
+    }
+    assert compare_reports(first, second, max_regression=1e9) == []
+
+    changed = copy.deepcopy(first)
+    changed["results"]["riverside-town-50-v2/x1"]["equivalents"]["UAH"]["calculate_max_flow"]["digest"] = "0"
+    slower = changed["results"]["riverside-town-50-v2/x1"]["equivalents"]["UAH"]["build_graph"]
+    slower["median_us"] = cases["build_graph"]["median_us"] * 10
+    problems = compare_reports(first, changed, max_regression=0.25)
+    assert [p.split(":")[0] for p in problems] == [
+        "riverside-town-50-v2/x1/UAH/build_graph",
+        "riverside-town-50-v2/x1/UAH/calculate_max_flow",
+    ]
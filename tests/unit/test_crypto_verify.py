@@ -0,0 +1,69 @@
+import base64
+
+import pytest
+from nacl.signing import SigningKey
+
+from app.config import settings
+from app.core.auth import crypto
+from app.core.auth.crypto import (
+    generate_keypair,
+    offload_verification,
+    verify_signature,
+    verify_signatures,
+    verify_signatures_async,
+)
+from app.utils.exceptions import CryptoException
+
+
+def _signed(message: bytes) -> tuple[str, bytes, str]:
+    public_key_b64, private_key_b64 = generate_keypair()
+    signing_key = SigningKey(base64.b64decode(private_key_b64))
+    signature = base64.b64encode(signing_key.sign(message).signature).decode()
+    return public_key_b64, message, signature
+
+
+def test_decoded_keys_are_reused_and_invalid_keys_are_not_cached():
+    public_key_b64, message, signature = _signed(b"payload")
+    before = crypto._verify_key.cache_info()
+
+    assert verify_signature(public_key_b64, message, signature)
+    assert verify_signature(public_key_b64, message, signature)
+    after = crypto._verify_key.cache_info()
+    assert after.misses - before.misses == 1
+    assert after.hits - before.hits == 1
+
+    with pytest.raises(CryptoException):
+        verify_signature("not-a-key", message, signature)
+    assert crypto._verify_key.cache_info().currsize == after.currsize
+
+
+def test_batch_reports_each_item_without_raising():
+    good = _signed(b"one")
+    tampered = (good[0], b"two", good[2])
+    bad_key = ("not-a-key", b"one", good[2])
+
+    assert verify_signatures([good, tampered, bad_key]) == [True, False, False]
+
+
+@pytest.mark.asyncio
+async def test_async_batch_preserves_order_across_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "CRYPTO_VERIFY_WORKERS", 2)
+    items = []
+    for i in range(7):
+        item = _signed(f"m{i}".encode())
+        items.append(item if i % 3 else (item[0], b"forged", item[2]))
+
+    try:
+        verdicts = await verify_signatures_async(items, chunk_size=2)
+    finally:
+        crypto.shutdown_verify_pool()
+    assert verdicts == [i % 3 != 0 for i in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_offload_runs_inline_when_pool_is_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "CRYPTO_VERIFY_WORKERS", 0)
+    public_key_b64, message, signature = _signed(b"inline")
+
+    assert await offload_verification(verify_signature, public_key_b64, message, signature)
+    assert crypto._verify_pool is None
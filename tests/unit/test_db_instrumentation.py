@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.db import instrumentation
+from app.db.instrumentation import StatementTally, fingerprint, tally_statements
+
+
+def test_fingerprint_groups_statements_that_differ_only_in_values():
+    assert fingerprint(
+        "SELECT id FROM participants WHERE pid IN (?, ?, ?) AND status = 'active' LIMIT 10"
+    ) == "SELECT id FROM participants WHERE pid IN (...) AND status = ? LIMIT ?"
+    assert fingerprint("SELECT * FROM debts WHERE amount > $1::numeric -- hot path\n") == (
+        "SELECT * FROM debts WHERE amount > ?::numeric"
+    )
+    assert fingerprint("INSERT INTO t (a, b) VALUES (%(a_0)s, %(b_0)s), (%(a_1)s, %(b_1)s)") == (
+        "INSERT INTO t (a, b) VALUES (...)"
+    )
+    # Identifiers with digits are not literals.
+    assert fingerprint("SELECT t1.a FROM t1 WHERE t1.b = :b_1") == "SELECT t1.a FROM t1 WHERE t1.b = ?"
+
+
+@pytest.mark.asyncio
+async def test_statements_are_tallied_timed_and_slow_selects_explained(monkeypatch):
+    monkeypatch.setattr(settings, "DB_SLOW_STATEMENT_MS", 1)
+    monkeypatch.setattr(settings, "ENV", "dev")
+    instrumentation.reset()
+
+    slow_sql = (
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 300000) "
+        "SELECT count(*) FROM n"
+    )
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("CREATE TABLE t (a INTEGER)"))
+            with tally_statements(StatementTally()) as tally:
+                await conn.execute(text("INSERT INTO t VALUES (1), (2)"))
+                await conn.execute(text("SELECT a FROM t WHERE a > 0"))
+                await conn.execute(text(slow_sql))
+    finally:
+        await engine.dispose()
+
+    assert (tally.statements, tally.rows) == (3, 3)
+    assert tally.db_ms > 0
+
+    snap = instrumentation.snapshot()
+    by_sql = {f["sql"]: f for f in snap["fingerprints"]}
+    assert by_sql["SELECT a FROM t WHERE a > ?"]["calls"] == 1
+    assert by_sql["CREATE TABLE t (a INTEGER)"]["operation"] == "OTHER"
+
+    slow = [s for s in snap["slow_statements"] if s["sql"] == slow_sql]
+    assert slow and slow[0]["plan"], snap["slow_statements"]
+    instrumentation.reset()
+
+
+def test_postgres_explain_runs_in_a_rolled_back_savepoint():
+    executed: list[str] = []
+
+    class _Cursor:
+        def execute(self, sql, parameters=None):
+            executed.append(sql)
+            if sql.startswith("EXPLAIN"):
+                raise RuntimeError("permission denied")
+
+        def close(self):
+            pass
+
+    class _Conn:
+        class dialect:
+            name = "postgresql"
+
+        class connection:
+            @staticmethod
+            def cursor():
+                return _Cursor()
+
+    with pytest.raises(RuntimeError):
+        instrumentation._explain(_Conn(), "SELECT * FROM debts", {})
+    # The failed EXPLAIN cannot leave the caller's transaction aborted.
+    assert executed == [
+        "SAVEPOINT geo_explain",
+        "EXPLAIN SELECT * FROM debts",
+        "ROLLBACK TO SAVEPOINT geo_explain",
+        "RELEASE SAVEPOINT geo_explain",
+    ]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.core.admin import liquidity_view
+from app.db import session as db_session_module
+from app.db.base import Base
+from app.db.models.audit_log import AuditLog
+from app.db.models.equivalent import Equivalent
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+
+
+def _audit(action: str) -> AuditLog:
+    return AuditLog(
+        actor_id=None,
+        actor_role='admin',
+        action=action,
+        object_type='participant',
+        object_id='alice',
+        reason=None,
+        before_state=None,
+        after_state=None,
+        request_id=None,
+        ip_address='127.0.0.1',
+        user_agent='pytest',
+    )
+
+
+async def _empty_replica(tmp_path) -> str:
+    replica_url = f"sqlite+aiosqlite:///{(tmp_path / 'replica.db').as_posix()}"
+    replica_engine = create_async_engine(replica_url)
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await replica_engine.dispose()
+    return replica_url
+
+
+async def _actions(client) -> list[str]:
+    r = await client.get('/api/v1/admin/audit-log', headers={'X-Admin-Token': settings.ADMIN_TOKEN})
+    assert r.status_code == 200, r.text
+    return [item['action'] for item in r.json()['items']]
+
+
+@pytest.mark.asyncio
+async def test_read_only_admin_endpoints_use_the_read_replica(client, db_session, monkeypatch, tmp_path):
+    replica_url = f"sqlite+aiosqlite:///{(tmp_path / 'replica.db').as_posix()}"
+    replica_engine = create_async_engine(replica_url)
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(replica_engine)() as replica:
+        replica.add(_audit('replica.only'))
+        await replica.commit()
+    await replica_engine.dispose()
+
+    db_session.add(_audit('primary.only'))
+    await db_session.commit()
+
+    assert await _actions(client) == ['primary.only']
+
+    monkeypatch.setattr(settings, 'DATABASE_READ_URL', replica_url)
+    try:
+        assert db_session_module.get_read_sessionmaker() is db_session_module.get_read_sessionmaker()
+        assert await _actions(client) == ['replica.only']
+
+        # Pointing the replica at the primary is the same as not configuring one.
+        monkeypatch.setattr(settings, 'DATABASE_READ_URL', settings.DATABASE_URL)
+        assert db_session_module.get_read_sessionmaker() is None
+    finally:
+        await db_session_module.dispose_read_engine()
+
+
+@pytest.mark.asyncio
+async def test_versioned_views_are_not_built_from_a_lagging_replica(client, db_session, monkeypatch, tmp_path):
+    # The replica has not caught up with the trustline the primary just committed.
+    replica_url = await _empty_replica(tmp_path)
+    alice = Participant(pid='alice', display_name='Alice', public_key='A' * 64, type='person', status='active')
+    bob = Participant(pid='bob', display_name='Bob', public_key='B' * 64, type='person', status='active')
+    uah = Equivalent(code='UAH', symbol='₴', description='Hryvnia', precision=2, metadata_={}, is_active=True)
+    db_session.add_all([alice, bob, uah])
+    await db_session.flush()
+    db_session.add(
+        TrustLine(
+            from_participant_id=alice.id,
+            to_participant_id=bob.id,
+            equivalent_id=uah.id,
+            limit=Decimal('100.00'),
+            policy=None,
+            status='active',
+        )
+    )
+    await db_session.commit()
+
+    monkeypatch.setattr(settings, 'DATABASE_READ_URL', replica_url)
+    monkeypatch.setattr(settings, 'ADMIN_LIQUIDITY_VIEW_TTL_SECONDS', 60)
+    liquidity_view.clear()
+    try:
+        for _ in range(2):
+            r = await client.get(
+                '/api/v1/admin/liquidity/summary',
+                headers={'X-Admin-Token': settings.ADMIN_TOKEN},
+                params={'equivalent': 'UAH'},
+            )
+            assert r.status_code == 200, r.text
+            assert r.json()['active_trustlines'] == 1
+            assert Decimal(r.json()['total_limit']) == Decimal('100')
+    finally:
+        liquidity_view.clear()
+        await db_session_module.dispose_read_engine()
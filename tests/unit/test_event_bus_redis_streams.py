@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.utils.event_bus import InMemoryEventBus, RedisStreamsTransport
+
+
+class _MemoryStreamClient:
+    """The XADD/XREAD/XREVRANGE subset of redis.asyncio over an in-memory stream."""
+
+    def __init__(self) -> None:
+        self.entries: list[tuple[str, dict[str, str]]] = []
+        self._changed = asyncio.Condition()
+
+    async def xadd(self, stream, fields, maxlen=None, approximate=True):
+        async with self._changed:
+            entry_id = f"{len(self.entries) + 1}-0"
+            self.entries.append((entry_id, dict(fields)))
+            self._changed.notify_all()
+        return entry_id
+
+    async def xrevrange(self, stream, count=None):
+        return list(reversed(self.entries))[:count]
+
+    def _after(self, last_id: str, count: int):
+        seq = 0 if last_id == "0-0" else int(last_id.split("-")[0])
+        return self.entries[seq : seq + count]
+
+    async def xread(self, streams, count=None, block=None):
+        ((stream, last_id),) = streams.items()
+        async with self._changed:
+            if not self._after(last_id, count):
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=block / 1000)
+                except asyncio.TimeoutError:
+                    return []
+        return [(stream, self._after(last_id, count))]
+
+
+async def _start_worker(client: _MemoryStreamClient, stop: asyncio.Event):
+    bus = InMemoryEventBus()
+    transport = RedisStreamsTransport(client)
+    bus.set_transport(transport)
+    task = asyncio.create_task(transport.listen(bus.deliver_local, stop))
+    await asyncio.sleep(0)
+    return bus, transport, task
+
+
+@pytest.mark.asyncio
+async def test_publications_reach_subscribers_on_other_workers_once() -> None:
+    client = _MemoryStreamClient()
+    await client.xadd("s", {"o": "old", "m": '[["bob","payment.received",{"tx_id":"stale"}]]'})
+    stop = asyncio.Event()
+    worker_a, transport_a, task_a = await _start_worker(client, stop)
+    worker_b, _transport_b, task_b = await _start_worker(client, stop)
+    try:
+        local = await worker_a.subscribe(pid="bob", events=["payment.received"])
+        remote = await worker_b.subscribe(pid="bob", events=["payment.received"])
+        other = await worker_b.subscribe(pid="carol", events=["payment.received"])
+
+        with worker_a.batched():
+            worker_a.publish(recipient_pid="bob", event="payment.received", payload={"tx_id": "t1"})
+            worker_a.publish(recipient_pid="bob", event="payment.received", payload={"tx_id": "t2"})
+            assert local.queue.empty()
+        await transport_a.aclose()
+
+        # One stream entry for the batch; the entry that predates the listeners is skipped.
+        assert len(client.entries) == 2
+        for sub in (local, remote):
+            got = [(await asyncio.wait_for(sub.queue.get(), timeout=1))["payload"]["tx_id"] for _ in range(2)]
+            assert got == ["t1", "t2"]
+        await asyncio.sleep(0.05)
+        assert local.queue.empty() and remote.queue.empty() and other.queue.empty()
+    finally:
+        stop.set()
+        await asyncio.wait_for(asyncio.gather(task_a, task_b), timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_are_indexed_by_pid() -> None:
+    bus = InMemoryEventBus()
+    first = await bus.subscribe(pid="bob", events=["payment.received"])
+    second = await bus.subscribe(pid="bob", events=["payment.received"])
+
+    await bus.unsubscribe(first)
+    assert bus._subs_by_pid == {"bob": [second]}
+    await bus.unsubscribe(second)
+    assert bus._subs_by_pid == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_tail_read_starts_after_newest_entry_instead_of_replaying() -> None:
+    stop = asyncio.Event()
+    read_from: list[str] = []
+
+    class _TailFailingClient(_MemoryStreamClient):
+        async def xrevrange(self, stream, count=None):
+            raise ConnectionError("redis unavailable")
+
+        async def xread(self, streams, count=None, block=None):
+            read_from.extend(streams.values())
+            stop.set()
+            return []
+
+    client = _TailFailingClient()
+    await client.xadd("s", {"o": "old", "m": '[["bob","payment.received",{"tx_id":"stale"}]]'})
+    await asyncio.wait_for(RedisStreamsTransport(client).listen(lambda *_: None, stop), timeout=2)
+    assert read_from == ["$"]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+import app.api.v1.admin as admin_api
+from app.config import settings
+from app.core.payments.router import PaymentRouter
+from app.core.simulator.models import RunRecord
+from app.core.simulator.snapshot_builder import SnapshotBuilder
+from app.db.models.debt import Debt
+from app.db.models.equivalent import Equivalent
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+from app.utils import snapshot_cache
+
+
+@pytest.fixture
+def snapshot_cache_on(monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_SNAPSHOT_CACHE_TTL_SECONDS", 60)
+    snapshot_cache.clear()
+    yield
+    snapshot_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_admin_snapshot_is_served_from_cache_until_the_ledger_moves(
+    client, db_session, snapshot_cache_on, monkeypatch
+):
+    alice = Participant(pid="alice", display_name="Alice", public_key="A" * 64, type="person", status="active")
+    bob = Participant(pid="bob", display_name="Bob", public_key="B" * 64, type="person", status="active")
+    carol = Participant(pid="carol", display_name="Carol", public_key="C" * 64, type="person", status="active")
+    uah = Equivalent(code="UAH", symbol="₴", description="Hryvnia", precision=2, metadata_={}, is_active=True)
+    db_session.add_all([alice, bob, carol, uah])
+    await db_session.flush()
+    db_session.add_all(
+        [
+            TrustLine(
+                from_participant_id=alice.id,
+                to_participant_id=bob.id,
+                equivalent_id=uah.id,
+                limit=Decimal("100.00"),
+                policy={},
+                status="active",
+            ),
+            TrustLine(
+                from_participant_id=bob.id,
+                to_participant_id=carol.id,
+                equivalent_id=uah.id,
+                limit=Decimal("50.00"),
+                policy={},
+                status="active",
+            ),
+        ]
+    )
+    await db_session.commit()
+
+    loads = 0
+    real_load = admin_api.load_admin_graph
+
+    async def _counting_load(db, *, equivalent):
+        nonlocal loads
+        loads += 1
+        return await real_load(db, equivalent=equivalent)
+
+    monkeypatch.setattr(admin_api, "load_admin_graph", _counting_load)
+    headers = {"X-Admin-Token": settings.ADMIN_TOKEN}
+
+    r1 = await client.get("/api/v1/admin/graph/snapshot", headers=headers, params={"equivalent": "UAH"})
+    assert r1.status_code == 200
+    etag = r1.headers["etag"]
+
+    r2 = await client.get(
+        "/api/v1/admin/graph/snapshot",
+        headers={**headers, "If-None-Match": etag},
+        params={"equivalent": "UAH"},
+    )
+    assert (r2.status_code, r2.content, r2.headers["etag"]) == (304, b"", etag)
+
+    # Ego views are cut from the same cached graph.
+    ego = await client.get("/api/v1/admin/graph/ego", headers=headers, params={"pid": "alice", "equivalent": "UAH"})
+    assert ego.status_code == 200
+    assert {p["pid"] for p in ego.json()["participants"]} == {"alice", "bob"}
+    assert [(t["from"], t["to"]) for t in ego.json()["trustlines"]] == [("alice", "bob")]
+    assert loads == 1
+
+    # A committed debt invalidates routing for UAH, which moves the ledger version.
+    db_session.add(Debt(debtor_id=bob.id, creditor_id=alice.id, equivalent_id=uah.id, amount=Decimal("7.25")))
+    await db_session.commit()
+    PaymentRouter.invalidate_cache("UAH")
+
+    r3 = await client.get(
+        "/api/v1/admin/graph/snapshot",
+        headers={**headers, "If-None-Match": etag},
+        params={"equivalent": "UAH"},
+    )
+    assert r3.status_code == 200
+    assert r3.headers["etag"] != etag
+    assert [(d["debtor"], d["creditor"]) for d in r3.json()["debts"]] == [("bob", "alice")]
+    assert loads == 2
+
+
+@pytest.mark.asyncio
+async def test_run_snapshot_cache_tracks_scenario_topology_and_slices_ego_views(snapshot_cache_on):
+    scenario = {
+        "equivalents": ["UAH"],
+        "participants": [{"id": pid, "type": "person"} for pid in ("a", "b", "c", "d")],
+        "trustlines": [
+            {"from": "a", "to": "b", "equivalent": "UAH", "limit": "10"},
+            {"from": "b", "to": "c", "equivalent": "UAH", "limit": "10"},
+        ],
+    }
+    run = RunRecord(run_id="r1", scenario_id="s1", mode="fixtures", state="running")
+    run._scenario_raw = scenario
+    builder = SnapshotBuilder(
+        lock=threading.Lock(),
+        runs={"r1": run},
+        scenarios={},
+        utc_now=lambda: datetime.now(timezone.utc),
+        db_enabled=lambda: False,
+    )
+
+    first = await builder.cached_graph_snapshot(run_id="r1", equivalent="UAH")
+    assert await builder.cached_graph_snapshot(run_id="r1", equivalent="UAH") is first
+
+    ego = await builder.cached_ego_snapshot(run_id="r1", equivalent="UAH", pid="a", depth=1)
+    assert [n.id for n in ego.value.nodes] == ["a", "b"]
+    assert await builder.cached_ego_snapshot(run_id="r1", equivalent="UAH", pid="a", depth=1) is ego
+
+    scenario["trustlines"].append({"from": "a", "to": "d", "equivalent": "UAH", "limit": "5"})
+    rebuilt = await builder.cached_graph_snapshot(run_id="r1", equivalent="UAH")
+    assert rebuilt is not first and rebuilt.etag != first.etag
+    ego = await builder.cached_ego_snapshot(run_id="r1", equivalent="UAH", pid="a", depth=1)
+    assert [n.id for n in ego.value.nodes] == ["a", "b", "d"]
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = snapshot_cache.compute_etag(b"{}")
+    assert snapshot_cache.etag_matches(f'"other", W/{etag}', etag)
+    assert snapshot_cache.etag_matches("*", etag)
+    assert not snapshot_cache.etag_matches('"other"', etag)
+    assert not snapshot_cache.etag_matches(None, etag)
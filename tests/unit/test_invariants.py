@@ -157,7 +157,7 @@ async def test_payment_commit_aborts_on_trust_limit_violation(
 
     # P0.1: commit-only retry was removed; keep the test deterministic by
     # bypassing the whole-uow retry wrapper.
-    async def _run_uow_no_retry(*, op: str, fn, use_savepoint: bool = False):
+    async def _run_uow_no_retry(*, op: str, fn, use_savepoint: bool = False, conflict_keys=frozenset()):
         return await fn()
 
     monkeypatch.setattr(engine, "_run_uow_with_retry", _run_uow_no_retry)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.utils.json_stream import batched, iter_json_array, load_json_object_without
+
+_DOC = {
+    "scenario_id": "s",
+    "participants": [{"id": f"P{i}", "name": 'quote " and ] brace }'} for i in range(25)],
+    "settings": {"nested": [1, [2, {"x": "]"}]]},
+    "trustlines": [{"from": "P0", "to": f"P{i}", "limit": 1234567.25} for i in range(1, 25)],
+    "equivalents": ["UAH"],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_streamed_members_match_json_load_at_any_chunk_boundary(tmp_path, chunk_size):
+    path = tmp_path / "scenario.json"
+    path.write_text(json.dumps(_DOC, indent=1), encoding="utf-8")
+
+    assert list(iter_json_array(str(path), key="participants", chunk_size=chunk_size)) == _DOC["participants"]
+    assert list(iter_json_array(str(path), key="trustlines", chunk_size=chunk_size)) == _DOC["trustlines"]
+    assert list(iter_json_array(str(path), key="missing", chunk_size=chunk_size)) == []
+    assert load_json_object_without(
+        str(path), ("participants", "trustlines"), chunk_size=chunk_size
+    ) == {"scenario_id": "s", "settings": _DOC["settings"], "equivalents": ["UAH"]}
+
+
+def test_top_level_arrays_and_batching(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text("[1, 22, 333]", encoding="utf-8")
+
+    assert list(iter_json_array(str(path), chunk_size=2)) == [1, 22, 333]
+    assert list(batched(iter_json_array(str(path)), 2)) == [[1, 22], [333]]
+
+
+def test_malformed_input_is_rejected(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text("[1 2]", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path)))
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.participants.search import search_participants
+from app.db.models.participant import Participant
+from app.utils.exceptions import BadRequestException
+
+
+async def _seed(db_session):
+    rows = [
+        ("7annaPid", "Zed"),  # PID prefix match for "7ann"
+        ("9xyz", "Anna"),  # exact name
+        ("9abc", "Annabel"),  # name prefix
+        ("9def", "Mary Anna"),  # word prefix
+        ("9ghi", "Joanna"),  # substring
+        ("9jkl", "Bob"),  # no match
+        ("9mno", "100%_sure"),  # wildcard characters in the name
+    ]
+    db_session.add_all(
+        [
+            Participant(pid=pid, display_name=name, public_key=f"{i:064d}", type="person", status="active")
+            for i, (pid, name) in enumerate(rows)
+        ]
+    )
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_results_are_ranked_by_relevance_bucket(db_session):
+    await _seed(db_session)
+
+    page = await search_participants(db_session, query="anna", limit=20)
+    assert [p.display_name for p in page.items] == ["Anna", "Annabel", "Mary Anna", "Joanna"]
+    assert page.next_cursor is None
+
+    page = await search_participants(db_session, query="7ann", limit=20)
+    assert [p.pid for p in page.items] == ["7annaPid"]
+
+
+@pytest.mark.asyncio
+async def test_pid_matches_by_prefix_only(db_session):
+    await _seed(db_session)
+
+    page = await search_participants(db_session, query="annaPid", limit=20)
+    assert page.items == []
+
+
+@pytest.mark.asyncio
+async def test_like_wildcards_in_the_query_are_literal(db_session):
+    await _seed(db_session)
+
+    page = await search_participants(db_session, query="%_", limit=20)
+    assert [p.display_name for p in page.items] == ["100%_sure"]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_cover_ranked_results_once(db_session):
+    await _seed(db_session)
+
+    full = await search_participants(db_session, query="anna", limit=20)
+    seen = []
+    cursor = None
+    while True:
+        page = await search_participants(db_session, query="anna", limit=1, cursor=cursor)
+        seen.extend(p.pid for p in page.items)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == [p.pid for p in full.items]
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_a_bad_request(db_session):
+    with pytest.raises(BadRequestException):
+        await search_participants(db_session, query="anna", cursor="%%%")
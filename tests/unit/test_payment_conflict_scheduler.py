@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.core.payments.conflict_scheduler import SegmentConflictScheduler, segment_keys
+
+
+EQ = uuid.uuid4()
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_segment_keys_are_unordered_pairs_per_equivalent():
+    keys = segment_keys(EQ, [["A", "B", "C"], ["C", "B"]])
+    assert keys == {(str(EQ), "A", "B"), (str(EQ), "B", "C")}
+    assert segment_keys(uuid.uuid4(), [["A", "B"]]).isdisjoint(keys)
+
+
+@pytest.mark.asyncio
+async def test_overlapping_work_queues_in_order_and_disjoint_work_proceeds(monkeypatch):
+    monkeypatch.setattr(settings, "PAYMENT_CONFLICT_SCHEDULER_ENABLED", True)
+    scheduler = SegmentConflictScheduler()
+    ab = segment_keys(EQ, [["A", "B"]])
+    abc = segment_keys(EQ, [["A", "B", "C"]])
+    de = segment_keys(EQ, [["D", "E"]])
+
+    release_first = asyncio.Event()
+    order: list[str] = []
+
+    async def _run(name: str, keys, gate: asyncio.Event | None = None):
+        async with scheduler.hold(keys, phase="commit"):
+            order.append(f"{name}:start")
+            if gate is not None:
+                await gate.wait()
+            order.append(f"{name}:end")
+
+    waits_before = _sample("geo_payment_scheduler_wait_seconds_count", phase="commit")
+    first = asyncio.create_task(_run("first", ab, release_first))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(_run("second", abc))
+    third = asyncio.create_task(_run("third", ab))
+    await asyncio.create_task(_run("disjoint", de))
+    await asyncio.sleep(0)
+
+    # The disjoint unit ran to completion while the overlapping ones are queued.
+    assert order == ["first:start", "disjoint:start", "disjoint:end"]
+
+    release_first.set()
+    await asyncio.gather(first, second, third)
+    assert order[3:] == ["first:end", "second:start", "second:end", "third:start", "third:end"]
+    assert _sample("geo_payment_scheduler_wait_seconds_count", phase="commit") == waits_before + 4
+    assert scheduler._owners == {} and scheduler._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_reentry_and_cancelled_waiter_do_not_leak(monkeypatch):
+    monkeypatch.setattr(settings, "PAYMENT_CONFLICT_SCHEDULER_ENABLED", True)
+    scheduler = SegmentConflictScheduler()
+    keys = segment_keys(EQ, [["A", "B"]])
+
+    async with scheduler.hold(keys, phase="commit"):
+        # Commit aborting its own transaction re-enters the keys it holds.
+        async with scheduler.hold(keys, phase="abort"):
+            pass
+
+        waiter = asyncio.create_task(scheduler.hold(keys, phase="commit").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    assert scheduler._owners == {} and scheduler._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_disabled_scheduler_does_not_queue(monkeypatch):
+    monkeypatch.setattr(settings, "PAYMENT_CONFLICT_SCHEDULER_ENABLED", False)
+    scheduler = SegmentConflictScheduler()
+    keys = segment_keys(EQ, [["A", "B"]])
+
+    async with scheduler.hold(keys, phase="commit"):
+        await asyncio.wait_for(scheduler.hold(keys, phase="commit").__aenter__(), timeout=1)
+    assert scheduler._owners == {}
+
+
+@pytest.mark.asyncio
+async def test_uow_retry_counts_conflicts_and_retries_per_phase(monkeypatch):
+    from app.core.payments.engine import PaymentEngine
+
+    class _Session:
+        async def rollback(self):
+            pass
+
+    eng = PaymentEngine(_Session())  # type: ignore[arg-type]
+    eng._retry_attempts = 3
+    eng._retry_base_delay_s = 0.0
+    eng._retry_max_delay_s = 0.0
+    monkeypatch.setattr(eng, "_is_postgres", lambda: True)
+
+    class _FakePgError(Exception):
+        sqlstate = "40001"
+
+    calls = {"n": 0}
+
+    async def _fn():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise DBAPIError(
+                statement="SELECT 1",
+                params=None,
+                orig=_FakePgError("serialization_failure"),
+                connection_invalidated=False,
+            )
+        return "ok"
+
+    conflicts_before = _sample("geo_payment_uow_conflicts_total", phase="prepare", sqlstate="40001")
+    retries_before = _sample("geo_payment_uow_retries_total", phase="prepare")
+
+    assert await eng._run_uow_with_retry(op="prepare_routes", fn=_fn) == "ok"
+    assert calls["n"] == 2
+    assert _sample("geo_payment_uow_conflicts_total", phase="prepare", sqlstate="40001") == conflicts_before + 1
+    assert _sample("geo_payment_uow_retries_total", phase="prepare") == retries_before + 1
@@ -360,7 +360,7 @@ async def test_abort_reacquires_preheld_tx_lock_only_after_outer_rollback_retry(
             raise _Retry
         raise _Stop
 
-    async def _run_twice(*, op, fn, use_savepoint=False):
+    async def _run_twice(*, op, fn, use_savepoint=False, conflict_keys=frozenset()):
         assert op == ("abort" if commit else "abort_nocommit")
         assert use_savepoint is (not commit)
         with pytest.raises(_Retry):
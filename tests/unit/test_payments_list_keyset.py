@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.payments.service import PaymentService
+from app.db.models.participant import Participant
+from app.db.models.transaction import Transaction
+from app.utils.exceptions import BadRequestException
+
+
+def _payment(initiator, *, n: int, sender: str, receiver: str, equivalent: str, at: datetime):
+    return Transaction(
+        tx_id=f"TX_KEYSET_{n:03d}",
+        type="PAYMENT",
+        initiator_id=initiator.id,
+        payload={
+            "from": sender,
+            "to": receiver,
+            "amount": "1.00",
+            "equivalent": equivalent,
+            "routes": [],
+        },
+        state="COMMITTED",
+        created_at=at,
+        updated_at=at,
+    )
+
+
+async def _seed(db_session):
+    alice = Participant(pid="alice", display_name="Alice", public_key="A" * 64, type="person", status="active")
+    bob = Participant(pid="bob", display_name="Bob", public_key="B" * 64, type="person", status="active")
+    db_session.add_all([alice, bob])
+    await db_session.flush()
+
+    base = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    txs = []
+    for n in range(12):
+        sent = n % 3 != 0
+        txs.append(
+            _payment(
+                alice if sent else bob,
+                n=n,
+                sender="alice" if sent else "bob",
+                receiver="bob" if sent else "alice",
+                equivalent="USD" if n % 2 else "EUR",
+                # Pairs share a second so the `id` tie-break is exercised.
+                at=base + timedelta(seconds=n // 2),
+            )
+        )
+    db_session.add_all(txs)
+    await db_session.commit()
+    return alice, txs
+
+
+async def _walk(service, alice, **filters) -> list[str]:
+    seen: list[str] = []
+    cursor = None
+    while True:
+        page = await service.list_payments(
+            requester_participant_id=alice.id,
+            requester_pid="alice",
+            per_page=5,
+            cursor=cursor,
+            **filters,
+        )
+        assert len(page.items) <= 5
+        seen.extend(item.tx_id for item in page.items)
+        if page.next_cursor is None:
+            return seen
+        cursor = page.next_cursor
+
+
+@pytest.mark.asyncio
+async def test_payment_columns_are_filled_from_payload_on_insert(db_session):
+    _, txs = await _seed(db_session)
+
+    row = (
+        await db_session.execute(select(Transaction).where(Transaction.tx_id == txs[1].tx_id))
+    ).scalar_one()
+    assert (row.sender_pid, row.receiver_pid, row.equivalent_code) == ("alice", "bob", "USD")
+
+
+@pytest.mark.asyncio
+async def test_cursor_walk_returns_every_payment_once_newest_first(db_session):
+    alice, txs = await _seed(db_session)
+    service = PaymentService(db_session)
+
+    expected = [
+        tx.tx_id
+        for tx in sorted(txs, key=lambda tx: (tx.created_at, tx.id), reverse=True)
+    ]
+    assert await _walk(service, alice) == expected
+
+    sent = await _walk(service, alice, direction="sent")
+    assert sent == [tx_id for tx_id in expected if int(tx_id[-3:]) % 3 != 0]
+
+    received_usd = await _walk(service, alice, direction="received", equivalent="USD")
+    assert received_usd == [
+        tx_id for tx_id in expected if int(tx_id[-3:]) % 3 == 0 and int(tx_id[-3:]) % 2
+    ]
+
+
+@pytest.mark.asyncio
+async def test_legacy_page_parameter_still_pages_with_offset(db_session):
+    alice, _ = await _seed(db_session)
+    service = PaymentService(db_session)
+
+    walked = await _walk(service, alice)
+    second = await service.list_payments(
+        requester_participant_id=alice.id, requester_pid="alice", page=2, per_page=5
+    )
+    assert [item.tx_id for item in second.items] == walked[5:10]
+    assert second.next_cursor is not None
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_a_bad_request(db_session):
+    alice, _ = await _seed(db_session)
+    service = PaymentService(db_session)
+
+    with pytest.raises(BadRequestException):
+        await service.list_payments(
+            requester_participant_id=alice.id, requester_pid="alice", cursor="not-a-cursor"
+        )
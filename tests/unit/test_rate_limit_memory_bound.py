@@ -5,11 +5,12 @@ import pytest
 from app.api import deps
 from app.config import settings
 from app.utils.exceptions import TooManyRequestsException
+from app.utils.rate_limit import SlidingWindowCounter
 
 
-def _request(host: str) -> MagicMock:
+def _request(host: str, path: str = "/api/v1/test-rate-limit") -> MagicMock:
     request = MagicMock()
-    request.url.path = "/api/v1/test-rate-limit"
+    request.url.path = path
     request.client.host = host
     request.app.state.redis = None
     return request
@@ -17,15 +18,14 @@ def _request(host: str) -> MagicMock:
 
 @pytest.fixture(autouse=True)
 def _isolated_rate_limit_state(monkeypatch):
-    deps._rate_limit_counters.clear()
-    monkeypatch.setattr(deps, "_rate_limit_last_cleanup_bucket", None)
+    deps._rate_limit_windows.clear()
     monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
     monkeypatch.setattr(settings, "REDIS_ENABLED", False)
     monkeypatch.setattr(settings, "RATE_LIMIT_WINDOW_SECONDS", 60)
     monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS_PER_WINDOW", 100)
     monkeypatch.setattr(deps.time, "monotonic", lambda: 600.0)
     yield
-    deps._rate_limit_counters.clear()
+    deps._rate_limit_windows.clear()
 
 
 @pytest.mark.asyncio
@@ -37,13 +37,8 @@ async def test_unique_hosts_cannot_grow_in_memory_rate_limit_state_without_bound
     for index in range(20):
         await deps.rate_limit(_request(f"host-{index}"))
 
-    assert len(deps._rate_limit_counters) == 4
-    assert {host for _, host in deps._rate_limit_counters} == {
-        "host-16",
-        "host-17",
-        "host-18",
-        "host-19",
-    }
+    assert len(deps._rate_limit_windows) == 4
+    assert all(f"host-{index}" in deps._rate_limit_windows for index in range(16, 20))
 
 
 @pytest.mark.asyncio
@@ -56,8 +51,8 @@ async def test_recently_active_host_survives_unique_host_eviction(monkeypatch) -
         await deps.rate_limit(_request(f"unique-{index}"))
         await deps.rate_limit(hot_request)
 
-    assert deps._rate_limit_counters[(10, "hot-host")] == 11
-    assert len(deps._rate_limit_counters) == 3
+    assert deps._rate_limit_windows.count("hot-host") == 11
+    assert len(deps._rate_limit_windows) == 3
 
 
 @pytest.mark.asyncio
@@ -71,4 +66,40 @@ async def test_bounded_state_still_enforces_limit_for_real_host(monkeypatch) ->
     with pytest.raises(TooManyRequestsException):
         await deps.rate_limit(request)
 
-    assert deps._rate_limit_counters[(10, "limited-host")] == 3
+    # Rejected requests are not counted.
+    assert deps._rate_limit_windows.count("limited-host") == 2
+
+
+@pytest.mark.asyncio
+async def test_heavy_routes_draw_more_of_the_budget(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS_PER_WINDOW", 10)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTE_COSTS", {"/api/v1/payments/max-flow": 4})
+    heavy = _request("client", path="/api/v1/payments/max-flow")
+
+    await deps.rate_limit(heavy)
+    await deps.rate_limit(heavy)
+    with pytest.raises(TooManyRequestsException):
+        await deps.rate_limit(heavy)
+
+    # Two cheap requests still fit in what is left.
+    await deps.rate_limit(_request("client"))
+    await deps.rate_limit(_request("client"))
+    assert deps._rate_limit_windows.count("client") == 10
+
+
+def test_sliding_window_does_not_allow_a_double_burst_at_the_boundary() -> None:
+    counter = SlidingWindowCounter()
+
+    def burst(now: float) -> int:
+        return sum(
+            counter.hit("c", now=now, window_seconds=10, limit=10) for _ in range(20)
+        )
+
+    # A full budget spent just before the boundary...
+    assert burst(19.9) == 10
+    # ...is still almost entirely inside the window just after it.
+    assert burst(20.1) == 0
+    # Halfway through the next bucket half of the previous one has slid out.
+    assert burst(25.0) == 5
+    # Two buckets later nothing of the burst remains.
+    assert burst(40.0) == 10
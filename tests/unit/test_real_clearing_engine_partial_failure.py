@@ -9,6 +9,7 @@ from types import SimpleNamespace
 
 import pytest
 
+from app.config import settings
 from app.core.clearing.service import ClearingCommittedAfterCancellation
 from app.core.simulator.models import RunRecord
 from app.core.simulator.real_clearing_engine import RealClearingEngine
@@ -316,3 +317,77 @@ async def test_cleared_volume_is_returned_as_exact_decimal() -> None:
     # a float seed would re-narrow it before the metric writer ever sees it.
     assert isinstance(cleared["EUR"], Decimal)
     assert cleared["EUR"] == Decimal("0")
+
+
+class _SlowPerEquivalentService:
+    """One cycle per equivalent; the first equivalent is the slowest to clear."""
+
+    delays = {"USD": 0.05, "EUR": 0.01, "UAH": 0.0}
+    in_flight = 0
+    max_in_flight = 0
+
+    def __init__(self, _session) -> None:
+        self.cleared = False
+
+    async def find_cycles(
+        self, equivalent: str, *, max_depth: int, allowed_participant_pids=None
+    ) -> list:
+        if self.cleared:
+            return []
+        cls = type(self)
+        cls.in_flight += 1
+        cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            await asyncio.sleep(cls.delays[equivalent])
+        finally:
+            cls.in_flight -= 1
+        return [[{"debtor": "alice", "creditor": "bob", "amount": "1.00", "eq": equivalent}]]
+
+    async def execute_clearing_with_amount(
+        self, cycle, *, allowed_participant_pids=None
+    ) -> Decimal | None:
+        self.cleared = True
+        return Decimal(str(len(cycle[0]["eq"])))
+
+
+@pytest.mark.asyncio
+async def test_equivalents_clear_concurrently_with_ordered_done_events(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "SIMULATOR_CLEARING_EQ_CONCURRENCY", 3)
+    _SlowPerEquivalentService.max_in_flight = 0
+    sse = _SseCapture()
+    run = RunRecord(run_id="parallel-clearing-run", scenario_id="scenario", mode="real", state="running")
+    run.tick_index = 1
+    for eq in ("USD", "EUR", "UAH"):
+        run._real_viz_by_eq[eq] = _VizHelper()
+
+    engine = RealClearingEngine(
+        lock=threading.RLock(),
+        sse=sse,
+        utc_now=lambda: datetime(2026, 10, 18, tzinfo=timezone.utc),
+        logger=logging.getLogger(__name__),
+        edge_patch_builder=_EdgePatchBuilder(),
+        clearing_max_depth_limit=6,
+        clearing_max_fx_edges_limit=8,
+        real_clearing_time_budget_ms=10_000,
+    )
+
+    async def _apply_trust_growth(**_kwargs):
+        return SimpleNamespace(updated_count=0)
+
+    cleared = await engine.tick_real_mode_clearing(
+        None,
+        run_id=run.run_id,
+        run=run,
+        equivalents=["USD", "EUR", "UAH"],
+        apply_trust_growth=_apply_trust_growth,
+        build_edge_patch_for_equivalent=None,
+        broadcast_topology_edge_patch=None,
+        async_session_local=lambda: _SessionContext(),
+        clearing_service_cls=_SlowPerEquivalentService,
+    )
+
+    assert cleared == {"USD": Decimal("3"), "EUR": Decimal("3"), "UAH": Decimal("3")}
+    assert _SlowPerEquivalentService.max_in_flight == 3
+    done = [event["equivalent"] for event in sse.events if event["type"] == "clearing.done"]
+    # USD finishes last but its event still comes first, as in sequential mode.
+    assert done == ["USD", "EUR", "UAH"]
@@ -5,6 +5,7 @@ from decimal import Decimal
 import pytest
 from sqlalchemy import delete, func, select
 
+from app.config import settings
 from app.core.payments.engine import PaymentEngine
 from app.core.recovery import (
     abort_stale_payment_transactions,
@@ -406,6 +407,52 @@ async def test_expired_lock_cleanup_counts_observed_resolved_ids_for_terminal_ou
     assert remaining_locks == 0
 
 
+@pytest.mark.asyncio
+async def test_bulk_expired_lock_cleanup_matches_engine_outcomes(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "RECOVERY_BULK_BATCH_SIZE", 2)
+    expired_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    live_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    prepared = [_payment_transaction(f"TX_BULK_{i}") for i in range(3)]
+    committed = _payment_transaction("TX_BULK_COMMITTED")
+    committed.state = "COMMITTED"
+    aborted = _payment_transaction("TX_BULK_ABORTED")
+    aborted.state = "ABORTED"
+    aborted.error = {"code": "E010", "message": "Routing failed", "details": {"hop": 1}}
+    live = _payment_transaction("TX_BULK_LIVE")
+    db_session.add_all([*prepared, committed, aborted, live])
+    db_session.add_all(
+        [
+            *(_prepare_lock(tx.tx_id, expires_at=expired_at) for tx in prepared),
+            _prepare_lock(prepared[0].tx_id, expires_at=expired_at),
+            _prepare_lock(committed.tx_id, expires_at=expired_at),
+            _prepare_lock(aborted.tx_id, expires_at=expired_at),
+            _prepare_lock(live.tx_id, expires_at=live_at),
+        ]
+    )
+    await db_session.commit()
+
+    async def _no_engine(self, *args, **kwargs):
+        raise AssertionError("bulk mode must not abort per transaction")
+
+    monkeypatch.setattr(PaymentEngine, "abort", _no_engine)
+
+    result = await cleanup_expired_prepare_locks(db_session)
+
+    assert result.expired_lock_ids_resolved == 6
+    assert result.transactions_aborted == 3
+    assert result.terminal_transactions_seen == 2
+    assert result.succeeded and not result.deadline_reached
+    for tx in (*prepared, committed, aborted, live):
+        await db_session.refresh(tx)
+    assert [tx.state for tx in prepared] == ["ABORTED"] * 3
+    assert prepared[0].error == {"code": "E007", "message": "Prepare lock expired", "details": {}}
+    assert committed.state == "COMMITTED" and committed.error is None
+    assert aborted.error == {"code": "E007", "message": "Routing failed", "details": {"hop": 1}}
+    assert live.state == "PREPARED"
+    remaining_tx_ids = (await db_session.execute(select(PrepareLock.tx_id))).scalars().all()
+    assert remaining_tx_ids == [live.tx_id]
+
+
 @pytest.mark.asyncio
 async def test_recovery_item_rollback_failure_escalates_the_batch(
     db_session,
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.core.payments.graph_codec import (
+    GraphSnapshot,
+    decode_graph,
+    decode_topology,
+    encode_graph,
+    encode_topology,
+)
+from app.core.payments.router import PaymentRouter
+from app.db.models.equivalent import Equivalent
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+from app.utils import shared_cache as shared_cache_module
+from app.utils.shared_cache import RedisSharedCache, SharedCache
+
+
+class _MemorySharedCache(SharedCache):
+    """Versioned in-memory stand-in with the RedisSharedCache key semantics."""
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.versions: dict[str, int] = {}
+        self.values: dict[str, bytes] = {}
+        self.invalidated: list[str | None] = []
+
+    async def get(self, namespace, key, *, scope):
+        token = f"{self.versions.get('*', 0)}.{self.versions.get(scope or '*', 0)}"
+        return token, self.values.get(f"{namespace}:{token}:{key}")
+
+    async def set(self, namespace, key, value, *, token, ttl_seconds):
+        self.values[f"{namespace}:{token}:{key}"] = value
+
+    def invalidate(self, scope):
+        self.invalidated.append(scope)
+        self.versions["*"] = self.versions.get("*", 0) + 1
+        if scope:
+            self.versions[scope] = self.versions.get(scope, 0) + 1
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = _MemorySharedCache()
+    monkeypatch.setattr(settings, "ROUTING_GRAPH_CACHE_TTL_SECONDS", 60)
+    shared_cache_module.set_shared_cache(cache)
+    PaymentRouter.drop_local_cache()
+    try:
+        yield cache
+    finally:
+        shared_cache_module.set_shared_cache(None)
+        PaymentRouter.drop_local_cache()
+
+
+def test_graph_snapshot_round_trips_exactly():
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    snapshot = GraphSnapshot(
+        graph={"A": {"B": Decimal("10.50")}, "B": {"C": Decimal("0.0001")}, "C": {}},
+        edge_can_be_intermediate={"A": {"B": False}, "B": {"C": True}, "C": {}},
+        edge_blocked_participants={"A": {"B": {"Z", "Y"}}, "B": {"C": set()}, "C": {}},
+        pids={a: "A", b: "B", c: "C"},
+        uuids={"A": a, "B": b, "C": c},
+    )
+
+    decoded = decode_graph(encode_graph(snapshot))
+    assert decoded == snapshot
+    assert str(decoded.graph["A"]["B"]) == "10.50"
+
+    topology = {"A": {"B", "C"}, "B": {"C"}}
+    assert decode_topology(encode_topology(topology)) == topology
+
+
+def test_decoder_rejects_foreign_blobs():
+    with pytest.raises(ValueError):
+        decode_graph(encode_topology({"A": {"B"}}))
+
+
+@pytest.mark.asyncio
+async def test_second_worker_reuses_graph_until_invalidated(db_session, memory_cache):
+    usd = Equivalent(code="USD", precision=2, is_active=True)
+    a = Participant(pid="A", display_name="A", public_key="pkA", type="person", status="active")
+    b = Participant(pid="B", display_name="B", public_key="pkB", type="person", status="active")
+    db_session.add_all([usd, a, b])
+    await db_session.flush()
+    db_session.add(
+        TrustLine(from_participant_id=b.id, to_participant_id=a.id, equivalent_id=usd.id, limit=Decimal("100"))
+    )
+    await db_session.commit()
+
+    first = PaymentRouter(db_session)
+    await first.build_graph("USD")
+    assert first.graph["A"]["B"] == Decimal("100")
+    assert len(memory_cache.values) == 1
+
+    # Another worker: empty first tier, and a session that must not be queried.
+    PaymentRouter.drop_local_cache()
+    second = PaymentRouter.in_memory()
+    await second.build_graph("USD")
+    assert second.graph == first.graph
+    assert second.uuids == first.uuids
+
+    PaymentRouter.invalidate_cache("USD")
+    assert memory_cache.invalidated == ["USD"]
+    third = PaymentRouter(db_session)
+    await third.build_graph("USD")
+    assert len(memory_cache.values) == 2
+
+
+def test_remote_invalidation_drops_local_entries_but_not_own_echo():
+    cache = RedisSharedCache(client=None)
+    PaymentRouter._graph_cache["EUR"] = (0.0, {}, {}, {}, {}, {})
+    try:
+        cache._handle_message(f"{cache._origin}|EUR".encode())
+        assert "EUR" in PaymentRouter._graph_cache
+
+        cache._handle_message(b"other-worker|EUR")
+        assert "EUR" not in PaymentRouter._graph_cache
+    finally:
+        PaymentRouter._graph_cache.pop("EUR", None)
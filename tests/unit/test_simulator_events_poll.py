@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from app.core.simulator.models import RunRecord
+from app.core.simulator.sse_broadcast import SseBroadcast, SseReplayUnavailable
+
+
+def _make_sse(*, buffer_max: int = 16):
+    run = RunRecord(run_id="run_poll", scenario_id="scenario", mode="fixtures", state="running")
+    sse = SseBroadcast(
+        lock=threading.RLock(),
+        runs={run.run_id: run},
+        get_event_buffer_max=lambda: buffer_max,
+        get_event_buffer_ttl_sec=lambda: 0,
+        get_sub_queue_max=lambda: 8,
+        enqueue_event_artifact=lambda _run_id, _payload: None,
+        logger=logging.getLogger("test.sse.poll"),
+    )
+    return sse, run
+
+
+def _publish(sse: SseBroadcast, run: RunRecord, *, event_type: str = "tx.updated", equivalent: str = "EUR"):
+    return sse.publish_event(
+        run_id=run.run_id,
+        payload_factory=lambda event_id: {"event_id": event_id, "type": event_type, "equivalent": equivalent},
+    )
+
+
+@pytest.mark.asyncio
+async def test_poll_waits_for_the_next_matching_event_without_subscribing() -> None:
+    sse, run = _make_sse()
+    _publish(sse, run)
+
+    poll = asyncio.create_task(
+        sse.poll_events(
+            run.run_id, equivalent="EUR", after_event_id=None, types={"clearing.done"}, limit=10, timeout_sec=5
+        )
+    )
+    await asyncio.sleep(0.01)
+    assert not poll.done() and run._subs == []
+
+    _publish(sse, run, equivalent="UAH", event_type="clearing.done")
+    skipped = _publish(sse, run)
+    await asyncio.sleep(0.01)
+    assert not poll.done()
+
+    # A producer on another thread wakes the poller too.
+    done = await asyncio.to_thread(_publish, sse, run, event_type="clearing.done")
+    events, cursor = await asyncio.wait_for(poll, timeout=1)
+
+    assert [e["event_id"] for e in events] == [done["event_id"]]
+    assert cursor == done["event_id"] != skipped["event_id"]
+    assert sse._poll_waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_poll_batches_from_the_cursor_and_times_out_empty() -> None:
+    sse, run = _make_sse()
+    cursor = _publish(sse, run)["event_id"]
+    batch = [_publish(sse, run)["event_id"] for _ in range(3)]
+
+    events, next_cursor = await sse.poll_events(
+        run.run_id, equivalent="EUR", after_event_id=cursor, limit=2, timeout_sec=5
+    )
+    assert ([e["event_id"] for e in events], next_cursor) == (batch[:2], batch[1])
+
+    events, next_cursor = await sse.poll_events(
+        run.run_id, equivalent="EUR", after_event_id=next_cursor, limit=2, timeout_sec=5
+    )
+    assert ([e["event_id"] for e in events], next_cursor) == (batch[2:], batch[2])
+
+    events, idle_cursor = await sse.poll_events(
+        run.run_id, equivalent="EUR", after_event_id=next_cursor, limit=2, timeout_sec=0.05
+    )
+    assert (events, idle_cursor) == ([], batch[2])
+
+
+@pytest.mark.asyncio
+async def test_poll_rejects_a_cursor_that_fell_out_of_the_buffer() -> None:
+    sse, run = _make_sse(buffer_max=2)
+    cursor = _publish(sse, run)["event_id"]
+    for _ in range(3):
+        _publish(sse, run)
+
+    with pytest.raises(SseReplayUnavailable):
+        await sse.poll_events(run.run_id, equivalent="EUR", after_event_id=cursor, limit=10, timeout_sec=0)
@@ -1,10 +1,12 @@
 import logging
 import threading
 from datetime import datetime, timezone
+from decimal import Decimal
 
 import pytest
 
 from app.core.simulator.models import RunRecord
+from app.core.simulator.real_payment_planner import RealPaymentPlanner
 from app.core.simulator.real_runner import RealRunner
 
 
@@ -105,3 +107,33 @@ def test_real_planner_seq_is_contiguous_per_tick() -> None:
     planned = runner._plan_real_payments(run, scenario)
     assert len(planned) > 0
     assert [a.seq for a in planned] == list(range(len(planned)))
+
+
+def test_real_planner_reuses_compiled_indexes_until_trustlines_change() -> None:
+    scenario = _scenario_minimal()
+    scenario["trustlines"].append(
+        {"equivalent": "HOUR", "from": "C", "to": "B", "limit": "10", "status": "active"}
+    )
+    planner = RealPaymentPlanner(
+        actions_per_tick_max=10,
+        amount_cap_limit=None,
+        logger=logging.getLogger(__name__),
+        action_factory=lambda *args: args,
+    )
+
+    compiled = planner.compile_scenario(scenario)
+    assert compiled.reachable("HOUR", "B").nodes == ["A", "C"]
+    assert planner.compile_scenario(scenario) is compiled
+
+    # A limit change (trust drift) recompiles limits but keeps reachability.
+    scenario["trustlines"][0]["limit"] = 4.0
+    drifted = planner.compile_scenario(scenario)
+    assert drifted is not compiled
+    assert drifted.max_outgoing_limit[("B", "HOUR")] == Decimal("10")
+    assert drifted.direct_edge_limit[("B", "A", "HOUR")] == Decimal("4.0")
+    assert drifted._reachable is compiled._reachable
+
+    # Freezing an edge changes the topology and drops the cached reachability.
+    scenario["trustlines"][2]["status"] = "frozen"
+    frozen = planner.compile_scenario(scenario)
+    assert frozen.reachable("HOUR", "B").nodes == ["A"]
@@ -0,0 +1,78 @@
+import json
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.config import settings
+from app.core.simulator.models import RunRecord
+from app.core.simulator.runtime import runtime
+from app.main import app
+
+
+@pytest.fixture
+def ws_run():
+    run = RunRecord(run_id="run_ws", scenario_id="scenario", mode="fixtures", state="paused", owner_id="admin")
+    with runtime._lock:
+        runtime._runs[run.run_id] = run
+    yield run
+    with runtime._lock:
+        runtime._runs.pop(run.run_id, None)
+
+
+def _publish(run: RunRecord, *, equivalent: str, event_type: str = "tx.updated"):
+    return runtime._sse.publish_event(
+        run_id=run.run_id,
+        payload_factory=lambda event_id: {"event_id": event_id, "type": event_type, "equivalent": equivalent},
+    )
+
+
+def test_run_websocket_multiplexes_equivalents_and_resumes_after_cursor(ws_run):
+    headers = {"X-Admin-Token": settings.ADMIN_TOKEN}
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/api/v1/simulator/runs/{ws_run.run_id}/ws", headers=headers) as ws:
+            assert ws.receive_json()["type"] == "hello"
+            ws.send_text(json.dumps({"type": "subscribe", "equivalents": ["uah", "EUR"]}))
+            assert ws.receive_json()["equivalents"] == ["EUR", "UAH"]
+            assert ws.receive_json()["type"] == "run_status"
+
+            uah = _publish(ws_run, equivalent="UAH")
+            _publish(ws_run, equivalent="USD")
+            eur = _publish(ws_run, equivalent="EUR")
+            assert [ws.receive_json()["event_id"] for _ in range(2)] == [uah["event_id"], eur["event_id"]]
+
+        # Reconnect from the first event: the EUR one is replayed, batched and compressed.
+        with client.websocket_connect(f"/api/v1/simulator/runs/{ws_run.run_id}/ws", headers=headers) as ws:
+            ws.receive_json()
+            ws.send_text(
+                json.dumps(
+                    {"type": "subscribe", "equivalents": ["EUR"], "after": uah["event_id"], "encoding": "zlib"}
+                )
+            )
+            assert ws.receive_json()["after"] == uah["event_id"]
+            batch = json.loads(zlib.decompress(ws.receive_bytes()))
+            assert [e["event_id"] for e in batch] == [eur["event_id"]]
+
+
+def test_run_websocket_rejects_missing_credentials_and_stale_cursors(ws_run, monkeypatch):
+    monkeypatch.setattr(runtime, "_event_buffer_max", 2)
+    headers = {"X-Admin-Token": settings.ADMIN_TOKEN}
+    stale = _publish(ws_run, equivalent="UAH")["event_id"]
+    for _ in range(3):
+        _publish(ws_run, equivalent="UAH")
+
+    with TestClient(app) as client:
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(f"/api/v1/simulator/runs/{ws_run.run_id}/ws"):
+                pass
+        assert exc_info.value.code == 1008
+
+        with client.websocket_connect(f"/api/v1/simulator/runs/{ws_run.run_id}/ws", headers=headers) as ws:
+            ws.receive_json()
+            ws.send_text(json.dumps({"type": "subscribe", "equivalents": ["UAH"], "after": stale}))
+            ws.receive_json()
+            assert ws.receive_json() == {"type": "error", "error": "replay_unavailable"}
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+            assert exc_info.value.code == 4410
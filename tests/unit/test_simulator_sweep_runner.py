@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core.simulator.adaptive_clearing_policy import AdaptiveClearingPolicyConfig
+from app.core.simulator.models import TrustDriftConfig
+from app.core.simulator.sweep_runner import SweepGrid, expand_grid, run_sweep
+from app.core.simulator.turbo_engine import TurboConfig
+
+_SCENARIO = Path(__file__).resolve().parents[2] / "fixtures" / "simulator" / "minimal" / "scenario.json"
+
+
+def _grid() -> SweepGrid:
+    return SweepGrid(
+        base=TurboConfig(ticks=12, clearing_every_n_ticks=4),
+        intensities=(50, 100),
+        seeds=(1, 2),
+        clearing_policies={"static": None, "adaptive": AdaptiveClearingPolicyConfig(window_ticks=4)},
+        trust_drifts={"off": TrustDriftConfig(enabled=False)},
+    )
+
+
+def test_grid_expands_to_every_combination_with_the_right_policy():
+    points = expand_grid(_grid())
+
+    assert len(points) == 2 * 2 * 2
+    adaptive = [p for p in points if p.clearing == "adaptive"]
+    assert {p.config.clearing_policy for p in adaptive} == {"adaptive"}
+    assert all(p.config.adaptive_config.window_ticks == 4 for p in adaptive)
+    assert {p.group for p in points if p.seed == 1} == {p.group for p in points if p.seed == 2}
+
+
+def test_pool_and_inline_runs_produce_the_same_report():
+    scenario = json.loads(_SCENARIO.read_text(encoding="utf-8"))
+
+    inline = run_sweep(scenario, _grid(), workers=1).to_dict()
+    pooled = run_sweep(scenario, _grid(), workers=2).to_dict()
+
+    assert inline == pooled
+    assert inline["runs"] == 8
+    assert len(inline["variants"]) == 4
+    row = inline["variants"][0]
+    assert row["seeds"] == [1, 2]
+    assert len(row["series"]["committed"]) == 12
+    # Rows come best-first.
+    rates = [v["success_rate"]["mean"] for v in inline["variants"]]
+    assert rates == sorted(rates, reverse=True)
+
+
+def test_cli_rejects_unknown_clearing_modes(monkeypatch, capsys, tmp_path):
+    from scripts.run_simulator_sweep import main
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["run_simulator_sweep.py", "--scenario", str(_SCENARIO), "--clearing", "static,adaptiv",
+         "--out", str(tmp_path / "sweep.json")],
+    )
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 2
+    assert "adaptiv" in capsys.readouterr().err
+    assert not (tmp_path / "sweep.json").exists()
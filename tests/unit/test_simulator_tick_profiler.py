@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.core.simulator.models import RunRecord
+from app.core.simulator.tick_profiler import TickProfiler, folded_stacks, record_tick_profile
+
+
+@pytest.mark.asyncio
+async def test_phases_nest_and_count_statements_and_rows_in_the_innermost_phase():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    profiler = TickProfiler(run_id="r1", tick_index=4)
+    try:
+        async with engine.connect() as conn:
+            # Outside the tick: not attributed to anything.
+            await conn.execute(text("CREATE TABLE t (a INTEGER)"))
+            await conn.execute(text("INSERT INTO t VALUES (1), (2), (3)"))
+
+            profiler.start()
+            with profiler.phase("payments"):
+                await conn.execute(text("SELECT a FROM t"))
+                with profiler.phase("planning"):
+                    await conn.execute(text("SELECT a FROM t WHERE a > 1"))
+                    await conn.execute(text("SELECT 1"))
+            for _ in range(2):
+                with profiler.phase("edge_patches"):
+                    await conn.execute(text("UPDATE t SET a = a + 1"))
+            profile = profiler.finish()
+
+            await conn.execute(text("SELECT a FROM t"))
+    finally:
+        await engine.dispose()
+
+    by_path = {p["path"]: p for p in profile["phases"]}
+    assert list(by_path) == ["tick", "tick;payments", "tick;payments;planning", "tick;edge_patches"]
+    assert (by_path["tick;payments"]["statements"], by_path["tick;payments"]["rows"]) == (1, 3)
+    assert (by_path["tick;payments;planning"]["statements"], by_path["tick;payments;planning"]["rows"]) == (2, 3)
+    # Writes are round-trips but read no rows; re-entering a phase accumulates.
+    assert by_path["tick;edge_patches"] | {"wall_ms": 0, "self_ms": 0, "db_ms": 0} == {
+        "phase": "edge_patches",
+        "path": "tick;edge_patches",
+        "calls": 2,
+        "wall_ms": 0,
+        "self_ms": 0,
+        "statements": 2,
+        "rows": 0,
+        "db_ms": 0,
+    }
+    assert (profile["tick_index"], profile["statements"], profile["rows"]) == (4, 5, 6)
+
+    payments = by_path["tick;payments"]
+    planning = by_path["tick;payments;planning"]
+    assert payments["self_ms"] == pytest.approx(payments["wall_ms"] - planning["wall_ms"], abs=0.01)
+    assert profile["wall_ms"] >= payments["wall_ms"] + by_path["tick;edge_patches"]["wall_ms"]
+
+
+def test_history_is_bounded_and_folds_into_flamegraph_stacks(monkeypatch):
+    monkeypatch.setattr(settings, "SIMULATOR_TICK_PROFILE_HISTORY", 2)
+    run = RunRecord(run_id="r1", scenario_id="s1", mode="real", state="running")
+    for tick in range(3):
+        record_tick_profile(
+            run,
+            {
+                "tick_index": tick,
+                "phases": [
+                    {"path": "tick", "self_ms": 1.0},
+                    {"path": "tick;payments", "self_ms": 0.5},
+                    {"path": "tick;audit", "self_ms": 0.0},
+                ],
+            },
+        )
+
+    assert [p["tick_index"] for p in run._tick_profiles] == [1, 2]
+    assert folded_stacks(run._tick_profiles) == "tick 2000\ntick;payments 1000\n"
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from app.core.simulator.models import TrustDriftConfig
+from app.core.simulator.turbo_engine import (
+    InMemoryLedger,
+    TurboConfig,
+    TurboSimulation,
+    persist_end_state,
+    run_turbo,
+)
+from app.db.models.debt import Debt
+from app.db.models.trustline import TrustLine
+from app.schemas.simulator import (
+    SimulatorClearingDoneEvent,
+    SimulatorTopologyChangedEvent,
+    SimulatorTxFailedEvent,
+    SimulatorTxUpdatedEvent,
+)
+
+_FIXTURES = Path(__file__).resolve().parents[2] / "fixtures" / "simulator"
+
+
+def _triangle(*, auto_clearing: bool = True) -> dict:
+    policy = {"auto_clearing": auto_clearing}
+    return {
+        "scenario_id": "turbo-triangle",
+        "equivalents": ["UAH"],
+        "participants": [{"id": pid, "type": "person"} for pid in ("A", "B", "C")],
+        "trustlines": [
+            {"from": "B", "to": "A", "limit": 100, "equivalent": "UAH", "policy": policy},
+            {"from": "C", "to": "B", "limit": 100, "equivalent": "UAH", "policy": policy},
+            {"from": "A", "to": "C", "limit": 100, "equivalent": "UAH", "policy": policy},
+        ],
+    }
+
+
+def test_flows_net_reverse_debt_and_keep_routing_capacity_in_sync():
+    ledger = InMemoryLedger(_triangle())
+    graph = ledger.routers["UAH"].graph
+    assert graph["A"]["B"] == Decimal("100")
+    # The ledger owns the graph; its routers never touch a database.
+    with pytest.raises(RuntimeError):
+        ledger.routers["UAH"].session
+
+    ledger.apply_flow("UAH", "A", "B", Decimal("30"))
+    assert ledger.debt("UAH", "A", "B") == Decimal("30")
+    assert graph["A"]["B"] == Decimal("70")
+    # Like `_build_graph_impl`, only trustlines create edges: A never trusted B.
+    assert "A" not in graph["B"]
+
+    # A flow against existing debt settles it before creating any new debt.
+    ledger.apply_flow("UAH", "B", "A", Decimal("30"))
+    assert ledger.debt_snapshot() == {}
+    assert graph["A"]["B"] == Decimal("100")
+
+
+def test_clearing_closes_cycles_only_where_policy_allows():
+    ledger = InMemoryLedger(_triangle())
+    for u, v, amount in (("A", "B", "40"), ("B", "C", "25"), ("C", "A", "60")):
+        ledger.apply_flow("UAH", u, v, Decimal(amount))
+
+    volume, cycles, per_edge = ledger.clear("UAH", max_depth=6)
+    assert (volume, cycles) == (Decimal("25"), 1)
+    assert per_edge == {("B", "A"): Decimal("25"), ("C", "B"): Decimal("25"), ("A", "C"): Decimal("25")}
+    assert ledger.debt_snapshot() == {
+        ("A", "B", "UAH"): Decimal("15"),
+        ("C", "A", "UAH"): Decimal("35"),
+    }
+
+    blocked = InMemoryLedger(_triangle(auto_clearing=False))
+    for u, v in (("A", "B"), ("B", "C"), ("C", "A")):
+        blocked.apply_flow("UAH", u, v, Decimal("10"))
+    assert blocked.clear("UAH", max_depth=6) == (Decimal("0"), 0, {})
+
+
+def test_trust_drift_grows_cleared_edges_and_decays_overloaded_ones():
+    drift = TrustDriftConfig(enabled=True, growth_rate=0.1, decay_rate=0.5, overload_threshold=0.7)
+    sim = TurboSimulation(_triangle(), TurboConfig(ticks=0, trust_drift=drift))
+    for u, v in (("A", "B"), ("B", "C"), ("C", "A")):
+        sim.ledger.apply_flow("UAH", u, v, Decimal("10"))
+    sim.ledger.apply_flow("UAH", "A", "B", Decimal("85"))
+
+    volume, grown = sim._maybe_clear("UAH", 25, attempted=0, rejected_no_capacity=0)
+    assert volume == Decimal("10") and grown == 3
+    assert sim.ledger.lines["UAH"][("B", "A")].limit == Decimal("110.00")
+    # Drift is mirrored into the scenario the planner reads.
+    assert sim.scenario["trustlines"][0]["limit"] == 110.0
+
+    # Decay skips edges cleared in this tick, then floors the limit at the debt.
+    assert sim._apply_decay(25) == 0
+    assert sim._apply_decay(26) == 1
+    assert sim.ledger.lines["UAH"][("B", "A")].limit == Decimal("85.00")
+
+
+def test_runs_are_deterministic_and_leave_the_input_scenario_alone():
+    scenario = json.loads((_FIXTURES / "minimal" / "scenario.json").read_text(encoding="utf-8"))
+    original = json.loads(json.dumps(scenario))
+    config = TurboConfig(ticks=30, seed=11, intensity_percent=100, clearing_every_n_ticks=10)
+
+    first = run_turbo(scenario, config)
+    second = run_turbo(scenario, config)
+
+    assert first.totals()["attempted"] > 0
+    assert [t.committed for t in first.ticks] == [t.committed for t in second.ticks]
+    assert first.debts == second.debts
+    assert scenario == original
+    for (debtor, creditor, eq), amount in first.debts.items():
+        assert amount <= first.limits[(creditor, debtor, eq)]
+
+
+def test_collected_events_validate_against_the_real_mode_sse_schemas():
+    scenario = json.loads((_FIXTURES / "clearing-demo-10" / "scenario.json").read_text(encoding="utf-8"))
+    drift = TrustDriftConfig(enabled=True, growth_rate=0.1, decay_rate=0.5, overload_threshold=0.7)
+    config = TurboConfig(
+        ticks=20, seed=11, intensity_percent=100, clearing_every_n_ticks=5, trust_drift=drift, collect_events=True
+    )
+    result = run_turbo(scenario, config)
+
+    schemas = {
+        "tx.updated": SimulatorTxUpdatedEvent,
+        "tx.failed": SimulatorTxFailedEvent,
+        "clearing.done": SimulatorClearingDoneEvent,
+        "topology.changed": SimulatorTopologyChangedEvent,
+    }
+    first_by_type = {}
+    for event in result.events:
+        first_by_type.setdefault(event["type"], event)
+    assert set(first_by_type) == set(schemas)
+    for event_type, event in first_by_type.items():
+        schemas[event_type].model_validate(event)
+
+    ids = [e["event_id"] for e in result.events]
+    assert len(set(ids)) == len(ids)
+    # Synthetic ids and simulated timestamps keep collected events reproducible.
+    again = run_turbo(scenario, config).events
+    assert [(e["type"], e["ts"]) for e in again] == [(e["type"], e["ts"]) for e in result.events]
+
+
+@pytest.mark.asyncio
+async def test_end_state_can_be_written_to_the_database(db_session):
+    sim = TurboSimulation(_triangle(), TurboConfig(ticks=0))
+    sim.ledger.apply_flow("UAH", "A", "B", Decimal("12.5"))
+    result = sim.run_all()
+
+    await persist_end_state(db_session, result)
+    await db_session.commit()
+
+    debts = (await db_session.execute(select(Debt))).scalars().all()
+    assert [d.amount for d in debts] == [Decimal("12.5")]
+    assert len((await db_session.execute(select(TrustLine))).scalars().all()) == 3
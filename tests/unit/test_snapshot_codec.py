@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.db.models.debt import Debt
+from app.db.models.equivalent import Equivalent
+from app.db.models.participant import Participant
+from app.db.models.trustline import TrustLine
+from app.schemas.simulator import SimulatorGraphSnapshot
+from app.utils import snapshot_cache, snapshot_codec
+
+
+def _snapshot(**link_overrides) -> SimulatorGraphSnapshot:
+    return SimulatorGraphSnapshot.model_validate(
+        {
+            "equivalent": "UAH",
+            "generated_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "nodes": [
+                {
+                    "id": "a",
+                    "name": "Alice",
+                    "type": "person",
+                    "status": "active",
+                    "links_count": 1,
+                    "net_balance_atoms": "-1250",
+                    "net_balance": "-12.50",
+                    "viz_color_key": "debtor",
+                    "viz_size": {"w": 18.5, "h": 18.5},
+                    "x": 3,
+                },
+                {"id": "b", "name": "Bob", "viz_color_key": "debtor"},
+            ],
+            "links": [
+                {
+                    "source": "a",
+                    "target": "b",
+                    "id": "a-b",
+                    "trust_limit": "100.00",
+                    "used": 12.5,
+                    "available": "87.5",
+                    "status": "active",
+                    "viz_width_key": "thin",
+                    **link_overrides,
+                }
+            ],
+            "palette": {"debtor": {"color": "#f00"}},
+        }
+    )
+
+
+def test_simulator_snapshot_round_trips_through_columns():
+    snap = _snapshot()
+    for compress in (True, False):
+        decoded = snapshot_codec.decode_snapshot(snapshot_codec.encode_simulator_snapshot(snap, compress))
+
+        assert decoded["meta"]["equivalent"] == "UAH"
+        assert decoded["meta"]["amount_scale"] == 2
+        assert decoded["meta"]["palette"] == {"debtor": {"color": "#f00"}}
+        a, b = decoded["nodes"]
+        assert (a["id"], a["name"], a["links_count"], a["net_balance_atoms"]) == ("a", "Alice", 1, "-1250")
+        assert a["viz_size"] == {"w": 18.5, "h": 18.5}
+        assert a["extra"] == {"x": 3}
+        assert (b["type"], b["links_count"], b["net_balance_atoms"], b["viz_size"]) == (None, None, None, None)
+        (link,) = decoded["links"]
+        assert (link["source"], link["target"], link["viz_width_key"]) == ("a", "b", "thin")
+        assert [link[k] for k in ("trust_limit", "used", "available")] == ["100.00", "12.50", "87.50"]
+
+
+def test_unrepresentable_amounts_fall_back_to_json():
+    entry = snapshot_cache.make_snapshot(_snapshot(used="0.0000000000000000001"), b"{}")
+
+    served = snapshot_codec.negotiate(entry, snapshot_codec.MEDIA_TYPE, snapshot_codec.encode_simulator_snapshot)
+
+    assert served is entry
+
+
+def test_accept_header_selects_binary_and_compression():
+    assert snapshot_codec.requested_compression("application/json") is None
+    assert snapshot_codec.requested_compression(f"{snapshot_codec.MEDIA_TYPE};q=0, */*") is None
+    assert snapshot_codec.requested_compression(f"application/json;q=0.5, {snapshot_codec.MEDIA_TYPE}") is True
+    assert snapshot_codec.requested_compression(f"{snapshot_codec.MEDIA_TYPE}; compression=none") is False
+
+
+@pytest.mark.asyncio
+async def test_admin_snapshot_binary_matches_json(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_SNAPSHOT_CACHE_TTL_SECONDS", 60)
+    snapshot_cache.clear()
+
+    alice = Participant(pid="alice", display_name="Alice", public_key="A" * 64, type="person", status="active")
+    bob = Participant(pid="bob", display_name="Bob", public_key="B" * 64, type="business", status="active")
+    uah = Equivalent(code="UAH", symbol="₴", description="Hryvnia", precision=2, metadata_={}, is_active=True)
+    db_session.add_all([alice, bob, uah])
+    await db_session.flush()
+    db_session.add(
+        TrustLine(
+            from_participant_id=alice.id,
+            to_participant_id=bob.id,
+            equivalent_id=uah.id,
+            limit=Decimal("100.00"),
+            policy={"auto_clearing": True},
+            status="active",
+        )
+    )
+    db_session.add(Debt(debtor_id=bob.id, creditor_id=alice.id, equivalent_id=uah.id, amount=Decimal("7.25")))
+    await db_session.commit()
+
+    headers = {"X-Admin-Token": settings.ADMIN_TOKEN}
+    params = {"equivalent": "UAH"}
+    try:
+        as_json = await client.get("/api/v1/admin/graph/snapshot", headers=headers, params=params)
+        binary = await client.get(
+            "/api/v1/admin/graph/snapshot", headers={**headers, "Accept": snapshot_codec.MEDIA_TYPE}, params=params
+        )
+        assert binary.status_code == 200
+        assert binary.headers["content-type"] == snapshot_codec.MEDIA_TYPE
+        assert binary.headers["etag"] != as_json.headers["etag"]
+
+        expected = as_json.json()
+        decoded = snapshot_codec.decode_snapshot(binary.content)
+        assert [(n["id"], n["name"], n["type"], n["net_balance_atoms"]) for n in decoded["nodes"]] == [
+            (p["pid"], p["display_name"], p["type"], p["net_balance_atoms"]) for p in expected["participants"]
+        ]
+        assert [(t["source"], t["target"], t["trust_limit"], t["used"], t["policy"]) for t in decoded["links"]] == [
+            (t["from"], t["to"], t["limit"], t["used"], t["policy"]) for t in expected["trustlines"]
+        ]
+        assert [(d["debtor"], d["creditor"], Decimal(d["amount"])) for d in decoded["debts"]] == [
+            ("bob", "alice", Decimal("7.25"))
+        ]
+        assert [e["code"] for e in decoded["meta"]["equivalents"]] == ["UAH"]
+
+        again = await client.get(
+            "/api/v1/admin/graph/snapshot",
+            headers={**headers, "Accept": snapshot_codec.MEDIA_TYPE, "If-None-Match": binary.headers["etag"]},
+            params=params,
+        )
+        assert again.status_code == 304
+
+        plain = await client.get(
+            "/api/v1/admin/graph/ego",
+            headers={**headers, "Accept": f"{snapshot_codec.MEDIA_TYPE}; compression=none"},
+            params={**params, "pid": "alice"},
+        )
+        assert plain.content[4:6] == bytes([snapshot_codec.FORMAT_VERSION, 0])
+        assert snapshot_codec.decode_snapshot(plain.content)["meta"]["root_pid"] == "alice"
+    finally:
+        snapshot_cache.clear()
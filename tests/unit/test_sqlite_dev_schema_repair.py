@@ -29,6 +29,7 @@ from sqlalchemy import create_engine, text
 from scripts.init_sqlite_db import (
     LIVE_TRUSTLINE_INDEX,
     OLD_TRUSTLINE_UNIQUE_CONSTRAINT,
+    repair_missing_payment_party_columns,
     repair_stale_trustline_uniqueness,
 )
 
@@ -174,3 +175,39 @@ def test_repair_is_a_no_op_on_a_current_schema(tmp_path: Path) -> None:
         assert repair_stale_trustline_uniqueness(conn) is True
     with engine.begin() as conn:
         assert repair_stale_trustline_uniqueness(conn) is False
+
+
+def test_pre_020_transactions_gain_backfilled_payment_columns(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'pre020.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE transactions (id CHAR(32) NOT NULL PRIMARY KEY, "
+            "type VARCHAR(30) NOT NULL, payload JSON NOT NULL, "
+            "created_at DATETIME DEFAULT (CURRENT_TIMESTAMP))"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO transactions (id, type, payload) VALUES "
+            "('aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa', 'PAYMENT', "
+            "'{\"from\": \"alice\", \"to\": \"bob\", \"equivalent\": \"USD\"}'), "
+            "('bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb', 'CLEARING', '{\"equivalent\": \"USD\"}')"
+        )
+
+    with engine.begin() as conn:
+        assert repair_missing_payment_party_columns(conn) is True
+    with engine.begin() as conn:
+        assert repair_missing_payment_party_columns(conn) is False
+        rows = conn.exec_driver_sql(
+            "SELECT type, sender_pid, receiver_pid, equivalent_code FROM transactions "
+            "ORDER BY id"
+        ).fetchall()
+        assert [tuple(r) for r in rows] == [
+            ("PAYMENT", "alice", "bob", "USD"),
+            ("CLEARING", None, None, None),
+        ]
+        indexes = {
+            str(r[0])
+            for r in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='transactions'"
+            ).fetchall()
+        }
+        assert "ix_transactions_sender_created_id" in indexes